@@ -0,0 +1,293 @@
+"""
+Async FalkorDB Client
+
+Non-blocking variant of FalkorDBClient for FastAPI services, built on the
+falkordb asyncio API and a bounded redis.asyncio connection pool:
+
+- max_connections caps concurrent graph round-trips; callers wait up to
+  pool_timeout seconds for a free connection instead of opening more
+- every query has a server-side timeout (query_timeout_ms)
+- connection errors on reads trigger a reconnect and retry (retries);
+  writes are not retried, since the failed attempt may have been applied
+- health() pings the server and reports the pool size
+- reads go through the same result cache as FalkorDBClient
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from falkor_client import (
+    BaseFalkorClient, FalkorConfig, GRAPH_VERSION_QUERY,
+    is_write_query, paginate_query, to_columns
+)
+
+
+class AsyncFalkorDBClient(BaseFalkorClient):
+    """Async client with connection pool for FalkorDB operations."""
+
+    def __init__(self, config: Optional[FalkorConfig] = None):
+        super().__init__(config)
+        self._pool = None
+        self._db = None
+        self._graph = None
+        self._connect_lock = asyncio.Lock()
+        self.reconnects = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._graph is not None
+
+    async def connect(self) -> None:
+        """Create the connection pool and verify the server is reachable."""
+        async with self._connect_lock:
+            await self._connect()
+
+    async def _connect(self) -> None:
+        """connect() with _connect_lock held."""
+        if self._graph is not None:
+            return
+        try:
+            from falkordb.asyncio import FalkorDB
+            from redis.asyncio import BlockingConnectionPool
+        except ImportError:
+            raise RuntimeError("FalkorDB not installed. Run: pip install falkordb")
+
+        self._pool = BlockingConnectionPool(
+            host=self.config.host,
+            port=self.config.port,
+            password=self.config.password,
+            max_connections=self.config.max_connections,
+            timeout=self.config.pool_timeout,
+            health_check_interval=self.config.health_check_interval,
+            decode_responses=True,
+        )
+        try:
+            # The constructor probes for cluster mode with a blocking call
+            self._db = await asyncio.to_thread(FalkorDB, connection_pool=self._pool)
+            await self._db.connection.ping()
+        except Exception as e:
+            await self._reset()
+            raise RuntimeError(f"Connection failed: {e}")
+
+        self._graph = self._db.select_graph(self.config.graph_name)
+        print(f"[OK] Connected to FalkorDB at {self.config.host}:{self.config.port} "
+              f"(pool: {self.config.max_connections})")
+        print(f"[OK] Graph: {self.config.graph_name}")
+
+    async def _reset(self) -> None:
+        """Drop the pool and all its connections."""
+        pool = self._pool
+        self._graph = None
+        self._db = None
+        self._pool = None
+        if pool is not None:
+            await pool.disconnect()
+
+    async def _reconnect(self, failed_pool) -> None:
+        """
+        Replace failed_pool with a new pool.
+
+        Concurrent queries failing on the same pool reconnect once: the
+        first one replaces the pool, the others find it already replaced.
+        """
+        async with self._connect_lock:
+            if self._pool is failed_pool and failed_pool is not None:
+                self.reconnects += 1
+                await self._reset()
+            await self._connect()
+
+    async def _run(
+        self,
+        text: str,
+        used: Optional[Dict[str, Any]] = None,
+        timeout_ms: Optional[int] = None
+    ):
+        """
+        Send a prepared query, reconnecting and retrying reads on connection errors.
+
+        A timeout or dropped connection can happen after the server ran the
+        query, so writes are raised instead of retried.
+        """
+        from redis.exceptions import ConnectionError as RedisConnectionError
+        from redis.exceptions import TimeoutError as RedisTimeoutError
+
+        timeout_ms = timeout_ms if timeout_ms is not None else self.config.query_timeout_ms
+
+        if self._graph is None:
+            await self.connect()
+
+        retries = 0 if is_write_query(text) else self.config.retries
+        attempt = 0
+        while True:
+            pool, graph = self._pool, self._graph
+            try:
+                return await graph.query(text, used, timeout=timeout_ms)
+            except (RedisConnectionError, RedisTimeoutError, OSError):
+                if attempt >= retries:
+                    raise
+                attempt += 1
+                await asyncio.sleep(0.1 * attempt)
+                await self._reconnect(pool)
+
+    async def query(
+        self,
+        cypher: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout_ms: Optional[int] = None,
+        use_cache: bool = True
+    ) -> List[Dict]:
+        """Execute a Cypher query and return results."""
+        text, used = self._bind(cypher, params)
+
+        if use_cache and self._version_check_due():
+            await self.check_graph_version()
+
+        if use_cache:
+            cached = self._cache_get(text, used)
+            if cached is not None:
+                return cached
+
+        if is_write_query(text):
+            try:
+                return self._records(await self._run(text, used, timeout_ms))
+            finally:
+                self.invalidate_cache()
+
+        version = self.graph_version
+        records = self._records(await self._run(text, used, timeout_ms))
+        if use_cache:
+            self._cache_put(text, used, version, records)
+        return records
+
+    async def explain(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Execution plan (GRAPH.EXPLAIN) as a list of operation lines."""
+        if self._graph is None:
+            await self.connect()
+        text, used = self._bind(cypher, params)
+        return [line.strip() for line in (await self._graph.explain(text, used)).plan]
+
+    async def profile(
+        self,
+        cypher: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout_ms: Optional[int] = None
+    ) -> List[str]:
+        """Run the query with GRAPH.PROFILE (see FalkorDBClient.profile)."""
+        from falkordb.execution_plan import ExecutionPlan
+
+        if self._graph is None:
+            await self.connect()
+        text, used = self._bind(cypher, params)
+        plan = ExecutionPlan(await self._graph.execute_command(*self._profile_command(text, used, timeout_ms)))
+        return [line.rstrip() for line in plan.plan]
+
+    async def check_graph_version(self) -> Optional[int]:
+        """Read the stored graph version; cached results are dropped if it changed."""
+        return self._apply_stored_version(await self._run(GRAPH_VERSION_QUERY))
+
+    async def iter_query(
+        self,
+        cypher: str,
+        params: Optional[Dict[str, Any]] = None,
+        page_size: Optional[int] = None,
+        timeout_ms: Optional[int] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Iterate over query results, optionally one SKIP/LIMIT page at a time.
+
+        See FalkorDBClient.iter_query. Results are not cached.
+        """
+        if page_size is None:
+            text, used = self._bind(cypher, params)
+            for record in self._iter_records(await self._run(text, used, timeout_ms)):
+                yield record
+            return
+
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+
+        paged = paginate_query(cypher)
+        skip = 0
+        while True:
+            text, used = self._bind(paged, {**(params or {}), "page_skip": skip, "page_limit": page_size})
+            result = await self._run(text, used, timeout_ms)
+            count = len(result.result_set or [])
+            for record in self._iter_records(result):
+                yield record
+            if count < page_size:
+                return
+            skip += page_size
+
+    async def query_columns(
+        self,
+        cypher: str,
+        params: Optional[Dict[str, Any]] = None,
+        page_size: Optional[int] = None,
+        as_arrow: bool = False
+    ) -> Any:
+        """Run a read query and return columnar output (see FalkorDBClient.query_columns)."""
+        rows = [record async for record in self.iter_query(cypher, params, page_size=page_size)]
+        keys = list(rows[0].keys()) if rows else []
+        return to_columns(keys, iter(rows), as_arrow=as_arrow)
+
+    async def execute(
+        self,
+        cypher: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout_ms: Optional[int] = None
+    ) -> None:
+        """Execute a Cypher command without returning results."""
+        text, used = self._bind(cypher, params)
+        try:
+            await self._run(text, used, timeout_ms)
+        finally:
+            self.invalidate_cache()
+
+    async def health(self) -> Dict[str, Any]:
+        """Ping the server and report the pool size."""
+        status: Dict[str, Any] = {
+            "connected": self.connected,
+            "graph_name": self.config.graph_name,
+            "max_connections": self.config.max_connections,
+            "reconnects": self.reconnects,
+            "result_cache": self.cache_info(),
+        }
+        if self._db is None:
+            return status
+
+        try:
+            start = time.perf_counter()
+            await self._db.connection.ping()
+            status["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        except Exception as e:
+            status["connected"] = False
+            status["error"] = str(e)
+        return status
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        await self._reset()
+        print("[OK] Disconnected")
+
+
+if __name__ == "__main__":
+    async def main():
+        client = AsyncFalkorDBClient()
+        try:
+            await client.connect()
+
+            # Concurrent queries share the pool
+            names, count = await asyncio.gather(
+                client.query("MATCH (b:brick_Building) RETURN b.name as name"),
+                client.query("MATCH (n) RETURN count(n) as count"),
+            )
+            print(f"\nBuildings: {[row['name'] for row in names]}")
+            print(f"Nodes: {count[0]['count'] if count else 0}")
+            print(f"Health: {await client.health()}")
+
+            await client.close()
+        except Exception as e:
+            print(f"Error: {e}")
+
+    asyncio.run(main())
@@ -0,0 +1,250 @@
+"""
+Bulk loader for the Brick Knowledge Graph
+
+Loads nodes and edges with parameterised UNWIND batches instead of one
+Cypher statement per entity:
+
+    UNWIND $rows AS row CREATE (n:brick_Floor:brick_Entity) SET n = row
+    UNWIND $rows AS row
+    MATCH (a:brick_Building {id: row.src}) MATCH (b:brick_Floor {id: row.dst})
+    CREATE (a)-[:brick_hasPart]->(b)
+
+Nodes are grouped by label and edges by (relation, source label, target label),
+so every batch is a single query plan that can use the id indexes.
+
+Input is the same node/edge format as seed_data.get_seed_graph().
+"""
+
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from falkor_client import FalkorDBClient, validate_identifier
+from schema import ENTITY_LABEL
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+@dataclass
+class BulkLoadStats:
+    """Result of a bulk load."""
+    nodes: int = 0
+    edges: int = 0
+    batches: int = 0
+    node_seconds: float = 0.0
+    edge_seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.node_seconds if self.node_seconds else 0.0
+
+    @property
+    def edges_per_second(self) -> float:
+        return self.edges / self.edge_seconds if self.edge_seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.nodes} nodes ({self.nodes_per_second:,.0f}/s), "
+            f"{self.edges} edges ({self.edges_per_second:,.0f}/s) "
+            f"in {self.batches} batches"
+        )
+
+
+def batched(rows: Sequence[Any], batch_size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(rows), batch_size):
+        yield rows[start:start + batch_size]
+
+
+def group_nodes(nodes: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group node property maps by label."""
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for node in nodes:
+        groups[node["label"]].append(node["properties"])
+    return dict(groups)
+
+
+def group_edges(
+    edges: Iterable[Tuple[str, str, str]],
+    labels: Dict[str, str]
+) -> Dict[Tuple[str, str, str], List[Dict[str, str]]]:
+    """
+    Group edges by (relation, source label, target label).
+
+    Args:
+        edges: (source_id, relation, target_id) tuples
+        labels: Node id -> label
+    """
+    groups: Dict[Tuple[str, str, str], List[Dict[str, str]]] = defaultdict(list)
+    for source_id, relation, target_id in edges:
+        if source_id not in labels or target_id not in labels:
+            raise ValueError(f"Edge references unknown node: {source_id} -[{relation}]-> {target_id}")
+        key = (relation, labels[source_id], labels[target_id])
+        groups[key].append({"src": source_id, "dst": target_id})
+    return dict(groups)
+
+
+def node_query(label: str) -> str:
+    return f"UNWIND $rows AS row CREATE (n:{validate_identifier(label)}:{ENTITY_LABEL}) SET n = row"
+
+
+def edge_query(relation: str, source_label: str, target_label: str, merge: bool = False) -> str:
+    """Batched edge query; merge=True makes it idempotent (MERGE instead of CREATE)."""
+    return (
+        "UNWIND $rows AS row "
+        f"MATCH (a:{validate_identifier(source_label)} {{id: row.src}}) "
+        f"MATCH (b:{validate_identifier(target_label)} {{id: row.dst}}) "
+        f"{'MERGE' if merge else 'CREATE'} (a)-[:{validate_identifier(relation)}]->(b)"
+    )
+
+
+def bulk_load(
+    client: FalkorDBClient,
+    nodes: List[Dict[str, Any]],
+    edges: List[Tuple[str, str, str]],
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> BulkLoadStats:
+    """
+    Load nodes and edges with UNWIND batches.
+
+    Nodes are created before edges. A failed batch is recorded in
+    stats.errors and the load continues with the next batch.
+
+    Args:
+        client: Connected FalkorDBClient
+        nodes: [{"label": ..., "properties": {...}}, ...]
+        edges: [(source_id, relation, target_id), ...]
+        batch_size: Rows per UNWIND query
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    stats = BulkLoadStats()
+    labels = {node["properties"]["id"]: node["label"] for node in nodes}
+
+    start = time.perf_counter()
+    for label, rows in group_nodes(nodes).items():
+        query = node_query(label)
+        for batch in batched(rows, batch_size):
+            stats.batches += 1
+            try:
+                client.execute(query, {"rows": list(batch)})
+                stats.nodes += len(batch)
+            except Exception as e:
+                stats.errors.append(f"{label}: {e}")
+    stats.node_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for (relation, source_label, target_label), rows in group_edges(edges, labels).items():
+        query = edge_query(relation, source_label, target_label)
+        for batch in batched(rows, batch_size):
+            stats.batches += 1
+            try:
+                client.execute(query, {"rows": list(batch)})
+                stats.edges += len(batch)
+            except Exception as e:
+                stats.errors.append(f"{source_label}-[{relation}]->{target_label}: {e}")
+    stats.edge_seconds = time.perf_counter() - start
+
+    return stats
+
+
+class BulkWriter:
+    """
+    Streaming UNWIND writer for graphs that arrive in chunks.
+
+    Rows are buffered per label and per (relation, source label, target
+    label) across add() calls, and a batch is written once a buffer holds
+    batch_size rows, so small chunks still give full batches. Pending
+    nodes are always written before an edge batch, so edge endpoints
+    exist. close() writes what is left and returns the stats.
+
+        writer = BulkWriter(client)
+        for nodes, edges in chunks:
+            writer.add(nodes, edges)
+        stats = writer.close()
+
+    Edges must reference nodes from the same add() call.
+    """
+
+    def __init__(self, client: FalkorDBClient, batch_size: int = DEFAULT_BATCH_SIZE):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.client = client
+        self.batch_size = batch_size
+        self.stats = BulkLoadStats()
+        self._nodes: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._edges: Dict[Tuple[str, str, str], List[Dict[str, str]]] = defaultdict(list)
+
+    def add(self, nodes: List[Dict[str, Any]], edges: List[Tuple[str, str, str]]) -> None:
+        """Buffer one chunk and write every batch that is full."""
+        labels = {node["properties"]["id"]: node["label"] for node in nodes}
+        for label, rows in group_nodes(nodes).items():
+            self._nodes[label].extend(rows)
+            if len(self._nodes[label]) >= self.batch_size:
+                self._flush_nodes(label, full_only=True)
+        for key, rows in group_edges(edges, labels).items():
+            self._edges[key].extend(rows)
+            if len(self._edges[key]) >= self.batch_size:
+                for label in list(self._nodes):
+                    self._flush_nodes(label)
+                self._flush_edges(key, full_only=True)
+
+    def close(self) -> BulkLoadStats:
+        """Write the remaining nodes, then the remaining edges."""
+        for label in list(self._nodes):
+            self._flush_nodes(label)
+        for key in list(self._edges):
+            self._flush_edges(key)
+        return self.stats
+
+    def _take(self, buffer: List[Any], full_only: bool) -> List[Any]:
+        count = len(buffer) - len(buffer) % self.batch_size if full_only else len(buffer)
+        rows = buffer[:count]
+        del buffer[:count]
+        return rows
+
+    def _flush_nodes(self, label: str, full_only: bool = False) -> None:
+        rows = self._take(self._nodes[label], full_only)
+        query = node_query(label)
+        start = time.perf_counter()
+        for batch in batched(rows, self.batch_size):
+            self.stats.batches += 1
+            try:
+                self.client.execute(query, {"rows": list(batch)})
+                self.stats.nodes += len(batch)
+            except Exception as e:
+                self.stats.errors.append(f"{label}: {e}")
+        self.stats.node_seconds += time.perf_counter() - start
+
+    def _flush_edges(self, key: Tuple[str, str, str], full_only: bool = False) -> None:
+        relation, source_label, target_label = key
+        rows = self._take(self._edges[key], full_only)
+        query = edge_query(relation, source_label, target_label)
+        start = time.perf_counter()
+        for batch in batched(rows, self.batch_size):
+            self.stats.batches += 1
+            try:
+                self.client.execute(query, {"rows": list(batch)})
+                self.stats.edges += len(batch)
+            except Exception as e:
+                self.stats.errors.append(f"{source_label}-[{relation}]->{target_label}: {e}")
+        self.stats.edge_seconds += time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    # Show the batches for the seed graph without connecting
+    from seed_data import get_seed_graph
+
+    nodes, edges = get_seed_graph()
+    labels = {node["properties"]["id"]: node["label"] for node in nodes}
+
+    print("NODE BATCHES")
+    for label, rows in group_nodes(nodes).items():
+        print(f"  {len(rows):3d}  {node_query(label)}")
+
+    print("\nEDGE BATCHES")
+    for key, rows in group_edges(edges, labels).items():
+        print(f"  {len(rows):3d}  {edge_query(*key)}")
@@ -2,13 +2,218 @@
 FalkorDB Client for Brick Ontology Knowledge Graph
 
 Simple client for connecting to FalkorDB and executing Cypher queries.
+
+Values are always passed as query parameters ($name), never interpolated
+into the Cypher text. FalkorDB caches execution plans per query text, so a
+parameterised template is planned once and reused for every value.
+
+Read results are cached per (template, parameters). The Brick graph is
+mostly static, so the cache is only invalidated by writes: every execute()
+or write query bumps graph_version, which drops all cached results. Writes
+from other processes (graph_sync, load_graph) are picked up through the
+version stored on the GraphMeta node, checked every version_check_interval
+seconds.
 """
 
+import copy
+import json
 import os
-from typing import Any, Dict, List, Optional
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 
 
+# Quoted strings are kept as-is; comments count as whitespace, so collapsing
+# newlines cannot turn a // comment into a comment on the rest of the query
+_TOKEN_PATTERN = re.compile(
+    r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")|((?:\s|//[^\n]*|/\*[\s\S]*?\*/)+)|(\$\w+)"""
+)
+GRAPH_META_LABEL = "GraphMeta"
+GRAPH_VERSION_QUERY = f"MATCH (m:{GRAPH_META_LABEL} {{id: 'graph'}}) RETURN m.version AS version"
+
+_IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_LIMIT_PATTERN = re.compile(r"\b(SKIP|LIMIT)\b", re.IGNORECASE)
+_WRITE_PATTERN = re.compile(r"\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP)\b", re.IGNORECASE)
+
+
+def validate_identifier(name: str) -> str:
+    """
+    Validate a label, relation type or property name.
+    
+    Identifiers cannot be passed as parameters, so anything interpolated
+    into Cypher must be a plain identifier.
+    """
+    if not _IDENTIFIER_PATTERN.match(name or ""):
+        raise ValueError(f"Invalid Cypher identifier: {name!r}")
+    return name
+
+
+@dataclass(frozen=True)
+class QueryTemplate:
+    """Prepared query: normalised Cypher text and its parameter names."""
+    cypher: str
+    parameters: Tuple[str, ...]
+
+
+def prepare_query(cypher: str) -> QueryTemplate:
+    """Strip comments, normalise whitespace and collect $parameter names."""
+    parts = []
+    names = []
+    position = 0
+    for match in _TOKEN_PATTERN.finditer(cypher):
+        parts.append(cypher[position:match.start()])
+        literal, whitespace, parameter = match.groups()
+        if literal is not None:
+            parts.append(literal)
+        elif whitespace is not None:
+            parts.append(" ")
+        else:
+            parts.append(parameter)
+            if parameter[1:] not in names:
+                names.append(parameter[1:])
+        position = match.end()
+    parts.append(cypher[position:])
+    return QueryTemplate("".join(parts).strip(), tuple(names))
+
+
+def column_keys(header: List[Any]) -> List[str]:
+    """Record keys for a result header (computed once per result, not per cell)."""
+    keys = []
+    for column in header:
+        if isinstance(column, (tuple, list)):
+            keys.append(str(column[1]) if len(column) > 1 else str(column[0]))
+        else:
+            keys.append(str(column))
+    return keys
+
+
+def paginate_query(cypher: str) -> str:
+    """
+    Append SKIP/LIMIT parameters to a query for paginated reads.
+    
+    The query should have an ORDER BY, otherwise pages are not guaranteed
+    to be stable.
+    """
+    if _LIMIT_PATTERN.search(cypher):
+        raise ValueError("Query already has SKIP/LIMIT; remove it to paginate")
+    return f"{cypher.rstrip()} SKIP $page_skip LIMIT $page_limit"
+
+
+def to_columns(
+    keys: List[str],
+    rows: Iterator[Dict[str, Any]],
+    as_arrow: bool = False
+) -> Any:
+    """
+    Collect records into columns.
+    
+    Returns:
+        Dict of column -> NumPy array (numeric columns get a numeric dtype,
+        everything else dtype=object), or a pyarrow.Table if as_arrow
+    """
+    columns: Dict[str, List[Any]] = {key: [] for key in keys}
+    for row in rows:
+        for key in keys:
+            columns[key].append(row.get(key))
+    
+    if as_arrow:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise RuntimeError("pyarrow not installed. Run: pip install pyarrow")
+        return pa.table(columns)
+    
+    import numpy as np
+    
+    arrays = {}
+    for key, values in columns.items():
+        if values and all(isinstance(v, (int, float, bool)) and v is not None for v in values):
+            arrays[key] = np.asarray(values)
+        else:
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+            arrays[key] = array
+    return arrays
+
+
+def is_write_query(cypher: str) -> bool:
+    """True if the query may modify the graph (never cached)."""
+    return bool(_WRITE_PATTERN.search(cypher))
+
+
+class ResultCache:
+    """
+    LRU + TTL cache of query results.
+    
+    Entries are tagged with the graph version they were read at and are
+    ignored once the version has moved on. Results larger than max_rows
+    are not cached, and the total number of cached rows is bounded.
+    Rows are deep-copied in and out (map projections nest dicts and lists),
+    so callers can mutate what they get without corrupting the cache.
+    """
+    
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 300.0, max_rows: int = 50000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[int, float, List[Dict]]]" = OrderedDict()
+        self._rows = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get(self, key: Tuple[str, str], version: int) -> Optional[List[Dict]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry_version, expires_at, records = entry
+            if entry_version == version and time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(records)
+            self._remove(key)
+        self.misses += 1
+        return None
+    
+    def put(self, key: Tuple[str, str], version: int, records: List[Dict]) -> None:
+        if len(records) > self.max_rows:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (version, time.monotonic() + self.ttl_seconds, copy.deepcopy(records))
+        self._rows += len(records)
+        while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    def _remove(self, key: Tuple[str, str]) -> None:
+        _, _, records = self._entries.pop(key)
+        self._rows -= len(records)
+    
+    def clear(self) -> None:
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+        self._rows = 0
+    
+    def info(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "rows": self._rows,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
 @dataclass
 class FalkorConfig:
     """FalkorDB connection configuration."""
@@ -16,13 +221,176 @@ class FalkorConfig:
     port: int = 6379
     graph_name: str = "energy_graph"
     password: Optional[str] = None
+    template_cache_size: int = 256
+    # Read-through result cache; result_cache_size=0 disables it
+    result_cache_size: int = 512
+    result_cache_ttl: float = 300.0
+    result_cache_max_rows: int = 50000
+    # Seconds between checks of the stored graph version; 0 disables
+    version_check_interval: float = 5.0
+    # Used by AsyncFalkorDBClient (the sync client only sends a timeout when given one)
+    max_connections: int = 10
+    pool_timeout: float = 5.0
+    query_timeout_ms: Optional[int] = 10000
+    health_check_interval: int = 30
+    retries: int = 2
 
 
-class FalkorDBClient:
-    """Client for FalkorDB operations."""
+class BaseFalkorClient:
+    """Query preparation and result conversion shared by the sync and async clients."""
     
     def __init__(self, config: Optional[FalkorConfig] = None):
         self.config = config or FalkorConfig()
+        self._templates: "OrderedDict[str, QueryTemplate]" = OrderedDict()
+        self._template_hits = 0
+        self._template_misses = 0
+        self.graph_version = 0
+        self.stored_graph_version: Optional[int] = None
+        self._version_checked_at = 0.0
+        self._result_cache = None
+        if self.config.result_cache_size > 0:
+            self._result_cache = ResultCache(
+                max_entries=self.config.result_cache_size,
+                ttl_seconds=self.config.result_cache_ttl,
+                max_rows=self.config.result_cache_max_rows
+            )
+    
+    def prepare(self, cypher: str) -> QueryTemplate:
+        """Get the prepared template for a query (cached per query text)."""
+        template = self._templates.get(cypher)
+        if template is not None:
+            self._templates.move_to_end(cypher)
+            self._template_hits += 1
+            return template
+        
+        self._template_misses += 1
+        template = prepare_query(cypher)
+        self._templates[cypher] = template
+        if len(self._templates) > self.config.template_cache_size:
+            self._templates.popitem(last=False)
+        return template
+    
+    def template_cache_info(self) -> Dict[str, int]:
+        """Hit/miss statistics for the template cache."""
+        return {
+            "size": len(self._templates),
+            "max_size": self.config.template_cache_size,
+            "hits": self._template_hits,
+            "misses": self._template_misses,
+        }
+    
+    def _bind(
+        self,
+        cypher: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Prepared query text and the parameters it uses."""
+        template = self.prepare(cypher)
+        params = params or {}
+        missing = [name for name in template.parameters if name not in params]
+        if missing:
+            raise ValueError(f"Missing query parameters: {', '.join(missing)}")
+        
+        used = {name: params[name] for name in template.parameters}
+        return template.cypher, used or None
+    
+    def _cache_key(self, text: str, params: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        return text, json.dumps(params, sort_keys=True, default=str) if params else ""
+    
+    def _cache_get(self, text: str, params: Optional[Dict[str, Any]]) -> Optional[List[Dict]]:
+        """Cached records for a read query, or None."""
+        if self._result_cache is None or is_write_query(text):
+            return None
+        return self._result_cache.get(self._cache_key(text, params), self.graph_version)
+    
+    def _cache_put(
+        self,
+        text: str,
+        params: Optional[Dict[str, Any]],
+        version: int,
+        records: List[Dict]
+    ) -> None:
+        """Store records read at `version` (skipped if a write happened meanwhile)."""
+        if self._result_cache is None or version != self.graph_version:
+            return
+        self._result_cache.put(self._cache_key(text, params), version, records)
+    
+    def _version_check_due(self) -> bool:
+        interval = self.config.version_check_interval
+        return (
+            self._result_cache is not None
+            and interval > 0
+            and time.monotonic() - self._version_checked_at >= interval
+        )
+    
+    def _apply_stored_version(self, result: Any) -> Optional[int]:
+        """Invalidate cached results if the stored graph version has changed."""
+        self._version_checked_at = time.monotonic()
+        rows = self._records(result)
+        version = rows[0].get("version") if rows else None
+        if version != self.stored_graph_version:
+            if self.stored_graph_version is not None:
+                self.invalidate_cache()
+            self.stored_graph_version = version
+        return version
+    
+    def invalidate_cache(self) -> None:
+        """Mark the graph as changed: bump graph_version and drop cached results."""
+        self.graph_version += 1
+        if self._result_cache is not None:
+            self._result_cache.clear()
+    
+    def cache_info(self) -> Dict[str, Any]:
+        """Result cache statistics (hit rate, size, evictions)."""
+        info = {
+            "enabled": self._result_cache is not None,
+            "graph_version": self.graph_version,
+            "stored_graph_version": self.stored_graph_version,
+        }
+        if self._result_cache is not None:
+            info.update(self._result_cache.info())
+        return info
+    
+    def _profile_command(
+        self,
+        text: str,
+        used: Optional[Dict[str, Any]],
+        timeout_ms: Optional[int]
+    ) -> List[Any]:
+        """GRAPH.PROFILE command; the falkordb Graph.profile() takes no timeout."""
+        command = ["GRAPH.PROFILE", self._graph.name, self._graph._build_params_header(used) + text]
+        if timeout_ms is not None:
+            command.extend(["timeout", int(timeout_ms)])
+        return command
+    
+    def _records(self, result: Any) -> List[Dict]:
+        """Convert a FalkorDB result set to a list of dicts."""
+        return list(self._iter_records(result))
+    
+    def _iter_records(self, result: Any) -> Iterator[Dict]:
+        """Yield result rows as dicts, converting values lazily."""
+        if not result.result_set:
+            return
+        keys = column_keys(result.header)
+        convert = self._convert
+        for row in result.result_set:
+            yield {key: convert(value) for key, value in zip(keys, row)}
+    
+    def _convert(self, value: Any) -> Any:
+        """Convert FalkorDB values to Python types."""
+        if hasattr(value, 'properties'):
+            return {
+                'labels': list(value.labels) if hasattr(value, 'labels') else [],
+                'properties': dict(value.properties)
+            }
+        return value
+
+
+class FalkorDBClient(BaseFalkorClient):
+    """Client for FalkorDB operations."""
+    
+    def __init__(self, config: Optional[FalkorConfig] = None):
+        super().__init__(config)
         self._db = None
         self._graph = None
     
@@ -45,49 +413,152 @@ class FalkorDBClient:
         except Exception as e:
             raise RuntimeError(f"Connection failed: {e}")
     
-    def query(self, cypher: str) -> List[Dict]:
-        """Execute a Cypher query and return results."""
+    def _run(
+        self,
+        text: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout_ms: Optional[int] = None
+    ):
+        """Send a prepared query with native parameters."""
         if self._graph is None:
             raise RuntimeError("Not connected")
+        if timeout_ms is None:
+            return self._graph.query(text, params)
+        return self._graph.query(text, params, timeout=timeout_ms)
+    
+    def query(
+        self,
+        cypher: str,
+        params: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        timeout_ms: Optional[int] = None
+    ) -> List[Dict]:
+        """Execute a Cypher query and return results (timeout_ms: server-side timeout)."""
+        text, used = self._bind(cypher, params)
+        
+        if use_cache and self._version_check_due():
+            self.check_graph_version()
         
-        result = self._graph.query(cypher)
-        
-        records = []
-        if result.result_set:
-            headers = result.header
-            for row in result.result_set:
-                record = {}
-                for i, value in enumerate(row):
-                    header = headers[i]
-                    if isinstance(header, (tuple, list)):
-                        key = str(header[1]) if len(header) > 1 else str(header[0])
-                    else:
-                        key = str(header)
-                    record[key] = self._convert(value)
-                records.append(record)
+        if use_cache:
+            cached = self._cache_get(text, used)
+            if cached is not None:
+                return cached
         
+        if is_write_query(text):
+            try:
+                return self._records(self._run(text, used, timeout_ms))
+            finally:
+                self.invalidate_cache()
+        
+        version = self.graph_version
+        records = self._records(self._run(text, used, timeout_ms))
+        if use_cache:
+            self._cache_put(text, used, version, records)
         return records
     
-    def execute(self, cypher: str) -> None:
+    def check_graph_version(self) -> Optional[int]:
+        """Read the stored graph version; cached results are dropped if it changed."""
+        return self._apply_stored_version(self._run(GRAPH_VERSION_QUERY))
+    
+    def iter_query(
+        self,
+        cypher: str,
+        params: Optional[Dict[str, Any]] = None,
+        page_size: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        Iterate over query results without building the full list of dicts.
+        
+        Args:
+            cypher: Read query (use ORDER BY when paginating)
+            params: Query parameters
+            page_size: If set, fetch page_size rows per round-trip with
+                SKIP/LIMIT, so only one page is held in memory at a time
+        
+        Results are not cached.
+        """
+        if page_size is None:
+            text, used = self._bind(cypher, params)
+            yield from self._iter_records(self._run(text, used))
+            return
+        
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        
+        paged = paginate_query(cypher)
+        skip = 0
+        while True:
+            text, used = self._bind(paged, {**(params or {}), "page_skip": skip, "page_limit": page_size})
+            result = self._run(text, used)
+            count = len(result.result_set or [])
+            yield from self._iter_records(result)
+            if count < page_size:
+                return
+            skip += page_size
+    
+    def query_columns(
+        self,
+        cypher: str,
+        params: Optional[Dict[str, Any]] = None,
+        page_size: Optional[int] = None,
+        as_arrow: bool = False
+    ) -> Any:
+        """
+        Run a read query and return columnar output for analytics.
+        
+        Returns:
+            Dict of column -> NumPy array, or a pyarrow.Table if as_arrow
+        """
+        rows = self.iter_query(cypher, params, page_size=page_size)
+        first = next(rows, None)
+        if first is None:
+            return to_columns([], iter(()), as_arrow=as_arrow)
+        
+        def all_rows():
+            yield first
+            yield from rows
+        
+        return to_columns(list(first.keys()), all_rows(), as_arrow=as_arrow)
+    
+    def execute(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> None:
         """Execute a Cypher command without returning results."""
+        text, used = self._bind(cypher, params)
+        try:
+            self._run(text, used)
+        finally:
+            self.invalidate_cache()
+    
+    def explain(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Execution plan (GRAPH.EXPLAIN) as a list of operation lines."""
+        if self._graph is None:
+            raise RuntimeError("Not connected")
+        text, used = self._bind(cypher, params)
+        return [line.strip() for line in self._graph.explain(text, used).plan]
+    
+    def profile(
+        self,
+        cypher: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout_ms: Optional[int] = None
+    ) -> List[str]:
+        """
+        Run the query with GRAPH.PROFILE; indented plan lines with records and time per operation.
+        
+        The query really executes, so pass the same timeout_ms it ran with.
+        """
+        from falkordb.execution_plan import ExecutionPlan
+        
         if self._graph is None:
             raise RuntimeError("Not connected")
-        self._graph.query(cypher)
+        text, used = self._bind(cypher, params)
+        plan = ExecutionPlan(self._graph.execute_command(*self._profile_command(text, used, timeout_ms)))
+        return [line.rstrip() for line in plan.plan]
     
     def delete_all(self) -> None:
         """Delete all nodes and relationships."""
         self.execute("MATCH (n) DETACH DELETE n")
         print("[OK] Graph cleared")
     
-    def _convert(self, value: Any) -> Any:
-        """Convert FalkorDB values to Python types."""
-        if hasattr(value, 'properties'):
-            return {
-                'labels': list(value.labels) if hasattr(value, 'labels') else [],
-                'properties': dict(value.properties)
-            }
-        return value
-    
     def close(self) -> None:
         """Close the connection."""
         self._graph = None
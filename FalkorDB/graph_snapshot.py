@@ -0,0 +1,233 @@
+"""
+In-process adjacency snapshot of the Brick Knowledge Graph
+
+Small, fixed-shape walks (building → systems → equipment → sensors) cost a
+network round-trip and Cypher planning each. A GraphSnapshot holds the
+graph in memory instead:
+
+- node id, label, name and unit as NumPy arrays
+- one CSR adjacency (indptr, indices) per relation type
+
+so a walk is a handful of vectorised array lookups. SnapshotCache keeps
+the snapshot in step with the graph version stored by load_graph and
+graph_sync (GraphMeta), reloading it when the version changes.
+
+Usage:
+    python graph_snapshot.py    # load and print snapshot size
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from falkor_client import FalkorDBClient
+from graph_stats import csr, dense_index, gather
+from schema import ENTITY_LABEL, class_label
+
+
+NODE_EXPORT = (
+    f"MATCH (n:{ENTITY_LABEL}) "
+    f"RETURN ID(n) AS node, n.id AS id, {class_label('n')} AS label, n.name AS name, n.unit AS unit"
+)
+EDGE_EXPORT = (
+    f"MATCH (a:{ENTITY_LABEL})-[r]->(b:{ENTITY_LABEL}) "
+    "RETURN ID(a) AS src, type(r) AS rel, ID(b) AS dst"
+)
+
+# A step in a walk: one relation type or alternatives (brick_hasPart|brick_hasMember)
+Step = Union[str, Sequence[str]]
+
+
+def _object_array(values: List[Any]) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class GraphSnapshot:
+    """Read-only in-memory copy of the graph with per-relation CSR adjacency."""
+
+    def __init__(
+        self,
+        nodes: Iterable[Dict[str, Any]],
+        edges: Iterable[Dict[str, Any]],
+        version: Optional[int] = None
+    ):
+        """
+        Args:
+            nodes: Rows of NODE_EXPORT (node, id, label, name, unit)
+            edges: Rows of EDGE_EXPORT (src, rel, dst)
+            version: Stored graph version the rows were read at
+        """
+        self.version = version
+        self.loaded_at = time.time()
+
+        nodes = list(nodes)
+        node_ids = np.asarray([row["node"] for row in nodes], dtype=np.int64)
+        self.ids = _object_array([row["id"] for row in nodes])
+        self.labels = _object_array([row["label"] for row in nodes])
+        self.names = _object_array([row.get("name") for row in nodes])
+        self.units = _object_array([row.get("unit") for row in nodes])
+        self._positions = {node_id: i for i, node_id in enumerate(self.ids)}
+
+        by_relation: Dict[str, Tuple[List[int], List[int]]] = {}
+        for row in edges:
+            src, dst = by_relation.setdefault(row["rel"], ([], []))
+            src.append(row["src"])
+            dst.append(row["dst"])
+
+        self.edge_count = 0
+        self._adjacency: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for relation, (src, dst) in by_relation.items():
+            heads = dense_index(node_ids, np.asarray(src, dtype=np.int64))
+            tails = dense_index(node_ids, np.asarray(dst, dtype=np.int64))
+            self._adjacency[relation] = csr(heads, tails, len(nodes))
+            self.edge_count += len(heads)
+
+    @classmethod
+    def load(cls, client: FalkorDBClient, version: Optional[int] = None) -> "GraphSnapshot":
+        """Export the graph through a connected FalkorDBClient."""
+        return cls(client.iter_query(NODE_EXPORT), client.iter_query(EDGE_EXPORT), version)
+
+    @classmethod
+    async def aload(cls, client, version: Optional[int] = None) -> "GraphSnapshot":
+        """Export the graph through a connected AsyncFalkorDBClient."""
+        nodes = [row async for row in client.iter_query(NODE_EXPORT)]
+        edges = [row async for row in client.iter_query(EDGE_EXPORT)]
+        return cls(nodes, edges, version)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def relations(self) -> List[str]:
+        return sorted(self._adjacency)
+
+    def find(self, label: str, node_id: Optional[str] = None, name: Optional[str] = None) -> np.ndarray:
+        """
+        Positions of nodes with a label, optionally filtered by id or by
+        case-insensitive name substring.
+        """
+        if node_id:
+            position = self._positions.get(node_id)
+            if position is None or self.labels[position] != label:
+                return np.empty(0, dtype=np.int64)
+            return np.array([position], dtype=np.int64)
+
+        matches = np.flatnonzero(self.labels == label)
+        if name:
+            needle = name.lower()
+            matches = np.array(
+                [i for i in matches if needle in str(self.names[i] or "").lower()],
+                dtype=np.int64
+            )
+        return matches
+
+    def expand(self, nodes: np.ndarray, step: Step) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        One hop from nodes.
+
+        Returns:
+            (positions, targets): targets[k] is reached from nodes[positions[k]]
+        """
+        relations = [step] if isinstance(step, str) else list(step)
+        positions, targets = [], []
+        for relation in relations:
+            if relation in self._adjacency:
+                indptr, indices = self._adjacency[relation]
+                found = gather(indptr, indices, nodes)
+                positions.append(found[0])
+                targets.append(found[1])
+        if not positions:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(positions), np.concatenate(targets)
+
+    def walk(self, start: np.ndarray, steps: Sequence[Step]) -> np.ndarray:
+        """
+        All paths from start following steps in order.
+
+        Returns:
+            Array of shape (paths, len(steps) + 1) with a node position per hop
+        """
+        paths = np.asarray(start, dtype=np.int64).reshape(-1, 1)
+        for step in steps:
+            positions, targets = self.expand(paths[:, -1], step)
+            paths = np.column_stack([paths[positions], targets])
+        return paths
+
+    def node(self, position: int) -> Dict[str, Any]:
+        return {
+            "id": self.ids[position],
+            "label": self.labels[position],
+            "name": self.names[position],
+            "unit": self.units[position],
+        }
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "nodes": len(self),
+            "edges": self.edge_count,
+            "relations": len(self._adjacency),
+            "version": self.version,
+            "age_seconds": round(time.time() - self.loaded_at, 1),
+        }
+
+
+class SnapshotCache:
+    """
+    Keeps a GraphSnapshot in step with the stored graph version.
+
+    The version is read at most every check_interval seconds; the snapshot
+    is reloaded only when it has changed. Graphs without a stored version
+    (loaded before GraphMeta existed) are loaded once.
+    """
+
+    def __init__(self, check_interval: float = 5.0):
+        self.check_interval = check_interval
+        self.snapshot: Optional[GraphSnapshot] = None
+        self.loads = 0
+        self._checked_at = 0.0
+
+    def _due(self) -> bool:
+        return self.snapshot is None or time.monotonic() - self._checked_at >= self.check_interval
+
+    def _stale(self, version: Optional[int]) -> bool:
+        self._checked_at = time.monotonic()
+        return self.snapshot is None or version != self.snapshot.version
+
+    def get(self, client: FalkorDBClient) -> GraphSnapshot:
+        """Current snapshot, reloaded through client if the graph changed."""
+        if self._due():
+            version = client.check_graph_version()
+            if self._stale(version):
+                self.snapshot = GraphSnapshot.load(client, version)
+                self.loads += 1
+        return self.snapshot
+
+    async def aget(self, client) -> GraphSnapshot:
+        """Async variant of get() for AsyncFalkorDBClient."""
+        if self._due():
+            version = await client.check_graph_version()
+            if self._stale(version):
+                self.snapshot = await GraphSnapshot.aload(client, version)
+                self.loads += 1
+        return self.snapshot
+
+    def info(self) -> Dict[str, Any]:
+        info = {"loads": self.loads, "check_interval": self.check_interval}
+        if self.snapshot is not None:
+            info.update(self.snapshot.info())
+        return info
+
+
+if __name__ == "__main__":
+    client = FalkorDBClient()
+    try:
+        client.connect()
+        start = time.perf_counter()
+        snapshot = GraphSnapshot.load(client, client.check_graph_version())
+        print(f"Loaded in {time.perf_counter() - start:.2f}s: {snapshot.info()}")
+        print(f"Relations: {', '.join(snapshot.relations)}")
+    finally:
+        client.close()
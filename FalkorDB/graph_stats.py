@@ -0,0 +1,218 @@
+"""
+Graph statistics and verification for the Brick Knowledge Graph
+
+Runs in bounded time on large graphs (no variable-length Cypher expansion):
+
+- node counts per label and edge counts per relation type, one
+  count query per label/type (answered from FalkorDB's label and
+  relation matrices)
+- one export of node and edge ids into NumPy arrays
+- reachability from every brick_Building with a vectorised BFS over an
+  undirected CSR adjacency built from the export
+- orphans (nodes without any edge) from the same degree arrays
+
+Usage:
+    python graph_stats.py
+    python graph_stats.py --graph portfolio_graph
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from falkor_client import FalkorDBClient, FalkorConfig, GRAPH_META_LABEL, validate_identifier
+
+
+ROOT_LABEL = "brick_Building"
+ORPHAN_SAMPLE_SIZE = 10
+
+# Building → System → Equipment → Sensor → Timeseries, checked with LIMIT 1
+TRAVERSAL_CHECK = """
+    MATCH (b:brick_Building)-[:brick_hasPart]->
+          (:brick_HVAC_System)-[:brick_hasMember]->
+          (:brick_Air_Handling_Unit)-[:brick_hasPoint]->
+          (:brick_Temperature_Sensor)-[:brick_hasTimeseries]->
+          (:brick_Timeseries)
+    RETURN b.id AS id LIMIT 1
+"""
+
+
+@dataclass
+class GraphReport:
+    """Result of verify()."""
+    label_counts: Dict[str, int] = field(default_factory=dict)
+    relation_counts: Dict[str, int] = field(default_factory=dict)
+    nodes: int = 0
+    edges: int = 0
+    roots: int = 0
+    reachable: int = 0
+    orphans: int = 0
+    orphan_sample: List[str] = field(default_factory=list)
+    traversal_ok: bool = False
+    seconds: float = 0.0
+
+    @property
+    def unreachable(self) -> int:
+        return self.nodes - self.reachable
+
+    def print(self) -> None:
+        print(f"    Nodes: {self.nodes}, relationships: {self.edges}")
+        for label, count in sorted(self.label_counts.items()):
+            print(f"      {label:32s} {count}")
+        for relation, count in sorted(self.relation_counts.items()):
+            print(f"      {relation:32s} {count}")
+        if not self.roots:
+            print("    [ERROR] No Building found!")
+        else:
+            print(f"    Nodes reachable from {self.roots} Building(s): {self.reachable}")
+        if self.unreachable:
+            print(f"    [WARN] {self.unreachable} nodes not reachable from a Building")
+        if self.orphans:
+            print(f"    [WARN] {self.orphans} orphan nodes, e.g. {', '.join(self.orphan_sample)}")
+        if self.traversal_ok:
+            print("    Building → System → Equipment → Sensor → Timeseries path found")
+        else:
+            print("    [WARN] No complete traversal path found")
+        print(f"    Verified in {self.seconds:.2f}s")
+
+
+def label_counts(client: FalkorDBClient) -> Dict[str, int]:
+    """Node count per label."""
+    counts = {}
+    for row in client.query("CALL db.labels() YIELD label RETURN label", use_cache=False):
+        label = validate_identifier(row["label"])
+        result = client.query(f"MATCH (n:{label}) RETURN count(n) AS count", use_cache=False)
+        counts[label] = result[0]["count"] if result else 0
+    return counts
+
+
+def relation_counts(client: FalkorDBClient) -> Dict[str, int]:
+    """Edge count per relation type."""
+    counts = {}
+    for row in client.query(
+        "CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType",
+        use_cache=False
+    ):
+        relation = validate_identifier(row["relationshipType"])
+        result = client.query(f"MATCH ()-[r:{relation}]->() RETURN count(r) AS count", use_cache=False)
+        counts[relation] = result[0]["count"] if result else 0
+    return counts
+
+
+def csr(heads: np.ndarray, tails: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    CSR adjacency for edges heads[i] -> tails[i].
+
+    Args:
+        heads, tails: Dense node indices (0..size-1)
+
+    Returns:
+        (indptr, indices): neighbours of node i are indices[indptr[i]:indptr[i + 1]]
+    """
+    order = np.argsort(heads, kind="stable")
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(heads, minlength=size), out=indptr[1:])
+    return indptr, tails[order]
+
+
+def undirected_csr(src: np.ndarray, dst: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """CSR adjacency with both directions of every edge."""
+    return csr(np.concatenate([src, dst]), np.concatenate([dst, src]), size)
+
+
+def gather(indptr: np.ndarray, indices: np.ndarray, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    All neighbours of nodes, without a Python loop.
+
+    Returns:
+        (positions, neighbours): neighbours[k] is a neighbour of nodes[positions[k]]
+    """
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    total = int(lengths.sum())
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    positions = np.repeat(np.arange(len(nodes)), lengths)
+    return positions, indices[offsets + np.arange(total)]
+
+
+def bfs_reachable(indptr: np.ndarray, indices: np.ndarray, sources: np.ndarray) -> np.ndarray:
+    """Boolean mask of nodes reachable from sources (frontier-at-a-time BFS)."""
+    visited = np.zeros(len(indptr) - 1, dtype=bool)
+    frontier = np.unique(sources)
+    visited[frontier] = True
+    while frontier.size:
+        _, neighbours = gather(indptr, indices, frontier)
+        frontier = np.unique(neighbours[~visited[neighbours]])
+        visited[frontier] = True
+    return visited
+
+
+def dense_index(node_ids: np.ndarray, refs: np.ndarray) -> np.ndarray:
+    """Map FalkorDB internal ids in refs to positions in node_ids."""
+    order = np.argsort(node_ids)
+    return order[np.searchsorted(node_ids[order], refs)]
+
+
+def verify(client: FalkorDBClient, root_label: str = ROOT_LABEL) -> GraphReport:
+    """
+    Collect counts, reachability from root_label nodes and orphans.
+
+    The export does not filter on brick_Entity: graphs loaded before that
+    label existed (see indexes.ensure_entity_label) would otherwise report
+    every node as missing. Only the GraphMeta node is left out.
+    """
+    start = time.perf_counter()
+    report = GraphReport(label_counts=label_counts(client), relation_counts=relation_counts(client))
+
+    nodes = client.query_columns(
+        f"MATCH (n) WHERE NOT n:{GRAPH_META_LABEL} RETURN ID(n) AS node, n.id AS id, "
+        f"'{validate_identifier(root_label)}' IN labels(n) AS root"
+    )
+    edges = client.query_columns(
+        "MATCH (a)-[]->(b) RETURN ID(a) AS src, ID(b) AS dst"
+    )
+    node_ids = np.asarray(nodes.get("node", []), dtype=np.int64)
+    src = dense_index(node_ids, np.asarray(edges.get("src", []), dtype=np.int64))
+    dst = dense_index(node_ids, np.asarray(edges.get("dst", []), dtype=np.int64))
+
+    report.nodes = len(node_ids)
+    report.edges = len(src)
+    roots = np.flatnonzero(np.asarray(nodes.get("root", []), dtype=bool))
+    report.roots = len(roots)
+
+    indptr, indices = undirected_csr(src, dst, report.nodes)
+    report.reachable = int(bfs_reachable(indptr, indices, roots).sum()) if report.roots else 0
+
+    orphans = np.flatnonzero(np.diff(indptr) == 0)
+    report.orphans = len(orphans)
+    report.orphan_sample = [str(nodes["id"][i]) for i in orphans[:ORPHAN_SAMPLE_SIZE]]
+
+    report.traversal_ok = bool(client.query(TRAVERSAL_CHECK, use_cache=False))
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the Brick graph and print statistics")
+    parser.add_argument("--host", default="localhost", help="FalkorDB host")
+    parser.add_argument("--port", type=int, default=6379, help="FalkorDB port")
+    parser.add_argument("--graph", default="energy_graph", help="Graph name")
+    args = parser.parse_args()
+
+    client = FalkorDBClient(FalkorConfig(host=args.host, port=args.port, graph_name=args.graph))
+    try:
+        client.connect()
+        verify(client).print()
+    except Exception as e:
+        print(f"\n[ERROR] {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Incremental graph sync for the Brick Knowledge Graph
+
+Instead of clear-and-reload, the desired graph (seed data or any other
+node/edge source in the seed_data format) is diffed against the current
+graph by id, and only the differences are applied:
+
+- new or changed nodes:  UNWIND ... MERGE (n:Label:brick_Entity {id: row.id}) SET n = row.props
+- new edges:             UNWIND ... MATCH ... MATCH ... MERGE (a)-[:REL]->(b)
+- removed edges/nodes:   UNWIND ... DELETE (only with prune=True)
+
+Running the same sync twice is a no-op. When anything changed, the graph
+version stored on the GraphMeta node is incremented, so clients can
+invalidate cached results (see FalkorDBClient.check_graph_version).
+
+The current graph is read without requiring the brick_Entity label, and
+nodes loaded before that label existed get it before any MERGE runs.
+Otherwise a graph from an older load would be diffed as empty and every
+node and edge created a second time.
+"""
+
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set, Tuple
+
+from falkor_client import FalkorDBClient, GRAPH_META_LABEL, validate_identifier
+from schema import ENTITY_LABEL, class_label
+from bulk_loader import DEFAULT_BATCH_SIZE, batched, edge_query
+from indexes import ensure_entity_label
+
+
+READ_PAGE_SIZE = 50000
+
+BUMP_VERSION_QUERY = (
+    f"MERGE (m:{GRAPH_META_LABEL} {{id: 'graph'}}) "
+    "SET m.version = coalesce(m.version, 0) + 1, m.updated_at = $updated_at "
+    "RETURN m.version AS version"
+)
+
+
+@dataclass
+class SyncPlan:
+    """Difference between the desired and the current graph."""
+    upsert_nodes: List[Dict[str, Any]] = field(default_factory=list)
+    replace_nodes: List[Dict[str, Any]] = field(default_factory=list)
+    delete_nodes: List[str] = field(default_factory=list)
+    create_edges: List[Tuple[str, str, str]] = field(default_factory=list)
+    delete_edges: List[Tuple[str, str, str]] = field(default_factory=list)
+    unchanged_nodes: int = 0
+    unchanged_edges: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.upsert_nodes or self.replace_nodes or self.delete_nodes
+                    or self.create_edges or self.delete_edges)
+
+    def summary(self) -> str:
+        return (
+            f"nodes: +{len(self.upsert_nodes)} upsert, {len(self.replace_nodes)} relabel, "
+            f"-{len(self.delete_nodes)} delete, {self.unchanged_nodes} unchanged | "
+            f"edges: +{len(self.create_edges)}, -{len(self.delete_edges)}, "
+            f"{self.unchanged_edges} unchanged"
+        )
+
+
+def read_current_graph(
+    client: FalkorDBClient
+) -> Tuple[Dict[str, Tuple[str, Dict[str, Any]]], Set[Tuple[str, str, str]]]:
+    """
+    Read the current graph (without the GraphMeta node).
+
+    Nodes are matched by id, not by brick_Entity, so graphs loaded before
+    the label was introduced are read correctly.
+
+    Returns:
+        (id -> (label, properties), set of (source_id, relation, target_id))
+    """
+    nodes = {}
+    for row in client.iter_query(
+        f"MATCH (n) WHERE n.id IS NOT NULL AND NOT n:{GRAPH_META_LABEL} "
+        f"RETURN n.id AS id, {class_label('n')} AS label, "
+        "properties(n) AS props ORDER BY id",
+        page_size=READ_PAGE_SIZE
+    ):
+        nodes[row["id"]] = (row["label"], row["props"])
+
+    edges = set()
+    for row in client.iter_query(
+        f"MATCH (a)-[r]->(b) WHERE NOT a:{GRAPH_META_LABEL} AND NOT b:{GRAPH_META_LABEL} "
+        "RETURN a.id AS src, type(r) AS rel, b.id AS dst ORDER BY src, rel, dst",
+        page_size=READ_PAGE_SIZE
+    ):
+        edges.add((row["src"], row["rel"], row["dst"]))
+
+    return nodes, edges
+
+
+def diff_graph(
+    desired_nodes: List[Dict[str, Any]],
+    desired_edges: List[Tuple[str, str, str]],
+    current_nodes: Dict[str, Tuple[str, Dict[str, Any]]],
+    current_edges: Set[Tuple[str, str, str]],
+    prune: bool = True
+) -> SyncPlan:
+    """
+    Compute the changes needed to turn the current graph into the desired one.
+
+    A node whose label changed is deleted and recreated (replace_nodes);
+    its edges are recreated from the desired edge list. The GraphMeta
+    node is never pruned.
+    """
+    plan = SyncPlan()
+    desired_ids = set()
+    replaced = set()
+
+    for node in desired_nodes:
+        node_id = node["properties"]["id"]
+        desired_ids.add(node_id)
+        current = current_nodes.get(node_id)
+        if current is None:
+            plan.upsert_nodes.append(node)
+        elif current[0] != node["label"]:
+            plan.replace_nodes.append(node)
+            replaced.add(node_id)
+        elif current[1] != node["properties"]:
+            plan.upsert_nodes.append(node)
+        else:
+            plan.unchanged_nodes += 1
+
+    desired_edge_set = set()
+    for edge in desired_edges:
+        desired_edge_set.add(edge)
+        source_id, _, target_id = edge
+        if edge in current_edges and source_id not in replaced and target_id not in replaced:
+            plan.unchanged_edges += 1
+        else:
+            plan.create_edges.append(edge)
+
+    if prune:
+        plan.delete_nodes = sorted(
+            node_id for node_id in set(current_nodes) - desired_ids
+            if current_nodes[node_id][0] != GRAPH_META_LABEL
+        )
+        deleted = set(plan.delete_nodes) | replaced
+        plan.delete_edges = sorted(
+            edge for edge in current_edges - desired_edge_set
+            if edge[0] not in deleted and edge[2] not in deleted
+        )
+
+    return plan
+
+
+def apply_sync_plan(
+    client: FalkorDBClient,
+    plan: SyncPlan,
+    desired_nodes: List[Dict[str, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> None:
+    """Apply a SyncPlan with batched MERGE/DELETE queries."""
+    labels = {node["properties"]["id"]: node["label"] for node in desired_nodes}
+
+    # Removed edges and nodes first, so relabelled nodes can be recreated
+    edges_by_type: Dict[str, List[Dict[str, str]]] = defaultdict(list)
+    for source_id, relation, target_id in plan.delete_edges:
+        edges_by_type[relation].append({"src": source_id, "dst": target_id})
+    for relation, rows in edges_by_type.items():
+        query = (
+            f"UNWIND $rows AS row "
+            f"MATCH (a:{ENTITY_LABEL} {{id: row.src}})-[r:{validate_identifier(relation)}]->"
+            f"(b:{ENTITY_LABEL} {{id: row.dst}}) DELETE r"
+        )
+        for batch in batched(rows, batch_size):
+            client.execute(query, {"rows": list(batch)})
+
+    removed = plan.delete_nodes + [node["properties"]["id"] for node in plan.replace_nodes]
+    for batch in batched(removed, batch_size):
+        client.execute(
+            f"UNWIND $ids AS id MATCH (n:{ENTITY_LABEL} {{id: id}}) "
+            f"WHERE NOT n:{GRAPH_META_LABEL} DETACH DELETE n",
+            {"ids": list(batch)}
+        )
+
+    # Upsert nodes grouped by label
+    nodes_by_label: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for node in plan.upsert_nodes + plan.replace_nodes:
+        props = node["properties"]
+        nodes_by_label[node["label"]].append({"id": props["id"], "props": props})
+    for label, rows in nodes_by_label.items():
+        query = (
+            f"UNWIND $rows AS row "
+            f"MERGE (n:{validate_identifier(label)}:{ENTITY_LABEL} {{id: row.id}}) "
+            f"SET n = row.props"
+        )
+        for batch in batched(rows, batch_size):
+            client.execute(query, {"rows": list(batch)})
+
+    # Create edges grouped by (relation, source label, target label)
+    edge_groups: Dict[Tuple[str, str, str], List[Dict[str, str]]] = defaultdict(list)
+    for source_id, relation, target_id in plan.create_edges:
+        edge_groups[(relation, labels[source_id], labels[target_id])].append(
+            {"src": source_id, "dst": target_id}
+        )
+    for key, rows in edge_groups.items():
+        query = edge_query(*key, merge=True)
+        for batch in batched(rows, batch_size):
+            client.execute(query, {"rows": list(batch)})
+
+
+def bump_graph_version(client: FalkorDBClient) -> int:
+    """Increment the stored graph version and return the new value."""
+    rows = client.query(BUMP_VERSION_QUERY, {"updated_at": int(time.time())})
+    return rows[0]["version"] if rows else 0
+
+
+def sync_graph(
+    client: FalkorDBClient,
+    nodes: List[Dict[str, Any]],
+    edges: List[Tuple[str, str, str]],
+    prune: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False
+) -> SyncPlan:
+    """
+    Make the graph match `nodes` and `edges`, touching only what changed.
+
+    Args:
+        client: Connected client
+        nodes: Desired nodes (seed_data format)
+        edges: Desired edges (source_id, relation, target_id)
+        prune: Delete nodes/edges that are not in the desired graph
+        batch_size: Rows per UNWIND query
+        dry_run: Only compute the plan
+
+    Before applying, nodes without brick_Entity are backfilled, since the
+    MERGE and DELETE queries match on that label.
+    """
+    current_nodes, current_edges = read_current_graph(client)
+    plan = diff_graph(nodes, edges, current_nodes, current_edges, prune=prune)
+    if dry_run or plan.is_empty:
+        return plan
+
+    ensure_entity_label(client)
+    apply_sync_plan(client, plan, nodes, batch_size=batch_size)
+    bump_graph_version(client)
+    return plan
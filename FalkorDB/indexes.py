@@ -0,0 +1,158 @@
+"""
+Index management for the Brick Knowledge Graph
+
+Indexes are derived from schema.py (id on every Brick class and on the
+common brick_Entity label, plus INDEXED_PROPERTIES) instead of a
+hard-coded list. Only missing indexes are created, and failures are
+reported rather than silently ignored.
+
+Usage:
+    python indexes.py            # create missing indexes and print report
+    python indexes.py --report   # report only
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from falkor_client import FalkorDBClient, FalkorConfig, GRAPH_META_LABEL, validate_identifier
+from schema import ENTITY_LABEL, get_index_definitions
+
+
+# Lookups used by the GraphQL server and the NL-to-KG resolver; the report
+# shows whether FalkorDB plans them with an index scan
+SAMPLE_QUERIES = {
+    "building_by_id": "MATCH (b:brick_Building {id: $id}) RETURN b",
+    "floors_of_building": "MATCH (b:brick_Building {id: $id})-[:brick_hasPart]->(f:brick_Floor) RETURN f",
+    "points_of_entity": f"MATCH (p:{ENTITY_LABEL} {{id: $id}})-[:brick_hasPoint]->(s) RETURN s",
+    "members_of_system": f"MATCH (sys:{ENTITY_LABEL} {{id: $id}})-[:brick_hasMember]->(eq) RETURN eq",
+    "timeseries_by_external_id": "MATCH (ts:brick_Timeseries {external_id: $id}) RETURN ts",
+}
+
+
+@dataclass
+class IndexReport:
+    """Result of an index sync."""
+    desired: List[Tuple[str, str]] = field(default_factory=list)
+    existing: Set[Tuple[str, str]] = field(default_factory=set)
+    created: List[Tuple[str, str]] = field(default_factory=list)
+    errors: Dict[Tuple[str, str], str] = field(default_factory=dict)
+    usage: Dict[str, Optional[bool]] = field(default_factory=dict)
+
+    @property
+    def missing(self) -> List[Tuple[str, str]]:
+        return [index for index in self.desired if index not in self.existing]
+
+    def print(self) -> None:
+        print(f"    Indexes: {len(self.desired)} desired, "
+              f"{len(self.existing & set(self.desired))} present, "
+              f"{len(self.created)} created, {len(self.errors)} errors")
+        for (label, prop), error in self.errors.items():
+            print(f"    [ERROR] {label}({prop}): {error}")
+        for label, prop in self.missing:
+            if (label, prop) not in self.errors:
+                print(f"    [WARN] Missing index {label}({prop})")
+        for name, used in self.usage.items():
+            status = "index scan" if used else ("NO INDEX" if used is False else "unknown")
+            print(f"    {name:28s} {status}")
+
+
+def existing_indexes(client: FalkorDBClient) -> Set[Tuple[str, str]]:
+    """(label, property) pairs with a node index in the current graph."""
+    rows = client.query(
+        "CALL db.indexes() YIELD label, properties, entitytype "
+        "RETURN label, properties, entitytype",
+        use_cache=False
+    )
+    indexes = set()
+    for row in rows:
+        if row.get("entitytype", "NODE") != "NODE":
+            continue
+        for prop in row.get("properties") or []:
+            indexes.add((row["label"], prop))
+    return indexes
+
+
+def index_usage(client: FalkorDBClient, queries: Dict[str, str] = SAMPLE_QUERIES) -> Dict[str, Optional[bool]]:
+    """
+    Check with EXPLAIN whether each query starts from an index scan.
+
+    Returns:
+        Query name -> True (index scan), False (label/full scan) or None
+        (EXPLAIN failed)
+    """
+    usage: Dict[str, Optional[bool]] = {}
+    for name, cypher in queries.items():
+        try:
+            plan = client.explain(cypher, {"id": ""})
+        except Exception:
+            usage[name] = None
+            continue
+        usage[name] = any("Index Scan" in line for line in plan)
+    return usage
+
+
+def create_indexes(client: FalkorDBClient, report_usage: bool = True) -> IndexReport:
+    """
+    Create missing schema indexes and report index state.
+
+    Args:
+        client: Connected client
+        report_usage: Also EXPLAIN SAMPLE_QUERIES to check index usage
+    """
+    report = IndexReport(desired=get_index_definitions())
+    try:
+        report.existing = existing_indexes(client)
+    except Exception as e:
+        report.errors[("db.indexes", "*")] = str(e)
+
+    for label, prop in report.missing:
+        try:
+            client.execute(
+                f"CREATE INDEX FOR (n:{validate_identifier(label)}) ON (n.{validate_identifier(prop)})"
+            )
+            report.created.append((label, prop))
+            report.existing.add((label, prop))
+        except Exception as e:
+            report.errors[(label, prop)] = str(e)
+
+    if report_usage:
+        report.usage = index_usage(client)
+    return report
+
+
+def ensure_entity_label(client: FalkorDBClient) -> None:
+    """Add brick_Entity to nodes loaded before the label existed (not the GraphMeta node)."""
+    client.execute(
+        f"MATCH (n) WHERE NOT n:{ENTITY_LABEL} AND NOT n:{GRAPH_META_LABEL} SET n:{ENTITY_LABEL}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create and report Brick graph indexes")
+    parser.add_argument("--report", action="store_true", help="Only report, don't create")
+    parser.add_argument("--host", default="localhost", help="FalkorDB host")
+    parser.add_argument("--port", type=int, default=6379, help="FalkorDB port")
+    parser.add_argument("--graph", default="energy_graph", help="Graph name")
+    args = parser.parse_args()
+
+    client = FalkorDBClient(FalkorConfig(host=args.host, port=args.port, graph_name=args.graph))
+    try:
+        client.connect()
+        if args.report:
+            report = IndexReport(desired=get_index_definitions(), existing=existing_indexes(client))
+            report.usage = index_usage(client)
+        else:
+            ensure_entity_label(client)
+            report = create_indexes(client)
+        report.print()
+    except Exception as e:
+        print(f"\n[ERROR] {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
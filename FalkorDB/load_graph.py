@@ -5,50 +5,92 @@ Creates a connected graph with brick_Building as root.
 All nodes have valid semantic paths to the Building.
 
 Usage:
-    python load_graph.py [--clear]
+    python load_graph.py [--clear] [--bulk] [--batch-size N]
+    python load_graph.py --sync [--no-prune]   # incremental, see graph_sync.py
 """
 
 import argparse
 import sys
 from falkor_client import FalkorDBClient, FalkorConfig
-from seed_data import generate_cypher_statements, get_seed_summary
+from seed_data import generate_cypher_statements, get_seed_graph, get_seed_summary
+from bulk_loader import DEFAULT_BATCH_SIZE, bulk_load
+from graph_sync import bump_graph_version, sync_graph
+from graph_stats import verify
+from indexes import create_indexes, index_usage
 
 
-def create_indexes(client: FalkorDBClient) -> None:
-    """Create indexes for common queries."""
-    indexes = [
-        "CREATE INDEX ON :brick_Building(id)",
-        "CREATE INDEX ON :brick_Building(name)",
-        "CREATE INDEX ON :brick_Floor(id)",
-        "CREATE INDEX ON :brick_HVAC_Zone(id)",
-        "CREATE INDEX ON :brick_Air_Handling_Unit(id)",
-        "CREATE INDEX ON :brick_Electrical_Meter(id)",
-        "CREATE INDEX ON :brick_Temperature_Sensor(id)",
-        "CREATE INDEX ON :brick_Timeseries(id)",
-        "CREATE INDEX ON :brick_Timeseries(external_id)",
-    ]
-    
-    for index in indexes:
-        try:
-            client.execute(index)
-        except Exception:
-            pass  # Index may already exist
-
-
-def load_graph(client: FalkorDBClient, clear_first: bool = True) -> None:
-    """Load the Brick ontology graph into FalkorDB."""
+def load_graph(
+    client: FalkorDBClient,
+    clear_first: bool = True,
+    bulk: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sync: bool = False,
+    prune: bool = True
+) -> None:
+    """
+    Load the Brick ontology graph into FalkorDB.
+    
+    Args:
+        client: Connected client
+        clear_first: Delete existing nodes before loading
+        bulk: Use UNWIND batches instead of one statement per entity
+        batch_size: Rows per batch in bulk and sync mode
+        sync: Apply only the differences to the current graph (MERGE upserts)
+        prune: In sync mode, delete nodes/edges not in the seed data
+    """
     
     print("\n" + "=" * 50)
     print("LOADING BRICK ONTOLOGY GRAPH")
     print("=" * 50)
     
-    if clear_first:
+    if clear_first and not sync:
         print("\n[*] Clearing existing graph...")
         client.delete_all()
     
     print("[*] Creating indexes...")
-    create_indexes(client)
+    create_indexes(client, report_usage=False).print()
+    
+    if sync:
+        print("[*] Syncing graph...")
+        plan = sync_graph(client, *get_seed_graph(), prune=prune, batch_size=batch_size)
+        print(f"\n[OK] {plan.summary()}")
+        if plan.is_empty:
+            print("    Graph already up to date")
+    elif bulk:
+        print(f"[*] Bulk loading (batch size {batch_size})...")
+        nodes, edges = get_seed_graph()
+        stats = bulk_load(client, nodes, edges, batch_size=batch_size)
+        print(f"\n[OK] Loaded {stats.summary()}")
+        for error in stats.errors:
+            print(f"    [ERROR] {error}")
+        if stats.errors:
+            print(f"[WARN] {len(stats.errors)} errors")
+    else:
+        load_statements(client)
+    
+    if not sync:
+        print(f"[*] Graph version: {bump_graph_version(client)}")
+    
+    print("\n[*] Checking index usage...")
+    for name, used in index_usage(client).items():
+        print(f"    {name:28s} {'index scan' if used else 'NO INDEX' if used is False else 'unknown'}")
+    
+    # Verify connectivity
+    print("\n[*] Verifying graph connectivity...")
+    verify_graph(client)
     
+    # Print summary
+    print("\n" + "=" * 50)
+    print("LOAD COMPLETE")
+    print("=" * 50)
+    
+    summary = get_seed_summary()
+    print(f"\nRoot: {summary['root']}")
+    print(f"Expected nodes: ~{sum([summary['floors'], summary['zones'], summary['systems'], summary['equipment'], summary['meters'], summary['sensors'], summary['timeseries']]) + 1}")
+
+
+def load_statements(client: FalkorDBClient) -> None:
+    """Execute the seed data one Cypher statement at a time."""
     print("[*] Generating Cypher statements...")
     statements = generate_cypher_statements()
     print(f"    Generated {len(statements)} statements")
@@ -68,63 +110,11 @@ def load_graph(client: FalkorDBClient, clear_first: bool = True) -> None:
     print(f"\n[OK] Executed {success} statements")
     if errors > 0:
         print(f"[WARN] {errors} errors")
-    
-    # Verify connectivity
-    print("\n[*] Verifying graph connectivity...")
-    verify_graph(client)
-    
-    # Print summary
-    print("\n" + "=" * 50)
-    print("LOAD COMPLETE")
-    print("=" * 50)
-    
-    summary = get_seed_summary()
-    print(f"\nRoot: {summary['root']}")
-    print(f"Expected nodes: ~{sum([summary['floors'], summary['zones'], summary['systems'], summary['equipment'], summary['meters'], summary['sensors'], summary['timeseries']]) + 1}")
-    
-    # Count actual nodes
-    result = client.query("MATCH (n) RETURN count(n) as count")
-    if result:
-        print(f"Actual nodes: {result[0]['count']}")
-    
-    result = client.query("MATCH ()-[r]->() RETURN count(r) as count")
-    if result:
-        print(f"Relationships: {result[0]['count']}")
 
 
 def verify_graph(client: FalkorDBClient) -> None:
-    """Verify the graph is properly connected."""
-    
-    # Check Building exists
-    result = client.query("MATCH (b:brick_Building) RETURN b.name as name")
-    if result:
-        print(f"    Root Building: {result[0]['name']}")
-    else:
-        print("    [ERROR] No Building found!")
-        return
-    
-    # Check all nodes are reachable from Building
-    result = client.query("""
-        MATCH (b:brick_Building {id: 'building_opera'})
-        MATCH (b)-[*1..5]-(connected)
-        RETURN count(DISTINCT connected) as reachable
-    """)
-    if result:
-        print(f"    Nodes reachable from Building: {result[0]['reachable']}")
-    
-    # Check traversal path exists
-    result = client.query("""
-        MATCH path = (b:brick_Building)-[:brick_hasPart]->
-                     (:brick_HVAC_System)-[:brick_hasMember]->
-                     (:brick_Air_Handling_Unit)-[:brick_hasPoint]->
-                     (:brick_Temperature_Sensor)-[:brick_hasTimeseries]->
-                     (:brick_Timeseries)
-        RETURN count(path) as paths
-    """)
-    if result and result[0]['paths'] > 0:
-        print(f"    Valid traversal paths: {result[0]['paths']}")
-    else:
-        print("    [WARN] No complete traversal path found")
+    """Verify the graph is properly connected (see graph_stats.py)."""
+    verify(client).print()
 
 
 def main():
@@ -133,6 +123,13 @@ def main():
     parser.add_argument("--host", default="localhost", help="FalkorDB host")
     parser.add_argument("--port", type=int, default=6379, help="FalkorDB port")
     parser.add_argument("--graph", default="energy_graph", help="Graph name")
+    parser.add_argument("--bulk", action="store_true", help="Load with UNWIND batches")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Rows per batch with --bulk/--sync")
+    parser.add_argument("--sync", action="store_true",
+                        help="Incremental MERGE-based sync instead of reload")
+    parser.add_argument("--no-prune", action="store_true",
+                        help="With --sync, keep nodes/edges not in the seed data")
     
     args = parser.parse_args()
     
@@ -146,7 +143,8 @@ def main():
     
     try:
         client.connect()
-        load_graph(client, clear_first=args.clear)
+        load_graph(client, clear_first=args.clear, bulk=args.bulk, batch_size=args.batch_size,
+                   sync=args.sync, prune=not args.no_prune)
         
     except Exception as e:
         print(f"\n[ERROR] {e}")
@@ -0,0 +1,356 @@
+"""
+Query cost guard for FalkorDB
+
+Protects a shared FalkorDB instance from runaway reads. Before a query
+runs, guard():
+
+- bounds variable-length patterns without an upper bound ([*], [*2..])
+  to max_hops
+- appends LIMIT max_rows to a read query whose final RETURN has none
+- rejects the query (QueryRejected) if its estimated cost exceeds max_cost
+- gives it a server-side timeout (timeout_ms)
+
+The cost of a query template is estimated once from its execution plan
+(GRAPH.EXPLAIN plans a query without running it) and the graph's label
+counts:
+
+- All Node Scan reads every node, Node By Label Scan every node with the
+  label, index and id seeks one node
+- every traverse multiplies by the average degree, a variable-length
+  traverse by average degree ** max hops
+- a Cartesian Product multiplies its scans instead of taking the largest
+
+Costs are cached per template and dropped when the graph version changes.
+
+Usage:
+    guard = QueryGuard()
+    guarded = guard.check(client, cypher, params)
+    client.query(guarded.cypher, params, timeout_ms=guarded.timeout_ms)
+"""
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from falkor_client import is_write_query, prepare_query, validate_identifier
+
+
+DEFAULT_MAX_ROWS = 1000
+DEFAULT_MAX_COST = 5_000_000
+DEFAULT_MAX_HOPS = 5
+DEFAULT_TIMEOUT_MS = 5000
+
+LABELS_QUERY = "CALL db.labels() YIELD label RETURN label"
+EDGE_COUNT_QUERY = "MATCH ()-[r]->() RETURN count(r) AS count"
+
+# [*], [:R*], [r:R*2..], [*..3], [*1..5], [*3]
+_VAR_LENGTH = re.compile(r"\*\s*(\d*)\s*(\.\.)?\s*(\d*)(?=\s*\])")
+_RETURN = re.compile(r"\bRETURN\b", re.IGNORECASE)
+_LIMIT = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+_UNION = re.compile(r"\bUNION\b", re.IGNORECASE)
+_PLAN_LABEL = re.compile(r"\(\w*:(\w+)")
+_PLAN_HOPS = re.compile(r"\*(\d*)\.\.(\d*)")
+
+
+class QueryRejected(Exception):
+    """Raised when a query's estimated cost exceeds the guard's budget."""
+
+    def __init__(self, cost: "QueryCost", max_cost: float):
+        self.cost = cost
+        self.max_cost = max_cost
+        super().__init__(
+            f"Query rejected: estimated cost {cost.estimate:,.0f} exceeds {max_cost:,.0f} "
+            f"({'; '.join(cost.reasons) or 'large scan'})"
+        )
+
+
+@dataclass
+class QueryCost:
+    """Estimated number of rows a plan touches."""
+    estimate: Optional[float]
+    operations: List[str] = field(default_factory=list)
+    reasons: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "estimate": round(self.estimate) if self.estimate is not None else None,
+            "operations": self.operations,
+            "reasons": self.reasons,
+        }
+
+
+@dataclass
+class GuardedQuery:
+    """A query as it should be run: rewritten text, timeout and its cost."""
+    cypher: str
+    timeout_ms: Optional[int]
+    cost: QueryCost
+    row_limit: Optional[int] = None
+    rewrites: List[str] = field(default_factory=list)
+
+    def truncated(self, rows: int) -> bool:
+        """True if a result of rows rows may have been cut by the injected LIMIT."""
+        return self.row_limit is not None and rows >= self.row_limit
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "cost": self.cost.to_dict(),
+            "timeout_ms": self.timeout_ms,
+            "row_limit": self.row_limit,
+            "rewrites": self.rewrites,
+        }
+
+
+def bound_variable_length(cypher: str, max_hops: int) -> Tuple[str, bool]:
+    """
+    Give variable-length patterns without an upper bound one.
+
+    Returns:
+        (cypher, changed)
+    """
+    changed = False
+
+    def bound(match: re.Match) -> str:
+        nonlocal changed
+        low, dots, high = match.groups()
+        if high or (low and not dots):
+            return match.group(0)
+        changed = True
+        return f"*{low or 1}..{max(int(low or 1), max_hops)}"
+
+    return _VAR_LENGTH.sub(bound, cypher), changed
+
+
+def has_final_limit(cypher: str) -> bool:
+    """True if the last RETURN clause already has a LIMIT."""
+    returns = list(_RETURN.finditer(cypher))
+    return bool(returns) and bool(_LIMIT.search(cypher, returns[-1].end()))
+
+
+def inject_limit(cypher: str, max_rows: int) -> Tuple[str, bool]:
+    """
+    Append LIMIT max_rows to a read query that returns rows without one.
+
+    Writes, UNIONs and queries without RETURN are left alone.
+
+    Returns:
+        (cypher, changed)
+    """
+    if is_write_query(cypher) or _UNION.search(cypher) or not _RETURN.search(cypher):
+        return cypher, False
+    if has_final_limit(cypher):
+        return cypher, False
+    return f"{cypher.rstrip().rstrip(';')}\nLIMIT {max_rows}", True
+
+
+class QueryGuard:
+    """
+    Rewrites, costs and bounds queries before they reach FalkorDB.
+
+    Args:
+        max_rows: LIMIT added to read queries without one
+        max_cost: Queries estimated above this are rejected
+        max_hops: Upper bound for unbounded variable-length patterns
+        timeout_ms: Server-side timeout for every guarded query
+        max_templates: Cached template costs
+    """
+
+    def __init__(
+        self,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_cost: float = DEFAULT_MAX_COST,
+        max_hops: int = DEFAULT_MAX_HOPS,
+        timeout_ms: Optional[int] = DEFAULT_TIMEOUT_MS,
+        max_templates: int = 1024
+    ):
+        self.max_rows = max_rows
+        self.max_cost = max_cost
+        self.max_hops = max_hops
+        self.timeout_ms = timeout_ms
+        self.max_templates = max_templates
+        self._costs: "OrderedDict[str, QueryCost]" = OrderedDict()
+        self._version: Optional[Tuple[int, Optional[int]]] = None
+        self._stats_loaded = False
+        self.label_counts: Dict[str, int] = {}
+        self.nodes = 0
+        self.edges = 0
+        self.explains = 0
+        self.rejected = 0
+
+    # -------------------------------------------------------------------------
+    # Rewriting and estimation (no I/O)
+    # -------------------------------------------------------------------------
+
+    def rewrite(self, cypher: str) -> Tuple[str, List[str]]:
+        """Bound variable-length patterns and inject LIMIT. Returns (cypher, rewrites)."""
+        rewrites = []
+        cypher, bounded = bound_variable_length(cypher, self.max_hops)
+        if bounded:
+            rewrites.append(f"variable-length patterns bounded to {self.max_hops} hops")
+        cypher, limited = inject_limit(cypher, self.max_rows)
+        if limited:
+            rewrites.append(f"LIMIT {self.max_rows} added")
+        return cypher, rewrites
+
+    def estimate(self, plan: List[str]) -> QueryCost:
+        """Estimate the cost of an execution plan (GRAPH.EXPLAIN lines)."""
+        degree = max(self.edges / self.nodes, 1.0) if self.nodes else 1.0
+        scans: List[float] = []
+        fanout = 1.0
+        operations = []
+        reasons = []
+        cartesian = False
+
+        for line in plan:
+            operation = line.split("|")[0].strip()
+            operations.append(operation)
+            if operation == "All Node Scan":
+                scans.append(float(self.nodes))
+                reasons.append("all node scan")
+            elif operation == "Node By Label Scan":
+                label = _PLAN_LABEL.search(line)
+                scans.append(float(self.label_counts.get(label.group(1), self.nodes) if label else self.nodes))
+            elif "Seek" in operation or "Index Scan" in operation or "ID Scan" in operation:
+                scans.append(1.0)
+            elif operation == "Conditional Variable Length Traverse":
+                hops = _PLAN_HOPS.search(line)
+                high = int(hops.group(2)) if hops and hops.group(2).isdigit() else self.max_hops
+                fanout *= degree ** min(high, self.max_hops)
+                reasons.append(f"variable-length traverse ({high} hops)")
+            elif "Traverse" in operation or operation == "Expand Into":
+                fanout *= degree
+            elif operation == "Cartesian Product":
+                cartesian = True
+                reasons.append("cartesian product")
+
+        if cartesian:
+            base = 1.0
+            for rows in scans:
+                base *= max(rows, 1.0)
+        else:
+            base = max(scans, default=1.0)
+        return QueryCost(base * fanout, operations, reasons)
+
+    def _check_cost(self, cost: QueryCost) -> None:
+        if cost.estimate is not None and cost.estimate > self.max_cost:
+            self.rejected += 1
+            raise QueryRejected(cost, self.max_cost)
+
+    def _guarded(self, cypher: str, rewrites: List[str], cost: QueryCost) -> GuardedQuery:
+        self._check_cost(cost)
+        limited = any(r.startswith("LIMIT") for r in rewrites)
+        return GuardedQuery(
+            cypher=cypher,
+            timeout_ms=self.timeout_ms,
+            cost=cost,
+            row_limit=self.max_rows if limited else None,
+            rewrites=rewrites
+        )
+
+    def _cached(self, template: str) -> Optional[QueryCost]:
+        cost = self._costs.get(template)
+        if cost is not None:
+            self._costs.move_to_end(template)
+        return cost
+
+    def _remember(self, template: str, cost: QueryCost) -> None:
+        self._costs[template] = cost
+        while len(self._costs) > self.max_templates:
+            self._costs.popitem(last=False)
+
+    def _version_changed(self, client) -> bool:
+        version = (client.graph_version, client.stored_graph_version)
+        if version == self._version:
+            return False
+        self._version = version
+        self._costs.clear()
+        self._stats_loaded = False
+        return True
+
+    def _failed_cost(self, error: Exception) -> QueryCost:
+        # Estimation is best-effort: the query still runs with LIMIT and timeout
+        return QueryCost(None, reasons=[f"explain failed: {error}"])
+
+    # -------------------------------------------------------------------------
+    # Sync and async entry points
+    # -------------------------------------------------------------------------
+
+    def load_stats(self, client) -> None:
+        """Read label counts and the edge count through a FalkorDBClient."""
+        counts = {}
+        for row in client.query(LABELS_QUERY, use_cache=False):
+            label = validate_identifier(row["label"])
+            result = client.query(f"MATCH (n:{label}) RETURN count(n) AS count", use_cache=False)
+            counts[label] = result[0]["count"] if result else 0
+        edges = client.query(EDGE_COUNT_QUERY, use_cache=False)
+        self._set_stats(counts, edges[0]["count"] if edges else 0)
+
+    async def aload_stats(self, client) -> None:
+        """Async variant of load_stats() for AsyncFalkorDBClient."""
+        counts = {}
+        for row in await client.query(LABELS_QUERY, use_cache=False):
+            label = validate_identifier(row["label"])
+            result = await client.query(f"MATCH (n:{label}) RETURN count(n) AS count", use_cache=False)
+            counts[label] = result[0]["count"] if result else 0
+        edges = await client.query(EDGE_COUNT_QUERY, use_cache=False)
+        self._set_stats(counts, edges[0]["count"] if edges else 0)
+
+    def _set_stats(self, counts: Dict[str, int], edges: int) -> None:
+        self.label_counts = counts
+        # Every entity node also carries brick_Entity, so don't sum labels
+        self.nodes = max(counts.values(), default=0)
+        self.edges = edges
+        self._stats_loaded = True
+
+    def check(self, client, cypher: str, params: Optional[Dict[str, Any]] = None) -> GuardedQuery:
+        """
+        Rewrite and cost a query for a FalkorDBClient.
+
+        Raises:
+            QueryRejected: If the estimated cost exceeds max_cost
+        """
+        cypher, rewrites = self.rewrite(cypher)
+        template = prepare_query(cypher).cypher
+        cost = None if self._version_changed(client) else self._cached(template)
+        if cost is None:
+            try:
+                if not self._stats_loaded:
+                    self.load_stats(client)
+                cost = self.estimate(client.explain(cypher, params))
+                self.explains += 1
+            except Exception as e:
+                # Not remembered, so the next call retries EXPLAIN
+                cost = self._failed_cost(e)
+            else:
+                self._remember(template, cost)
+        return self._guarded(cypher, rewrites, cost)
+
+    async def acheck(self, client, cypher: str, params: Optional[Dict[str, Any]] = None) -> GuardedQuery:
+        """Async variant of check() for AsyncFalkorDBClient."""
+        cypher, rewrites = self.rewrite(cypher)
+        template = prepare_query(cypher).cypher
+        cost = None if self._version_changed(client) else self._cached(template)
+        if cost is None:
+            try:
+                if not self._stats_loaded:
+                    await self.aload_stats(client)
+                cost = self.estimate(await client.explain(cypher, params))
+                self.explains += 1
+            except Exception as e:
+                cost = self._failed_cost(e)
+            else:
+                self._remember(template, cost)
+        return self._guarded(cypher, rewrites, cost)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "templates": len(self._costs),
+            "explains": self.explains,
+            "rejected": self.rejected,
+            "max_rows": self.max_rows,
+            "max_cost": self.max_cost,
+            "timeout_ms": self.timeout_ms,
+            "nodes": self.nodes,
+            "edges": self.edges,
+        }
@@ -8,6 +8,9 @@ Supported traversal pattern:
 Building → System → Equipment → Point → Timeseries
 """
 
+from typing import List, Tuple
+
+
 # ============================================================================
 # BRICK CLASSES (Node Labels)
 # ============================================================================
@@ -56,6 +59,33 @@ BRICK_CLASSES = {
 }
 
 
+# Common label on every node, so lookups by id without a known class
+# (MATCH (n:brick_Entity {id: $id})) can use a single index
+ENTITY_LABEL = "brick_Entity"
+
+
+def class_label(var: str) -> str:
+    """
+    Cypher expression for a node's Brick class label.
+
+    Label order is not guaranteed (a backfilled brick_Entity may come
+    first), so the class is the first label that is not brick_Entity.
+    """
+    return f"[l IN labels({var}) WHERE l <> '{ENTITY_LABEL}'][0]"
+
+
+# ============================================================================
+# INDEXES
+# ============================================================================
+
+# Every Brick class (and brick_Entity) gets an index on id; extra
+# properties that queries filter on are listed here
+INDEXED_PROPERTIES = {
+    "brick_Building": ["name"],
+    "brick_Timeseries": ["external_id"],
+}
+
+
 # ============================================================================
 # BRICK RELATIONS (Edge Types)
 # ============================================================================
@@ -110,6 +140,11 @@ TRAVERSAL PATTERN:
         └─[brick_hasPoint]→ brick_Power_Sensor
             └─[brick_hasTimeseries]→ brick_Timeseries
 
+NODE LABELS:
+  - Every node has its Brick class label and brick_Entity
+    (e.g. :brick_Chiller:brick_Entity). Label order is not guaranteed;
+    the class is [l IN labels(n) WHERE l <> 'brick_Entity'][0]
+
 NODE PROPERTIES:
   - id: Unique identifier (required)
   - name: Human-readable name (required)
@@ -138,3 +173,16 @@ def get_label(brick_class: str) -> str:
 def get_relation(brick_relation: str) -> str:
     """Get FalkorDB relation type for a Brick relation."""
     return BRICK_RELATIONS.get(brick_relation, f"brick_{brick_relation}")
+
+
+def get_index_definitions() -> List[Tuple[str, str]]:
+    """
+    Indexes derived from the schema as (label, property) pairs.
+    
+    id on every Brick class and on brick_Entity, plus INDEXED_PROPERTIES.
+    """
+    labels = [ENTITY_LABEL] + sorted(set(BRICK_CLASSES.values()))
+    indexes = [(label, "id") for label in labels]
+    for label, properties in INDEXED_PROPERTIES.items():
+        indexes.extend((label, prop) for prop in properties)
+    return indexes
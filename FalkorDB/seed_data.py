@@ -9,42 +9,57 @@ Traversal: Building → System → Equipment → Point → Timeseries
 
 from typing import List, Tuple, Dict, Any
 
+from schema import ENTITY_LABEL
 
-def generate_cypher_statements() -> List[str]:
+
+# Node: {"label": "brick_...", "properties": {...}}
+# Edge: (source_id, relation, target_id)
+Node = Dict[str, Any]
+Edge = Tuple[str, str, str]
+
+
+def get_seed_graph() -> Tuple[List[Node], List[Edge]]:
     """
-    Generate Cypher statements for seeding the graph.
-    Returns list of Cypher CREATE/MATCH statements.
+    Seed graph as plain node and edge lists.
+    
+    This is the single source for the seed data; both the statement-based
+    loader and the bulk loader build on it.
+    
+    Returns:
+        Tuple of (nodes, edges)
     """
-    statements = []
+    nodes: List[Node] = []
+    edges: List[Edge] = []
+    
+    def add_node(label: str, **properties: Any) -> str:
+        nodes.append({"label": label, "properties": properties})
+        return properties["id"]
     
     # ========================================================================
     # ROOT: Building
     # ========================================================================
-    statements.append("""
-    CREATE (b:brick_Building {
-        id: 'building_opera',
-        name: 'Operahuset',
-        description: 'Oslo Opera House',
-        address: 'Kirsten Flagstads Plass 1, Oslo',
-        area_sqm: 38500,
-        year_built: 2008,
-        energy_class: 'B'
-    })
-    """)
+    building_id = add_node(
+        "brick_Building",
+        id='building_opera',
+        name='Operahuset',
+        description='Oslo Opera House',
+        address='Kirsten Flagstads Plass 1, Oslo',
+        area_sqm=38500,
+        year_built=2008,
+        energy_class='B'
+    )
     
     # ========================================================================
     # FLOORS: Building -[hasPart]-> Floor
     # ========================================================================
     for level in range(1, 4):
-        statements.append(f"""
-        MATCH (b:brick_Building {{id: 'building_opera'}})
-        CREATE (f:brick_Floor {{
-            id: 'floor_opera_{level}',
-            name: 'Etasje {level}',
-            level: {level}
-        }})
-        CREATE (b)-[:brick_hasPart]->(f)
-        """)
+        floor_id = add_node(
+            "brick_Floor",
+            id=f'floor_opera_{level}',
+            name=f'Etasje {level}',
+            level=level
+        )
+        edges.append((building_id, "brick_hasPart", floor_id))
     
     # ========================================================================
     # HVAC ZONES: Floor -[hasPart]-> HVAC_Zone
@@ -56,14 +71,8 @@ def generate_cypher_statements() -> List[str]:
     ]
     
     for zone_id, zone_name, floor_level in zones:
-        statements.append(f"""
-        MATCH (f:brick_Floor {{id: 'floor_opera_{floor_level}'}})
-        CREATE (z:brick_HVAC_Zone {{
-            id: '{zone_id}',
-            name: '{zone_name}'
-        }})
-        CREATE (f)-[:brick_hasPart]->(z)
-        """)
+        add_node("brick_HVAC_Zone", id=zone_id, name=zone_name)
+        edges.append((f'floor_opera_{floor_level}', "brick_hasPart", zone_id))
     
     # ========================================================================
     # SYSTEMS: Building -[hasPart]-> System
@@ -75,69 +84,53 @@ def generate_cypher_statements() -> List[str]:
     ]
     
     for sys_id, sys_label, sys_name in systems:
-        statements.append(f"""
-        MATCH (b:brick_Building {{id: 'building_opera'}})
-        CREATE (s:{sys_label} {{
-            id: '{sys_id}',
-            name: '{sys_name}'
-        }})
-        CREATE (b)-[:brick_hasPart]->(s)
-        """)
+        add_node(sys_label, id=sys_id, name=sys_name)
+        edges.append((building_id, "brick_hasPart", sys_id))
     
     # ========================================================================
     # EQUIPMENT: System -[hasMember]-> Equipment
     # ========================================================================
     
     # AHU in HVAC System
-    statements.append("""
-    MATCH (s:brick_HVAC_System {id: 'system_hvac'})
-    CREATE (ahu:brick_Air_Handling_Unit {
-        id: 'ahu_main',
-        name: 'Hovedaggregat AHU-01',
-        manufacturer: 'Swegon',
-        model: 'Gold RX',
-        capacity: 50000,
-        capacity_unit: 'm3/h'
-    })
-    CREATE (s)-[:brick_hasMember]->(ahu)
-    """)
+    add_node(
+        "brick_Air_Handling_Unit",
+        id='ahu_main',
+        name='Hovedaggregat AHU-01',
+        manufacturer='Swegon',
+        model='Gold RX',
+        capacity=50000,
+        capacity_unit='m3/h'
+    )
+    edges.append(('system_hvac', "brick_hasMember", 'ahu_main'))
     
     # Chiller in HVAC System
-    statements.append("""
-    MATCH (s:brick_HVAC_System {id: 'system_hvac'})
-    CREATE (ch:brick_Chiller {
-        id: 'chiller_main',
-        name: 'Kjølemaskin CH-01',
-        manufacturer: 'Carrier',
-        model: 'AquaEdge 23XRV',
-        capacity: 2000,
-        capacity_unit: 'kW'
-    })
-    CREATE (s)-[:brick_hasMember]->(ch)
-    """)
+    add_node(
+        "brick_Chiller",
+        id='chiller_main',
+        name='Kjølemaskin CH-01',
+        manufacturer='Carrier',
+        model='AquaEdge 23XRV',
+        capacity=2000,
+        capacity_unit='kW'
+    )
+    edges.append(('system_hvac', "brick_hasMember", 'chiller_main'))
     
     # Pump in HVAC System
-    statements.append("""
-    MATCH (s:brick_HVAC_System {id: 'system_hvac'})
-    CREATE (p:brick_Pump {
-        id: 'pump_chw',
-        name: 'Kjølevannspumpe P-01',
-        manufacturer: 'Grundfos',
-        capacity: 75,
-        capacity_unit: 'kW'
-    })
-    CREATE (s)-[:brick_hasMember]->(p)
-    """)
+    add_node(
+        "brick_Pump",
+        id='pump_chw',
+        name='Kjølevannspumpe P-01',
+        manufacturer='Grundfos',
+        capacity=75,
+        capacity_unit='kW'
+    )
+    edges.append(('system_hvac', "brick_hasMember", 'pump_chw'))
     
     # ========================================================================
     # EQUIPMENT FEEDS ZONES: AHU -[feeds]-> Zone
     # ========================================================================
     for zone_id in ['zone_foyer', 'zone_hall', 'zone_backstage']:
-        statements.append(f"""
-        MATCH (ahu:brick_Air_Handling_Unit {{id: 'ahu_main'}})
-        MATCH (z:brick_HVAC_Zone {{id: '{zone_id}'}})
-        CREATE (ahu)-[:brick_feeds]->(z)
-        """)
+        edges.append(('ahu_main', "brick_feeds", zone_id))
     
     # ========================================================================
     # METERS: Building -[isMeteredBy]-> Meter
@@ -149,15 +142,8 @@ def generate_cypher_statements() -> List[str]:
     ]
     
     for meter_id, meter_label, meter_name, unit in meters:
-        statements.append(f"""
-        MATCH (b:brick_Building {{id: 'building_opera'}})
-        CREATE (m:{meter_label} {{
-            id: '{meter_id}',
-            name: '{meter_name}',
-            unit: '{unit}'
-        }})
-        CREATE (b)-[:brick_isMeteredBy]->(m)
-        """)
+        add_node(meter_label, id=meter_id, name=meter_name, unit=unit)
+        edges.append((building_id, "brick_isMeteredBy", meter_id))
     
     # ========================================================================
     # POINTS (SENSORS): Equipment/Zone -[hasPoint]-> Sensor
@@ -171,15 +157,8 @@ def generate_cypher_statements() -> List[str]:
     ]
     
     for sensor_id, sensor_label, sensor_name, unit in ahu_sensors:
-        statements.append(f"""
-        MATCH (ahu:brick_Air_Handling_Unit {{id: 'ahu_main'}})
-        CREATE (s:{sensor_label} {{
-            id: '{sensor_id}',
-            name: '{sensor_name}',
-            unit: '{unit}'
-        }})
-        CREATE (ahu)-[:brick_hasPoint]->(s)
-        """)
+        add_node(sensor_label, id=sensor_id, name=sensor_name, unit=unit)
+        edges.append(('ahu_main', "brick_hasPoint", sensor_id))
     
     # Chiller sensors
     chiller_sensors = [
@@ -189,36 +168,15 @@ def generate_cypher_statements() -> List[str]:
     ]
     
     for sensor_id, sensor_label, sensor_name, unit in chiller_sensors:
-        statements.append(f"""
-        MATCH (ch:brick_Chiller {{id: 'chiller_main'}})
-        CREATE (s:{sensor_label} {{
-            id: '{sensor_id}',
-            name: '{sensor_name}',
-            unit: '{unit}'
-        }})
-        CREATE (ch)-[:brick_hasPoint]->(s)
-        """)
+        add_node(sensor_label, id=sensor_id, name=sensor_name, unit=unit)
+        edges.append(('chiller_main', "brick_hasPoint", sensor_id))
     
     # Meter sensors
-    statements.append("""
-    MATCH (m:brick_Electrical_Meter {id: 'meter_elec_main'})
-    CREATE (s:brick_Energy_Sensor {
-        id: 'sensor_energy_main',
-        name: 'Akkumulert Energi',
-        unit: 'kWh'
-    })
-    CREATE (m)-[:brick_hasPoint]->(s)
-    """)
-    
-    statements.append("""
-    MATCH (m:brick_Electrical_Meter {id: 'meter_elec_main'})
-    CREATE (s:brick_Power_Sensor {
-        id: 'sensor_power_main',
-        name: 'Momentan Effekt',
-        unit: 'kW'
-    })
-    CREATE (m)-[:brick_hasPoint]->(s)
-    """)
+    add_node("brick_Energy_Sensor", id='sensor_energy_main', name='Akkumulert Energi', unit='kWh')
+    edges.append(('meter_elec_main', "brick_hasPoint", 'sensor_energy_main'))
+    
+    add_node("brick_Power_Sensor", id='sensor_power_main', name='Momentan Effekt', unit='kW')
+    edges.append(('meter_elec_main', "brick_hasPoint", 'sensor_power_main'))
     
     # Zone sensors
     zone_sensors = [
@@ -228,27 +186,19 @@ def generate_cypher_statements() -> List[str]:
     ]
     
     for zone_id, sensor_id, sensor_name in zone_sensors:
-        statements.append(f"""
-        MATCH (z:brick_HVAC_Zone {{id: '{zone_id}'}})
-        CREATE (s:brick_Temperature_Sensor {{
-            id: '{sensor_id}',
-            name: '{sensor_name}',
-            unit: 'degC'
-        }})
-        CREATE (z)-[:brick_hasPoint]->(s)
-        """)
+        add_node("brick_Temperature_Sensor", id=sensor_id, name=sensor_name, unit='degC')
+        edges.append((zone_id, "brick_hasPoint", sensor_id))
     
     # CO2 sensors in zones
     for zone_id in ['zone_foyer', 'zone_hall']:
-        statements.append(f"""
-        MATCH (z:brick_HVAC_Zone {{id: '{zone_id}'}})
-        CREATE (s:brick_CO2_Sensor {{
-            id: 'sensor_co2_{zone_id}',
-            name: 'CO2 {zone_id.replace('zone_', '').title()}',
-            unit: 'ppm'
-        }})
-        CREATE (z)-[:brick_hasPoint]->(s)
-        """)
+        sensor_id = f'sensor_co2_{zone_id}'
+        add_node(
+            "brick_CO2_Sensor",
+            id=sensor_id,
+            name=f"CO2 {zone_id.replace('zone_', '').title()}",
+            unit='ppm'
+        )
+        edges.append((zone_id, "brick_hasPoint", sensor_id))
     
     # ========================================================================
     # TIMESERIES: Sensor -[hasTimeseries]-> Timeseries
@@ -267,15 +217,52 @@ def generate_cypher_statements() -> List[str]:
     
     for sensor_id in timeseries_sensors:
         ts_id = sensor_id.replace('sensor_', 'ts_')
-        statements.append(f"""
-        MATCH (s {{id: '{sensor_id}'}})
-        CREATE (ts:brick_Timeseries {{
-            id: '{ts_id}',
-            external_id: 'piscada.{ts_id}',
-            resolution: 'PT15M'
-        }})
-        CREATE (s)-[:brick_hasTimeseries]->(ts)
-        """)
+        add_node(
+            "brick_Timeseries",
+            id=ts_id,
+            external_id=f'piscada.{ts_id}',
+            resolution='PT15M'
+        )
+        edges.append((sensor_id, "brick_hasTimeseries", ts_id))
+    
+    return nodes, edges
+
+
+def _cypher_literal(value: Any) -> str:
+    """Format a Python value as a Cypher literal."""
+    if isinstance(value, str):
+        escaped = value.replace("\\", "\\\\").replace("'", "\\'")
+        return f"'{escaped}'"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def generate_cypher_statements() -> List[str]:
+    """
+    Generate Cypher statements for seeding the graph.
+    Returns list of Cypher CREATE/MATCH statements.
+    
+    One CREATE per node followed by one MATCH + CREATE per relationship.
+    For large graphs use bulk_loader.bulk_load() instead.
+    """
+    nodes, edges = get_seed_graph()
+    labels = {node["properties"]["id"]: node["label"] for node in nodes}
+    statements = []
+    
+    for node in nodes:
+        props = ", ".join(
+            f"{key}: {_cypher_literal(value)}"
+            for key, value in node["properties"].items()
+        )
+        statements.append(f"CREATE (:{node['label']}:{ENTITY_LABEL} {{{props}}})")
+    
+    for source_id, relation, target_id in edges:
+        statements.append(
+            f"MATCH (a:{labels[source_id]} {{id: {_cypher_literal(source_id)}}}) "
+            f"MATCH (b:{labels[target_id]} {{id: {_cypher_literal(target_id)}}}) "
+            f"CREATE (a)-[:{relation}]->(b)"
+        )
     
     return statements
 
@@ -0,0 +1,364 @@
+"""
+Synthetic Brick portfolio generator for scale testing
+
+Generates Brick-conformant graphs of configurable size with the same shape
+as seed_data.py (Building → Floor → Zone, Building → System → Equipment,
+Building → Meter, Equipment/Zone/Meter → Sensor → Timeseries).
+
+The graph is produced one building at a time, so a 10k-building portfolio
+never has to fit in memory. Output goes either straight into FalkorDB as
+UNWIND batches (bulk_loader) or to CSV files for FalkorDB's bulk loader
+(falkordb-bulk-insert). Output is deterministic for a given seed.
+
+Usage:
+    python synthetic_portfolio.py --buildings 100 --summary
+    python synthetic_portfolio.py --buildings 1000 --load --clear
+    python synthetic_portfolio.py --buildings 10000 --csv portfolio_csv
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Tuple
+
+from schema import BRICK_CLASSES, BRICK_RELATIONS, ENTITY_LABEL
+from seed_data import Node, Edge
+
+
+CITIES = ["Oslo", "Bergen", "Trondheim", "Stavanger", "Tromsø", "Drammen", "Kristiansand"]
+BUILDING_TYPES = ["Kontorbygg", "Skole", "Sykehjem", "Kulturhus", "Idrettshall", "Lager"]
+ENERGY_CLASSES = ["A", "B", "C", "D", "E"]
+
+# (label, unit) for sensors on each kind of equipment
+EQUIPMENT_SENSORS = {
+    "AHU": [("Temperature_Sensor", "degC"), ("Temperature_Sensor", "degC"), ("Power_Sensor", "kW"),
+            ("Flow_Sensor", "m3/h"), ("Pressure_Sensor", "Pa"), ("Humidity_Sensor", "%RH")],
+    "Chiller": [("Power_Sensor", "kW"), ("Temperature_Sensor", "degC"), ("Temperature_Sensor", "degC"),
+                ("Flow_Sensor", "m3/h")],
+    "Pump": [("Power_Sensor", "kW"), ("Pressure_Sensor", "Pa"), ("Flow_Sensor", "m3/h")],
+}
+
+METERS = [
+    ("Electrical_Meter", "kWh", [("Energy_Sensor", "kWh"), ("Power_Sensor", "kW")]),
+    ("Thermal_Energy_Meter", "kWh", [("Energy_Sensor", "kWh")]),
+    ("Water_Meter", "m3", [("Flow_Sensor", "m3/h")]),
+]
+
+# Properties written per label in CSV output (first column is the id)
+CSV_PROPERTIES = {
+    "brick_Building": ["id", "name", "address", "area_sqm", "year_built", "energy_class"],
+    "brick_Floor": ["id", "name", "level"],
+    "brick_Timeseries": ["id", "external_id", "resolution"],
+}
+DEFAULT_CSV_PROPERTIES = ["id", "name", "unit", "manufacturer", "capacity", "capacity_unit"]
+
+
+@dataclass
+class PortfolioSpec:
+    """Size of the generated portfolio."""
+    buildings: int = 10
+    floors_per_building: int = 5
+    zones_per_floor: int = 4
+    ahus_per_building: int = 2
+    chillers_per_building: int = 1
+    pumps_per_building: int = 2
+    sensors_per_equipment: int = 4
+    zone_sensors: int = 2
+    timeseries_ratio: float = 1.0
+    seed: int = 42
+
+    def expected_counts(self) -> Dict[str, int]:
+        """Approximate node/edge counts (timeseries depend on timeseries_ratio)."""
+        equipment = self.ahus_per_building + self.chillers_per_building + self.pumps_per_building
+        zones = self.floors_per_building * self.zones_per_floor
+        meter_sensors = sum(len(sensors) for _, _, sensors in METERS)
+        sensors = equipment * self.sensors_per_equipment + zones * self.zone_sensors + meter_sensors
+        timeseries = int(round(sensors * self.timeseries_ratio))
+        per_building = (1 + self.floors_per_building + zones + 3 + equipment
+                        + len(METERS) + sensors + timeseries)
+        edges = (self.floors_per_building + zones + 3 + equipment + zones
+                 + len(METERS) + sensors + timeseries)
+        return {
+            "buildings": self.buildings,
+            "sensors": sensors * self.buildings,
+            "timeseries": timeseries * self.buildings,
+            "nodes": per_building * self.buildings,
+            "edges": edges * self.buildings,
+        }
+
+
+def _label(brick_class: str) -> str:
+    return BRICK_CLASSES[brick_class]
+
+
+def generate_building(spec: PortfolioSpec, index: int) -> Tuple[List[Node], List[Edge]]:
+    """
+    Nodes and edges for building number `index`.
+
+    Each building has its own random stream (seed, index), so buildings can
+    be generated independently and in any order with identical results.
+    """
+    rng = random.Random(spec.seed * 1_000_003 + index)
+    nodes: List[Node] = []
+    edges: List[Edge] = []
+    prefix = f"b{index:06d}"
+    has_part = BRICK_RELATIONS["hasPart"]
+    has_point = BRICK_RELATIONS["hasPoint"]
+
+    def add_node(brick_class: str, **properties: Any) -> str:
+        nodes.append({"label": _label(brick_class), "properties": properties})
+        return properties["id"]
+
+    def add_sensors(parent_id: str, sensor_types: List[Tuple[str, str]], count: int, name: str) -> None:
+        for k in range(count):
+            sensor_class, unit = sensor_types[k % len(sensor_types)]
+            sensor_id = add_node(
+                sensor_class,
+                id=f"{parent_id}_pt{k}",
+                name=f"{sensor_class.replace('_', ' ')} {name}",
+                unit=unit
+            )
+            edges.append((parent_id, has_point, sensor_id))
+            if rng.random() < spec.timeseries_ratio:
+                ts_id = add_node(
+                    "Timeseries",
+                    id=f"{sensor_id}_ts",
+                    external_id=f"piscada.{sensor_id}",
+                    resolution=rng.choice(["PT5M", "PT15M", "PT1H"])
+                )
+                edges.append((sensor_id, BRICK_RELATIONS["hasTimeseries"], ts_id))
+
+    city = rng.choice(CITIES)
+    building_id = add_node(
+        "Building",
+        id=prefix,
+        name=f"{rng.choice(BUILDING_TYPES)} {city} {index}",
+        address=f"Gate {rng.randint(1, 200)}, {city}",
+        area_sqm=rng.randint(500, 40000),
+        year_built=rng.randint(1950, 2024),
+        energy_class=rng.choice(ENERGY_CLASSES)
+    )
+
+    # Floors and zones
+    zone_ids = []
+    for level in range(1, spec.floors_per_building + 1):
+        floor_id = add_node("Floor", id=f"{prefix}_f{level}", name=f"Etasje {level}", level=level)
+        edges.append((building_id, has_part, floor_id))
+        for z in range(spec.zones_per_floor):
+            zone_id = add_node("HVAC_Zone", id=f"{floor_id}_z{z}", name=f"Sone {level}.{z + 1}")
+            edges.append((floor_id, has_part, zone_id))
+            zone_ids.append(zone_id)
+
+    # Systems
+    systems = {}
+    for system_class, name in [("HVAC_System", "HVAC System"),
+                               ("Electrical_System", "Elektrisk System"),
+                               ("Lighting_System", "Belysningssystem")]:
+        systems[system_class] = add_node(system_class, id=f"{prefix}_{system_class.lower()}", name=name)
+        edges.append((building_id, has_part, systems[system_class]))
+
+    # Equipment in the HVAC system
+    equipment = (
+        [("AHU", i) for i in range(spec.ahus_per_building)]
+        + [("Chiller", i) for i in range(spec.chillers_per_building)]
+        + [("Pump", i) for i in range(spec.pumps_per_building)]
+    )
+    ahu_ids = []
+    for kind, i in equipment:
+        eq_id = add_node(
+            kind,
+            id=f"{prefix}_{kind.lower()}{i}",
+            name=f"{kind}-{i + 1:02d}",
+            manufacturer=rng.choice(["Swegon", "Systemair", "Carrier", "Grundfos", "Daikin"]),
+            capacity=rng.randint(10, 5000),
+            capacity_unit="kW"
+        )
+        edges.append((systems["HVAC_System"], BRICK_RELATIONS["hasMember"], eq_id))
+        add_sensors(eq_id, EQUIPMENT_SENSORS[kind], spec.sensors_per_equipment, f"{kind}-{i + 1:02d}")
+        if kind == "AHU":
+            ahu_ids.append(eq_id)
+
+    # Each zone is fed by one AHU
+    for z, zone_id in enumerate(zone_ids):
+        if ahu_ids:
+            edges.append((ahu_ids[z % len(ahu_ids)], BRICK_RELATIONS["feeds"], zone_id))
+        add_sensors(zone_id, [("Temperature_Sensor", "degC"), ("CO2_Sensor", "ppm")],
+                    spec.zone_sensors, zone_id)
+
+    # Meters
+    for meter_class, unit, sensor_types in METERS:
+        meter_id = add_node(meter_class, id=f"{prefix}_{meter_class.lower()}",
+                            name=meter_class.replace("_", " "), unit=unit)
+        edges.append((building_id, BRICK_RELATIONS["isMeteredBy"], meter_id))
+        add_sensors(meter_id, sensor_types, len(sensor_types), meter_class)
+
+    return nodes, edges
+
+
+def iter_portfolio(
+    spec: PortfolioSpec,
+    buildings_per_chunk: int = 10
+) -> Iterator[Tuple[List[Node], List[Edge]]]:
+    """
+    Yield the portfolio in chunks of whole buildings.
+
+    Edges never cross buildings, so each chunk can be bulk-loaded on its own.
+    """
+    for start in range(0, spec.buildings, buildings_per_chunk):
+        nodes: List[Node] = []
+        edges: List[Edge] = []
+        for index in range(start, min(start + buildings_per_chunk, spec.buildings)):
+            building_nodes, building_edges = generate_building(spec, index)
+            nodes.extend(building_nodes)
+            edges.extend(building_edges)
+        yield nodes, edges
+
+
+def load_portfolio(client, spec: PortfolioSpec, batch_size: int = 1000):
+    """
+    Stream the portfolio into FalkorDB with UNWIND batches.
+
+    All chunks go through one BulkWriter, so batches stay full across
+    chunk boundaries. The graph version is bumped afterwards so cached
+    query results for the old graph are not served.
+
+    Returns:
+        BulkLoadStats for the whole portfolio
+    """
+    from bulk_loader import BulkWriter
+    from graph_sync import bump_graph_version
+
+    writer = BulkWriter(client, batch_size=batch_size)
+    for nodes, edges in iter_portfolio(spec):
+        writer.add(nodes, edges)
+    stats = writer.close()
+    bump_graph_version(client)
+    return stats
+
+
+def write_csv(spec: PortfolioSpec, output_dir: str) -> Dict[str, int]:
+    """
+    Write the portfolio as CSV for falkordb-bulk-insert.
+
+    One node file per label (first column is the id) and one relation
+    file per relation type (source id, target id).
+
+    Returns:
+        Rows written per file
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    writers: Dict[str, Tuple[Any, Any, List[str]]] = {}
+    counts: Dict[str, int] = {}
+
+    def writer_for(name: str, header: List[str]):
+        if name not in writers:
+            handle = open(os.path.join(output_dir, f"{name}.csv"), "w", newline="", encoding="utf-8")
+            out = csv.writer(handle)
+            out.writerow(header)
+            writers[name] = (handle, out, header)
+            counts[name] = 0
+        return writers[name]
+
+    try:
+        for nodes, edges in iter_portfolio(spec):
+            for node in nodes:
+                header = CSV_PROPERTIES.get(node["label"], DEFAULT_CSV_PROPERTIES)
+                _, out, header = writer_for(node["label"], header)
+                out.writerow([node["properties"].get(key, "") for key in header])
+                counts[node["label"]] += 1
+            for source_id, relation, target_id in edges:
+                _, out, _ = writer_for(relation, ["src", "dst"])
+                out.writerow([source_id, target_id])
+                counts[relation] += 1
+    finally:
+        for handle, _, _ in writers.values():
+            handle.close()
+
+    return counts
+
+
+def bulk_insert_command(graph_name: str, output_dir: str, counts: Dict[str, int]) -> str:
+    """falkordb-bulk-insert command line for the CSV files in output_dir."""
+    parts = ["falkordb-bulk-insert", graph_name]
+    for name in sorted(counts):
+        path = os.path.join(output_dir, f"{name}.csv")
+        if name in BRICK_RELATIONS.values():
+            parts += ["--relations-with-type", name, path]
+        else:
+            parts += ["--nodes-with-label", f"{name}:{ENTITY_LABEL}", path]
+    return " ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Brick portfolio")
+    parser.add_argument("--buildings", type=int, default=10, help="Number of buildings")
+    parser.add_argument("--floors", type=int, default=5, help="Floors per building")
+    parser.add_argument("--zones", type=int, default=4, help="Zones per floor")
+    parser.add_argument("--ahus", type=int, default=2, help="AHUs per building")
+    parser.add_argument("--sensors", type=int, default=4, help="Sensors per equipment")
+    parser.add_argument("--timeseries-ratio", type=float, default=1.0,
+                        help="Fraction of sensors with a timeseries")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--summary", action="store_true", help="Print expected counts and exit")
+    parser.add_argument("--csv", metavar="DIR", help="Write CSV files for falkordb-bulk-insert")
+    parser.add_argument("--load", action="store_true", help="Load into FalkorDB with UNWIND batches")
+    parser.add_argument("--clear", action="store_true", help="Clear existing graph before --load")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per batch with --load")
+    parser.add_argument("--host", default="localhost", help="FalkorDB host")
+    parser.add_argument("--port", type=int, default=6379, help="FalkorDB port")
+    parser.add_argument("--graph", default="energy_graph", help="Graph name")
+    args = parser.parse_args()
+
+    spec = PortfolioSpec(
+        buildings=args.buildings,
+        floors_per_building=args.floors,
+        zones_per_floor=args.zones,
+        ahus_per_building=args.ahus,
+        sensors_per_equipment=args.sensors,
+        timeseries_ratio=args.timeseries_ratio,
+        seed=args.seed
+    )
+
+    print("SYNTHETIC PORTFOLIO")
+    print("=" * 40)
+    for key, value in spec.expected_counts().items():
+        print(f"{key.title():12s} ~{value:,}")
+
+    if args.summary:
+        return
+
+    if args.csv:
+        start = time.perf_counter()
+        counts = write_csv(spec, args.csv)
+        print(f"\n[OK] Wrote {sum(counts.values()):,} rows to {args.csv} "
+              f"in {time.perf_counter() - start:.1f}s")
+        print("\nLoad with:")
+        print(f"  {bulk_insert_command(args.graph, args.csv, counts)}")
+
+    if args.load:
+        from falkor_client import FalkorDBClient, FalkorConfig
+        from indexes import create_indexes
+
+        client = FalkorDBClient(FalkorConfig(host=args.host, port=args.port, graph_name=args.graph))
+        try:
+            client.connect()
+            if args.clear:
+                client.delete_all()
+            create_indexes(client, report_usage=False).print()
+            stats = load_portfolio(client, spec, batch_size=args.batch_size)
+            print(f"\n[OK] Loaded {stats.summary()}")
+            if stats.errors:
+                print(f"[WARN] {len(stats.errors)} errors, first: {stats.errors[0]}")
+        except Exception as e:
+            print(f"\n[ERROR] {e}")
+            sys.exit(1)
+        finally:
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
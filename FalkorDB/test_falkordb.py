@@ -0,0 +1,415 @@
+"""
+Offline tests for the FalkorDB helpers (no server needed)
+
+Run:
+    python -m pytest -q test_falkordb.py
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from async_client import AsyncFalkorDBClient
+from bulk_loader import BulkWriter, batched, bulk_load, edge_query, group_edges, node_query
+from falkor_client import FalkorConfig, FalkorDBClient, GRAPH_META_LABEL, ResultCache, paginate_query, prepare_query
+from graph_stats import bfs_reachable, csr, dense_index, gather, undirected_csr, verify
+from graph_sync import diff_graph, sync_graph
+from schema import BRICK_CLASSES, ENTITY_LABEL, INDEXED_PROPERTIES, class_label, get_index_definitions
+from synthetic_portfolio import PortfolioSpec, generate_building, iter_portfolio, load_portfolio
+
+
+class FakeGraph:
+    """Answers paginated queries from a list of rows and records every call."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def query(self, text, params=None, timeout=None):
+        self.calls.append((text, params))
+        rows = self.rows
+        if params and "page_skip" in params:
+            rows = rows[params["page_skip"]:params["page_skip"] + params["page_limit"]]
+        return SimpleNamespace(header=[[1, "id"], [1, "value"]], result_set=[list(row) for row in rows])
+
+
+class RecordingClient:
+    """Stands in for FalkorDBClient in bulk_load."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.calls = []
+
+    def execute(self, cypher, params=None):
+        self.calls.append((cypher, params))
+        if self.fail_on and self.fail_on in cypher:
+            raise RuntimeError("boom")
+
+    def query(self, cypher, params=None):
+        self.calls.append((cypher, params))
+        return [{"version": 1}]
+
+
+class InMemoryGraphClient:
+    """
+    Just enough of FalkorDBClient for sync_graph: nodes are (labels, props),
+    edges are (src, rel, dst). MERGE creates a node when no node has both
+    labels and the id, like FalkorDB does.
+    """
+
+    def __init__(self, nodes, edges):
+        self.nodes = [(list(labels), dict(props)) for labels, props in nodes]
+        self.edges = set(edges)
+        self.executed = []
+
+    def iter_query(self, cypher, params=None, page_size=None):
+        entity_only = f"n:{ENTITY_LABEL}" in cypher or f"a:{ENTITY_LABEL}" in cypher
+        if "labels(n)" in cypher:
+            for labels, props in self.nodes:
+                if GRAPH_META_LABEL not in labels and (ENTITY_LABEL in labels or not entity_only):
+                    if class_label("n") in cypher:
+                        label = [l for l in labels if l != ENTITY_LABEL][0]
+                    else:
+                        label = labels[0]
+                    yield {"id": props["id"], "label": label, "props": props}
+        else:
+            for src, rel, dst in sorted(self.edges):
+                yield {"src": src, "rel": rel, "dst": dst}
+
+    def execute(self, cypher, params=None):
+        self.executed.append(cypher)
+        if cypher.endswith(f"SET n:{ENTITY_LABEL}"):
+            for labels, _ in self.nodes:
+                if ENTITY_LABEL not in labels and GRAPH_META_LABEL not in labels:
+                    labels.append(ENTITY_LABEL)
+        elif cypher.startswith("UNWIND $rows AS row MERGE (n:"):
+            label = cypher.split("MERGE (n:")[1].split(":")[0]
+            for row in params["rows"]:
+                match = [p for l, p in self.nodes if {label, ENTITY_LABEL} <= set(l) and p["id"] == row["id"]]
+                if match:
+                    match[0].clear()
+                    match[0].update(row["props"])
+                else:
+                    self.nodes.append(([label, ENTITY_LABEL], dict(row["props"])))
+        elif "MERGE (a)-[:" in cypher:
+            relation = cypher.split("MERGE (a)-[:")[1].split("]")[0]
+            self.edges.update((row["src"], relation, row["dst"]) for row in params["rows"])
+
+    def query(self, cypher, params=None):
+        return [{"version": 1}]
+
+
+def _client(rows):
+    client = FalkorDBClient(FalkorConfig(result_cache_size=0))
+    client._graph = FakeGraph(rows)
+    return client
+
+
+# ---------------------------------------------------------------------------
+# bulk_loader
+# ---------------------------------------------------------------------------
+
+def test_batched():
+    """Batches cover every row once, the last one may be short."""
+    assert [list(b) for b in batched(list(range(7)), 3)] == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(batched([], 3)) == []
+
+
+def test_bulk_load_batches():
+    """Nodes go before edges, one UNWIND query per label/relation batch."""
+    nodes = [{"label": "brick_Building", "properties": {"id": "b1"}}] + [
+        {"label": "brick_Floor", "properties": {"id": f"f{i}"}} for i in range(5)
+    ]
+    edges = [("b1", "brick_hasPart", f"f{i}") for i in range(5)]
+    client = RecordingClient()
+
+    stats = bulk_load(client, nodes, edges, batch_size=2)
+    assert (stats.nodes, stats.edges, stats.errors) == (6, 5, [])
+    assert stats.batches == 1 + 3 + 3
+    assert client.calls[0] == (node_query("brick_Building"), {"rows": [{"id": "b1"}]})
+    assert client.calls[-1] == (
+        edge_query("brick_hasPart", "brick_Building", "brick_Floor"), {"rows": [{"src": "b1", "dst": "f4"}]}
+    )
+    assert f":brick_Floor:{ENTITY_LABEL})" in node_query("brick_Floor")
+
+    stats = bulk_load(RecordingClient(fail_on="brick_Floor:"), nodes, edges, batch_size=2)
+    assert stats.nodes == 1 and len(stats.errors) == 3, "Failed batches are recorded and skipped"
+
+    with pytest.raises(ValueError):
+        bulk_load(client, nodes, edges, batch_size=0)
+
+
+def test_edge_query():
+    """MERGE variant, identifier validation and unknown edge endpoints."""
+    assert "MERGE (a)-[:brick_feeds]->(b)" in edge_query("brick_feeds", "brick_AHU", "brick_HVAC_Zone", merge=True)
+    with pytest.raises(ValueError):
+        edge_query("feeds; DROP", "brick_AHU", "brick_HVAC_Zone")
+    with pytest.raises(ValueError):
+        group_edges([("a", "brick_hasPart", "missing")], {"a": "brick_Building"})
+
+
+# ---------------------------------------------------------------------------
+# falkor_client: iter_query / paginate_query
+# ---------------------------------------------------------------------------
+
+def test_paginate_query():
+    """SKIP/LIMIT parameters are appended; existing SKIP/LIMIT is refused."""
+    assert paginate_query("MATCH (n) RETURN n ORDER BY n.id\n") == (
+        "MATCH (n) RETURN n ORDER BY n.id SKIP $page_skip LIMIT $page_limit"
+    )
+    with pytest.raises(ValueError):
+        paginate_query("MATCH (n) RETURN n LIMIT 5")
+
+
+def test_prepare_query_strips_comments():
+    """Comments are dropped before newlines collapse; quoted text is kept."""
+    template = prepare_query(
+        "MATCH (b:brick_Building) // by id\n"
+        "WHERE b.id = $id /* exact\n match */ AND b.url = 'http://x//y'\n"
+        "RETURN b"
+    )
+    assert template.cypher == "MATCH (b:brick_Building) WHERE b.id = $id AND b.url = 'http://x//y' RETURN b"
+    assert template.parameters == ("id",)
+
+
+def test_iter_query_pages():
+    """Pages are fetched until a short page; rows come back as dicts."""
+    rows = [(f"n{i}", i) for i in range(7)]
+    client = _client(rows)
+
+    records = list(client.iter_query("MATCH (n) RETURN n.id AS id, n.value AS value ORDER BY n.id", page_size=3))
+    assert records == [{"id": f"n{i}", "value": i} for i in range(7)]
+    assert [params["page_skip"] for _, params in client._graph.calls] == [0, 3, 6]
+
+    client = _client(rows[:6])
+    list(client.iter_query("MATCH (n) RETURN n.id AS id, n.value AS value ORDER BY n.id", page_size=3))
+    assert len(client._graph.calls) == 3, "An exact multiple ends with one empty page"
+
+    client = _client(rows)
+    stream = client.iter_query("MATCH (n) RETURN n.id AS id, n.value AS value")
+    assert next(stream) == {"id": "n0", "value": 0}
+    assert len(client._graph.calls) == 1 and client._graph.calls[0][1] is None
+
+    with pytest.raises(ValueError):
+        list(client.iter_query("MATCH (n) RETURN n", page_size=0))
+
+
+def test_result_cache_returns_copies():
+    """Mutating a cached result, or the list that was stored, leaves the cache intact."""
+    cache = ResultCache()
+    records = [{"b": {"name": "Operahuset", "floors": ["f1"]}}]
+    cache.put(("q", "{}"), 1, records)
+    records[0]["b"]["name"] = "changed"
+
+    first = cache.get(("q", "{}"), 1)
+    first[0]["b"]["floors"].append("f2")
+    first.append({"b": None})
+
+    assert cache.get(("q", "{}"), 1) == [{"b": {"name": "Operahuset", "floors": ["f1"]}}]
+
+
+def test_query_columns():
+    """Numeric columns get a numeric dtype, the rest dtype=object."""
+    columns = _client([(f"n{i}", i) for i in range(4)]).query_columns("MATCH (n) RETURN n", page_size=2)
+    assert columns["value"].dtype.kind == "i" and columns["value"].sum() == 6
+    assert columns["id"].dtype == object
+    assert _client([]).query_columns("MATCH (n) RETURN n") == {}
+
+
+def test_async_retries_only_reads():
+    """Reads are retried after a reconnect; a failed write is raised at once."""
+    class FlakyGraph:
+        def __init__(self):
+            self.calls = 0
+
+        async def query(self, text, params=None, timeout=None):
+            self.calls += 1
+            raise OSError("connection reset")
+
+    async def run(cypher):
+        client = AsyncFalkorDBClient(FalkorConfig(retries=2))
+        client._graph = graph = FlakyGraph()
+        client._pool = object()
+
+        async def reconnect(pool):
+            client.reconnects += 1
+        client._reconnect = reconnect
+
+        with pytest.raises(OSError):
+            await client._run(cypher)
+        return graph.calls, client.reconnects
+
+    assert asyncio.run(run("MATCH (n) RETURN n")) == (3, 2)
+    assert asyncio.run(run("MATCH (n {id: 'a'}) SET n.name = 'b'")) == (1, 0)
+
+
+# ---------------------------------------------------------------------------
+# schema / graph_sync
+# ---------------------------------------------------------------------------
+
+def test_index_definitions():
+    """id on every Brick label and brick_Entity, plus the extra properties."""
+    indexes = get_index_definitions()
+    assert indexes[0] == (ENTITY_LABEL, "id")
+    assert len(indexes) == len(set(indexes))
+    assert {(label, "id") for label in BRICK_CLASSES.values()} <= set(indexes)
+    for label, properties in INDEXED_PROPERTIES.items():
+        assert {(label, prop) for prop in properties} <= set(indexes)
+
+
+def test_diff_graph_keeps_graph_meta():
+    """Pruning never deletes the GraphMeta node."""
+    current_nodes = {
+        "graph": (GRAPH_META_LABEL, {"id": "graph", "version": 3}),
+        "old": ("brick_Floor", {"id": "old"}),
+    }
+    plan = diff_graph([], [], current_nodes, set())
+    assert plan.delete_nodes == ["old"]
+
+
+def test_sync_unlabelled_graph():
+    """A graph loaded before brick_Entity existed is updated in place, not duplicated."""
+    building = {"label": "brick_Building", "properties": {"id": "b1", "name": "Operahuset"}}
+    floor = {"label": "brick_Floor", "properties": {"id": "f1", "level": 1}}
+    client = InMemoryGraphClient(
+        [(["brick_Building"], building["properties"]), (["brick_Floor"], {"id": "f1", "level": 0})],
+        [("b1", "brick_hasPart", "f1")]
+    )
+
+    plan = sync_graph(client, [building, floor], [("b1", "brick_hasPart", "f1")], dry_run=True)
+    assert [node["properties"]["id"] for node in plan.upsert_nodes] == ["f1"]
+    assert plan.unchanged_nodes == 1 and plan.unchanged_edges == 1
+    assert client.executed == [], "dry_run must not write"
+
+    plan = sync_graph(client, [building, floor], [("b1", "brick_hasPart", "f1")])
+    assert client.executed[0].endswith(f"SET n:{ENTITY_LABEL}"), "Backfill runs before MERGE"
+    assert sorted(props["id"] for _, props in client.nodes) == ["b1", "f1"]
+    assert all(ENTITY_LABEL in labels for labels, _ in client.nodes)
+    assert client.nodes[1][1]["level"] == 1
+    assert client.edges == {("b1", "brick_hasPart", "f1")}
+
+    assert sync_graph(client, [building, floor], [("b1", "brick_hasPart", "f1")]).is_empty
+
+
+def test_sync_reads_class_label_in_any_order():
+    """The class label is read past brick_Entity, so label order doesn't cause relabels."""
+    floor = {"label": "brick_Floor", "properties": {"id": "f1", "level": 1}}
+    client = InMemoryGraphClient([([ENTITY_LABEL, "brick_Floor"], floor["properties"])], [])
+
+    plan = sync_graph(client, [floor], [], dry_run=True)
+    assert plan.is_empty and plan.unchanged_nodes == 1
+
+
+# ---------------------------------------------------------------------------
+# synthetic_portfolio
+# ---------------------------------------------------------------------------
+
+def test_generator_is_deterministic():
+    """Same seed gives the same graph, independent of chunking and order."""
+    spec = PortfolioSpec(buildings=5, floors_per_building=2, timeseries_ratio=0.5, seed=7)
+
+    assert generate_building(spec, 3) == generate_building(spec, 3)
+    chunked = [chunk for chunk in iter_portfolio(spec, buildings_per_chunk=2)]
+    assert len(chunked) == 3
+    nodes = [node for chunk_nodes, _ in chunked for node in chunk_nodes]
+    assert nodes == [node for i in range(5) for node in generate_building(spec, i)[0]]
+
+    other = PortfolioSpec(buildings=5, floors_per_building=2, timeseries_ratio=0.5, seed=8)
+    assert generate_building(other, 3) != generate_building(spec, 3)
+
+
+def test_generator_counts():
+    """With timeseries_ratio=1 the counts match expected_counts exactly."""
+    spec = PortfolioSpec(buildings=3)
+    nodes, edges = zip(*iter_portfolio(spec, buildings_per_chunk=2))
+    expected = spec.expected_counts()
+    assert sum(map(len, nodes)) == expected["nodes"]
+    assert sum(map(len, edges)) == expected["edges"]
+    ids = [node["properties"]["id"] for chunk in nodes for node in chunk]
+    assert len(ids) == len(set(ids))
+
+
+def test_load_portfolio_streams_full_batches():
+    """Chunks share one writer: batches fill across chunks and the version is bumped."""
+    spec = PortfolioSpec(buildings=25)
+    client = RecordingClient()
+    stats = load_portfolio(client, spec, batch_size=1000)
+
+    expected = spec.expected_counts()
+    assert (stats.nodes, stats.edges, stats.errors) == (expected["nodes"], expected["edges"], [])
+    sizes = [len(params["rows"]) for _, params in client.calls if params and "rows" in params]
+    assert sum(sizes) == expected["nodes"] + expected["edges"]
+    assert len(sizes) == stats.batches
+    per_chunk = sum(bulk_load(RecordingClient(), nodes, edges).batches for nodes, edges in iter_portfolio(spec))
+    assert stats.batches < per_chunk
+
+    # Every node batch precedes the edge batch that needs it
+    first_edge = next(i for i, (query, _) in enumerate(client.calls) if "MATCH" in query)
+    timeseries = [i for i, (query, _) in enumerate(client.calls) if "CREATE (n:brick_Timeseries" in query]
+    assert timeseries and timeseries[0] < first_edge
+    assert "version" in client.calls[-1][0]
+
+
+# ---------------------------------------------------------------------------
+# graph_stats
+# ---------------------------------------------------------------------------
+
+def test_csr_and_gather():
+    """gather returns every neighbour of the requested nodes."""
+    heads = np.array([0, 0, 1, 3])
+    tails = np.array([1, 2, 2, 4])
+    indptr, indices = csr(heads, tails, 5)
+    assert indptr.tolist() == [0, 2, 3, 3, 4, 4]
+
+    positions, neighbours = gather(indptr, indices, np.array([3, 0, 2]))
+    assert positions.tolist() == [0, 1, 1]
+    assert neighbours.tolist() == [4, 1, 2]
+
+
+def test_bfs_reachable():
+    """Directed and undirected reachability from a set of roots."""
+    src = np.array([0, 1, 3])
+    dst = np.array([1, 2, 4])
+    assert bfs_reachable(*csr(src, dst, 6), np.array([0])).tolist() == [True, True, True, False, False, False]
+    assert bfs_reachable(*undirected_csr(src, dst, 6), np.array([4, 4])).tolist() == [
+        False, False, False, True, True, False
+    ]
+
+
+def test_dense_index():
+    """Internal ids are mapped to their positions in node_ids."""
+    node_ids = np.array([40, 10, 30, 20])
+    assert dense_index(node_ids, np.array([10, 40, 20, 20])).tolist() == [1, 0, 3, 3]
+
+
+
+def test_verify_graph_without_entity_label():
+    """Nodes loaded before brick_Entity existed are still exported."""
+    labels = {0: ["brick_Building"], 1: ["brick_Floor"], 2: ["brick_Floor"], 3: [GRAPH_META_LABEL]}
+    edges = [(0, 1)]
+
+    class StatsClient:
+        def query(self, text, params=None, use_cache=True):
+            return [{"id": "b1"}] if "LIMIT 1" in text else []
+
+        def query_columns(self, text, params=None):
+            if "ID(n)" in text:
+                ids = [n for n, node_labels in labels.items()
+                       if f":{ENTITY_LABEL})" not in text or ENTITY_LABEL in node_labels]
+                ids = [n for n in ids if f"NOT n:{GRAPH_META_LABEL}" not in text or n != 3]
+                return {"node": ids, "id": [f"n{n}" for n in ids], "root": [n == 0 for n in ids]}
+            assert ENTITY_LABEL not in text
+            return {"src": [a for a, _ in edges], "dst": [b for _, b in edges]}
+
+    report = verify(StatsClient())
+    assert (report.nodes, report.edges, report.roots, report.reachable) == (3, 1, 1, 2)
+    assert report.orphan_sample == ["n2"] and report.traversal_ok
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+    print("All tests passed")
@@ -10,6 +10,7 @@ Endpoint: http://localhost:4000/graphql
 
 import sys
 import os
+import asyncio
 from typing import List, Optional
 from contextlib import asynccontextmanager
 
@@ -21,27 +22,30 @@ from fastapi.middleware.cors import CORSMiddleware
 # Add FalkorDB path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'FalkorDB'))
 
-from falkor_client import FalkorDBClient, FalkorConfig
+from falkor_client import FalkorConfig, validate_identifier
+from async_client import AsyncFalkorDBClient
 
 
 # =============================================================================
 # FalkorDB Connection
 # =============================================================================
 
-_client: Optional[FalkorDBClient] = None
+_client: Optional[AsyncFalkorDBClient] = None
 
 
-def get_client() -> FalkorDBClient:
-    """Get or create FalkorDB client."""
+async def get_client() -> AsyncFalkorDBClient:
+    """Get or create the pooled async FalkorDB client."""
     global _client
     if _client is None:
         config = FalkorConfig(
             host=os.getenv("FALKORDB_HOST", "localhost"),
             port=int(os.getenv("FALKORDB_PORT", "6379")),
-            graph_name=os.getenv("FALKORDB_GRAPH", "energy_graph")
+            graph_name=os.getenv("FALKORDB_GRAPH", "energy_graph"),
+            max_connections=int(os.getenv("FALKORDB_MAX_CONNECTIONS", "10"))
         )
-        _client = FalkorDBClient(config)
-        _client.connect()
+        _client = AsyncFalkorDBClient(config)
+    if not _client.connected:
+        await _client.connect()
     return _client
 
 
@@ -150,6 +154,11 @@ def safe_get(data: dict, key: str, default=None):
     return data.get(key, default)
 
 
+def brick_label(type_name: str) -> str:
+    """Brick label for a type argument. Labels cannot be query parameters."""
+    return validate_identifier(f"brick_{type_name}")
+
+
 # =============================================================================
 # GraphQL Query Resolvers
 # =============================================================================
@@ -159,29 +168,37 @@ class Query:
     """GraphQL queries for Brick Ontology energy data."""
     
     @strawberry.field(description="Get a building by ID or name")
-    def building(self, id: Optional[str] = None, name: Optional[str] = None) -> Optional[Building]:
-        client = get_client()
+    async def building(self, id: Optional[str] = None, name: Optional[str] = None) -> Optional[Building]:
+        client = await get_client()
         
-        # Build WHERE clause
+        # Filter only on the arguments given, so the id/name indexes can be used
         conditions = []
+        params = {}
         if id:
-            conditions.append(f"b.id = '{id}'")
+            conditions.append("b.id = $id")
+            params["id"] = id
         if name:
-            conditions.append(f"b.name CONTAINS '{name}'")
-        
+            conditions.append("b.name = $name")
+            params["name"] = name
         where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
         
-        results = client.query(f"""
+        results = await client.query(f"""
             MATCH (b:brick_Building)
             {where}
             RETURN b
             LIMIT 1
-        """)
+        """, params)
         
         if not results:
             return None
         
         props = extract_props(results[0].get('b', {}))
+        building_id = props.get('id', '')
+        floors, systems, meters = await asyncio.gather(
+            get_floors_for_building(building_id),
+            get_systems_for_building(building_id),
+            get_meters_for_building(building_id)
+        )
         
         return Building(
             id=props.get('id', ''),
@@ -191,15 +208,15 @@ class Query:
             area_sqm=props.get('area_sqm'),
             year_built=props.get('year_built'),
             energy_class=props.get('energy_class'),
-            floors=get_floors_for_building(props.get('id', '')),
-            systems=get_systems_for_building(props.get('id', '')),
-            meters=get_meters_for_building(props.get('id', ''))
+            floors=floors,
+            systems=systems,
+            meters=meters
         )
     
     @strawberry.field(description="Get all buildings")
-    def buildings(self) -> List[Building]:
-        client = get_client()
-        results = client.query("MATCH (b:brick_Building) RETURN b")
+    async def buildings(self) -> List[Building]:
+        client = await get_client()
+        results = await client.query("MATCH (b:brick_Building) RETURN b")
         
         buildings = []
         for row in results:
@@ -216,17 +233,17 @@ class Query:
         return buildings
     
     @strawberry.field(description="Get floors, optionally filtered by building")
-    def floors(self, building_id: Optional[str] = None) -> List[Floor]:
-        client = get_client()
+    async def floors(self, building_id: Optional[str] = None) -> List[Floor]:
+        client = await get_client()
         
         if building_id:
-            results = client.query(f"""
-                MATCH (b:brick_Building {{id: '{building_id}'}})-[:brick_hasPart]->(f:brick_Floor)
+            results = await client.query("""
+                MATCH (b:brick_Building {id: $building_id})-[:brick_hasPart]->(f:brick_Floor)
                 RETURN f
                 ORDER BY f.level
-            """)
+            """, {"building_id": building_id})
         else:
-            results = client.query("MATCH (f:brick_Floor) RETURN f ORDER BY f.level")
+            results = await client.query("MATCH (f:brick_Floor) RETURN f ORDER BY f.level")
         
         floors = []
         for row in results:
@@ -239,172 +256,189 @@ class Query:
         return floors
     
     @strawberry.field(description="Get HVAC zones")
-    def zones(self, floor_id: Optional[str] = None, building_id: Optional[str] = None) -> List[HVACZone]:
-        client = get_client()
+    async def zones(self, floor_id: Optional[str] = None, building_id: Optional[str] = None) -> List[HVACZone]:
+        client = await get_client()
         
         if floor_id:
-            results = client.query(f"""
-                MATCH (f:brick_Floor {{id: '{floor_id}'}})-[:brick_hasPart]->(z:brick_HVAC_Zone)
+            results = await client.query("""
+                MATCH (f:brick_Floor {id: $floor_id})-[:brick_hasPart]->(z:brick_HVAC_Zone)
                 RETURN z
-            """)
+            """, {"floor_id": floor_id})
         elif building_id:
-            results = client.query(f"""
-                MATCH (b:brick_Building {{id: '{building_id}'}})-[:brick_hasPart]->(:brick_Floor)
+            results = await client.query("""
+                MATCH (b:brick_Building {id: $building_id})-[:brick_hasPart]->(:brick_Floor)
                       -[:brick_hasPart]->(z:brick_HVAC_Zone)
                 RETURN z
-            """)
+            """, {"building_id": building_id})
         else:
-            results = client.query("MATCH (z:brick_HVAC_Zone) RETURN z")
+            results = await client.query("MATCH (z:brick_HVAC_Zone) RETURN z")
+        
+        props_list = [extract_props(row.get('z', {})) for row in results]
+        zone_ids = [props.get('id', '') for props in props_list]
+        sensors, fed_by = await asyncio.gather(
+            asyncio.gather(*(get_sensors_for_parent(zone_id) for zone_id in zone_ids)),
+            asyncio.gather(*(get_equipment_feeding_zone(zone_id) for zone_id in zone_ids))
+        )
         
         zones = []
-        for row in results:
-            props = extract_props(row.get('z', {}))
-            zone_id = props.get('id', '')
+        for i, props in enumerate(props_list):
             zones.append(HVACZone(
-                id=zone_id,
+                id=zone_ids[i],
                 name=props.get('name', ''),
-                sensors=get_sensors_for_parent(zone_id),
-                fed_by=get_equipment_feeding_zone(zone_id)
+                sensors=sensors[i],
+                fed_by=fed_by[i]
             ))
         return zones
     
     @strawberry.field(description="Get systems (HVAC, Electrical, Lighting)")
-    def systems(self, building_id: Optional[str] = None, system_type: Optional[str] = None) -> List[System]:
-        client = get_client()
+    async def systems(self, building_id: Optional[str] = None, system_type: Optional[str] = None) -> List[System]:
+        client = await get_client()
         
         where_parts = []
         if system_type:
-            where_parts.append(f"sys:brick_{system_type}_System")
+            where_parts.append(f"sys:{brick_label(system_type + '_System')}")
         
         if building_id:
-            match = f"MATCH (b:brick_Building {{id: '{building_id}'}})-[:brick_hasPart]->(sys)"
+            match = "MATCH (b:brick_Building {id: $building_id})-[:brick_hasPart]->(sys)"
             where_parts.append("NOT sys:brick_Floor")
         else:
             match = "MATCH (sys) WHERE sys:brick_HVAC_System OR sys:brick_Electrical_System OR sys:brick_Lighting_System"
         
         where = f"WHERE {' AND '.join(where_parts)}" if where_parts and building_id else ""
         
-        results = client.query(f"{match} {where} RETURN sys, labels(sys)[0] as type")
+        results = await client.query(
+            f"{match} {where} RETURN sys, [l IN labels(sys) WHERE l <> 'brick_Entity'][0] as type",
+            {"building_id": building_id} if building_id else None
+        )
+        
+        props_list = [extract_props(row.get('sys', {})) for row in results]
+        equipment = await asyncio.gather(
+            *(get_equipment_for_system(props.get('id', '')) for props in props_list)
+        )
         
         systems = []
-        for row in results:
-            props = extract_props(row.get('sys', {}))
-            sys_id = props.get('id', '')
+        for row, props, sys_equipment in zip(results, props_list, equipment):
             systems.append(System(
-                id=sys_id,
+                id=props.get('id', ''),
                 name=props.get('name', ''),
                 system_type=row.get('type', '').replace('brick_', ''),
-                equipment=get_equipment_for_system(sys_id)
+                equipment=sys_equipment
             ))
         return systems
     
     @strawberry.field(description="Get equipment (AHU, Chiller, Pump, etc.)")
-    def equipment(self, system_id: Optional[str] = None, equipment_type: Optional[str] = None) -> List[Equipment]:
-        client = get_client()
+    async def equipment(self, system_id: Optional[str] = None, equipment_type: Optional[str] = None) -> List[Equipment]:
+        client = await get_client()
         
         if system_id:
-            results = client.query(f"""
-                MATCH (sys {{id: '{system_id}'}})-[:brick_hasMember]->(eq)
-                RETURN eq, labels(eq)[0] as type
-            """)
+            results = await client.query("""
+                MATCH (sys:brick_Entity {id: $system_id})-[:brick_hasMember]->(eq)
+                RETURN eq, [l IN labels(eq) WHERE l <> 'brick_Entity'][0] as type
+            """, {"system_id": system_id})
         else:
-            type_filter = f":brick_{equipment_type}" if equipment_type else ""
-            results = client.query(f"""
+            type_filter = f":{brick_label(equipment_type)}" if equipment_type else ""
+            results = await client.query(f"""
                 MATCH (eq{type_filter})
                 WHERE eq:brick_Air_Handling_Unit OR eq:brick_Chiller OR eq:brick_Pump OR eq:brick_Boiler
-                RETURN eq, labels(eq)[0] as type
+                RETURN eq, [l IN labels(eq) WHERE l <> 'brick_Entity'][0] as type
             """)
         
+        props_list = [extract_props(row.get('eq', {})) for row in results]
+        sensors = await asyncio.gather(
+            *(get_sensors_for_parent(props.get('id', '')) for props in props_list)
+        )
+        
         equipment = []
-        for row in results:
-            props = extract_props(row.get('eq', {}))
-            eq_id = props.get('id', '')
+        for row, props, eq_sensors in zip(results, props_list, sensors):
             equipment.append(Equipment(
-                id=eq_id,
+                id=props.get('id', ''),
                 name=props.get('name', ''),
                 equipment_type=row.get('type', '').replace('brick_', ''),
                 manufacturer=props.get('manufacturer'),
                 model=props.get('model'),
                 capacity=props.get('capacity'),
                 capacity_unit=props.get('capacity_unit'),
-                sensors=get_sensors_for_parent(eq_id)
+                sensors=eq_sensors
             ))
         return equipment
     
     @strawberry.field(description="Get sensors with optional filters")
-    def sensors(
+    async def sensors(
         self,
         zone_id: Optional[str] = None,
         equipment_id: Optional[str] = None,
         sensor_type: Optional[str] = None
     ) -> List[Sensor]:
-        client = get_client()
+        client = await get_client()
         
-        type_filter = f":brick_{sensor_type}" if sensor_type else ""
+        type_filter = f":{brick_label(sensor_type)}" if sensor_type else ""
         
         if zone_id:
-            results = client.query(f"""
-                MATCH (z:brick_HVAC_Zone {{id: '{zone_id}'}})-[:brick_hasPoint]->(s{type_filter})
+            results = await client.query(f"""
+                MATCH (z:brick_HVAC_Zone {{id: $zone_id}})-[:brick_hasPoint]->(s{type_filter})
                 OPTIONAL MATCH (s)-[:brick_hasTimeseries]->(ts)
-                RETURN s, labels(s)[0] as type, ts
-            """)
+                RETURN s, [l IN labels(s) WHERE l <> 'brick_Entity'][0] as type, ts
+            """, {"zone_id": zone_id})
         elif equipment_id:
-            results = client.query(f"""
-                MATCH (eq {{id: '{equipment_id}'}})-[:brick_hasPoint]->(s{type_filter})
+            results = await client.query(f"""
+                MATCH (eq:brick_Entity {{id: $equipment_id}})-[:brick_hasPoint]->(s{type_filter})
                 OPTIONAL MATCH (s)-[:brick_hasTimeseries]->(ts)
-                RETURN s, labels(s)[0] as type, ts
-            """)
+                RETURN s, [l IN labels(s) WHERE l <> 'brick_Entity'][0] as type, ts
+            """, {"equipment_id": equipment_id})
         else:
-            results = client.query(f"""
+            results = await client.query(f"""
                 MATCH (s{type_filter})
                 WHERE s:brick_Temperature_Sensor OR s:brick_Power_Sensor OR s:brick_CO2_Sensor 
                       OR s:brick_Energy_Sensor OR s:brick_Humidity_Sensor
                 OPTIONAL MATCH (s)-[:brick_hasTimeseries]->(ts)
-                RETURN s, labels(s)[0] as type, ts
+                RETURN s, [l IN labels(s) WHERE l <> 'brick_Entity'][0] as type, ts
             """)
         
         return parse_sensors(results)
     
     @strawberry.field(description="Get meters for a building")
-    def meters(self, building_id: Optional[str] = None) -> List[Meter]:
-        client = get_client()
+    async def meters(self, building_id: Optional[str] = None) -> List[Meter]:
+        client = await get_client()
         
         if building_id:
-            results = client.query(f"""
-                MATCH (b:brick_Building {{id: '{building_id}'}})-[:brick_isMeteredBy]->(m)
-                RETURN m, labels(m)[0] as type
-            """)
+            results = await client.query("""
+                MATCH (b:brick_Building {id: $building_id})-[:brick_isMeteredBy]->(m)
+                RETURN m, [l IN labels(m) WHERE l <> 'brick_Entity'][0] as type
+            """, {"building_id": building_id})
         else:
-            results = client.query("""
+            results = await client.query("""
                 MATCH (m)
                 WHERE m:brick_Electrical_Meter OR m:brick_Thermal_Energy_Meter OR m:brick_Water_Meter
-                RETURN m, labels(m)[0] as type
+                RETURN m, [l IN labels(m) WHERE l <> 'brick_Entity'][0] as type
             """)
         
+        props_list = [extract_props(row.get('m', {})) for row in results]
+        sensors = await asyncio.gather(
+            *(get_sensors_for_parent(props.get('id', '')) for props in props_list)
+        )
+        
         meters = []
-        for row in results:
-            props = extract_props(row.get('m', {}))
-            meter_id = props.get('id', '')
+        for row, props, meter_sensors in zip(results, props_list, sensors):
             meters.append(Meter(
-                id=meter_id,
+                id=props.get('id', ''),
                 name=props.get('name', ''),
                 meter_type=row.get('type', '').replace('brick_', ''),
                 unit=props.get('unit'),
-                sensors=get_sensors_for_parent(meter_id)
+                sensors=meter_sensors
             ))
         return meters
     
     @strawberry.field(description="Get timeseries references")
-    def timeseries(self, sensor_id: Optional[str] = None) -> List[Timeseries]:
-        client = get_client()
+    async def timeseries(self, sensor_id: Optional[str] = None) -> List[Timeseries]:
+        client = await get_client()
         
         if sensor_id:
-            results = client.query(f"""
-                MATCH (s {{id: '{sensor_id}'}})-[:brick_hasTimeseries]->(ts:brick_Timeseries)
+            results = await client.query("""
+                MATCH (s:brick_Entity {id: $sensor_id})-[:brick_hasTimeseries]->(ts:brick_Timeseries)
                 RETURN ts
-            """)
+            """, {"sensor_id": sensor_id})
         else:
-            results = client.query("""
+            results = await client.query("""
                 MATCH (ts:brick_Timeseries)
                 RETURN ts
             """)
@@ -420,13 +454,13 @@ class Query:
         return timeseries
     
     @strawberry.field(description="Count sensors by type")
-    def sensor_count(self, sensor_type: Optional[str] = None) -> int:
-        client = get_client()
+    async def sensor_count(self, sensor_type: Optional[str] = None) -> int:
+        client = await get_client()
         
         if sensor_type:
-            results = client.query(f"MATCH (s:brick_{sensor_type}) RETURN count(s) as count")
+            results = await client.query(f"MATCH (s:{brick_label(sensor_type)}) RETURN count(s) as count")
         else:
-            results = client.query("""
+            results = await client.query("""
                 MATCH (s)
                 WHERE s:brick_Temperature_Sensor OR s:brick_Power_Sensor OR s:brick_CO2_Sensor
                 RETURN count(s) as count
@@ -435,13 +469,13 @@ class Query:
         return results[0].get('count', 0) if results else 0
     
     @strawberry.field(description="Count equipment by type")
-    def equipment_count(self, equipment_type: Optional[str] = None) -> int:
-        client = get_client()
+    async def equipment_count(self, equipment_type: Optional[str] = None) -> int:
+        client = await get_client()
         
         if equipment_type:
-            results = client.query(f"MATCH (eq:brick_{equipment_type}) RETURN count(eq) as count")
+            results = await client.query(f"MATCH (eq:{brick_label(equipment_type)}) RETURN count(eq) as count")
         else:
-            results = client.query("""
+            results = await client.query("""
                 MATCH (eq)
                 WHERE eq:brick_Air_Handling_Unit OR eq:brick_Chiller OR eq:brick_Pump
                 RETURN count(eq) as count
@@ -454,16 +488,16 @@ class Query:
 # Helper Query Functions
 # =============================================================================
 
-def get_floors_for_building(building_id: str) -> List[Floor]:
+async def get_floors_for_building(building_id: str) -> List[Floor]:
     """Get floors for a building."""
     if not building_id:
         return []
-    client = get_client()
-    results = client.query(f"""
-        MATCH (b:brick_Building {{id: '{building_id}'}})-[:brick_hasPart]->(f:brick_Floor)
+    client = await get_client()
+    results = await client.query("""
+        MATCH (b:brick_Building {id: $building_id})-[:brick_hasPart]->(f:brick_Floor)
         RETURN f
         ORDER BY f.level
-    """)
+    """, {"building_id": building_id})
     
     floors = []
     for row in results:
@@ -476,16 +510,16 @@ def get_floors_for_building(building_id: str) -> List[Floor]:
     return floors
 
 
-def get_systems_for_building(building_id: str) -> List[System]:
+async def get_systems_for_building(building_id: str) -> List[System]:
     """Get systems for a building."""
     if not building_id:
         return []
-    client = get_client()
-    results = client.query(f"""
-        MATCH (b:brick_Building {{id: '{building_id}'}})-[:brick_hasPart]->(sys)
+    client = await get_client()
+    results = await client.query("""
+        MATCH (b:brick_Building {id: $building_id})-[:brick_hasPart]->(sys)
         WHERE NOT sys:brick_Floor
-        RETURN sys, labels(sys)[0] as type
-    """)
+        RETURN sys, [l IN labels(sys) WHERE l <> 'brick_Entity'][0] as type
+    """, {"building_id": building_id})
     
     systems = []
     for row in results:
@@ -498,15 +532,15 @@ def get_systems_for_building(building_id: str) -> List[System]:
     return systems
 
 
-def get_meters_for_building(building_id: str) -> List[Meter]:
+async def get_meters_for_building(building_id: str) -> List[Meter]:
     """Get meters for a building."""
     if not building_id:
         return []
-    client = get_client()
-    results = client.query(f"""
-        MATCH (b:brick_Building {{id: '{building_id}'}})-[:brick_isMeteredBy]->(m)
-        RETURN m, labels(m)[0] as type
-    """)
+    client = await get_client()
+    results = await client.query("""
+        MATCH (b:brick_Building {id: $building_id})-[:brick_isMeteredBy]->(m)
+        RETURN m, [l IN labels(m) WHERE l <> 'brick_Entity'][0] as type
+    """, {"building_id": building_id})
     
     meters = []
     for row in results:
@@ -520,15 +554,15 @@ def get_meters_for_building(building_id: str) -> List[Meter]:
     return meters
 
 
-def get_equipment_for_system(system_id: str) -> List[Equipment]:
+async def get_equipment_for_system(system_id: str) -> List[Equipment]:
     """Get equipment for a system."""
     if not system_id:
         return []
-    client = get_client()
-    results = client.query(f"""
-        MATCH (sys {{id: '{system_id}'}})-[:brick_hasMember]->(eq)
-        RETURN eq, labels(eq)[0] as type
-    """)
+    client = await get_client()
+    results = await client.query("""
+        MATCH (sys:brick_Entity {id: $system_id})-[:brick_hasMember]->(eq)
+        RETURN eq, [l IN labels(eq) WHERE l <> 'brick_Entity'][0] as type
+    """, {"system_id": system_id})
     
     equipment = []
     for row in results:
@@ -543,29 +577,29 @@ def get_equipment_for_system(system_id: str) -> List[Equipment]:
     return equipment
 
 
-def get_sensors_for_parent(parent_id: str) -> List[Sensor]:
+async def get_sensors_for_parent(parent_id: str) -> List[Sensor]:
     """Get sensors for an equipment or zone."""
     if not parent_id:
         return []
-    client = get_client()
-    results = client.query(f"""
-        MATCH (p {{id: '{parent_id}'}})-[:brick_hasPoint]->(s)
+    client = await get_client()
+    results = await client.query("""
+        MATCH (p:brick_Entity {id: $parent_id})-[:brick_hasPoint]->(s)
         OPTIONAL MATCH (s)-[:brick_hasTimeseries]->(ts)
-        RETURN s, labels(s)[0] as type, ts
-    """)
+        RETURN s, [l IN labels(s) WHERE l <> 'brick_Entity'][0] as type, ts
+    """, {"parent_id": parent_id})
     
     return parse_sensors(results)
 
 
-def get_equipment_feeding_zone(zone_id: str) -> List[Equipment]:
+async def get_equipment_feeding_zone(zone_id: str) -> List[Equipment]:
     """Get equipment that feeds a zone."""
     if not zone_id:
         return []
-    client = get_client()
-    results = client.query(f"""
-        MATCH (eq)-[:brick_feeds]->(z:brick_HVAC_Zone {{id: '{zone_id}'}})
-        RETURN eq, labels(eq)[0] as type
-    """)
+    client = await get_client()
+    results = await client.query("""
+        MATCH (eq)-[:brick_feeds]->(z:brick_HVAC_Zone {id: $zone_id})
+        RETURN eq, [l IN labels(eq) WHERE l <> 'brick_Entity'][0] as type
+    """, {"zone_id": zone_id})
     
     equipment = []
     for row in results:
@@ -617,7 +651,7 @@ async def lifespan(app: FastAPI):
     print("=" * 60)
     
     try:
-        get_client()
+        await get_client()
         print("\n✅ FalkorDB connected")
     except Exception as e:
         print(f"\n⚠️  FalkorDB connection failed: {e}")
@@ -630,7 +664,7 @@ async def lifespan(app: FastAPI):
     
     global _client
     if _client:
-        _client.close()
+        await _client.close()
         _client = None
 
 
@@ -664,12 +698,13 @@ app.include_router(graphql_app, prefix="/graphql")
 async def health():
     """Health check endpoint."""
     try:
-        client = get_client()
-        results = client.query("MATCH (b:brick_Building) RETURN count(b) as count")
+        client = await get_client()
+        results = await client.query("MATCH (b:brick_Building) RETURN count(b) as count")
         return {
             "status": "healthy",
             "database": "connected",
-            "buildings": results[0].get('count', 0) if results else 0
+            "buildings": results[0].get('count', 0) if results else 0,
+            "pool": await client.health()
         }
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
@@ -7,6 +7,7 @@ with natural language.
 Pipeline: NL → Intent → GraphQL → Cypher → FalkorDB → Response
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -16,13 +17,15 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, Response
+from pydantic import BaseModel, Field
 
 # Add parent directory for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from pipeline import KGPipeline
+from pipeline import KGPipeline, PipelineResult
+from query_guard import QueryRejected
+from telemetry import CONTENT_TYPE, PipelineTelemetry, exporters_from_env
 
 
 # ============================================================================
@@ -48,6 +51,27 @@ class QueryResponse(BaseModel):
     results: Optional[List[Dict[str, Any]]] = None
 
 
+class BatchQueryRequest(BaseModel):
+    """Request model for several NL queries."""
+    queries: List[str] = Field(..., min_length=1, max_length=100)
+    language: str = "no"
+
+
+class BatchQueryResponse(BaseModel):
+    """Response model for several NL queries, one result per query."""
+    results: List[QueryResponse]
+    unique_queries: int
+    graph_queries: int
+
+
+class ProfileResponse(QueryResponse):
+    """Response for a profiled NL query."""
+    timings_ms: Dict[str, float]
+    operators: List[Dict[str, Any]] = []
+    slowest_operator: Optional[Dict[str, Any]] = None
+    profile_error: Optional[str] = None
+
+
 class ExplainResponse(BaseModel):
     """Response for pipeline explanation."""
     original_query: str
@@ -67,6 +91,10 @@ class HealthResponse(BaseModel):
     database_connected: bool
     graph_name: str
     pipeline: str
+    database: Optional[Dict[str, Any]] = None
+    snapshot: Optional[Dict[str, Any]] = None
+    plan_cache: Optional[Dict[str, Any]] = None
+    query_guard: Optional[Dict[str, Any]] = None
 
 
 # ============================================================================
@@ -88,9 +116,13 @@ def get_pipeline() -> KGPipeline:
             falkor_host=os.getenv("FALKORDB_HOST", "localhost"),
             falkor_port=int(os.getenv("FALKORDB_PORT", "6379")),
             graph_name=os.getenv("FALKORDB_GRAPH", "energy_graph"),
-            api_key=os.getenv("OPENAI_API_KEY")
+            api_key=os.getenv("OPENAI_API_KEY"),
+            use_snapshot=os.getenv("KG_SNAPSHOT", "0") == "1",
+            plan_cache_path=os.getenv("KG_PLAN_CACHE_FILE"),
+            semantic_cache=os.getenv("KG_SEMANTIC_CACHE", "0") == "1",
+            query_guard=os.getenv("KG_QUERY_GUARD", "1") == "1",
+            telemetry=PipelineTelemetry(exporters_from_env())
         )
-        _pipeline.connect()
     return _pipeline
 
 
@@ -104,9 +136,10 @@ async def lifespan(app: FastAPI):
     print("=" * 60)
     
     try:
-        get_pipeline()
+        pipeline = get_pipeline()
         print("\n✓ Pipeline initialized")
-        print("✓ FalkorDB connected")
+        if await pipeline.aconnect():
+            print("✓ FalkorDB connected (async pool)")
     except Exception as e:
         print(f"\n⚠ Pipeline initialization failed: {e}")
     
@@ -119,6 +152,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     global _pipeline
     if _pipeline:
+        await _pipeline.aclose()
         _pipeline.close()
         _pipeline = None
 
@@ -169,16 +203,27 @@ if STATIC_DIR.exists():
 async def health_check():
     """Check API and database health."""
     pipeline = get_pipeline()
-    connected = pipeline._client is not None
+    database = await pipeline._async_client.health() if pipeline._async_client else None
+    connected = bool(database and database["connected"])
     
     return HealthResponse(
         status="ok" if connected else "degraded",
         database_connected=connected,
         graph_name=pipeline._falkor_config["graph_name"],
-        pipeline="NL → Intent → GraphQL → Cypher → FalkorDB"
+        pipeline="NL → Intent → GraphQL → Cypher → FalkorDB",
+        database=database,
+        snapshot=pipeline.snapshot_info(),
+        plan_cache=pipeline.plan_cache.info() if pipeline.plan_cache else None,
+        query_guard=pipeline.guard_info()
     )
 
 
+@app.get("/metrics")
+async def metrics():
+    """Pipeline metrics in the Prometheus text format."""
+    return Response(get_pipeline().telemetry.render(), media_type=CONTENT_TYPE)
+
+
 @app.post("/query", response_model=QueryResponse)
 async def process_query(request: QueryRequest):
     """
@@ -193,11 +238,12 @@ async def process_query(request: QueryRequest):
     """
     pipeline = get_pipeline()
     
-    # Set language
-    pipeline.language = request.language
-    
-    result = pipeline.process(request.query)
+    result = await pipeline.aprocess(request.query, language=request.language)
     
+    return _query_response(result)
+
+
+def _query_response(result: PipelineResult) -> QueryResponse:
     return QueryResponse(
         success=result.success,
         query=result.original_query,
@@ -210,6 +256,27 @@ async def process_query(request: QueryRequest):
     )
 
 
+@app.post("/query/batch", response_model=BatchQueryResponse)
+async def process_batch(request: BatchQueryRequest):
+    """
+    Process several natural language queries in one request.
+    
+    Identical questions are answered once, intent extraction runs
+    concurrently, and questions that resolve to the same Cypher query
+    share one FalkorDB round-trip.
+    """
+    pipeline = get_pipeline()
+    
+    results = await pipeline.aprocess_batch(request.queries, language=request.language)
+    
+    groups = {r.debug_info["batch_group"] for r in results if "batch_group" in r.debug_info}
+    return BatchQueryResponse(
+        results=[_query_response(result) for result in results],
+        unique_queries=len({q.strip() for q in request.queries}),
+        graph_queries=len(groups)
+    )
+
+
 @app.get("/query")
 async def query_get(
     q: str = Query(..., description="Natural language query"),
@@ -224,6 +291,39 @@ async def query_get(
     return await process_query(request)
 
 
+@app.post("/profile", response_model=ProfileResponse)
+async def profile_query(request: QueryRequest):
+    """
+    Process a natural language query and profile it.
+    
+    Returns wall-clock time per pipeline stage and the FalkorDB
+    GRAPH.PROFILE operator tree (records produced and time per operator).
+    The query is added to the report at /profile/report.
+    """
+    pipeline = get_pipeline()
+    
+    result = await pipeline.aprocess(request.query, profile=True, language=request.language)
+    profile = result.debug_info.get("profile", {})
+    
+    return ProfileResponse(
+        **_query_response(result).model_dump(),
+        timings_ms=result.debug_info.get("timings_ms", {}),
+        operators=profile.get("operators", []),
+        slowest_operator=profile.get("slowest_operator"),
+        profile_error=result.debug_info.get("profile_error")
+    )
+
+
+@app.get("/profile/report")
+async def profile_report(limit: int = Query(10, ge=1, le=100)):
+    """Slowest profiled Cypher templates by db_execution (mean, p95 and max over recent samples)."""
+    pipeline = get_pipeline()
+    return {
+        **pipeline.profile_report.info(),
+        "templates": pipeline.profile_report.slowest(limit)
+    }
+
+
 @app.post("/explain", response_model=ExplainResponse)
 async def explain_query(request: QueryRequest):
     """
@@ -232,7 +332,7 @@ async def explain_query(request: QueryRequest):
     Shows all pipeline stages: Intent → GraphQL → Cypher
     """
     pipeline = get_pipeline()
-    explanation = pipeline.explain(request.query)
+    explanation = await asyncio.to_thread(pipeline.explain, request.query)
     
     return ExplainResponse(
         original_query=explanation["original_query"],
@@ -247,22 +347,35 @@ async def execute_cypher(request: CypherRequest):
     """
     Execute a raw Cypher query directly against FalkorDB.
     
-    Warning: This bypasses the NL→GraphQL pipeline.
-    For debugging/admin use only.
+    Warning: This bypasses the NL→GraphQL pipeline, but not the query
+    guard. For debugging/admin use only.
     """
     pipeline = get_pipeline()
     
-    if pipeline._client is None:
+    if pipeline._async_client is None and not await pipeline.aconnect():
         raise HTTPException(status_code=503, detail="Database not connected")
     
     try:
-        results = pipeline._client.query(request.cypher)
+        if pipeline.query_guard is None:
+            results = await pipeline._async_client.query(request.cypher)
+            return {
+                "success": True,
+                "cypher": request.cypher,
+                "results": results,
+                "count": len(results)
+            }
+        guarded = await pipeline.query_guard.acheck(pipeline._async_client, request.cypher)
+        results = await pipeline._async_client.query(guarded.cypher, timeout_ms=guarded.timeout_ms)
         return {
             "success": True,
-            "cypher": request.cypher,
+            "cypher": guarded.cypher,
             "results": results,
-            "count": len(results)
+            "count": len(results),
+            "truncated": guarded.truncated(len(results)),
+            "guard": guarded.info()
         }
+    except QueryRejected as e:
+        raise HTTPException(status_code=422, detail={"error": str(e), "cost": e.cost.to_dict()})
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -297,7 +410,9 @@ async def get_schema():
         "meters(buildingId) → [Meter]",
         "timeseries(sensorId) → [Timeseries]",
         "sensorCount(sensorType) → Int",
-        "equipmentCount(equipmentType) → Int"
+        "equipmentCount(equipmentType) → Int",
+        "entityCount(entityType, buildingName) → Int",
+        "nodeCounts → [NodeCount]"
     ]
     
     return {
@@ -57,6 +57,16 @@ class GraphQLGenerator:
             BrickClass.TIMESERIES: ("timeseries", "Timeseries"),
         }
         
+        # entityCount(entityType) values for counted entity classes
+        self.count_types = {
+            BrickClass.BUILDING: "Building",
+            BrickClass.FLOOR: "Floor",
+            BrickClass.HVAC_ZONE: "HVAC_Zone",
+            BrickClass.ELECTRICAL_METER: "Electrical_Meter",
+            BrickClass.THERMAL_METER: "Thermal_Energy_Meter",
+            BrickClass.WATER_METER: "Water_Meter",
+        }
+        
         # Fields for each GraphQL type
         self.type_fields = {
             "Building": ["id", "name", "address", "areaSqm", "yearBuilt", "energyClass"],
@@ -68,6 +78,34 @@ class GraphQLGenerator:
             "Meter": ["id", "name", "meterType", "unit"],
             "Timeseries": ["id", "externalId", "resolution"],
         }
+        
+        # Related entities included when a single entity is asked about in general
+        self.nested_fields = {
+            "Building": {
+                "floors": ["id", "name", "level"],
+                "systems": ["id", "name", "systemType"],
+                "meters": ["id", "name", "meterType", "unit"],
+            },
+        }
+    
+    def _select_fields(self, type_name: str, requested_fields: Optional[List[str]], nested: bool = False) -> List[str]:
+        """
+        Selection for type_name.
+        
+        Requested fields the type has are selected with id and name, so a
+        question about the address fetches only that. Otherwise the type's
+        default fields, plus its related entities if nested is set.
+        """
+        default = self.type_fields.get(type_name, ["id", "name"])
+        requested = [f for f in requested_fields or [] if f in default]
+        if requested:
+            return list(dict.fromkeys(["id", "name"] + requested))
+        
+        fields = list(default)
+        if nested:
+            for name, sub_fields in self.nested_fields.get(type_name, {}).items():
+                fields.append(f"{name} {{ {' '.join(sub_fields)} }}")
+        return fields
     
     def generate(
         self,
@@ -111,7 +149,7 @@ class GraphQLGenerator:
         )
         
         # Build fields
-        fields = requested_fields or self.type_fields.get(type_name, ["id", "name"])
+        fields = self._select_fields(type_name, requested_fields, nested=True)
         field_str = "\n      ".join(fields)
         
         # Build arguments
@@ -128,7 +166,7 @@ class GraphQLGenerator:
         args_str = f"({', '.join(args)})" if args else ""
         
         # For single entity, use singular query
-        if query_name.endswith("s"):
+        if query_name.endswith("s") and query_name != "timeseries":
             singular_query = query_name[:-1]  # buildings -> building
         else:
             singular_query = query_name
@@ -156,20 +194,7 @@ class GraphQLGenerator:
         """Generate query for listing entities."""
         
         if entity_class is None:
-            # Default to buildings
-            return GeneratedGraphQL(
-                query="""query ListBuildings {
-  buildings {
-      id
-      name
-      address
-  }
-}""",
-                variables={},
-                operation_name="ListBuildings",
-                description="List all buildings",
-                requested_fields=["id", "name", "address"]
-            )
+            return self._generate_overview_query()
         
         query_name, type_name = self.entity_to_query.get(
             entity_class, ("buildings", "Building")
@@ -179,7 +204,7 @@ class GraphQLGenerator:
         if not query_name.endswith("s"):
             query_name = query_name + "s"
         
-        fields = requested_fields or self.type_fields.get(type_name, ["id", "name"])
+        fields = self._select_fields(type_name, requested_fields)
         field_str = "\n      ".join(fields)
         
         # Build filter arguments based on entity type
@@ -401,29 +426,30 @@ class GraphQLGenerator:
                 requested_fields=["count"]
             )
         
-        elif entity_class == BrickClass.FLOOR:
+        elif entity_class in self.count_types:
+            entity_type = self.count_types[entity_class]
+            args = f'entityType: "{entity_type}"'
+            variables = {}
+            building_name = parameters.get("building_name")
+            if building_name and entity_class != BrickClass.BUILDING:
+                args += ", buildingName: $buildingName"
+                variables["buildingName"] = building_name
             return GeneratedGraphQL(
-                query="""query CountFloors {
-  floors {
-      id
-  }
-}""",
-                variables={},
-                operation_name="CountFloors",
-                description="Count floors",
+                query=f"""query CountEntities($buildingName: String) {{
+  entityCount({args})
+}}""",
+                variables=variables,
+                operation_name="CountEntities",
+                description=f"Count {entity_type} nodes" + (f" in {building_name}" if variables else ""),
                 requested_fields=["count"]
             )
         
-        # Default count
-        return GeneratedGraphQL(
-            query="""query CountSensors {
-  sensorCount
-}""",
-            variables={},
-            operation_name="CountSensors",
-            description="Count all sensors",
-            requested_fields=["count"]
-        )
+        elif entity_class is not None:
+            # Counted from the number of rows
+            return self._generate_list_query(entity_class, parameters, ["id"])
+        
+        # No counted entity type ("Hvor mange målere er det?"): counts per node type
+        return self._generate_overview_query()
     
     def _generate_default_query(
         self,
@@ -431,16 +457,22 @@ class GraphQLGenerator:
         parameters: Dict[str, Any]
     ) -> GeneratedGraphQL:
         """Generate default query."""
+        # "Fortell om Operahuset": no intent keyword, but a known entity
+        if entity_class is not None or "building_name" in parameters:
+            return self._generate_single_query(entity_class, parameters)
+        return self._generate_overview_query()
+    
+    def _generate_overview_query(self) -> GeneratedGraphQL:
+        """Node counts per type, for questions that name no entity."""
         return GeneratedGraphQL(
             query="""query Overview {
-  buildings {
-      id
-      name
-      address
+  nodeCounts {
+      type
+      count
   }
 }""",
             variables={},
             operation_name="Overview",
-            description="Get building overview",
-            requested_fields=["id", "name", "address"]
+            description="Count nodes per type",
+            requested_fields=["type", "count"]
         )
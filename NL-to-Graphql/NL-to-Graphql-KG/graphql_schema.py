@@ -189,6 +189,13 @@ type Query {
     timeseries(sensorId: String): [Timeseries!]!
     sensorCount(sensorType: String): Int!
     equipmentCount(equipmentType: String): Int!
+    entityCount(entityType: String!, buildingName: String): Int!
+    nodeCounts: [NodeCount!]!
+}
+
+type NodeCount {
+    type: String!
+    count: Int!
 }
 
 type Building {
@@ -278,6 +285,8 @@ QUERIES:
   timeseries(sensorId)   → Get timeseries references
   sensorCount(sensorType) → Count sensors
   equipmentCount(equipmentType) → Count equipment
+  entityCount(entityType, buildingName) → Count buildings, floors, zones or meters
+  nodeCounts             → Count nodes per type (overview)
 
 TYPES:
   Building: id, name, address, areaSqm, yearBuilt, energyClass, floors, systems, meters
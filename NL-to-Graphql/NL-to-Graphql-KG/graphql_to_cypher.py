@@ -3,10 +3,76 @@ GraphQL to Cypher Resolver
 
 Translates GraphQL queries to Cypher queries for FalkorDB.
 This is the bridge between the GraphQL layer and the graph database.
+
+Documents are parsed with graphql-core. The first root field selects the
+resolver, its arguments (literals or $variables) become the resolver's
+filters, and its selection set becomes the Cypher map projection: only
+selected properties are returned, and a nested collection (floors,
+sensors, ...) is matched only if it is selected, so a query for
+{ building { address } } returns only the address and runs no OPTIONAL
+MATCH. Parsed documents are cached by document text.
 """
 
-from typing import Dict, List, Any, Optional
+import re
 from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
+
+from graphql import GraphQLError, parse
+from graphql.language import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    VariableNode,
+)
+from graphql.utilities import value_from_ast_untyped
+
+
+# Field name → nested selection (None for scalar fields)
+Selection = Dict[str, Optional["Selection"]]
+
+# Fields answered with the node's Brick label rather than a property
+LABEL_FIELDS = {"type", "systemType", "equipmentType", "sensorType", "meterType"}
+
+# Common label on every node (FalkorDB schema.ENTITY_LABEL)
+ENTITY_LABEL = "brick_Entity"
+
+# Projection when a selection set has no scalar fields
+DEFAULT_FIELDS = ["id", "name"]
+
+_CAMEL_BOUNDARY = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+def _class_label(var: str) -> str:
+    """Brick class label of var; label order is not guaranteed, so skip brick_Entity."""
+    return f"[l IN labels({var}) WHERE l <> '{ENTITY_LABEL}'][0]"
+
+
+def _name_variants(name: str) -> List[str]:
+    """Spellings of a building name to look up (operahuset → Operahuset)."""
+    return list(dict.fromkeys([name, name.capitalize(), name.title()]))
+
+
+def _building_filter(building_id: str, building_name: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    WHERE clause on b for the arguments that are present.
+    
+    Only plain comparisons on b.id and b.name, so the planner can use the
+    id and name indexes; optional-argument guards or toLower() on the
+    property force a scan of every building.
+    """
+    conditions = []
+    parameters: Dict[str, Any] = {}
+    if building_id:
+        conditions.append("b.id = $id")
+        parameters["id"] = building_id
+    if building_name:
+        conditions.append("b.name IN $names")
+        parameters["names"] = _name_variants(building_name)
+    where = f"\nWHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, parameters
 
 
 @dataclass
@@ -17,6 +83,81 @@ class CypherQuery:
     description: str
 
 
+@dataclass(frozen=True)
+class Variable:
+    """Reference to a GraphQL $variable in a compiled argument."""
+    name: str
+
+
+@dataclass(frozen=True)
+class CompiledField:
+    """Root field of a parsed GraphQL document."""
+    name: str
+    arguments: Dict[str, Any]
+    selection: Optional[Selection]
+    
+    def bind(self, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Arguments with $variables substituted."""
+        return {
+            key: variables.get(value.name) if isinstance(value, Variable) else value
+            for key, value in self.arguments.items()
+        }
+
+
+def _selection(selection_set, fragments: Dict[str, FragmentDefinitionNode]) -> Optional[Selection]:
+    if selection_set is None:
+        return None
+    selection: Selection = {}
+    for node in selection_set.selections:
+        if isinstance(node, FieldNode):
+            if node.name.value != "__typename":
+                selection[node.name.value] = _selection(node.selection_set, fragments)
+        elif isinstance(node, InlineFragmentNode):
+            selection.update(_selection(node.selection_set, fragments) or {})
+        elif isinstance(node, FragmentSpreadNode) and node.name.value in fragments:
+            selection.update(_selection(fragments[node.name.value].selection_set, fragments) or {})
+    return selection
+
+
+@lru_cache(maxsize=512)
+def compile_document(document: str) -> Optional[CompiledField]:
+    """
+    Parse a GraphQL document into its first root field.
+    
+    Returns:
+        CompiledField, or None if the document can't be parsed or has
+        no operation
+    """
+    try:
+        ast = parse(document, no_location=True)
+    except GraphQLError:
+        return None
+    
+    fragments = {
+        d.name.value: d for d in ast.definitions if isinstance(d, FragmentDefinitionNode)
+    }
+    operation = next((d for d in ast.definitions if isinstance(d, OperationDefinitionNode)), None)
+    if operation is None:
+        return None
+    field = next((n for n in operation.selection_set.selections if isinstance(n, FieldNode)), None)
+    if field is None:
+        return None
+    
+    arguments = {
+        arg.name.value: (
+            Variable(arg.value.name.value) if isinstance(arg.value, VariableNode)
+            else value_from_ast_untyped(arg.value)
+        )
+        for arg in field.arguments or ()
+    }
+    return CompiledField(field.name.value, arguments, _selection(field.selection_set, fragments))
+
+
+def _property(field: str) -> str:
+    """GraphQL field name → node property (areaSqm → area_sqm)."""
+    return _CAMEL_BOUNDARY.sub("_", field).lower()
+
+
 class GraphQLToCypherResolver:
     """
     Resolves GraphQL queries to Cypher for FalkorDB.
@@ -68,319 +209,387 @@ class GraphQLToCypherResolver:
             "Humidity": "brick_Humidity_Sensor",
             "Humidity_Sensor": "brick_Humidity_Sensor",
         }
+        
+        # entityCount type → (MATCH pattern, pattern scoped to building b)
+        self.count_patterns = {
+            "Building": ("(n:brick_Building)", None),
+            "Floor": ("(n:brick_Floor)", "(b:brick_Building)-[:brick_hasPart]->(n:brick_Floor)"),
+            "HVAC_Zone": (
+                "(n:brick_HVAC_Zone)",
+                "(b:brick_Building)-[:brick_hasPart]->(:brick_Floor)-[:brick_hasPart]->(n:brick_HVAC_Zone)",
+            ),
+        }
+        for meter in ("Electrical_Meter", "Thermal_Energy_Meter", "Water_Meter"):
+            self.count_patterns[meter] = (
+                f"(n:brick_{meter})", f"(b:brick_Building)-[:brick_isMeteredBy]->(n:brick_{meter})"
+            )
+        
+        # Root query field → resolver(arguments, selection)
+        self.root_fields = {
+            "building": self._resolve_building,
+            "buildings": self._resolve_buildings,
+            "floors": self._resolve_floors,
+            "floor": self._resolve_floors,
+            "zones": self._resolve_zones,
+            "zone": self._resolve_zones,
+            "systems": self._resolve_systems,
+            "system": self._resolve_systems,
+            "equipment": self._resolve_equipment,
+            "equipments": self._resolve_equipment,
+            "sensors": self._resolve_sensors,
+            "sensor": self._resolve_sensors,
+            "meters": self._resolve_meters,
+            "meter": self._resolve_meters,
+            "timeseries": self._resolve_timeseries,
+            "sensorCount": self._resolve_sensor_count,
+            "equipmentCount": self._resolve_equipment_count,
+            "entityCount": self._resolve_entity_count,
+            "nodeCounts": self._resolve_node_counts,
+        }
     
     def resolve(self, graphql_query: str, variables: Dict[str, Any] = None) -> CypherQuery:
         """
         Resolve a GraphQL query string to Cypher.
         
-        This is a simplified parser - in production you'd use a proper GraphQL parser.
+        Unknown root fields and unparseable documents fall back to node
+        type counts.
         """
-        variables = variables or {}
-        query_lower = graphql_query.lower()
-        
-        # Detect query type and delegate
-        if "building(" in query_lower or "building {" in query_lower:
-            if "buildings" in query_lower:
-                return self._resolve_buildings()
-            return self._resolve_building(variables)
-        
-        elif "floors" in query_lower:
-            return self._resolve_floors(variables)
-        
-        elif "zones" in query_lower:
-            return self._resolve_zones(variables)
+        compiled = compile_document(graphql_query)
+        if compiled is None or compiled.name not in self.root_fields:
+            return self._resolve_default()
         
-        elif "systems" in query_lower:
-            return self._resolve_systems(variables)
-        
-        elif "equipment" in query_lower:
-            return self._resolve_equipment(variables)
-        
-        elif "sensors" in query_lower:
-            return self._resolve_sensors(variables)
-        
-        elif "meters" in query_lower:
-            return self._resolve_meters(variables)
-        
-        elif "timeseries" in query_lower:
-            return self._resolve_timeseries(variables)
-        
-        elif "sensorcount" in query_lower:
-            return self._resolve_sensor_count(variables)
-        
-        elif "equipmentcount" in query_lower:
-            return self._resolve_equipment_count(variables)
-        
-        # Default fallback
+        arguments = compiled.bind(variables or {})
+        return self.root_fields[compiled.name](arguments, compiled.selection)
+    
+    def _fields(
+        self,
+        var: str,
+        selection: Optional[Selection],
+        nested: tuple = ()
+    ) -> str:
+        """Map projection items for the scalar fields selected on var."""
+        names = [
+            name for name, sub in (selection or {}).items()
+            if sub is None and name not in nested
+        ]
+        return ", ".join(
+            f"{name}: {_class_label(var)}" if name in LABEL_FIELDS else f".{_property(name)}"
+            for name in names or DEFAULT_FIELDS
+        )
+    
+    def _project(
+        self,
+        match: str,
+        var: str,
+        selection: Optional[Selection],
+        collections: Optional[Dict[str, tuple]] = None,
+        order_by: str = ""
+    ) -> str:
+        """
+        Cypher returning a map projection of var after match.
+        
+        Args:
+            match: MATCH/WHERE clauses binding var
+            selection: Selection set on var
+            collections: Nested field → (OPTIONAL MATCH clause, item
+                variable, aggregate with {item}); only selected fields are
+                matched, each aggregated in its own WITH so collections
+                don't multiply each other's rows. A nested field selected
+                without a selection set collects item names.
+            order_by: ORDER BY expression
+        """
+        collections = collections or {}
+        lines = [match]
+        carried = [var]
+        entries = [self._fields(var, selection, nested=tuple(collections))]
+        
+        for name, (clause, item, aggregate) in collections.items():
+            if not selection or name not in selection:
+                continue
+            sub = selection[name]
+            projection = f"{item} {{{self._fields(item, sub)}}}" if sub is not None else f"{item}.name"
+            lines.append(clause)
+            lines.append(f"WITH {', '.join(carried)}, {aggregate.format(item=projection)} AS {name}")
+            carried.append(name)
+            entries.append(f"{name}: {name}")
+        
+        lines.append(f"RETURN {var} {{{', '.join(entries)}}}")
+        if order_by:
+            lines.append(f"ORDER BY {order_by}")
+        return "\n".join(lines)
+    
+    def _resolve_node_counts(self, args: Dict[str, Any], selection: Optional[Selection]) -> CypherQuery:
+        return self._resolve_default()
+    
+    def _resolve_default(self) -> CypherQuery:
         return CypherQuery(
-            cypher="MATCH (n) RETURN labels(n)[0] as type, count(*) as count",
+            cypher=f"MATCH (n) RETURN {_class_label('n')} as type, count(*) as count",
             parameters={},
             description="Default query - node type counts"
         )
     
-    def _resolve_building(self, variables: Dict[str, Any]) -> CypherQuery:
+    def _resolve_building(self, args: Dict[str, Any], selection: Optional[Selection]) -> CypherQuery:
         """Resolve building query."""
-        building_id = variables.get("id", "")
-        building_name = variables.get("name", "")
+        where, parameters = _building_filter(args.get("id") or "", args.get("name") or "")
         
         return CypherQuery(
-            cypher="""
-MATCH (b:brick_Building)
-WHERE ($id = '' OR b.id = $id) AND ($name = '' OR b.name CONTAINS $name)
-OPTIONAL MATCH (b)-[:brick_hasPart]->(f:brick_Floor)
-OPTIONAL MATCH (b)-[:brick_hasPart]->(sys)
-WHERE NOT sys:brick_Floor
-OPTIONAL MATCH (b)-[:brick_isMeteredBy]->(m)
-RETURN b {
-    .id, .name, .description, .address, .area_sqm, .year_built, .energy_class,
-    floors: collect(DISTINCT f {.id, .name, .level}),
-    systems: collect(DISTINCT sys {.id, .name, type: labels(sys)[0]}),
-    meters: collect(DISTINCT m {.id, .name, type: labels(m)[0], .unit})
-}
-LIMIT 1""",
-            parameters={"id": building_id, "name": building_name},
+            cypher=self._project(
+                f"""
+MATCH (b:brick_Building){where}
+WITH b LIMIT 1""",
+                "b", selection, {
+                    "floors": ("OPTIONAL MATCH (b)-[:brick_hasPart]->(f:brick_Floor)", "f", "collect(DISTINCT {item})"),
+                    "systems": ("OPTIONAL MATCH (b)-[:brick_hasPart]->(sys) WHERE NOT sys:brick_Floor",
+                                "sys", "collect(DISTINCT {item})"),
+                    "meters": ("OPTIONAL MATCH (b)-[:brick_isMeteredBy]->(m)", "m", "collect(DISTINCT {item})"),
+                }
+            ),
+            parameters=parameters,
             description="Get building with related entities"
         )
     
-    def _resolve_buildings(self) -> CypherQuery:
+    def _resolve_buildings(self, args: Dict[str, Any], selection: Optional[Selection]) -> CypherQuery:
         """Resolve all buildings query."""
         return CypherQuery(
-            cypher="""
-MATCH (b:brick_Building)
-RETURN b {.id, .name, .address, .area_sqm, .energy_class}""",
+            cypher=self._project("\nMATCH (b:brick_Building)", "b", selection),
             parameters={},
             description="Get all buildings"
         )
     
-    def _resolve_floors(self, variables: Dict[str, Any]) -> CypherQuery:
+    def _resolve_floors(self, args: Dict[str, Any], selection: Optional[Selection]) -> CypherQuery:
         """Resolve floors query."""
-        building_id = variables.get("buildingId", variables.get("building_id", ""))
+        building_id = args.get("buildingId", args.get("building_id", ""))
+        zones = {
+            "zones": ("OPTIONAL MATCH (f)-[:brick_hasPart]->(z:brick_HVAC_Zone)", "z", "collect(DISTINCT {item})"),
+        }
         
         if building_id:
             return CypherQuery(
-                cypher="""
-MATCH (b:brick_Building {id: $building_id})-[:brick_hasPart]->(f:brick_Floor)
-OPTIONAL MATCH (f)-[:brick_hasPart]->(z:brick_HVAC_Zone)
-RETURN f {.id, .name, .level, zones: collect(z {.id, .name})}
-ORDER BY f.level""",
+                cypher=self._project(
+                    "\nMATCH (b:brick_Building {id: $building_id})-[:brick_hasPart]->(f:brick_Floor)",
+                    "f", selection, zones, order_by="f.level"
+                ),
                 parameters={"building_id": building_id},
                 description="Get floors for building"
             )
         
         return CypherQuery(
-            cypher="""
-MATCH (f:brick_Floor)
-RETURN f {.id, .name, .level}
-ORDER BY f.level""",
+            cypher=self._project("\nMATCH (f:brick_Floor)", "f", selection, zones, order_by="f.level"),
             parameters={},
             description="Get all floors"
         )
     
-    def _resolve_zones(self, variables: Dict[str, Any]) -> CypherQuery:
+    def _resolve_zones(self, args: Dict[str, Any], selection: Optional[Selection]) -> CypherQuery:
         """Resolve zones query."""
-        floor_id = variables.get("floorId", variables.get("floor_id", ""))
-        building_id = variables.get("buildingId", variables.get("building_id", ""))
+        floor_id = args.get("floorId", args.get("floor_id", ""))
+        building_id = args.get("buildingId", args.get("building_id", ""))
+        collections = {
+            "sensors": ("OPTIONAL MATCH (z)-[:brick_hasPoint]->(s)", "s", "collect(DISTINCT {item})"),
+            "fedBy": ("OPTIONAL MATCH (eq)-[:brick_feeds]->(z)", "eq", "collect(DISTINCT {item})"),
+        }
         
         if floor_id:
             return CypherQuery(
-                cypher="""
-MATCH (f:brick_Floor {id: $floor_id})-[:brick_hasPart]->(z:brick_HVAC_Zone)
-OPTIONAL MATCH (z)-[:brick_hasPoint]->(s)
-OPTIONAL MATCH (eq)-[:brick_feeds]->(z)
-RETURN z {
-    .id, .name,
-    sensors: collect(DISTINCT s {.id, .name, .unit, type: labels(s)[0]}),
-    fedBy: collect(DISTINCT eq {.id, .name, type: labels(eq)[0]})
-}""",
+                cypher=self._project(
+                    "\nMATCH (f:brick_Floor {id: $floor_id})-[:brick_hasPart]->(z:brick_HVAC_Zone)",
+                    "z", selection, collections
+                ),
                 parameters={"floor_id": floor_id},
                 description="Get zones for floor"
             )
         
         if building_id:
             return CypherQuery(
-                cypher="""
+                cypher=self._project(
+                    """
 MATCH (b:brick_Building {id: $building_id})-[:brick_hasPart]->(:brick_Floor)
-      -[:brick_hasPart]->(z:brick_HVAC_Zone)
-RETURN z {.id, .name}""",
+      -[:brick_hasPart]->(z:brick_HVAC_Zone)""",
+                    "z", selection, collections
+                ),
                 parameters={"building_id": building_id},
                 description="Get zones for building"
             )
         
         return CypherQuery(
-            cypher="MATCH (z:brick_HVAC_Zone) RETURN z {.id, .name}",
+            cypher=self._project("MATCH (z:brick_HVAC_Zone)", "z", selection, collections),
             parameters={},
             description="Get all zones"
         )
     
-    def _resolve_systems(self, variables: Dict[str, Any]) -> CypherQuery:
+    def _resolve_systems(self, args: Dict[str, Any], selection: Optional[Selection]) -> CypherQuery:
         """Resolve systems query."""
-        building_id = variables.get("buildingId", variables.get("building_id", ""))
-        system_type = variables.get("systemType", variables.get("system_type", ""))
+        building_id = args.get("buildingId", args.get("building_id", ""))
+        system_type = args.get("systemType", args.get("system_type", ""))
         
         # Map system type to label
         label_filter = ""
         if system_type:
             brick_label = self.system_types.get(system_type, f"brick_{system_type}")
             label_filter = f" AND sys:{brick_label}"
+        equipment = {
+            "equipment": ("OPTIONAL MATCH (sys)-[:brick_hasMember]->(eq)", "eq", "collect(DISTINCT {item})"),
+        }
         
         if building_id:
             return CypherQuery(
-                cypher=f"""
+                cypher=self._project(
+                    f"""
 MATCH (b:brick_Building {{id: $building_id}})-[:brick_hasPart]->(sys)
-WHERE NOT sys:brick_Floor{label_filter}
-OPTIONAL MATCH (sys)-[:brick_hasMember]->(eq)
-RETURN sys {{
-    .id, .name, systemType: labels(sys)[0],
-    equipment: collect(eq {{.id, .name, type: labels(eq)[0]}})
-}}""",
+WHERE NOT sys:brick_Floor{label_filter}""",
+                    "sys", selection, equipment
+                ),
                 parameters={"building_id": building_id},
                 description="Get systems for building"
             )
         
         return CypherQuery(
-            cypher=f"""
+            cypher=self._project(
+                f"""
 MATCH (sys)
-WHERE (sys:brick_HVAC_System OR sys:brick_Electrical_System OR sys:brick_Lighting_System){label_filter}
-RETURN sys {{.id, .name, systemType: labels(sys)[0]}}""",
+WHERE (sys:brick_HVAC_System OR sys:brick_Electrical_System OR sys:brick_Lighting_System){label_filter}""",
+                "sys", selection, equipment
+            ),
             parameters={},
             description="Get all systems"
         )
     
-    def _resolve_equipment(self, variables: Dict[str, Any]) -> CypherQuery:
+    def _resolve_equipment(self, args: Dict[str, Any], selection: Optional[Selection]) -> CypherQuery:
         """Resolve equipment query."""
-        system_id = variables.get("systemId", variables.get("system_id", ""))
-        equipment_type = variables.get("equipmentType", variables.get("equipment_type", ""))
+        system_id = args.get("systemId", args.get("system_id", ""))
+        equipment_type = args.get("equipmentType", args.get("equipment_type", ""))
         
         # Map equipment type
         label_filter = ""
         if equipment_type:
             brick_label = self.equipment_types.get(equipment_type, f"brick_{equipment_type}")
             label_filter = f":{brick_label}"
+        collections = {
+            "sensors": ("OPTIONAL MATCH (eq)-[:brick_hasPoint]->(s)", "s", "collect(DISTINCT {item})"),
+            "zones": ("OPTIONAL MATCH (eq)-[:brick_feeds]->(z:brick_HVAC_Zone)", "z", "collect(DISTINCT {item})"),
+        }
         
         if system_id:
             return CypherQuery(
-                cypher=f"""
-MATCH (sys {{id: $system_id}})-[:brick_hasMember]->(eq{label_filter})
-OPTIONAL MATCH (eq)-[:brick_hasPoint]->(s)
-OPTIONAL MATCH (eq)-[:brick_feeds]->(z:brick_HVAC_Zone)
-RETURN eq {{
-    .id, .name, equipmentType: labels(eq)[0],
-    .manufacturer, .model, .capacity, .capacity_unit,
-    sensors: collect(DISTINCT s {{.id, .name, .unit, type: labels(s)[0]}}),
-    zones: collect(DISTINCT z.name)
-}}""",
+                cypher=self._project(
+                    f"\nMATCH (sys:brick_Entity {{id: $system_id}})-[:brick_hasMember]->(eq{label_filter})",
+                    "eq", selection, collections
+                ),
                 parameters={"system_id": system_id},
                 description="Get equipment for system"
             )
         
         return CypherQuery(
-            cypher=f"""
-MATCH (eq{label_filter if label_filter else ''})
-WHERE eq:brick_Air_Handling_Unit OR eq:brick_Chiller OR eq:brick_Pump OR eq:brick_Boiler
-RETURN eq {{.id, .name, equipmentType: labels(eq)[0], .manufacturer, .model}}""",
+            cypher=self._project(
+                f"""
+MATCH (eq{label_filter})
+WHERE eq:brick_Air_Handling_Unit OR eq:brick_Chiller OR eq:brick_Pump OR eq:brick_Boiler""",
+                "eq", selection, collections
+            ),
             parameters={},
             description="Get all equipment"
         )
     
-    def _resolve_sensors(self, variables: Dict[str, Any]) -> CypherQuery:
+    def _resolve_sensors(self, args: Dict[str, Any], selection: Optional[Selection]) -> CypherQuery:
         """Resolve sensors query."""
-        zone_id = variables.get("zoneId", variables.get("zone_id", ""))
-        equipment_id = variables.get("equipmentId", variables.get("equipment_id", ""))
-        sensor_type = variables.get("sensorType", variables.get("sensor_type", ""))
+        zone_id = args.get("zoneId", args.get("zone_id", ""))
+        equipment_id = args.get("equipmentId", args.get("equipment_id", ""))
+        sensor_type = args.get("sensorType", args.get("sensor_type", ""))
         
         # Map sensor type
         label_filter = ""
         if sensor_type:
             brick_label = self.sensor_types.get(sensor_type, f"brick_{sensor_type}")
             label_filter = f":{brick_label}"
+        timeseries = {
+            "timeseries": ("OPTIONAL MATCH (s)-[:brick_hasTimeseries]->(ts)", "ts", "head(collect({item}))"),
+        }
         
         if zone_id:
             return CypherQuery(
-                cypher=f"""
-MATCH (z:brick_HVAC_Zone {{id: $zone_id}})-[:brick_hasPoint]->(s{label_filter})
-OPTIONAL MATCH (s)-[:brick_hasTimeseries]->(ts)
-RETURN s {{
-    .id, .name, .unit, sensorType: labels(s)[0],
-    timeseries: ts {{.id, .external_id, .resolution}}
-}}""",
+                cypher=self._project(
+                    f"\nMATCH (z:brick_HVAC_Zone {{id: $zone_id}})-[:brick_hasPoint]->(s{label_filter})",
+                    "s", selection, timeseries
+                ),
                 parameters={"zone_id": zone_id},
                 description="Get sensors for zone"
             )
         
         if equipment_id:
             return CypherQuery(
-                cypher=f"""
-MATCH (eq {{id: $equipment_id}})-[:brick_hasPoint]->(s{label_filter})
-OPTIONAL MATCH (s)-[:brick_hasTimeseries]->(ts)
-RETURN s {{
-    .id, .name, .unit, sensorType: labels(s)[0],
-    timeseries: ts {{.id, .external_id, .resolution}}
-}}""",
+                cypher=self._project(
+                    f"\nMATCH (eq:brick_Entity {{id: $equipment_id}})-[:brick_hasPoint]->(s{label_filter})",
+                    "s", selection, timeseries
+                ),
                 parameters={"equipment_id": equipment_id},
                 description="Get sensors for equipment"
             )
         
         # All sensors
         return CypherQuery(
-            cypher=f"""
-MATCH (s{label_filter if label_filter else ''})
+            cypher=self._project(
+                f"""
+MATCH (s{label_filter})
 WHERE s:brick_Temperature_Sensor OR s:brick_Power_Sensor OR s:brick_CO2_Sensor 
-      OR s:brick_Energy_Sensor OR s:brick_Humidity_Sensor
-RETURN s {{.id, .name, .unit, sensorType: labels(s)[0]}}""",
+      OR s:brick_Energy_Sensor OR s:brick_Humidity_Sensor""",
+                "s", selection, timeseries
+            ),
             parameters={},
             description="Get all sensors"
         )
     
-    def _resolve_meters(self, variables: Dict[str, Any]) -> CypherQuery:
+    def _resolve_meters(self, args: Dict[str, Any], selection: Optional[Selection]) -> CypherQuery:
         """Resolve meters query."""
-        building_id = variables.get("buildingId", variables.get("building_id", ""))
+        building_id = args.get("buildingId", args.get("building_id", ""))
+        sensors = {
+            "sensors": ("OPTIONAL MATCH (m)-[:brick_hasPoint]->(s)", "s", "collect(DISTINCT {item})"),
+        }
         
         if building_id:
             return CypherQuery(
-                cypher="""
-MATCH (b:brick_Building {id: $building_id})-[:brick_isMeteredBy]->(m)
-OPTIONAL MATCH (m)-[:brick_hasPoint]->(s)
-RETURN m {
-    .id, .name, .unit, meterType: labels(m)[0],
-    sensors: collect(s {.id, .name, .unit})
-}""",
+                cypher=self._project(
+                    "\nMATCH (b:brick_Building {id: $building_id})-[:brick_isMeteredBy]->(m)",
+                    "m", selection, sensors
+                ),
                 parameters={"building_id": building_id},
                 description="Get meters for building"
             )
         
         return CypherQuery(
-            cypher="""
+            cypher=self._project(
+                """
 MATCH (m)
-WHERE m:brick_Electrical_Meter OR m:brick_Thermal_Energy_Meter OR m:brick_Water_Meter
-RETURN m {.id, .name, .unit, meterType: labels(m)[0]}""",
+WHERE m:brick_Electrical_Meter OR m:brick_Thermal_Energy_Meter OR m:brick_Water_Meter""",
+                "m", selection, sensors
+            ),
             parameters={},
             description="Get all meters"
         )
     
-    def _resolve_timeseries(self, variables: Dict[str, Any]) -> CypherQuery:
+    def _resolve_timeseries(self, args: Dict[str, Any], selection: Optional[Selection]) -> CypherQuery:
         """Resolve timeseries query."""
-        sensor_id = variables.get("sensorId", variables.get("sensor_id", ""))
+        sensor_id = args.get("sensorId", args.get("sensor_id", ""))
+        fields = self._fields("ts", selection)
         
         if sensor_id:
             return CypherQuery(
-                cypher="""
-MATCH (s {id: $sensor_id})-[:brick_hasTimeseries]->(ts:brick_Timeseries)
-RETURN ts {.id, .external_id, .resolution}""",
+                cypher=f"""
+MATCH (s:brick_Entity {{id: $sensor_id}})-[:brick_hasTimeseries]->(ts:brick_Timeseries)
+RETURN ts {{{fields}}}""",
                 parameters={"sensor_id": sensor_id},
                 description="Get timeseries for sensor"
             )
         
         return CypherQuery(
-            cypher="""
+            cypher=f"""
 MATCH (s)-[:brick_hasTimeseries]->(ts:brick_Timeseries)
-RETURN s.name as sensor, ts {.id, .external_id, .resolution}""",
+RETURN s.name as sensor, ts {{{fields}}}""",
             parameters={},
             description="Get all timeseries"
         )
     
-    def _resolve_sensor_count(self, variables: Dict[str, Any]) -> CypherQuery:
+    def _resolve_sensor_count(self, args: Dict[str, Any], selection: Optional[Selection]) -> CypherQuery:
         """Resolve sensor count query."""
-        sensor_type = variables.get("sensorType", variables.get("sensor_type", ""))
+        sensor_type = args.get("sensorType", args.get("sensor_type", ""))
         
         if sensor_type:
             brick_label = self.sensor_types.get(sensor_type, f"brick_{sensor_type}")
@@ -399,9 +608,9 @@ RETURN count(s) as count""",
             description="Count all sensors"
         )
     
-    def _resolve_equipment_count(self, variables: Dict[str, Any]) -> CypherQuery:
+    def _resolve_equipment_count(self, args: Dict[str, Any], selection: Optional[Selection]) -> CypherQuery:
         """Resolve equipment count query."""
-        equipment_type = variables.get("equipmentType", variables.get("equipment_type", ""))
+        equipment_type = args.get("equipmentType", args.get("equipment_type", ""))
         
         if equipment_type:
             brick_label = self.equipment_types.get(equipment_type, f"brick_{equipment_type}")
@@ -419,3 +628,27 @@ RETURN count(eq) as count""",
             parameters={},
             description="Count all equipment"
         )
+    
+    def _resolve_entity_count(self, args: Dict[str, Any], selection: Optional[Selection]) -> CypherQuery:
+        """Resolve entity count query, optionally within one building."""
+        entity_type = args.get("entityType", args.get("entity_type", ""))
+        if entity_type not in self.count_patterns:
+            return self._resolve_default()
+        
+        pattern, scoped = self.count_patterns[entity_type]
+        building_name = args.get("buildingName", args.get("building_name", ""))
+        if building_name and scoped:
+            where, parameters = _building_filter("", building_name)
+            return CypherQuery(
+                cypher=f"""
+MATCH {scoped}{where}
+RETURN count(DISTINCT n) as count""",
+                parameters=parameters,
+                description=f"Count {entity_type} in building"
+            )
+        
+        return CypherQuery(
+            cypher=f"MATCH {pattern} RETURN count(n) as count",
+            parameters={},
+            description=f"Count {entity_type}"
+        )
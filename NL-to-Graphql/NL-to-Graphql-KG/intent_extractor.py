@@ -8,12 +8,25 @@ with domain-specific Brick ontology context.
 import json
 import os
 import re
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from typing import Dict, List, Optional, Any
 
 from ontology import BrickOntology, BrickClass, IntentType
 
 
+_ID_PATTERN = re.compile(r'\b(?:id|nummer|number)\s*[=:]?\s*([\'"]?)(\w+)\1', re.IGNORECASE)
+_QUOTED_NAME_PATTERN = re.compile(r'["\']([^"\']+)["\']')
+_NAME_PARAMETERS = ("building_name", "zone_name", "equipment_name")
+
+# Parallel LLM requests in extract_batch
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# Intents below this confidence are rejected by the pipeline and never cached
+MIN_CONFIDENCE = 0.3
+
+
 @dataclass
 class ExtractedIntent:
     """Structured representation of extracted intent."""
@@ -23,6 +36,8 @@ class ExtractedIntent:
     traversal_hint: Optional[str]  # Hint for which traversal pattern to use
     confidence: float
     original_query: str
+    requested_fields: List[str] = field(default_factory=list)  # GraphQL fields asked for
+    source: Optional[str] = None  # llm, semantic_cache, fallback or rule_based
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -31,7 +46,9 @@ class ExtractedIntent:
             "parameters": self.parameters,
             "traversal_hint": self.traversal_hint,
             "confidence": self.confidence,
-            "query": self.original_query
+            "query": self.original_query,
+            "fields": self.requested_fields,
+            "source": self.source
         }
 
 
@@ -40,11 +57,27 @@ class IntentExtractor:
     Extracts structured semantic intent from natural language queries.
     
     Supports both LLM-based extraction (with OpenAI) and rule-based fallback.
+    With a semantic_cache (semantic_cache.SemanticCache), paraphrases of
+    questions the LLM has already resolved reuse the stored intent.
+    With telemetry (telemetry.PipelineTelemetry), LLM latency and the
+    extraction source (llm, semantic_cache, fallback, rule_based) are recorded.
     """
     
-    def __init__(self, ontology: BrickOntology, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        ontology: BrickOntology,
+        api_key: Optional[str] = None,
+        semantic_cache=None,
+        max_retries: int = 5,
+        telemetry=None
+    ):
         self.ontology = ontology
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.semantic_cache = semantic_cache
+        self.telemetry = telemetry
+        # Rate-limited (429) and transient errors are retried by the OpenAI
+        # client with exponential backoff, honouring Retry-After
+        self.max_retries = max_retries
         self._client = None
         self._system_prompt = self._build_system_prompt()
     
@@ -54,7 +87,7 @@ class IntentExtractor:
         if self._client is None and self.api_key:
             try:
                 from openai import OpenAI
-                self._client = OpenAI(api_key=self.api_key)
+                self._client = OpenAI(api_key=self.api_key, max_retries=self.max_retries)
             except ImportError:
                 pass
         return self._client
@@ -141,17 +174,43 @@ Query: "Hvor mange etasjer har bygningen?"
         Extract structured intent from natural language query.
         
         Uses LLM if available, falls back to rule-based extraction.
+        Requested fields are always taken from this query's wording, also
+        for intents reused from the semantic cache.
         """
+        intent = self._extract(query)
+        return replace(intent, requested_fields=self.ontology.find_fields_by_text(query))
+    
+    def _extract(self, query: str) -> ExtractedIntent:
         # Try LLM extraction first
         if self.client:
+            signature = None
+            if self.semantic_cache is not None:
+                signature = self._cache_signature(query)
+                hit = self.semantic_cache.lookup(query, signature)
+                if hit:
+                    self._observe("semantic_cache")
+                    return replace(hit[0], source="semantic_cache")
+            start = time.perf_counter()
             try:
-                return self._extract_with_llm(query)
+                intent = self._extract_with_llm(query)
+                self._observe("llm", time.perf_counter() - start)
+                if self.semantic_cache is not None:
+                    self.semantic_cache.add(query, signature, intent)
+                return intent
             except Exception as e:
+                self._observe("fallback", time.perf_counter() - start)
                 print(f"[WARN] LLM extraction failed: {e}, using fallback")
+                return replace(self._extract_rule_based(query), source="fallback")
+        else:
+            self._observe("rule_based")
         
         # Fallback to rule-based
         return self._extract_rule_based(query)
     
+    def _observe(self, source: str, llm_seconds: Optional[float] = None) -> None:
+        if self.telemetry is not None:
+            self.telemetry.observe_extraction(source, llm_seconds)
+    
     def _extract_with_llm(self, query: str) -> ExtractedIntent:
         """Extract intent using LLM."""
         response = self.client.chat.completions.create(
@@ -181,25 +240,24 @@ Query: "Hvor mange etasjer har bygningen?"
             parameters=result.get("parameters", {}),
             traversal_hint=result.get("traversal_hint"),
             confidence=result.get("confidence", 0.7),
-            original_query=query
+            original_query=query,
+            source="llm"
         )
     
     def _extract_rule_based(self, query: str) -> ExtractedIntent:
         """Rule-based fallback extraction."""
         query_lower = query.lower()
         
-        # Detect intent type
-        intent_type = self.ontology.detect_intent(query_lower)
-        
-        # Detect entity type
-        entity_class = self.ontology.find_entity_by_text(query_lower)
-        
-        # Detect traversal hint
-        traversal = self.ontology.find_traversal_by_intent(query_lower)
-        traversal_hint = traversal.name if traversal else None
+        # Intent, entity, traversal and known names in one scan
+        hits = self.ontology.match(query_lower)
+        intent_type = hits["intent"].key if "intent" in hits else IntentType.UNKNOWN
+        entity_class = hits["entity"].key if "entity" in hits else None
+        if intent_type == IntentType.QUERY_AGGREGATE:
+            entity_class = self.ontology.find_counted_entity(query_lower)
+        traversal_hint = hits["traversal"].key if "traversal" in hits else None
         
         # Extract parameters
-        parameters = self._extract_parameters(query_lower)
+        parameters = self._extract_parameters(query_lower, hits)
         
         # Determine confidence
         confidence = 0.5
@@ -216,46 +274,75 @@ Query: "Hvor mange etasjer har bygningen?"
             parameters=parameters,
             traversal_hint=traversal_hint,
             confidence=min(confidence, 0.85),
-            original_query=query
+            original_query=query,
+            source="rule_based"
         )
     
-    def _extract_parameters(self, query: str) -> Dict[str, Any]:
-        """Extract parameters from query text."""
+    def _cache_signature(self, query: str) -> Dict[str, Any]:
+        """
+        Rule-based intent types, entity types and parameters of query.
+        
+        A semantic cache hit must match them exactly, so "Hvor mange
+        sensorer ..." never reuses the intent of "Vis alle sensorer ...".
+        """
+        query_lower = query.lower()
+        intents = [intent_type.value for intent_type in self.ontology.find_intents_by_text(query_lower)]
+        entities = sorted(brick_class.value for brick_class in self.ontology.find_entities_by_text(query_lower))
+        return {"intents": intents, "entities": entities, **self._extract_parameters(query_lower)}
+    
+    def _extract_parameters(self, query: str, hits: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Extract parameters from query text.
+        
+        Args:
+            query: Lowercased query
+            hits: Result of ontology.match(query), if already computed
+        """
         params = {}
         
         # Extract IDs
-        id_match = re.search(r'\b(?:id|nummer|number)\s*[=:]?\s*([\'"]?)(\w+)\1', query, re.IGNORECASE)
+        id_match = _ID_PATTERN.search(query)
         if id_match:
             params["id"] = id_match.group(2)
         
         # Extract names in quotes
-        name_match = re.search(r'["\']([^"\']+)["\']', query)
+        name_match = _QUOTED_NAME_PATTERN.search(query)
         if name_match:
             params["name"] = name_match.group(1)
         
-        # Extract specific building names
-        building_names = ["operahuset", "opera", "hovedbygg"]
-        for name in building_names:
-            if name in query:
-                params["building_name"] = name
-                break
-        
-        # Extract zone references
-        zone_patterns = ["foyer", "hovedsal", "backstage", "sone"]
-        for zone in zone_patterns:
-            if zone in query:
-                params["zone_name"] = zone
-                break
-        
-        # Extract equipment references
-        equipment_patterns = ["ahu", "aggregat", "kjølemaskin", "chiller", "pumpe"]
-        for eq in equipment_patterns:
-            if eq in query:
-                params["equipment_name"] = eq
-                break
+        # Building, zone and equipment names (ontology.parameter_values)
+        if hits is None:
+            hits = self.ontology.match(query)
+        for parameter in _NAME_PARAMETERS:
+            if parameter in hits:
+                params[parameter] = hits[parameter].key
         
         return params
     
-    def extract_batch(self, queries: List[str]) -> List[ExtractedIntent]:
-        """Extract intents from multiple queries."""
-        return [self.extract(q) for q in queries]
+    def extract_batch(
+        self,
+        queries: List[str],
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> List[ExtractedIntent]:
+        """
+        Extract intents from multiple queries.
+        
+        Identical questions are extracted once. With an LLM client, up to
+        max_concurrency requests run in parallel; the rule-based path is
+        CPU-bound and runs sequentially.
+        
+        Returns:
+            One intent per query, in input order
+        """
+        unique = list(dict.fromkeys(query.strip() for query in queries))
+        
+        if self.client and max_concurrency > 1 and len(unique) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(unique))) as pool:
+                intents = dict(zip(unique, pool.map(self.extract, unique)))
+        else:
+            intents = {query: self.extract(query) for query in unique}
+        
+        return [
+            replace(intents[query.strip()], parameters=dict(intents[query.strip()].parameters), original_query=query)
+            for query in queries
+        ]
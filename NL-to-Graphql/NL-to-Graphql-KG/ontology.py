@@ -9,6 +9,8 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any
 from enum import Enum
 
+from phrase_matcher import PhraseMatcher, PhraseHit
+
 
 class IntentType(Enum):
     """Types of user intents for KG queries."""
@@ -105,11 +107,19 @@ class BrickOntology:
     def __init__(self):
         self.entities: Dict[BrickClass, EntityDefinition] = {}
         self.traversals: Dict[str, TraversalPattern] = {}
+        self.traversal_keywords: Dict[str, List[str]] = {}
         self.intent_patterns: Dict[IntentType, List[str]] = {}
+        self.parameter_values: Dict[str, List[str]] = {}
+        self.field_keywords: Dict[str, List[str]] = {}
+        # Head nouns that also match at the end of a compound word
+        self.compound_heads: List[str] = ["aggregat", "målere", "pumpe"]
         
         self._init_entities()
         self._init_traversals()
         self._init_intent_patterns()
+        self._init_parameter_values()
+        self._init_field_keywords()
+        self.matcher = self._build_matcher()
     
     def _init_entities(self):
         """Define Brick entities with multilingual synonyms."""
@@ -155,7 +165,7 @@ class BrickOntology:
             name="Air Handling Unit",
             description="Air handling unit for ventilation",
             properties=["id", "name", "manufacturer", "model", "capacity", "capacity_unit"],
-            synonyms_no=["aggregat", "ahu", "luftbehandler", "ventilasjonsenhet"],
+            synonyms_no=["aggregat", "hovedaggregat", "ahu", "luftbehandler", "ventilasjonsenhet"],
             synonyms_en=["ahu", "air handling unit", "air handler"]
         )
         
@@ -242,7 +252,7 @@ RETURN eq.name as equipment, s.name as sensor, s.unit as unit""",
             cypher_pattern="""
 MATCH (z:brick_HVAC_Zone)-[:brick_hasPoint]->(s)
 WHERE z.id = $zone_id OR z.name CONTAINS $zone_name
-RETURN z.name as zone, s.name as sensor, labels(s)[0] as type, s.unit as unit""",
+RETURN z.name as zone, s.name as sensor, [l IN labels(s) WHERE l <> 'brick_Entity'][0] as type, s.unit as unit""",
             return_fields=["zone", "sensor", "type", "unit"]
         )
         
@@ -272,7 +282,7 @@ RETURN ahu.name as ahu, collect(z.name) as zones""",
             cypher_pattern="""
 MATCH (b:brick_Building)-[:brick_isMeteredBy]->(m)
 WHERE b.id = $building_id OR b.name CONTAINS $building_name
-RETURN m.name as meter, labels(m)[0] as type, m.unit as unit""",
+RETURN m.name as meter, [l IN labels(m) WHERE l <> 'brick_Entity'][0] as type, m.unit as unit""",
             return_fields=["meter", "type", "unit"]
         )
         
@@ -282,10 +292,20 @@ RETURN m.name as meter, labels(m)[0] as type, m.unit as unit""",
             cypher_pattern="""
 MATCH path = (b:brick_Building)-[:brick_hasPart|brick_hasMember|brick_hasPoint|brick_hasTimeseries*1..5]->(end)
 WHERE b.id = $building_id OR b.name CONTAINS $building_name
-RETURN [node in nodes(path) | {label: labels(node)[0], name: node.name}] as hierarchy
+RETURN [node in nodes(path) | {label: [l IN labels(node) WHERE l <> 'brick_Entity'][0], name: node.name}] as hierarchy
 LIMIT 20""",
             return_fields=["hierarchy"]
         )
+        
+        # Keywords to traversal mapping
+        self.traversal_keywords = {
+            "building_sensors": ["sensorer i bygg", "sensors in building", "alle sensorer"],
+            "zone_sensors": ["sensorer i sone", "sensors in zone", "sone sensor"],
+            "equipment_timeseries": ["tidsserie", "timeseries", "data for", "målinger"],
+            "ahu_zones": ["soner som", "zones fed", "mater", "feeds"],
+            "building_meters": ["målere", "meters", "strømmåler", "electrical meter"],
+            "full_hierarchy": ["hierarki", "hierarchy", "full oversikt", "alt i"]
+        }
     
     def _init_intent_patterns(self):
         """Define patterns for intent detection."""
@@ -302,16 +322,16 @@ LIMIT 20""",
         self.intent_patterns[IntentType.QUERY_LIST] = [
             # Norwegian
             "vis alle", "list opp", "hvilke", "gi meg alle", "hent alle",
-            "hvor mange", "list alle",
+            "list alle", "list",
             # English
             "show all", "list all", "which", "give me all", "get all",
-            "how many", "what are the"
+            "what are the"
         ]
         
         self.intent_patterns[IntentType.QUERY_TRAVERSE] = [
             # Norwegian  
-            "sensorer i", "utstyr i", "soner som", "som mater", "koblet til",
-            "relatert til", "i bygget", "i sonen", "tilhører",
+            "sensorer i", "sensorene i", "utstyr i", "soner som", "som mater", "koblet til",
+            "relatert til", "i bygget", "i bygningen", "i sonen", "tilhører",
             # English
             "sensors in", "equipment in", "zones that", "feeds", "connected to",
             "related to", "in building", "in zone", "belongs to"
@@ -319,9 +339,9 @@ LIMIT 20""",
         
         self.intent_patterns[IntentType.QUERY_AGGREGATE] = [
             # Norwegian
-            "antall", "totalt", "sum", "gjennomsnitt", "tell",
+            "hvor mange", "antall", "totalt", "sum", "gjennomsnitt", "tell",
             # English
-            "count", "total", "sum", "average", "number of"
+            "how many", "count", "total", "sum", "average", "number of"
         ]
         
         self.intent_patterns[IntentType.QUERY_PATH] = [
@@ -331,48 +351,93 @@ LIMIT 20""",
             "path between", "path from", "connection between", "link"
         ]
     
-    def find_entity_by_text(self, text: str) -> Optional[BrickClass]:
-        """Find entity type from natural language text."""
-        text_lower = text.lower()
+    def _init_parameter_values(self):
+        """Known names extracted as query parameters (first match wins)."""
         
+        self.parameter_values["building_name"] = ["operahuset", "opera", "hovedbygg"]
+        self.parameter_values["zone_name"] = ["foyer", "hovedsal", "backstage", "sone"]
+        self.parameter_values["equipment_name"] = ["ahu", "hovedaggregat", "aggregat", "kjølemaskin", "chiller", "pumpe"]
+    
+    def _init_field_keywords(self):
+        """Words asking for a single property (GraphQL field name → phrases)."""
+        
+        self.field_keywords["energyClass"] = ["energimerke", "energiklasse", "energy class", "energy rating"]
+        self.field_keywords["address"] = ["adresse", "address"]
+        self.field_keywords["areaSqm"] = ["areal", "størrelse", "area", "size"]
+        self.field_keywords["yearBuilt"] = ["byggeår", "når ble", "built", "year"]
+        self.field_keywords["name"] = ["navn", "hva heter"]
+    
+    def _build_matcher(self) -> PhraseMatcher:
+        """Compile all phrases into one matcher (see phrase_matcher.py)."""
+        matcher = PhraseMatcher()
         for brick_class, entity in self.entities.items():
-            # Check synonyms (Norwegian and English)
-            all_synonyms = entity.synonyms_no + entity.synonyms_en + [entity.name.lower()]
-            for synonym in all_synonyms:
-                if synonym in text_lower:
-                    return brick_class
-        
-        return None
+            matcher.add("entity", brick_class,
+                        entity.synonyms_no + entity.synonyms_en + [entity.name.lower()])
+        for intent_type, patterns in self.intent_patterns.items():
+            matcher.add("intent", intent_type, patterns)
+        for traversal_name, keywords in self.traversal_keywords.items():
+            matcher.add("traversal", traversal_name, keywords)
+        for parameter, values in self.parameter_values.items():
+            for value in values:
+                matcher.add(parameter, value, [value])
+        for field_name, keywords in self.field_keywords.items():
+            matcher.add("field", field_name, keywords)
+        matcher.allow_compound(self.compound_heads)
+        matcher.compile()
+        return matcher
+    
+    def match(self, text: str) -> Dict[str, PhraseHit]:
+        """
+        Scan text once for entities, intents, traversals and parameter values.
+        
+        Returns:
+            Category ("entity", "intent", "traversal", or a parameter name)
+            -> highest-priority hit
+        """
+        return self.matcher.best(text)
+    
+    def find_fields_by_text(self, text: str) -> List[str]:
+        """GraphQL fields the text asks for, e.g. ["address"] for "Hva er adressen?"."""
+        return list(dict.fromkeys(hit.key for hit in self.matcher.find_all(text) if hit.category == "field"))
+    
+    def find_intents_by_text(self, text: str) -> List[IntentType]:
+        """All intent types whose patterns occur in text, in ontology order."""
+        found = {hit.key: hit.priority for hit in self.matcher.find_all(text) if hit.category == "intent"}
+        return sorted(found, key=found.get)
+    
+    def find_entities_by_text(self, text: str) -> List[BrickClass]:
+        """All entity types mentioned in text, in ontology order."""
+        found = {hit.key: hit.priority for hit in self.matcher.find_all(text) if hit.category == "entity"}
+        return sorted(found, key=found.get)
+    
+    def find_counted_entity(self, text: str) -> Optional[BrickClass]:
+        """
+        Entity type a count question is about: the first one mentioned.
+        
+        "Hvor mange etasjer har bygningen?" counts floors, although Building
+        has priority. A named building ("Operahuset") is the scope of the
+        count, not what is counted.
+        """
+        hits = self.matcher.find_all(text)
+        named = {hit.start for hit in hits if hit.category == "building_name"}
+        entities = [hit for hit in hits if hit.category == "entity" and hit.start not in named]
+        first = min(entities, key=lambda hit: (hit.start, hit.priority), default=None)
+        return first.key if first else None
+    
+    def find_entity_by_text(self, text: str) -> Optional[BrickClass]:
+        """Find entity type from natural language text."""
+        hit = self.match(text).get("entity")
+        return hit.key if hit else None
     
     def find_traversal_by_intent(self, text: str) -> Optional[TraversalPattern]:
         """Find best matching traversal pattern for query."""
-        text_lower = text.lower()
-        
-        # Keywords to traversal mapping
-        traversal_keywords = {
-            "building_sensors": ["sensorer i bygg", "sensors in building", "alle sensorer"],
-            "zone_sensors": ["sensorer i sone", "sensors in zone", "sone sensor"],
-            "equipment_timeseries": ["tidsserie", "timeseries", "data for", "målinger"],
-            "ahu_zones": ["soner som", "zones fed", "mater", "feeds"],
-            "building_meters": ["målere", "meters", "strømmåler", "electrical meter"],
-            "full_hierarchy": ["hierarki", "hierarchy", "full oversikt", "alt i"]
-        }
-        
-        for traversal_name, keywords in traversal_keywords.items():
-            if any(kw in text_lower for kw in keywords):
-                return self.traversals.get(traversal_name)
-        
-        return None
+        hit = self.match(text).get("traversal")
+        return self.traversals.get(hit.key) if hit else None
     
     def detect_intent(self, text: str) -> IntentType:
         """Detect intent type from text."""
-        text_lower = text.lower()
-        
-        for intent_type, patterns in self.intent_patterns.items():
-            if any(pattern in text_lower for pattern in patterns):
-                return intent_type
-        
-        return IntentType.UNKNOWN
+        hit = self.match(text).get("intent")
+        return hit.key if hit else IntentType.UNKNOWN
     
     def to_llm_context(self) -> str:
         """Export ontology as LLM context string."""
@@ -0,0 +1,97 @@
+"""
+Phrase Matcher for rule-based intent extraction
+
+All ontology phrases (entity synonyms, intent patterns, traversal keywords,
+parameter values) are compiled once into a single regex alternation,
+longest phrase first. One scan over the question returns every hit:
+
+- a phrase must start at a word boundary ("sum" doesn't match "summer"),
+  but may be followed by an inflection ("bygning" matches "bygningen")
+- head nouns registered with allow_compound() also match as the tail of
+  a Norwegian compound ("aggregat" in "luftbehandlingsaggregatene")
+- at each position the longest phrase wins; shorter phrases that are
+  prefixes of it are reported too, so "sensorer i sone" also yields
+  "sensorer i"
+- within a category, the phrase registered first has priority, which
+  keeps the order-based semantics of the ontology dictionaries
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class PhraseHit:
+    """A phrase found in the text."""
+    category: str
+    key: Any
+    phrase: str
+    start: int
+    priority: int
+
+
+class PhraseMatcher:
+    """Single compiled regex over phrases grouped by category."""
+
+    def __init__(self):
+        # phrase -> [(category, key, priority)]
+        self._phrases: Dict[str, List[Tuple[str, Any, int]]] = {}
+        self._priorities: Dict[str, int] = {}
+        self._compound: set = set()
+        self._pattern: Optional[re.Pattern] = None
+        self._prefixes: Dict[str, List[str]] = {}
+
+    def add(self, category: str, key: Any, phrases: Iterable[str]) -> None:
+        """Register phrases for key; keys added earlier in a category have priority."""
+        priority = self._priorities.get(category, 0)
+        self._priorities[category] = priority + 1
+        for phrase in phrases:
+            phrase = phrase.lower()
+            entries = self._phrases.setdefault(phrase, [])
+            if not any(c == category and k == key for c, k, _ in entries):
+                entries.append((category, key, priority))
+        self._pattern = None
+
+    def allow_compound(self, phrases: Iterable[str]) -> None:
+        """Let registered phrases also match inside a word, as a compound tail."""
+        self._compound.update(phrase.lower() for phrase in phrases if phrase.lower() in self._phrases)
+        self._pattern = None
+
+    def compile(self) -> None:
+        phrases = sorted(self._phrases, key=len, reverse=True)
+        alternation = "|".join(re.escape(phrase) for phrase in phrases)
+        # Lookahead so matches at every word start are found, even overlapping ones
+        pattern = rf"(?<!\w)(?=({alternation}))"
+        if self._compound:
+            tails = "|".join(re.escape(phrase) for phrase in phrases if phrase in self._compound)
+            pattern += rf"|(?<=\w)(?=({tails}))"
+        self._pattern = re.compile(pattern)
+        self._prefixes = {
+            phrase: [other for other in phrases if phrase.startswith(other)]
+            for phrase in phrases
+        }
+
+    def find_all(self, text: str) -> List[PhraseHit]:
+        """Every phrase hit in text, in order of position."""
+        if self._pattern is None:
+            self.compile()
+        hits = []
+        for match in self._pattern.finditer(text.lower()):
+            if match.group(1) is not None:
+                prefixes = self._prefixes[match.group(1)]
+            else:
+                prefixes = [phrase for phrase in self._prefixes[match.group(2)] if phrase in self._compound]
+            for phrase in prefixes:
+                for category, key, priority in self._phrases[phrase]:
+                    hits.append(PhraseHit(category, key, phrase, match.start(), priority))
+        return hits
+
+    def best(self, text: str) -> Dict[str, PhraseHit]:
+        """Highest-priority hit per category."""
+        best: Dict[str, PhraseHit] = {}
+        for hit in self.find_all(text):
+            current = best.get(hit.category)
+            if current is None or hit.priority < current.priority:
+                best[hit.category] = hit
+        return best
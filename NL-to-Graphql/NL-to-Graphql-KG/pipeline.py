@@ -19,20 +19,61 @@ Pipeline stages:
 3. GraphQL → Cypher Translation
 4. Cypher → FalkorDB Execution
 5. Results → Natural Language Response
+
+With use_snapshot=True, common traversal intents (building_sensors,
+zone_sensors, ahu_zones, full_hierarchy) are answered in stage 4 from an
+in-memory adjacency snapshot instead of FalkorDB (see snapshot_resolver.py).
+
+Stages 1-3 are cached (plan_cache.py): a repeated question skips intent
+extraction, GraphQL generation and Cypher resolution. With
+semantic_cache=True, paraphrases of earlier questions also skip the LLM
+(semantic_cache.py).
+
+aprocess_batch() answers many questions at once: identical questions are
+planned once, planning runs concurrently on worker threads, and questions
+that resolve to the same Cypher query and parameters share one FalkorDB
+round-trip.
+
+Before stage 4 every Cypher query passes the query guard
+(FalkorDB/query_guard.py): unbounded variable-length patterns get an upper
+bound, reads without LIMIT get one, queries whose estimated cost is too
+high are rejected, and the rest run with a server-side timeout.
+
+debug_info["timings_ms"] holds the wall-clock time of each stage.
+process(query, profile=True) also runs the Cypher query with GRAPH.PROFILE
+and adds it to profile_report, a rolling report of the slowest query
+templates (see profiler.py).
+
+Each question is traced (a kg.process span with one span per stage) and
+counted in Prometheus metrics: outcomes, LLM latency and fallbacks,
+low-confidence rejections, DB latency and result sizes (see telemetry.py).
 """
 
+import asyncio
+import json
 import sys
 import os
-from dataclasses import dataclass
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from typing import Dict, List, Optional, Any
 
 # Add FalkorDB path for importing client
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'FalkorDB'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'FalkorDB'))
 
 from ontology import BrickOntology, IntentType
-from intent_extractor import IntentExtractor, ExtractedIntent
+from intent_extractor import IntentExtractor, ExtractedIntent, MIN_CONFIDENCE
 from graphql_generator import GraphQLGenerator, GeneratedGraphQL
 from graphql_to_cypher import GraphQLToCypherResolver, CypherQuery
+from snapshot_resolver import SnapshotResolver
+from plan_cache import PlanCache
+from query_guard import QueryGuard, QueryRejected
+from profiler import ProfileReport, parse_profile, slowest_operator
+from telemetry import PipelineTelemetry
+
+
+# Questions planned in parallel by aprocess_batch (LLM requests in flight)
+DEFAULT_BATCH_CONCURRENCY = 8
 
 
 @dataclass
@@ -60,6 +101,17 @@ class PipelineResult:
         }
 
 
+@dataclass
+class PlannedQuery:
+    """Stages 1-3 of the pipeline: everything needed before hitting FalkorDB."""
+    original_query: str
+    extracted_intent: ExtractedIntent
+    graphql_query: GeneratedGraphQL
+    cypher_query: CypherQuery
+    debug_info: Dict[str, Any]
+    language: str = "no"
+
+
 class KGPipeline:
     """
     Complete NL-to-KG Pipeline for Brick Ontology queries.
@@ -80,15 +132,32 @@ class KGPipeline:
         falkor_port: int = 6379,
         graph_name: str = "energy_graph",
         api_key: Optional[str] = None,
-        language: str = "no"
+        language: str = "no",
+        use_snapshot: bool = False,
+        plan_cache: bool = True,
+        plan_cache_path: Optional[str] = None,
+        semantic_cache: bool = False,
+        query_guard: bool = True,
+        telemetry: Optional[PipelineTelemetry] = None
     ):
         self.language = language
+        self.telemetry = telemetry or PipelineTelemetry()
         
         # Initialize pipeline components
         self.ontology = BrickOntology()
-        self.intent_extractor = IntentExtractor(self.ontology, api_key)
+        semantic = None
+        if semantic_cache:
+            from semantic_cache import SemanticCache
+            semantic = SemanticCache()
+        self.intent_extractor = IntentExtractor(
+            self.ontology, api_key, semantic_cache=semantic, telemetry=self.telemetry
+        )
         self.graphql_generator = GraphQLGenerator(self.ontology)
         self.cypher_resolver = GraphQLToCypherResolver()
+        self.snapshot_resolver = SnapshotResolver()
+        self.plan_cache = PlanCache(path=plan_cache_path) if plan_cache else None
+        self.query_guard = QueryGuard() if query_guard else None
+        self.profile_report = ProfileReport()
         
         # FalkorDB connection
         self._falkor_config = {
@@ -97,6 +166,11 @@ class KGPipeline:
             "graph_name": graph_name
         }
         self._client = None
+        self._async_client = None
+        self._snapshots = None
+        if use_snapshot:
+            from graph_snapshot import SnapshotCache
+            self._snapshots = SnapshotCache()
     
     def connect(self) -> bool:
         """Connect to FalkorDB."""
@@ -115,7 +189,26 @@ class KGPipeline:
             print(f"[ERROR] Could not connect to FalkorDB: {e}")
             return False
     
-    def process(self, query: str) -> PipelineResult:
+    async def aconnect(self) -> bool:
+        """Connect the async client (connection pool) used by aprocess()."""
+        try:
+            from falkor_client import FalkorConfig
+            from async_client import AsyncFalkorDBClient
+            
+            config = FalkorConfig(
+                host=self._falkor_config["host"],
+                port=self._falkor_config["port"],
+                graph_name=self._falkor_config["graph_name"]
+            )
+            self._async_client = AsyncFalkorDBClient(config)
+            await self._async_client.connect()
+            return True
+        except Exception as e:
+            print(f"[ERROR] Could not connect to FalkorDB: {e}")
+            self._async_client = None
+            return False
+    
+    def process(self, query: str, profile: bool = False, language: Optional[str] = None) -> PipelineResult:
         """
         Process a natural language query through the complete pipeline.
         
@@ -123,22 +216,261 @@ class KGPipeline:
         
         Args:
             query: Natural language query
+            profile: Bypass the result cache and run the Cypher query with
+                GRAPH.PROFILE too (see profiler.py)
+            language: Response language ('no' or 'en'); defaults to the
+                pipeline's language
             
         Returns:
             PipelineResult with all intermediate and final results
         """
-        debug_info = {"stages": [], "pipeline": "NL → Intent → GraphQL → Cypher → FalkorDB"}
+        with self.telemetry.tracer.span("kg.process", query=query, profile=profile) as span:
+            return self._observe_result(self._process(query, profile, language), span)
+    
+    def _process(self, query: str, profile: bool, language: Optional[str]) -> PipelineResult:
+        planned = self.plan(query, language)
+        if isinstance(planned, PipelineResult):
+            return planned
+        
+        if self._client is None:
+            if not self.connect():
+                return self._failed(planned, self._connection_error_response(planned.language))
+        
+        cypher = planned.cypher_query
+        text, options = cypher.cypher, self._query_options(profile)
+        with self._stage(planned.debug_info, "db_execution") as span:
+            results = None
+            if self._uses_snapshot(planned):
+                try:
+                    results = self._from_snapshot(planned, self._snapshots.get(self._client))
+                except Exception as e:
+                    planned.debug_info["snapshot_error"] = str(e)
+            
+            if results is None:
+                try:
+                    if self.query_guard is not None:
+                        guarded = self.query_guard.check(self._client, cypher.cypher, cypher.parameters)
+                        text, options["timeout_ms"] = guarded.cypher, guarded.timeout_ms
+                    start = time.perf_counter()
+                    # Parameters are sent natively so FalkorDB reuses the query plan
+                    results = self._client.query(text, cypher.parameters, **options)
+                    self.telemetry.db_latency.observe(time.perf_counter() - start, source="falkordb")
+                    if self.query_guard is not None:
+                        self._record_guard(planned, guarded, results)
+                except QueryRejected as e:
+                    span.set_status("ERROR", str(e))
+                    return self._rejected(planned, e)
+                except Exception as e:
+                    span.set_status("ERROR", str(e))
+                    planned.debug_info["error"] = str(e)
+                    return self._failed(planned, self._query_error_response(str(e), planned.language))
+        
+        if not self._should_profile(planned, profile):
+            return self._complete(planned, results)
+        try:
+            operators = parse_profile(
+                self._client.profile(text, cypher.parameters, timeout_ms=options.get("timeout_ms"))
+            )
+        except Exception as e:
+            planned.debug_info["profile_error"] = str(e)
+            operators = []
+        return self._profiled(planned, results, text, operators)
+    
+    async def aprocess(
+        self,
+        query: str,
+        profile: bool = False,
+        language: Optional[str] = None
+    ) -> PipelineResult:
+        """
+        Async variant of process() for use from FastAPI handlers.
+        
+        Stages 1-3 run on a worker thread and stage 4 on the pooled async
+        client, so neither the LLM call nor graph round-trips block the
+        event loop. The language is per call, so concurrent requests in
+        different languages share one pipeline.
+        """
+        with self.telemetry.tracer.span("kg.process", query=query, profile=profile) as span:
+            planned = await asyncio.to_thread(self.plan, query, language)
+            if isinstance(planned, PipelineResult):
+                return self._observe_result(planned, span)
+            return self._observe_result(await self._aexecute(planned, profile), span)
+    
+    async def _aexecute(self, planned: PlannedQuery, profile: bool = False) -> PipelineResult:
+        """Stages 4-5 of aprocess() for a planned query."""
+        if self._async_client is None:
+            if not await self.aconnect():
+                return self._failed(planned, self._connection_error_response(planned.language))
+        
+        cypher = planned.cypher_query
+        text, options = cypher.cypher, self._query_options(profile)
+        with self._stage(planned.debug_info, "db_execution") as span:
+            results = None
+            if self._uses_snapshot(planned):
+                try:
+                    results = self._from_snapshot(planned, await self._snapshots.aget(self._async_client))
+                except Exception as e:
+                    planned.debug_info["snapshot_error"] = str(e)
+            
+            if results is None:
+                try:
+                    if self.query_guard is not None:
+                        guarded = await self.query_guard.acheck(self._async_client, cypher.cypher, cypher.parameters)
+                        text, options["timeout_ms"] = guarded.cypher, guarded.timeout_ms
+                    start = time.perf_counter()
+                    results = await self._async_client.query(text, cypher.parameters, **options)
+                    self.telemetry.db_latency.observe(time.perf_counter() - start, source="falkordb")
+                    if self.query_guard is not None:
+                        self._record_guard(planned, guarded, results)
+                except QueryRejected as e:
+                    span.set_status("ERROR", str(e))
+                    return self._rejected(planned, e)
+                except Exception as e:
+                    span.set_status("ERROR", str(e))
+                    planned.debug_info["error"] = str(e)
+                    return self._failed(planned, self._query_error_response(str(e), planned.language))
+        
+        if not self._should_profile(planned, profile):
+            return self._complete(planned, results)
+        try:
+            operators = parse_profile(
+                await self._async_client.profile(text, cypher.parameters, timeout_ms=options.get("timeout_ms"))
+            )
+        except Exception as e:
+            planned.debug_info["profile_error"] = str(e)
+            operators = []
+        return self._profiled(planned, results, text, operators)
+    
+    async def aprocess_batch(
+        self,
+        queries: List[str],
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        language: Optional[str] = None
+    ) -> List[PipelineResult]:
+        """
+        Process many natural language queries.
+        
+        Identical questions are planned once, up to max_concurrency at a
+        time on worker threads. Planned queries with the same Cypher and
+        parameters are executed once and share the results; each result's
+        debug_info["batch_group"] identifies its graph query. A question
+        whose planning raises gets a failed result; the others still run.
+        
+        Returns:
+            One PipelineResult per query, in input order
+        """
+        with self.telemetry.tracer.span("kg.process_batch", queries=len(queries)):
+            results = await self._aprocess_batch(queries, max_concurrency, language)
+        for result in results:
+            self._observe_result(result)
+        return results
+    
+    async def _aprocess_batch(
+        self,
+        queries: List[str],
+        max_concurrency: int,
+        language: Optional[str]
+    ) -> List[PipelineResult]:
+        unique = list(dict.fromkeys(q.strip() for q in queries))
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def plan(query: str):
+            async with semaphore:
+                return await asyncio.to_thread(self.plan, query, language)
+        
+        planned = await asyncio.gather(*(plan(q) for q in unique), return_exceptions=True)
+        planned_by_query = {
+            query: self._planning_failed(query, outcome, language) if isinstance(outcome, Exception) else outcome
+            for query, outcome in zip(unique, planned)
+        }
+        
+        # Group by the graph query each question resolved to
+        groups: Dict[str, List[PlannedQuery]] = {}
+        for planned in planned_by_query.values():
+            if isinstance(planned, PlannedQuery):
+                groups.setdefault(self._group_key(planned), []).append(planned)
+        
+        async def execute(index: int, members: List[PlannedQuery]):
+            first = await self._aexecute(members[0])
+            results = {members[0].original_query: first}
+            for planned in members[1:]:
+                planned.debug_info.update({
+                    key: value for key, value in first.debug_info.items()
+                    if key in ("source", "snapshot_version", "snapshot_error", "error", "guard", "truncated")
+                })
+                if first.success:
+                    results[planned.original_query] = self._complete(planned, first.raw_results)
+                else:
+                    results[planned.original_query] = self._failed(planned, first.natural_response)
+            for result in results.values():
+                result.debug_info["batch_group"] = index
+            return results
+        
+        results: Dict[str, PipelineResult] = {
+            query: planned for query, planned in planned_by_query.items()
+            if isinstance(planned, PipelineResult)
+        }
+        for group in await asyncio.gather(*(execute(i, m) for i, m in enumerate(groups.values()))):
+            results.update(group)
+        
+        return [self._for_query(results[q.strip()], q) for q in queries]
+    
+    def _group_key(self, planned: PlannedQuery) -> str:
+        # Snapshot-resolved traversals depend on the intent, not the Cypher
+        if self._uses_snapshot(planned):
+            intent = planned.extracted_intent
+            return json.dumps(["snapshot", intent.traversal_hint, intent.parameters], sort_keys=True, default=str)
+        return json.dumps(
+            [planned.cypher_query.cypher, planned.cypher_query.parameters],
+            sort_keys=True,
+            default=str
+        )
+    
+    def _for_query(self, result: PipelineResult, query: str) -> PipelineResult:
+        """result as the answer to query (a possibly duplicated batch question)."""
+        if result.original_query == query:
+            return result
+        return replace(result, original_query=query, debug_info=dict(result.debug_info))
+    
+    def plan(self, query: str, language: Optional[str] = None):
+        """
+        Run stages 1-3 (NL → Intent → GraphQL → Cypher).
+        
+        Args:
+            query: Natural language query
+            language: Response language; defaults to the pipeline's language
+        
+        Returns:
+            PlannedQuery, or a failed PipelineResult if the intent
+            confidence is too low
+        """
+        language = language or self.language
+        debug_info = {
+            "stages": [],
+            "pipeline": "NL → Intent → GraphQL → Cypher → FalkorDB",
+            "timings_ms": {}
+        }
         
         # =====================================================================
         # Stage 1: Intent Extraction (NL → Semantic Object)
         # =====================================================================
         debug_info["stages"].append("1_intent_extraction")
-        intent = self.intent_extractor.extract(query)
-        debug_info["intent_confidence"] = intent.confidence
-        debug_info["intent_type"] = intent.intent_type.value
-        debug_info["entity_class"] = intent.entity_class.value if intent.entity_class else None
+        with self._stage(debug_info, "intent_extraction"):
+            cached_intent = self.plan_cache.get_intent(query) if self.plan_cache else None
+            if cached_intent:
+                intent = cached_intent
+            else:
+                intent = self.intent_extractor.extract(query)
+                if self.plan_cache:
+                    self.plan_cache.put_intent(query, intent)
+            if self.plan_cache:
+                debug_info["plan_cache"] = {"intent": "hit" if cached_intent else "miss"}
+            debug_info["intent_confidence"] = intent.confidence
+            debug_info["intent_type"] = intent.intent_type.value
+            debug_info["entity_class"] = intent.entity_class.value if intent.entity_class else None
         
-        if intent.confidence < 0.3:
+        if intent.confidence < MIN_CONFIDENCE:
+            self.telemetry.low_confidence.inc()
             return PipelineResult(
                 success=False,
                 original_query=query,
@@ -146,7 +478,7 @@ class KGPipeline:
                 graphql_query=None,
                 cypher_query=None,
                 raw_results=None,
-                natural_response=self._low_confidence_response(intent),
+                natural_response=self._low_confidence_response(intent, language),
                 debug_info=debug_info
             )
         
@@ -154,89 +486,199 @@ class KGPipeline:
         # Stage 2: GraphQL Generation (Intent → GraphQL)
         # =====================================================================
         debug_info["stages"].append("2_graphql_generation")
-        graphql_query = self.graphql_generator.generate(
-            intent_type=intent.intent_type,
-            entity_class=intent.entity_class,
-            parameters=intent.parameters,
-            requested_fields=None  # Let generator decide
-        )
-        debug_info["graphql_operation"] = graphql_query.operation_name
+        with self._stage(debug_info, "graphql_generation"):
+            cached_plan = self.plan_cache.get_plan(intent) if self.plan_cache else None
+            if cached_plan:
+                graphql_query, cypher_query = cached_plan
+            else:
+                graphql_query = self.graphql_generator.generate(
+                    intent_type=intent.intent_type,
+                    entity_class=intent.entity_class,
+                    parameters=intent.parameters,
+                    requested_fields=intent.requested_fields  # Generator decides if empty
+                )
+            debug_info["graphql_operation"] = graphql_query.operation_name
         
         # =====================================================================
         # Stage 3: Cypher Resolution (GraphQL → Cypher)
         # =====================================================================
         debug_info["stages"].append("3_cypher_resolution")
-        cypher_query = self.cypher_resolver.resolve(
-            graphql_query=graphql_query.query,
-            variables=graphql_query.variables
-        )
-        debug_info["cypher_description"] = cypher_query.description
+        with self._stage(debug_info, "cypher_resolution"):
+            if not cached_plan:
+                cypher_query = self.cypher_resolver.resolve(
+                    graphql_query=graphql_query.query,
+                    variables=graphql_query.variables
+                )
+                if self.plan_cache:
+                    self.plan_cache.put_plan(intent, graphql_query, cypher_query)
+            if self.plan_cache:
+                debug_info["plan_cache"]["plan"] = "hit" if cached_plan else "miss"
+            debug_info["cypher_description"] = cypher_query.description
         
-        # =====================================================================
-        # Stage 4: FalkorDB Execution (Cypher → Results)
-        # =====================================================================
+        # Stage 4 (FalkorDB execution) is done by process()/aprocess()
         debug_info["stages"].append("4_falkordb_execution")
         
-        if self._client is None:
-            if not self.connect():
-                return PipelineResult(
-                    success=False,
-                    original_query=query,
-                    extracted_intent=intent,
-                    graphql_query=graphql_query,
-                    cypher_query=cypher_query,
-                    raw_results=None,
-                    natural_response=self._connection_error_response(),
-                    debug_info=debug_info
-                )
-        
+        return PlannedQuery(
+            original_query=query,
+            extracted_intent=intent,
+            graphql_query=graphql_query,
+            cypher_query=cypher_query,
+            debug_info=debug_info,
+            language=language
+        )
+    
+    def _uses_snapshot(self, planned: PlannedQuery) -> bool:
+        return self._snapshots is not None and self.snapshot_resolver.supports(planned.extracted_intent)
+    
+    def _from_snapshot(self, planned: PlannedQuery, snapshot) -> Optional[List[Dict]]:
+        """Stage 4 from the in-memory snapshot; None falls back to FalkorDB."""
+        start = time.perf_counter()
+        results = self.snapshot_resolver.resolve(snapshot, planned.extracted_intent)
+        if results is not None:
+            self.telemetry.db_latency.observe(time.perf_counter() - start, source="snapshot")
+            planned.debug_info["source"] = "snapshot"
+            planned.debug_info["snapshot_version"] = snapshot.version
+        return results
+    
+    @contextmanager
+    def _stage(self, debug_info: Dict[str, Any], stage: str):
+        """Span, debug_info["timings_ms"] entry and duration metric for a pipeline stage."""
+        start = time.perf_counter()
         try:
-            # Build parameterized query (substitute variables)
-            cypher_with_params = cypher_query.cypher
-            for key, value in cypher_query.parameters.items():
-                if isinstance(value, str):
-                    cypher_with_params = cypher_with_params.replace(f"${key}", f"'{value}'")
-                else:
-                    cypher_with_params = cypher_with_params.replace(f"${key}", str(value))
-            
-            results = self._client.query(cypher_with_params)
-            debug_info["result_count"] = len(results)
-            
-        except Exception as e:
-            debug_info["error"] = str(e)
-            return PipelineResult(
-                success=False,
-                original_query=query,
-                extracted_intent=intent,
-                graphql_query=graphql_query,
-                cypher_query=cypher_query,
-                raw_results=None,
-                natural_response=self._query_error_response(str(e)),
-                debug_info=debug_info
+            with self.telemetry.tracer.span(f"kg.{stage}") as span:
+                yield span
+        finally:
+            elapsed = time.perf_counter() - start
+            debug_info["timings_ms"][stage] = round(elapsed * 1000, 3)
+            self.telemetry.stage_duration.observe(elapsed, stage=stage)
+    
+    def _observe_result(self, result: PipelineResult, span=None) -> PipelineResult:
+        """Count the outcome of a processed question (and add it to its span)."""
+        if result.success:
+            outcome = "success"
+        elif result.extracted_intent is None:
+            outcome = "error"
+        elif result.cypher_query is None:
+            outcome = "low_confidence"
+        elif "rejected" in result.debug_info.get("guard", {}):
+            outcome = "rejected"
+        else:
+            outcome = "error"
+        self.telemetry.queries.inc(outcome=outcome)
+        if span is None:
+            return result
+        span.set_attribute("outcome", outcome)
+        span.set_attribute("result_count", result.debug_info.get("result_count"))
+        if outcome == "error":
+            span.set_status("ERROR", result.debug_info.get("error"))
+        return result
+    
+    @staticmethod
+    def _should_profile(planned: PlannedQuery, profile: bool) -> bool:
+        """GRAPH.PROFILE runs the query again, so skip it for snapshot and truncated results."""
+        if not profile or planned.debug_info.get("source") == "snapshot":
+            return False
+        if planned.debug_info.get("truncated"):
+            planned.debug_info["profile_error"] = "Not profiled: the result was truncated by the query guard"
+            return False
+        return True
+    
+    @staticmethod
+    def _query_options(profile: bool) -> Dict[str, Any]:
+        # A profiled query is a real round-trip, not a cache hit
+        return {"use_cache": False} if profile else {}
+    
+    def _profiled(
+        self,
+        planned: PlannedQuery,
+        results: List[Dict],
+        cypher: str,
+        operators: List[Dict[str, Any]]
+    ) -> PipelineResult:
+        """Complete a profiled query and add it to the profile report."""
+        result = self._complete(planned, results)
+        result.debug_info["profile"] = {
+            "operators": operators,
+            "slowest_operator": slowest_operator(operators),
+        }
+        self.profile_report.add(cypher, result.debug_info["timings_ms"], operators)
+        return result
+    
+    def _record_guard(self, planned: PlannedQuery, guarded, results: List[Dict]) -> None:
+        planned.debug_info["guard"] = guarded.info()
+        if guarded.truncated(len(results)):
+            planned.debug_info["truncated"] = True
+    
+    def _rejected(self, planned: PlannedQuery, error: QueryRejected) -> PipelineResult:
+        """Result for a query the guard refused to run."""
+        planned.debug_info["guard"] = {"rejected": str(error), "cost": error.cost.to_dict()}
+        if planned.language == "no":
+            response = "Spørringen er for kostbar å kjøre. Prøv å avgrense den til en bygning, sone eller et utstyr."
+        else:
+            response = "The query is too expensive to run. Try narrowing it to a building, zone or piece of equipment."
+        return self._failed(planned, response)
+    
+    def guard_info(self) -> Optional[Dict[str, Any]]:
+        """Query guard statistics, or None if query_guard is off."""
+        return self.query_guard.info() if self.query_guard is not None else None
+    
+    def snapshot_info(self) -> Optional[Dict[str, Any]]:
+        """Snapshot size and version, or None if use_snapshot is off."""
+        return self._snapshots.info() if self._snapshots is not None else None
+    
+    def _planning_failed(self, query: str, error: Exception, language: Optional[str]) -> PipelineResult:
+        """Result for a batch question whose stages 1-3 raised."""
+        return PipelineResult(
+            success=False,
+            original_query=query,
+            extracted_intent=None,
+            graphql_query=None,
+            cypher_query=None,
+            raw_results=None,
+            natural_response=self._query_error_response(str(error), language or self.language),
+            debug_info={"error": f"{type(error).__name__}: {error}"}
+        )
+    
+    def _failed(self, planned: PlannedQuery, response: str) -> PipelineResult:
+        """Result for a planned query that could not be executed."""
+        return PipelineResult(
+            success=False,
+            original_query=planned.original_query,
+            extracted_intent=planned.extracted_intent,
+            graphql_query=planned.graphql_query,
+            cypher_query=planned.cypher_query,
+            raw_results=None,
+            natural_response=response,
+            debug_info=planned.debug_info
+        )
+    
+    def _complete(self, planned: PlannedQuery, results: List[Dict]) -> PipelineResult:
+        """Stage 5: Response Formatting (Results → NL)."""
+        planned.debug_info["result_count"] = len(results)
+        self.telemetry.result_rows.observe(len(results), intent=planned.extracted_intent.intent_type.value)
+        with self._stage(planned.debug_info, "response_formatting"):
+            planned.debug_info["stages"].append("5_response_formatting")
+            natural_response = self._format_response(
+                results, planned.extracted_intent, planned.graphql_query, planned.language
             )
         
-        # =====================================================================
-        # Stage 5: Response Formatting (Results → NL)
-        # =====================================================================
-        debug_info["stages"].append("5_response_formatting")
-        natural_response = self._format_response(results, intent, graphql_query)
-        
         return PipelineResult(
             success=True,
-            original_query=query,
-            extracted_intent=intent,
-            graphql_query=graphql_query,
-            cypher_query=cypher_query,
+            original_query=planned.original_query,
+            extracted_intent=planned.extracted_intent,
+            graphql_query=planned.graphql_query,
+            cypher_query=planned.cypher_query,
             raw_results=results,
             natural_response=natural_response,
-            debug_info=debug_info
+            debug_info=planned.debug_info
         )
     
     def _format_response(
         self, 
         results: List[Dict], 
         intent: ExtractedIntent,
-        graphql_query: GeneratedGraphQL
+        graphql_query: GeneratedGraphQL,
+        language: str
     ) -> str:
         """Format query results as natural language."""
         
@@ -244,7 +686,7 @@ class KGPipeline:
         results = self._clean_results(results)
         
         if not results:
-            if self.language == "no":
+            if language == "no":
                 return "Ingen resultater funnet for spørringen din."
             return "No results found for your query."
         
@@ -255,16 +697,16 @@ class KGPipeline:
         
         # Build response based on intent type
         if intent.intent_type == IntentType.QUERY_AGGREGATE:
-            return self._format_aggregate_response(results)
+            return self._format_aggregate_response(results, language)
         
         elif intent.intent_type == IntentType.QUERY_LIST:
-            return self._format_list_response(results, graphql_query)
+            return self._format_list_response(results, graphql_query, language)
         
         elif intent.intent_type == IntentType.QUERY_ENTITY:
-            return self._format_entity_response(results)
+            return self._format_entity_response(results, language)
         
         elif intent.intent_type == IntentType.QUERY_TRAVERSE:
-            return self._format_traversal_response(results, graphql_query)
+            return self._format_traversal_response(results, graphql_query, language)
         
         # Default formatting
         return self._format_default_response(results)
@@ -350,28 +792,32 @@ class KGPipeline:
                     return found
         return None
     
-    def _format_aggregate_response(self, results: List[Dict]) -> str:
+    def _format_aggregate_response(self, results: List[Dict], language: str) -> str:
         """Format aggregation results."""
+        if results and "type" in results[0] and "count" in results[0]:
+            header = "Antall per type:" if language == "no" else "Count per type:"
+            return "\n".join([header] + [f"- {row['type']}: {row['count']}" for row in results])
+        
         if results and "count" in results[0]:
             count = results[0]["count"]
-            if self.language == "no":
+            if language == "no":
                 return f"Antall: {count}"
             return f"Count: {count}"
         
         # Handle count from list length
         if results:
             count = len(results)
-            if self.language == "no":
+            if language == "no":
                 return f"Antall: {count}"
             return f"Count: {count}"
         
         return str(results)
     
-    def _format_list_response(self, results: List[Dict], graphql_query: GeneratedGraphQL) -> str:
+    def _format_list_response(self, results: List[Dict], graphql_query: GeneratedGraphQL, language: str) -> str:
         """Format list results."""
         lines = []
         
-        if self.language == "no":
+        if language == "no":
             lines.append(f"Fant {len(results)} resultater:")
         else:
             lines.append(f"Found {len(results)} results:")
@@ -405,17 +851,17 @@ class KGPipeline:
         
         if len(results) > 15:
             remaining = len(results) - 15
-            if self.language == "no":
+            if language == "no":
                 lines.append(f"\n  ... og {remaining} flere resultater")
             else:
                 lines.append(f"\n  ... and {remaining} more results")
         
         return "\n".join(lines)
     
-    def _format_entity_response(self, results: List[Dict]) -> str:
+    def _format_entity_response(self, results: List[Dict], language: str) -> str:
         """Format single entity response."""
         if not results:
-            return "Entitet ikke funnet." if self.language == "no" else "Entity not found."
+            return "Entitet ikke funnet." if language == "no" else "Entity not found."
         
         entity = results[0]
         
@@ -438,13 +884,13 @@ class KGPipeline:
                 continue
             
             # Make keys readable
-            readable_key = self._format_field_name(key)
+            readable_key = self._format_field_name(key, language)
             
             if isinstance(value, dict):
                 lines.append(f"  {readable_key}:")
                 for k, v in value.items():
                     if v is not None:
-                        nice_k = self._format_field_name(k)
+                        nice_k = self._format_field_name(k, language)
                         lines.append(f"    • {nice_k}: {v}")
             elif isinstance(value, list):
                 if len(value) > 0:
@@ -452,7 +898,9 @@ class KGPipeline:
                     for item in value[:5]:  # Show first 5
                         if isinstance(item, dict):
                             item_name = item.get('name', item.get('id', str(item)))
-                            item_type = item.get('type', item.get('level', ''))
+                            item_type = item.get('type') or next(
+                                (v for k, v in item.items() if k.endswith('Type') and v), item.get('level', '')
+                            )
                             if item_type:
                                 lines.append(f"    • {item_name} ({item_type})")
                             else:
@@ -466,7 +914,12 @@ class KGPipeline:
         
         return "\n".join(lines)
     
-    def _format_traversal_response(self, results: List[Dict], graphql_query: GeneratedGraphQL) -> str:
+    def _format_traversal_response(
+        self,
+        results: List[Dict],
+        graphql_query: GeneratedGraphQL,
+        language: str
+    ) -> str:
         """Format traversal results."""
         lines = []
         
@@ -514,7 +967,7 @@ class KGPipeline:
         
         if len(results) > 20:
             remaining = len(results) - 20
-            if self.language == "no":
+            if language == "no":
                 lines.append(f"... og {remaining} flere resultater")
             else:
                 lines.append(f"... and {remaining} more results")
@@ -546,24 +999,24 @@ class KGPipeline:
                 return data[key]
         return None
     
-    def _format_field_name(self, key: str) -> str:
+    def _format_field_name(self, key: str, language: str) -> str:
         """Format a field name for display."""
         # Field name translations
         translations = {
-            "energy_class": "Energimerke" if self.language == "no" else "Energy Class",
-            "area_sqm": "Areal (m²)" if self.language == "no" else "Area (m²)",
-            "year_built": "Byggeår" if self.language == "no" else "Year Built",
-            "address": "Adresse" if self.language == "no" else "Address",
-            "description": "Beskrivelse" if self.language == "no" else "Description",
-            "floors": "Etasjer" if self.language == "no" else "Floors",
-            "systems": "Systemer" if self.language == "no" else "Systems",
-            "meters": "Målere" if self.language == "no" else "Meters",
-            "sensors": "Sensorer" if self.language == "no" else "Sensors",
-            "equipment": "Utstyr" if self.language == "no" else "Equipment",
-            "zones": "Soner" if self.language == "no" else "Zones",
-            "unit": "Enhet" if self.language == "no" else "Unit",
-            "external_id": "Ekstern ID" if self.language == "no" else "External ID",
-            "timeseries": "Tidsserie" if self.language == "no" else "Timeseries",
+            "energy_class": "Energimerke" if language == "no" else "Energy Class",
+            "area_sqm": "Areal (m²)" if language == "no" else "Area (m²)",
+            "year_built": "Byggeår" if language == "no" else "Year Built",
+            "address": "Adresse" if language == "no" else "Address",
+            "description": "Beskrivelse" if language == "no" else "Description",
+            "floors": "Etasjer" if language == "no" else "Floors",
+            "systems": "Systemer" if language == "no" else "Systems",
+            "meters": "Målere" if language == "no" else "Meters",
+            "sensors": "Sensorer" if language == "no" else "Sensors",
+            "equipment": "Utstyr" if language == "no" else "Equipment",
+            "zones": "Soner" if language == "no" else "Zones",
+            "unit": "Enhet" if language == "no" else "Unit",
+            "external_id": "Ekstern ID" if language == "no" else "External ID",
+            "timeseries": "Tidsserie" if language == "no" else "Timeseries",
         }
         
         if key in translations:
@@ -572,9 +1025,9 @@ class KGPipeline:
         # Default: title case with underscores replaced
         return key.replace("_", " ").title()
     
-    def _low_confidence_response(self, intent: ExtractedIntent) -> str:
+    def _low_confidence_response(self, intent: ExtractedIntent, language: str) -> str:
         """Response when intent confidence is too low."""
-        if self.language == "no":
+        if language == "no":
             return (
                 f"Beklager, jeg forstod ikke helt spørsmålet: \"{intent.original_query}\"\n\n"
                 "Prøv å spørre om:\n"
@@ -592,9 +1045,9 @@ class KGPipeline:
             "  • Zones and floors"
         )
     
-    def _connection_error_response(self) -> str:
+    def _connection_error_response(self, language: str) -> str:
         """Response when FalkorDB connection fails."""
-        if self.language == "no":
+        if language == "no":
             return (
                 "Kunne ikke koble til FalkorDB.\n"
                 "Sjekk at databasen kjører: docker start falkordb"
@@ -604,18 +1057,28 @@ class KGPipeline:
             "Make sure the database is running: docker start falkordb"
         )
     
-    def _query_error_response(self, error: str) -> str:
+    def _query_error_response(self, error: str, language: str) -> str:
         """Response when query execution fails."""
-        if self.language == "no":
+        if language == "no":
             return f"Feil ved kjøring av spørring: {error}"
         return f"Query execution error: {error}"
     
     def close(self):
-        """Close database connection."""
+        """Close database connection and save the plan cache."""
+        if self.plan_cache:
+            self.plan_cache.save()
         if self._client:
             self._client.close()
             self._client = None
     
+    async def aclose(self):
+        """Close the async client and its connection pool, and save the plan cache."""
+        if self.plan_cache:
+            self.plan_cache.save()
+        if self._async_client:
+            await self._async_client.close()
+            self._async_client = None
+    
     # =========================================================================
     # Debug/inspection methods
     # =========================================================================
@@ -633,7 +1096,8 @@ class KGPipeline:
         graphql = self.graphql_generator.generate(
             intent_type=intent.intent_type,
             entity_class=intent.entity_class,
-            parameters=intent.parameters
+            parameters=intent.parameters,
+            requested_fields=intent.requested_fields
         )
         
         # Stage 3: Cypher
@@ -0,0 +1,241 @@
+"""
+Plan Cache for the NL-to-KG Pipeline
+
+Two cache levels in front of stages 1-3:
+
+1. normalised question text → ExtractedIntent (skips the LLM call)
+2. (intent type, entity, parameters, requested fields) → (GeneratedGraphQL, CypherQuery)
+
+so a repeated question only pays the FalkorDB round-trip. Both levels are
+LRU with a TTL, and can be saved to a JSON file and loaded on startup.
+Rule-based intents produced because the LLM failed (source "fallback")
+are kept for FALLBACK_TTL_SECONDS only, so the LLM gets the question
+again once it is back.
+"""
+
+import copy
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, replace
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from ontology import BrickClass, IntentType
+from intent_extractor import ExtractedIntent, MIN_CONFIDENCE
+from graphql_generator import GeneratedGraphQL
+from graphql_to_cypher import CypherQuery
+
+
+PLAN_CACHE_VERSION = 2
+
+# Lifetime of intents from the rule-based fallback after an LLM error
+FALLBACK_TTL_SECONDS = 60.0
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.]+$")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return _TRAILING_PUNCTUATION.sub("", _WHITESPACE.sub(" ", query.strip().lower()))
+
+
+def plan_key(intent: ExtractedIntent) -> str:
+    """Everything GraphQL generation depends on."""
+    return json.dumps(
+        [
+            intent.intent_type.value,
+            intent.entity_class.value if intent.entity_class else None,
+            intent.parameters,
+            intent.requested_fields,
+        ],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a TTL. Expiry uses wall-clock time so entries survive a restart."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 86400.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.time() < entry[0]:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any, expires_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expires_at or time.time() + self.ttl_seconds, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def items(self):
+        """(key, expires_at, value) for entries that haven't expired, oldest first."""
+        now = time.time()
+        with self._lock:
+            return [(key, expires_at, value) for key, (expires_at, value) in self._entries.items()
+                    if expires_at > now]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def info(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+def _intent_from_dict(data: Dict[str, Any]) -> ExtractedIntent:
+    return ExtractedIntent(
+        intent_type=IntentType(data["intent"]),
+        entity_class=BrickClass(data["entity"]) if data.get("entity") else None,
+        parameters=data.get("parameters") or {},
+        traversal_hint=data.get("traversal_hint"),
+        confidence=data.get("confidence", 0.0),
+        original_query=data.get("query", ""),
+        requested_fields=data.get("fields") or [],
+        source=data.get("source")
+    )
+
+
+class PlanCache:
+    """
+    Intent and plan cache for KGPipeline.
+
+    Args:
+        max_entries: Entries per level
+        ttl_seconds: Entry lifetime
+        path: JSON file for persistence; loaded on creation, written by save()
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400.0,
+        path: Optional[str] = None
+    ):
+        self.path = path
+        self.intents = LRUCache(max_entries, ttl_seconds)
+        self.plans = LRUCache(max_entries, ttl_seconds)
+        self._dirty = False
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def get_intent(self, query: str) -> Optional[ExtractedIntent]:
+        """Cached intent for query, with original_query set to this question."""
+        intent = self.intents.get(normalize_query(query))
+        if intent is None:
+            return None
+        return replace(intent, parameters=copy.deepcopy(intent.parameters), original_query=query)
+
+    def put_intent(self, query: str, intent: ExtractedIntent) -> None:
+        if intent.confidence < MIN_CONFIDENCE:
+            return
+        expires_at = None
+        if intent.source == "fallback":
+            expires_at = time.time() + min(FALLBACK_TTL_SECONDS, self.intents.ttl_seconds)
+        self.intents.put(normalize_query(query), intent, expires_at)
+        self._dirty = True
+
+    def get_plan(self, intent: ExtractedIntent) -> Optional[Tuple[GeneratedGraphQL, CypherQuery]]:
+        plan = self.plans.get(plan_key(intent))
+        return copy.deepcopy(plan) if plan is not None else None
+
+    def put_plan(self, intent: ExtractedIntent, graphql_query: GeneratedGraphQL, cypher_query: CypherQuery) -> None:
+        self.plans.put(plan_key(intent), copy.deepcopy((graphql_query, cypher_query)))
+        self._dirty = True
+
+    def clear(self) -> None:
+        self.intents.clear()
+        self.plans.clear()
+        self._dirty = True
+
+    def save(self, path: Optional[str] = None) -> bool:
+        """Write both levels to JSON (atomically). Returns False if there was nothing to do."""
+        path = path or self.path
+        if not path or not self._dirty:
+            return False
+
+        data = {
+            "version": PLAN_CACHE_VERSION,
+            "intents": [
+                {"key": key, "expires_at": expires_at, "intent": intent.to_dict()}
+                for key, expires_at, intent in self.intents.items()
+            ],
+            "plans": [
+                {"key": key, "expires_at": expires_at, "graphql": asdict(graphql), "cypher": asdict(cypher)}
+                for key, expires_at, (graphql, cypher) in self.plans.items()
+            ],
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._dirty = False
+        return True
+
+    def load(self, path: Optional[str] = None) -> int:
+        """Load entries saved by save(); expired or unreadable entries are skipped."""
+        path = path or self.path
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Could not load plan cache {path}: {e}")
+            return 0
+        if data.get("version") != PLAN_CACHE_VERSION:
+            return 0
+
+        now = time.time()
+        loaded = 0
+        for entry in data.get("intents", []):
+            if entry["expires_at"] > now:
+                try:
+                    self.intents.put(entry["key"], _intent_from_dict(entry["intent"]), entry["expires_at"])
+                    loaded += 1
+                except (KeyError, ValueError):
+                    continue
+        for entry in data.get("plans", []):
+            if entry["expires_at"] > now:
+                try:
+                    plan = (GeneratedGraphQL(**entry["graphql"]), CypherQuery(**entry["cypher"]))
+                    self.plans.put(entry["key"], plan, entry["expires_at"])
+                    loaded += 1
+                except (KeyError, TypeError):
+                    continue
+        return loaded
+
+    def info(self) -> Dict[str, Any]:
+        return {"path": self.path, "intents": self.intents.info(), "plans": self.plans.info()}
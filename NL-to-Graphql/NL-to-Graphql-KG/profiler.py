@@ -0,0 +1,168 @@
+"""
+Query Profiler for the NL-to-KG Pipeline
+
+Every processed question records wall-clock time per pipeline stage in
+debug_info["timings_ms"]:
+
+    intent_extraction, graphql_generation, cypher_resolution,
+    db_execution, response_formatting
+
+With process(query, profile=True) the Cypher query also runs with
+GRAPH.PROFILE, which executes it again and reports records produced and
+execution time per operator. parse_profile() turns the indented plan into
+an operator tree, and ProfileReport keeps the last samples per Cypher
+template so the slowest templates can be listed (/profile/report). The
+report ranks templates by db_execution alone; intent extraction (often an
+LLM call) and the other stages don't depend on the Cypher template and are
+reported separately.
+
+The query itself runs with the result cache bypassed, so db_execution is
+a real round-trip. The profile run gets the same guard timeout, and is
+skipped when the guard truncated the result.
+"""
+
+import re
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+STAGES = (
+    "intent_extraction",
+    "graphql_generation",
+    "cypher_resolution",
+    "db_execution",
+    "response_formatting",
+)
+
+# "    Node By Label Scan | (f:brick_Floor) | Records produced: 3, Execution time: 0.012 ms"
+_PROFILE_LINE = re.compile(
+    r"^(?P<indent>\s*)(?P<operation>.+?)\s*\|\s*"
+    r"Records produced: (?P<records>\d+), Execution time: (?P<time>[\d.]+) ms\s*$"
+)
+_INDENT = 4
+
+
+def parse_profile(lines: List[str]) -> List[Dict[str, Any]]:
+    """
+    Operator tree from GRAPH.PROFILE output.
+
+    Returns:
+        Root operators, each {"operation", "args", "records", "time_ms",
+        "children"}
+    """
+    roots: List[Dict[str, Any]] = []
+    stack: List[Tuple[int, Dict[str, Any]]] = []
+    for line in lines:
+        match = _PROFILE_LINE.match(line)
+        if not match:
+            continue
+        operation, _, args = match.group("operation").partition("|")
+        node = {
+            "operation": operation.strip(),
+            "args": args.strip() or None,
+            "records": int(match.group("records")),
+            "time_ms": float(match.group("time")),
+            "children": [],
+        }
+        depth = len(match.group("indent").expandtabs(_INDENT)) // _INDENT
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        (stack[-1][1]["children"] if stack else roots).append(node)
+        stack.append((depth, node))
+    return roots
+
+
+def walk(operators: List[Dict[str, Any]]):
+    """Every operator in the tree, depth first."""
+    for operator in operators:
+        yield operator
+        yield from walk(operator["children"])
+
+
+def slowest_operator(operators: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Operator with the highest execution time (without its children)."""
+    slowest = max(walk(operators), key=lambda op: op["time_ms"], default=None)
+    if slowest is None:
+        return None
+    return {key: slowest[key] for key in ("operation", "args", "records", "time_ms")}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class ProfileReport:
+    """
+    Rolling per-template profile samples.
+
+    Args:
+        window: Samples kept per template
+        max_templates: Least recently profiled templates are dropped
+    """
+
+    def __init__(self, window: int = 50, max_templates: int = 256):
+        self.window = window
+        self.max_templates = max_templates
+        self._samples: "OrderedDict[str, Deque[Dict[str, float]]]" = OrderedDict()
+        self._operators: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        cypher: str,
+        timings_ms: Dict[str, float],
+        operators: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        with self._lock:
+            samples = self._samples.pop(cypher, None) or deque(maxlen=self.window)
+            samples.append(dict(timings_ms))
+            self._samples[cypher] = samples
+            if operators:
+                self._operators[cypher] = operators
+            while len(self._samples) > self.max_templates:
+                dropped, _ = self._samples.popitem(last=False)
+                self._operators.pop(dropped, None)
+
+    def slowest(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Templates ordered by mean db_execution time, slowest first.
+
+        mean_ms, p95_ms and max_ms are db_execution times; the mean of
+        every stage (and of the total) is in stages_mean_ms and
+        total_mean_ms.
+        """
+        with self._lock:
+            entries = [(cypher, list(samples)) for cypher, samples in self._samples.items()]
+            operators = dict(self._operators)
+
+        report = []
+        for cypher, samples in entries:
+            db_times = [sample.get("db_execution", 0.0) for sample in samples]
+            totals = [sum(sample.values()) for sample in samples]
+            stages = {
+                stage: round(sum(s.get(stage, 0.0) for s in samples) / len(samples), 3)
+                for stage in STAGES
+            }
+            report.append({
+                "cypher": cypher,
+                "samples": len(samples),
+                "mean_ms": round(sum(db_times) / len(db_times), 3),
+                "p95_ms": round(_percentile(db_times, 0.95), 3),
+                "max_ms": round(max(db_times), 3),
+                "total_mean_ms": round(sum(totals) / len(totals), 3),
+                "stages_mean_ms": stages,
+                "slowest_operator": slowest_operator(operators.get(cypher, [])),
+                "operators": operators.get(cypher),
+            })
+        report.sort(key=lambda entry: entry["mean_ms"], reverse=True)
+        return report[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._operators.clear()
+
+    def info(self) -> Dict[str, Any]:
+        return {"templates": len(self._samples), "window": self.window}
@@ -0,0 +1,189 @@
+"""
+Semantic Cache for Intent Extraction
+
+Exact-match caching (plan_cache.py) misses paraphrases like
+"Hvor mange etasjer har bygningen?" vs "Hvor mange etasjer har bygget?". The semantic
+cache embeds every question the LLM has resolved and reuses the stored
+intent for a new question whose embedding is close enough.
+
+Embedders:
+- HashingEmbedder: character n-gram hashing over normalised words (command
+  words and fillers dropped, Norwegian plural/definite endings stripped,
+  so "sensorene i bygningen" ~ "sensorer i bygget"); no model or network.
+  This is the default, since sentence-transformers is not in requirements.txt
+- SentenceEmbedder: local CPU sentence-transformers model (multilingual,
+  handles Norwegian); used instead when sentence-transformers is installed
+
+Lookup is a single matrix-vector product over normalised embeddings. A hit
+also requires the rule-based signature (intent, entity type and building, zone,
+equipment names) of both questions to match, so "sensorer i foyer" never
+reuses the intent of "sensorer i hovedsal".
+"""
+
+import re
+import threading
+import zlib
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from intent_extractor import ExtractedIntent
+
+
+DEFAULT_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+_TOKEN = re.compile(r"\w+")
+
+# Words that don't change what is asked for ("Vis alle ..." vs "List ...").
+# Intent and entities are compared through the rule-based signature instead.
+_FILLER_WORDS = {
+    "vis", "list", "hent", "finn", "gi", "meg", "alle", "i", "på", "av", "for",
+    "til", "og", "en", "et", "den", "det", "de", "som", "har", "er",
+}
+
+# Plural and definite endings, longest first
+_SUFFIXES = ("ingen", "ene", "ane", "en", "et", "er", "ar", "a", "e")
+
+
+def _normalise(word: str) -> str:
+    """Strip one Norwegian inflection ending and a doubled final consonant (bygget -> byg)."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    if len(word) >= 4 and word[-1] == word[-2] and word[-1] not in "aeiouyæøå":
+        word = word[:-1]
+    return word
+
+
+class HashingEmbedder:
+    """Character n-gram hashing embedder over normalised words; deterministic and offline."""
+
+    def __init__(self, dim: int = 1024, ngram_range: Tuple[int, int] = (3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.name = f"hashing-{dim}"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        low, high = self.ngram_range
+        for row, text in enumerate(texts):
+            words = _TOKEN.findall(text.lower())
+            words = [_normalise(word) for word in words if word not in _FILLER_WORDS] or words
+            for token in words:
+                token = f" {token} "
+                for n in range(low, high + 1):
+                    for i in range(max(len(token) - n + 1, 1)):
+                        vectors[row, zlib.crc32(token[i:i + n].encode()) % self.dim] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class SentenceEmbedder:
+    """sentence-transformers model on CPU, loaded on first use."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        self.name = model_name
+        self._model = None
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.name, device="cpu")
+        return np.asarray(
+            self._model.encode(texts, normalize_embeddings=True, convert_to_numpy=True),
+            dtype=np.float32
+        )
+
+
+def default_embedder():
+    """SentenceEmbedder if sentence-transformers is installed, else HashingEmbedder."""
+    try:
+        import sentence_transformers  # noqa: F401
+        return SentenceEmbedder()
+    except ImportError:
+        return HashingEmbedder()
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of resolved intents.
+
+    Args:
+        embedder: Object with encode(texts) -> normalised (n, dim) array
+        threshold: Minimum cosine similarity for a hit
+        max_entries: Oldest entries are overwritten when full
+    """
+
+    def __init__(self, embedder=None, threshold: Optional[float] = None, max_entries: int = 4096):
+        self.embedder = embedder or default_embedder()
+        # n-gram hashing scores paraphrases lower than a sentence model
+        if threshold is None:
+            threshold = 0.75 if isinstance(self.embedder, HashingEmbedder) else 0.9
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Tuple[str, Dict[str, Any], ExtractedIntent]] = []
+        self._next = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _embed(self, query: str) -> np.ndarray:
+        return self.embedder.encode([query])[0]
+
+    def lookup(self, query: str, signature: Dict[str, Any]) -> Optional[Tuple[ExtractedIntent, float]]:
+        """
+        Most similar cached intent above the threshold.
+
+        Args:
+            query: New question
+            signature: Rule-based entity and parameters of the question;
+                must equal the cached question's
+
+        Returns:
+            (intent with original_query set to query, similarity), or None
+        """
+        vector = self._embed(query)
+        with self._lock:
+            if not self._entries:
+                self.misses += 1
+                return None
+            scores = self._vectors[:len(self._entries)] @ vector
+            for index in np.argsort(scores)[::-1][:5]:
+                score = float(scores[index])
+                if score < self.threshold:
+                    break
+                _, cached_signature, intent = self._entries[index]
+                if cached_signature == signature:
+                    self.hits += 1
+                    return replace(intent, parameters=dict(intent.parameters), original_query=query), score
+            self.misses += 1
+            return None
+
+    def add(self, query: str, signature: Dict[str, Any], intent: ExtractedIntent) -> None:
+        vector = self._embed(query)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            entry = (query, dict(signature), intent)
+            if len(self._entries) < self.max_entries:
+                self._entries.append(entry)
+                index = len(self._entries) - 1
+            else:
+                index = self._next
+                self._entries[index] = entry
+                self._next = (self._next + 1) % self.max_entries
+            self._vectors[index] = vector
+
+    def info(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "embedder": self.embedder.name,
+            "entries": len(self._entries),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,118 @@
+"""
+Snapshot Resolver - answers traversal intents from an in-memory graph
+
+Implements the fixed-shape traversal patterns from the ontology
+(building_sensors, zone_sensors, ahu_zones, full_hierarchy) as walks over
+a GraphSnapshot (FalkorDB/graph_snapshot.py). Rows have the same fields as
+the ontology's Cypher patterns return.
+
+Anything else, or a traversal whose start entity isn't found in the
+snapshot, returns None so the pipeline falls back to FalkorDB.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ontology import IntentType
+from intent_extractor import ExtractedIntent
+
+
+HIERARCHY_STEP = ("brick_hasPart", "brick_hasMember", "brick_hasPoint", "brick_hasTimeseries")
+HIERARCHY_DEPTH = 5
+HIERARCHY_LIMIT = 20
+
+
+class SnapshotResolver:
+    """Resolve supported traversal intents against a GraphSnapshot."""
+
+    def __init__(self):
+        self.traversals: Dict[str, Callable[[Any, np.ndarray], List[Dict]]] = {
+            "building_sensors": self._building_sensors,
+            "zone_sensors": self._zone_sensors,
+            "ahu_zones": self._ahu_zones,
+            "full_hierarchy": self._full_hierarchy,
+        }
+        # Start label and (id, name) parameter keys per traversal, in priority order
+        self._starts = {
+            "building_sensors": ("brick_Building", ["building_id", "id"], ["building_name", "name"]),
+            "zone_sensors": ("brick_HVAC_Zone", ["zone_id", "id"], ["zone_name", "name"]),
+            "ahu_zones": ("brick_Air_Handling_Unit", ["ahu_id", "id"], ["ahu_name", "name", "equipment_name"]),
+            "full_hierarchy": ("brick_Building", ["building_id", "id"], ["building_name", "name"]),
+        }
+
+    def supports(self, intent: ExtractedIntent) -> bool:
+        return intent.intent_type == IntentType.QUERY_TRAVERSE and intent.traversal_hint in self.traversals
+
+    def resolve(self, snapshot, intent: ExtractedIntent) -> Optional[List[Dict]]:
+        """
+        Answer intent from snapshot.
+
+        Returns:
+            Result rows, or None if the intent isn't supported or its
+            start entity can't be found
+        """
+        if not self.supports(intent):
+            return None
+
+        start = self._find_start(snapshot, intent.traversal_hint, intent.parameters)
+        if start is None:
+            return None
+        return self.traversals[intent.traversal_hint](snapshot, start)
+
+    def _find_start(self, snapshot, traversal: str, parameters: Dict[str, Any]) -> Optional[np.ndarray]:
+        label, id_keys, name_keys = self._starts[traversal]
+        node_id = next((parameters[key] for key in id_keys if parameters.get(key)), None)
+        name = next((parameters[key] for key in name_keys if parameters.get(key)), None)
+
+        start = snapshot.find(label, node_id=node_id, name=name)
+        # No match, e.g. a generic word like "sone" extracted as a name: let FalkorDB answer
+        return start if len(start) else None
+
+    def _rows(self, paths: np.ndarray, columns: Dict[str, Callable[[Sequence[int]], Any]]) -> List[Dict]:
+        return [{key: value(path) for key, value in columns.items()} for path in paths.tolist()]
+
+    def _building_sensors(self, snapshot, start: np.ndarray) -> List[Dict]:
+        # (b)-[:brick_hasPart*1..2]->(sys)-[:brick_hasMember]->(eq)-[:brick_hasPoint]->(s)
+        paths = [
+            snapshot.walk(start, ["brick_hasPart", "brick_hasMember", "brick_hasPoint"]),
+            snapshot.walk(start, ["brick_hasPart", "brick_hasPart", "brick_hasMember", "brick_hasPoint"]),
+        ]
+        tails = np.concatenate([p[:, -2:] for p in paths])
+        return self._rows(tails, {
+            "equipment": lambda p: snapshot.names[p[0]],
+            "sensor": lambda p: snapshot.names[p[1]],
+            "unit": lambda p: snapshot.units[p[1]],
+        })
+
+    def _zone_sensors(self, snapshot, start: np.ndarray) -> List[Dict]:
+        paths = snapshot.walk(start, ["brick_hasPoint"])
+        return self._rows(paths, {
+            "zone": lambda p: snapshot.names[p[0]],
+            "sensor": lambda p: snapshot.names[p[1]],
+            "type": lambda p: snapshot.labels[p[1]],
+            "unit": lambda p: snapshot.units[p[1]],
+        })
+
+    def _ahu_zones(self, snapshot, start: np.ndarray) -> List[Dict]:
+        paths = snapshot.walk(start, ["brick_feeds"])
+        zones: Dict[int, List[str]] = {}
+        for ahu, zone in paths.tolist():
+            if snapshot.labels[zone] == "brick_HVAC_Zone":
+                zones.setdefault(ahu, []).append(snapshot.names[zone])
+        return [{"ahu": snapshot.names[ahu], "zones": names} for ahu, names in zones.items()]
+
+    def _full_hierarchy(self, snapshot, start: np.ndarray) -> List[Dict]:
+        # Paths of length 1..5, shortest first, like the Cypher pattern with LIMIT 20
+        rows = []
+        paths = np.asarray(start, dtype=np.int64).reshape(-1, 1)
+        for _ in range(HIERARCHY_DEPTH):
+            positions, targets = snapshot.expand(paths[:, -1], HIERARCHY_STEP)
+            paths = np.column_stack([paths[positions], targets])
+            for path in paths[:HIERARCHY_LIMIT - len(rows)].tolist():
+                rows.append({"hierarchy": [
+                    {"label": snapshot.labels[i], "name": snapshot.names[i]} for i in path
+                ]})
+            if len(rows) >= HIERARCHY_LIMIT or not len(paths):
+                break
+        return rows
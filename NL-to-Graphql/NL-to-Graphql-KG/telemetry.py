@@ -0,0 +1,369 @@
+"""
+Tracing and Metrics for the NL-to-KG Pipeline
+
+Spans follow the OpenTelemetry model (trace id, span id, parent, start/end
+time, attributes, status). Every question gets a kg.process span with one
+child span per pipeline stage:
+
+    kg.process
+    ├── kg.intent_extraction
+    ├── kg.graphql_generation
+    ├── kg.cypher_resolution
+    ├── kg.db_execution
+    └── kg.response_formatting
+
+Finished spans go to the tracer's exporters. ConsoleSpanExporter and
+FileSpanExporter write one JSON object per span, and InMemorySpanExporter
+keeps them for tests. The parent span is tracked in a context variable,
+so spans opened on worker threads (asyncio.to_thread) and in asyncio
+tasks nest correctly.
+
+Metrics are Prometheus counters and histograms, rendered in the text
+exposition format by MetricsRegistry.render() (the /metrics endpoint):
+
+    kg_queries_total{outcome}                 success, low_confidence, rejected, error
+    kg_intent_extractions_total{source}       llm, semantic_cache, fallback, rule_based
+    kg_llm_latency_seconds{outcome}           OpenAI request time
+    kg_low_confidence_rejections_total
+    kg_db_latency_seconds{source}             falkordb or snapshot
+    kg_result_rows{intent}                    rows per answered question
+    kg_stage_duration_seconds{stage}
+
+"source=fallback" counts questions where the LLM failed and rule-based
+extraction answered. The fallback rate is fallback / (llm + fallback).
+"""
+
+import contextvars
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("kg_span", default=None)
+
+
+# =============================================================================
+# Tracing
+# =============================================================================
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_time_unix_nano: int = 0
+    end_time_unix_nano: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "UNSET"
+    status_description: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str, description: Optional[str] = None) -> None:
+        self.status = status
+        self.status_description = description
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_time_unix_nano is None:
+            return None
+        return (self.end_time_unix_nano - self.start_time_unix_nano) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "context": {"trace_id": self.trace_id, "span_id": self.span_id},
+            "parent_id": self.parent_id,
+            "start_time_unix_nano": self.start_time_unix_nano,
+            "end_time_unix_nano": self.end_time_unix_nano,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "status": {"status_code": self.status, "description": self.status_description},
+        }
+
+
+class ConsoleSpanExporter:
+    """Print finished spans as JSON lines."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def export(self, span: Span) -> None:
+        print(json.dumps(span.to_dict(), ensure_ascii=False, default=str), file=self.stream)
+
+
+class FileSpanExporter:
+    """Append finished spans as JSON lines to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class InMemorySpanExporter:
+    """Keep finished spans in a list (for tests)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+def exporters_from_env() -> List[Any]:
+    """Exporters from KG_TRACE (console, file) and KG_TRACE_FILE."""
+    kind = os.getenv("KG_TRACE", "").lower()
+    if kind == "console":
+        return [ConsoleSpanExporter()]
+    if kind == "file":
+        return [FileSpanExporter(os.getenv("KG_TRACE_FILE", "kg_traces.jsonl"))]
+    return []
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporters."""
+
+    def __init__(self, exporters: Optional[Sequence[Any]] = None):
+        self.exporters = list(exporters or [])
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """Open a child of the current span (or a new trace)."""
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else f"{random.getrandbits(128):032x}",
+            span_id=f"{random.getrandbits(64):016x}",
+            parent_id=parent.span_id if parent else None,
+            start_time_unix_nano=time.time_ns(),
+            attributes=attributes
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_status("ERROR", f"{type(e).__name__}: {e}")
+            raise
+        else:
+            if span.status == "UNSET":
+                span.set_status("OK")
+        finally:
+            _current_span.reset(token)
+            span.end_time_unix_nano = time.time_ns()
+            for exporter in self.exporters:
+                try:
+                    exporter.export(span)
+                except Exception as e:
+                    print(f"[WARN] Span export failed: {e}")
+
+
+# =============================================================================
+# Metrics
+# =============================================================================
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        if not values and not self.labelnames:
+            values = [((), 0.0)]
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values]
+
+
+class Histogram(Counter):
+    """Cumulative-bucket histogram with labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # labels -> (bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._series.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._series[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        lines = []
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                labels = _labels(self.labelnames, key, [("le", _number(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Counter] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.lines())
+        return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# Pipeline telemetry
+# =============================================================================
+
+class PipelineTelemetry:
+    """
+    Tracer and metrics used by KGPipeline and IntentExtractor.
+
+    Args:
+        exporters: Span exporters; spans are only timed, not exported, if empty
+    """
+
+    def __init__(self, exporters: Optional[Sequence[Any]] = None):
+        self.tracer = Tracer(exporters)
+        self.registry = MetricsRegistry()
+        self.queries = self.registry.counter(
+            "kg_queries_total", "Processed questions by outcome", ["outcome"]
+        )
+        self.extractions = self.registry.counter(
+            "kg_intent_extractions_total", "Intent extractions by source", ["source"]
+        )
+        self.llm_latency = self.registry.histogram(
+            "kg_llm_latency_seconds", "LLM intent extraction latency", ["outcome"]
+        )
+        self.low_confidence = self.registry.counter(
+            "kg_low_confidence_rejections_total", "Questions rejected for low intent confidence"
+        )
+        self.db_latency = self.registry.histogram(
+            "kg_db_latency_seconds", "Graph query latency", ["source"]
+        )
+        self.result_rows = self.registry.histogram(
+            "kg_result_rows", "Result rows per answered question", ["intent"], buckets=ROW_BUCKETS
+        )
+        self.stage_duration = self.registry.histogram(
+            "kg_stage_duration_seconds", "Pipeline stage duration", ["stage"]
+        )
+
+    def observe_extraction(self, source: str, llm_seconds: Optional[float] = None) -> None:
+        """Count an intent extraction; llm_seconds is the LLM request time if one was made."""
+        self.extractions.inc(source=source)
+        if llm_seconds is not None:
+            self.llm_latency.observe(llm_seconds, outcome="ok" if source == "llm" else "error")
+        span = self.tracer.current_span()
+        if span is not None:
+            span.set_attribute("intent.source", source)
+
+    def render(self) -> str:
+        return self.registry.render()
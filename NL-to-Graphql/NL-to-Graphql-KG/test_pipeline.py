@@ -11,7 +11,7 @@ import os
 
 # Add paths
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'FalkorDB'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'FalkorDB'))
 
 
 def test_ontology():
@@ -39,6 +39,22 @@ def test_ontology():
     intent = ontology.detect_intent("vis alle sensorer")
     assert intent == IntentType.QUERY_LIST
     print("✓ Intent detection works ('vis alle' → QUERY_LIST)")
+    
+    # Phrases match at word starts only: 'rom' in 'from', 'get' in 'bygget'
+    assert ontology.find_entity_by_text("path from a to b") is None
+    assert ontology.detect_intent("sensorer i bygget") == IntentType.QUERY_TRAVERSE
+    hits = ontology.match("hvilke soner mater hovedaggregatet")
+    assert hits["traversal"].key == "ahu_zones"
+    assert hits["equipment_name"].key == "hovedaggregat"
+    print("✓ Compiled matcher respects word boundaries and longest match")
+    
+    # Norwegian compounds: head nouns also match as compound tails
+    hits = ontology.match("hvor mange luftbehandlingsaggregater?")
+    assert hits["entity"].key == BrickClass.AHU
+    assert hits["equipment_name"].key == "aggregat"
+    assert ontology.find_entity_by_text("vis ventilasjonsaggregatet") == BrickClass.AHU
+    assert ontology.find_traversal_by_intent("vis energimåleren").name == "building_meters"
+    print("✓ Compound words match their head noun")
 
 
 def test_intent_extractor():
@@ -103,6 +119,8 @@ def test_graphql_to_cypher():
     """Test GraphQL to Cypher resolution."""
     print("\n=== Testing GraphQL → Cypher Resolution ===")
     
+    from ontology import BrickOntology, BrickClass, IntentType
+    from graphql_generator import GraphQLGenerator
     from graphql_to_cypher import GraphQLToCypherResolver
     
     resolver = GraphQLToCypherResolver()
@@ -124,6 +142,49 @@ def test_graphql_to_cypher():
     print(f"  Building query:")
     print(f"    Cypher: {cypher.cypher[:60]}...")
     assert "brick_Building" in cypher.cypher
+    assert cypher.parameters["names"] == ["Opera"], "Literal arguments should be used"
+    
+    # Only the arguments that are present are filtered on, without toLower()
+    assert "WHERE b.name IN $names\n" in cypher.cypher and "$id" not in cypher.cypher
+    cypher = resolver.resolve('query { building(id: "building_opera") { name } }')
+    assert "WHERE b.id = $id\n" in cypher.cypher and cypher.parameters == {"id": "building_opera"}
+    cypher = resolver.resolve('query { entityCount(entityType: "Floor", buildingName: "operahuset") }')
+    assert "toLower" not in cypher.cypher and cypher.parameters == {"names": ["operahuset", "Operahuset"]}
+    
+    # Routing follows the root field, not substrings of the document
+    cypher = resolver.resolve('query CountEquipment { equipmentCount(equipmentType: "Chiller") }')
+    assert cypher.cypher == "MATCH (eq:brick_Chiller) RETURN count(eq) as count"
+    
+    # Label fields skip brick_Entity, whichever position it has
+    cypher = resolver.resolve("query { sensors { name sensorType } }")
+    assert "sensorType: [l IN labels(s) WHERE l <> 'brick_Entity'][0]" in cypher.cypher
+    
+    # Only selected fields are projected
+    cypher = resolver.resolve("query { buildings { address areaSqm } }")
+    assert "b {.address, .area_sqm}" in cypher.cypher
+    
+    # Nested collections are matched only when selected
+    cypher = resolver.resolve("query { building { address } }")
+    assert "OPTIONAL MATCH" not in cypher.cypher
+    cypher = resolver.resolve("query { zones { name sensors { name } } }")
+    assert cypher.cypher.count("OPTIONAL MATCH") == 1 and "sensors: sensors" in cypher.cypher
+    
+    # Generator → resolver routing for questions without an entity type
+    generator = GraphQLGenerator(BrickOntology())
+    
+    def route(intent_type, entity_class=None, parameters=None):
+        gql = generator.generate(intent_type, entity_class, parameters or {})
+        return resolver.resolve(gql.query, gql.variables)
+    
+    counts = "MATCH (n) RETURN [l IN labels(n) WHERE l <> 'brick_Entity'][0] as type, count(*) as count"
+    assert route(IntentType.QUERY_LIST).cypher == counts, "Entity-less lists must not list every building"
+    assert route(IntentType.UNKNOWN).cypher == counts
+    assert route(IntentType.QUERY_AGGREGATE).cypher == counts, "Counts without an entity type per node type"
+    cypher = route(IntentType.QUERY_AGGREGATE, BrickClass.TEMPERATURE_SENSOR)
+    assert cypher.cypher == "MATCH (s:brick_Temperature_Sensor) RETURN count(s) as count"
+    cypher = route(IntentType.UNKNOWN, BrickClass.BUILDING, {"building_name": "operahuset"})
+    assert "LIMIT 1" in cypher.cypher and "Operahuset" in cypher.parameters["names"]
+    assert route(IntentType.QUERY_LIST, BrickClass.FLOOR).cypher.startswith("\nMATCH (f:brick_Floor)")
     
     print("✓ GraphQL → Cypher resolution works")
 
@@ -151,6 +212,588 @@ def test_full_pipeline_no_db():
     print("✓ Pipeline explain works (without DB)")
 
 
+def test_count_questions():
+    """Test that count questions count the entity they ask about (offline)."""
+    print("\n=== Testing Count Questions ===")
+    
+    from pipeline import KGPipeline
+    
+    class FakeClient:
+        def __init__(self):
+            self.queries = []
+        
+        def query(self, cypher, params=None, **options):
+            self.queries.append((cypher, params))
+            if "as type, count(*)" in cypher:
+                return [{"type": "brick_Building", "count": 1}, {"type": "brick_Floor", "count": 3}]
+            return [{"count": 3}]
+    
+    pipeline = KGPipeline(query_guard=False, plan_cache=False)
+    client = FakeClient()
+    pipeline._client = client
+    
+    cases = {
+        "Hvor mange bygninger er det?": ("MATCH (n:brick_Building) RETURN count(n)", None),
+        "Hvor mange etasjer har bygningen?": ("MATCH (n:brick_Floor) RETURN count(n)", None),
+        "How many floors does the building have?": ("MATCH (n:brick_Floor) RETURN count(n)", None),
+        "Hvor mange soner har Operahuset?": ("(n:brick_HVAC_Zone)", {"names": ["operahuset", "Operahuset"]}),
+        "Hvor mange strømmålere har Operahuset?": ("(n:brick_Electrical_Meter)", {"names": ["operahuset", "Operahuset"]}),
+        "Hvor mange temperatursensorer er det?": ("MATCH (s:brick_Temperature_Sensor)", None),
+    }
+    for question, (expected, params) in cases.items():
+        result = pipeline.process(question)
+        cypher, used = client.queries[-1]
+        print(f"  {question} → {cypher.strip().splitlines()[0]}")
+        assert result.success and expected in cypher, (question, cypher)
+        assert (used or None) == params, (question, used)
+        assert result.natural_response in ("Antall: 3", "Count: 3"), result.natural_response
+    
+    result = pipeline.process("Hvor mange målere er det?")
+    assert "brick_Temperature_Sensor" not in client.queries[-1][0]
+    assert result.natural_response.splitlines() == ["Antall per type:", "- brick_Building: 1", "- brick_Floor: 3"]
+    
+    print("✓ Count questions are routed to their entity type")
+
+
+def test_query_parameters():
+    """Test that query values are sent as native parameters."""
+    print("\n=== Testing Query Parameters ===")
+    
+    from falkor_client import FalkorDBClient
+    from pipeline import KGPipeline
+    
+    class FakeResult:
+        header = [[1, "b"]]
+        result_set = [[{"id": "building_opera"}]]
+    
+    class FakeGraph:
+        def __init__(self):
+            self.calls = []
+        
+        def query(self, cypher, params=None, timeout=None):
+            self.calls.append((cypher, params))
+            return FakeResult()
+    
+    client = FalkorDBClient()
+    graph = FakeGraph()
+    client._graph = graph
+    
+    pipeline = KGPipeline()
+    pipeline._client = client
+    
+    pipeline.process("Hva er adressen til bygningen Opera'?")
+    pipeline.process("Hva er adressen til bygningen Opera'?")
+    
+    # The guard's stats queries (retried while EXPLAIN fails on the fake) come first
+    cypher, params = [call for call in graph.calls if "brick_Building" in call[0]][-1]
+    print(f"  Cypher: {cypher[:60]}...")
+    print(f"  Params: {params}")
+    assert params, "Expected native query parameters"
+    for value in params.values():
+        if isinstance(value, str) and value:
+            assert value not in cypher, "Parameter value was interpolated into Cypher"
+    
+    info = client.template_cache_info()
+    assert info["hits"] >= 1, info
+    print(f"✓ Parameters passed natively, template cache: {info}")
+
+
+def test_result_cache():
+    """Test read-through result cache and write invalidation."""
+    print("\n=== Testing Result Cache ===")
+    
+    from falkor_client import FalkorDBClient, FalkorConfig
+    
+    class FakeResult:
+        header = [[1, "count"]]
+        result_set = [[3]]
+    
+    class FakeGraph:
+        def __init__(self):
+            self.calls = 0
+        
+        def query(self, cypher, params=None):
+            self.calls += 1
+            return FakeResult()
+    
+    client = FalkorDBClient(FalkorConfig(version_check_interval=0))
+    graph = FakeGraph()
+    client._graph = graph
+    
+    query = "MATCH (f:brick_Floor {id: $id}) RETURN count(f) as count"
+    assert client.query(query, {"id": "floor_opera_1"}) == [{"count": 3}]
+    assert client.query(query, {"id": "floor_opera_1"}) == [{"count": 3}]
+    assert graph.calls == 1, "Second read should be served from cache"
+    
+    client.query(query, {"id": "floor_opera_2"})
+    assert graph.calls == 2, "Different parameters must not share a cache entry"
+    
+    client.execute("MATCH (f:brick_Floor {id: $id}) SET f.name = $name", {"id": "floor_opera_1", "name": "1"})
+    client.query(query, {"id": "floor_opera_1"})
+    assert graph.calls == 4, "Writes must invalidate cached results"
+    
+    info = client.cache_info()
+    print(f"✓ Result cache works: {info}")
+    assert info["graph_version"] == 1
+    assert info["hits"] == 1
+
+
+def test_graph_sync():
+    """Test sync diff idempotence and stored graph version invalidation."""
+    print("\n=== Testing Graph Sync ===")
+    
+    from falkor_client import FalkorDBClient, GRAPH_VERSION_QUERY
+    from graph_sync import diff_graph
+    from seed_data import get_seed_graph
+    
+    nodes, edges = get_seed_graph()
+    plan = diff_graph(nodes, edges, {}, set())
+    assert len(plan.upsert_nodes) == len(nodes) and len(plan.create_edges) == len(edges)
+    
+    current = {node["properties"]["id"]: (node["label"], node["properties"]) for node in nodes}
+    assert diff_graph(nodes, edges, current, set(edges)).is_empty, "Second sync must be a no-op"
+    
+    changed = dict(nodes[1], properties=dict(nodes[1]["properties"], name="Renamed"))
+    plan = diff_graph([changed] + nodes[2:], edges, current, set(edges))
+    assert [n["properties"]["id"] for n in plan.upsert_nodes] == [changed["properties"]["id"]]
+    assert plan.delete_nodes == [nodes[0]["properties"]["id"]]
+    print(f"✓ Diff: {plan.summary()}")
+    
+    class FakeResult:
+        def __init__(self, key, value):
+            self.header = [[1, key]]
+            self.result_set = [[value]]
+    
+    class FakeGraph:
+        version = 1
+        
+        def query(self, cypher, params=None):
+            if cypher == GRAPH_VERSION_QUERY:
+                return FakeResult("version", self.version)
+            return FakeResult("count", 3)
+    
+    client = FalkorDBClient()
+    graph = FakeGraph()
+    client._graph = graph
+    
+    client.query("MATCH (n) RETURN count(n) as count")
+    assert client.stored_graph_version == 1
+    graph.version = 2
+    client.check_graph_version()
+    assert client.cache_info()["invalidations"] >= 1, "Version change must invalidate the cache"
+    print(f"✓ Stored graph version: {client.stored_graph_version}")
+
+
+def test_snapshot_traversal():
+    """Test traversal intents answered from the in-memory snapshot."""
+    print("\n=== Testing Snapshot Traversal ===")
+    
+    from pipeline import KGPipeline
+    from seed_data import get_seed_graph
+    
+    nodes, edges = get_seed_graph()
+    node_rows = [
+        {"node": i, "id": n["properties"]["id"], "label": n["label"],
+         "name": n["properties"].get("name"), "unit": n["properties"].get("unit")}
+        for i, n in enumerate(nodes)
+    ]
+    positions = {row["id"]: row["node"] for row in node_rows}
+    edge_rows = [{"src": positions[a], "rel": r, "dst": positions[b]} for a, r, b in edges]
+    
+    class FakeClient:
+        version = 1
+        
+        def check_graph_version(self):
+            return self.version
+        
+        def iter_query(self, cypher, params=None, page_size=None):
+            return iter(node_rows if "labels(n)" in cypher else edge_rows)
+        
+        def query(self, cypher, params=None):
+            raise AssertionError("Traversal should not reach FalkorDB")
+    
+    pipeline = KGPipeline(use_snapshot=True)
+    client = FakeClient()
+    pipeline._client = client
+    
+    result = pipeline.process("soner som AHU mater")
+    print(f"  Results: {result.raw_results}")
+    assert result.success and result.debug_info.get("source") == "snapshot"
+    assert result.raw_results[0]["zones"] == ["Foyer", "Hovedsal", "Backstage"]
+    
+    client.version = 2
+    pipeline._snapshots.check_interval = 0
+    pipeline.process("sensorer i sone foyer")
+    info = pipeline.snapshot_info()
+    assert info["loads"] == 2 and info["version"] == 2, "Snapshot should reload on version change"
+    print(f"✓ Snapshot: {info}")
+
+
+def test_plan_cache():
+    """Test that repeated questions skip intent extraction and planning."""
+    print("\n=== Testing Plan Cache ===")
+    
+    import tempfile
+    import time
+    from dataclasses import replace
+    from pipeline import KGPipeline
+    from plan_cache import FALLBACK_TTL_SECONDS, PlanCache
+    
+    pipeline = KGPipeline()
+    calls = []
+    extract = pipeline.intent_extractor.extract
+    pipeline.intent_extractor.extract = lambda query: calls.append(query) or extract(query)
+    
+    first = pipeline.plan("Vis alle sensorer")
+    second = pipeline.plan("  vis alle SENSORER? ")
+    assert len(calls) == 1, "Repeated question should not be re-extracted"
+    assert first.debug_info["plan_cache"] == {"intent": "miss", "plan": "miss"}
+    assert second.debug_info["plan_cache"] == {"intent": "hit", "plan": "hit"}
+    assert second.extracted_intent.original_query == "  vis alle SENSORER? "
+    assert second.cypher_query.cypher == first.cypher_query.cypher
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "plan_cache.json")
+        assert pipeline.plan_cache.save(path)
+        restored = PlanCache(path=path)
+        assert restored.get_intent("Vis alle sensorer") is not None
+        assert restored.get_plan(second.extracted_intent) is not None
+    
+    # Rule-based intents after an LLM error expire quickly
+    cache = PlanCache()
+    fallback = replace(first.extracted_intent, source="fallback")
+    cache.put_intent("Vis alle soner", fallback)
+    cache.put_intent("Vis alle etasjer", first.extracted_intent)
+    expiry = {key: expires_at for key, expires_at, _ in cache.intents.items()}
+    assert expiry["vis alle soner"] <= time.time() + FALLBACK_TTL_SECONDS
+    assert expiry["vis alle etasjer"] > time.time() + FALLBACK_TTL_SECONDS
+    print(f"✓ Plan cache: {pipeline.plan_cache.info()}")
+
+
+def test_semantic_cache():
+    """Test that paraphrases reuse an LLM-resolved intent (offline)."""
+    print("\n=== Testing Semantic Cache ===")
+    
+    import json
+    from types import SimpleNamespace
+    from ontology import BrickOntology, BrickClass
+    from intent_extractor import IntentExtractor
+    from semantic_cache import SemanticCache, HashingEmbedder
+    
+    class FakeLLM:
+        def __init__(self):
+            self.calls = 0
+            self.chat = SimpleNamespace(completions=self)
+        
+        def create(self, model, messages, **kwargs):
+            self.calls += 1
+            entity = "brick_Floor" if "etasje" in messages[-1]["content"] else "brick_HVAC_Zone"
+            content = json.dumps({"intent_type": "query_aggregate", "entity_class": entity,
+                                  "parameters": {}, "confidence": 0.9})
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    
+    extractor = IntentExtractor(BrickOntology(), semantic_cache=SemanticCache(HashingEmbedder()))
+    llm = FakeLLM()
+    extractor._client = llm
+    
+    extractor.extract("Hvor mange etasjer har bygningen?")
+    intent = extractor.extract("Hvor mange etasjer har bygget?")
+    assert llm.calls == 1, "Paraphrase should be served from the semantic cache"
+    assert intent.entity_class == BrickClass.FLOOR
+    assert intent.original_query == "Hvor mange etasjer har bygget?"
+    
+    intent = extractor.extract("Hvor mange soner har bygningen?")
+    assert llm.calls == 2, "Different entity must not reuse a cached intent"
+    assert intent.entity_class == BrickClass.HVAC_ZONE
+    
+    extractor.extract("Vis alle sensorer i bygget")
+    extractor.extract("List sensorene i bygningen")
+    assert llm.calls == 3, "Paraphrase with other inflections should be served from the cache"
+    
+    extractor.extract("Hvor mange sensorer i bygningen")
+    assert llm.calls == 4, "Different intent must not reuse a cached intent"
+    print(f"✓ Semantic cache: {extractor.semantic_cache.info()}")
+
+
+def test_batch_extraction():
+    """Test that extract_batch dedupes questions and keeps input order (offline)."""
+    print("\n=== Testing Batch Extraction ===")
+    
+    import json
+    import threading
+    from types import SimpleNamespace
+    from ontology import BrickOntology, BrickClass
+    from intent_extractor import IntentExtractor
+    
+    class FakeLLM:
+        def __init__(self):
+            self.calls = 0
+            self.lock = threading.Lock()
+            self.chat = SimpleNamespace(completions=self)
+        
+        def create(self, model, messages, **kwargs):
+            with self.lock:
+                self.calls += 1
+            entity = "brick_Floor" if "etasje" in messages[-1]["content"] else "brick_HVAC_Zone"
+            content = json.dumps({"intent_type": "query_list", "entity_class": entity,
+                                  "parameters": {}, "confidence": 0.9})
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    
+    extractor = IntentExtractor(BrickOntology())
+    llm = FakeLLM()
+    extractor._client = llm
+    
+    queries = ["Vis alle etasjer", "Vis alle soner", "Vis alle etasjer ", "Vis alle soner"]
+    intents = extractor.extract_batch(queries, max_concurrency=4)
+    assert llm.calls == 2, "Identical questions should be extracted once"
+    assert [i.entity_class for i in intents] == [BrickClass.FLOOR, BrickClass.HVAC_ZONE] * 2
+    assert [i.original_query for i in intents] == queries
+    print(f"✓ {len(queries)} questions, {llm.calls} LLM calls")
+
+
+def test_batch_processing():
+    """Test that a batch runs each distinct graph query once (offline)."""
+    print("\n=== Testing Batch Processing ===")
+    
+    import asyncio
+    from pipeline import KGPipeline
+    
+    class FakeAsyncClient:
+        def __init__(self):
+            self.calls = []
+        
+        async def query(self, cypher, params=None):
+            self.calls.append((cypher, params))
+            return [{"count": 3}]
+    
+    pipeline = KGPipeline(query_guard=False)
+    client = FakeAsyncClient()
+    pipeline._async_client = client
+    
+    queries = ["Vis alle etasjer", "Vis alle soner", "Vis alle etasjer", "List alle etasjer"]
+    results = asyncio.run(pipeline.aprocess_batch(queries))
+    
+    assert [r.original_query for r in results] == queries
+    assert all(r.success for r in results)
+    assert len(client.calls) == 2, "Same Cypher should run once per batch"
+    assert results[0].debug_info["batch_group"] == results[3].debug_info["batch_group"]
+    print(f"✓ {len(queries)} questions, {len(client.calls)} graph queries")
+    
+    plan = pipeline.plan
+    
+    def flaky_plan(query, language=None):
+        if query == "Vis alle soner":
+            raise RuntimeError("LLM unavailable")
+        return plan(query, language)
+    
+    pipeline.plan = flaky_plan
+    results = asyncio.run(pipeline.aprocess_batch(["Vis alle etasjer", "Vis alle soner"], language="en"))
+    assert results[0].success and results[0].natural_response.startswith("Found"), results[0].natural_response
+    assert not results[1].success and "LLM unavailable" in results[1].debug_info["error"]
+    assert pipeline.language == "no", "Per-call language must not change the pipeline default"
+    print("✓ Failed planning is isolated per question")
+
+
+def test_query_guard():
+    """Test query rewriting, cost estimation and rejection (offline)."""
+    print("\n=== Testing Query Guard ===")
+    
+    from query_guard import QueryGuard, QueryRejected, LABELS_QUERY, EDGE_COUNT_QUERY
+    
+    guard = QueryGuard(max_rows=100, max_cost=10_000, max_hops=3)
+    cypher, rewrites = guard.rewrite("MATCH (b)-[:brick_hasPart*]->(x) RETURN x.name")
+    assert "*1..3" in cypher and cypher.endswith("LIMIT 100"), cypher
+    assert len(rewrites) == 2
+    assert guard.rewrite("MATCH (s) RETURN s LIMIT 5")[1] == []
+    assert guard.rewrite("MATCH (n) SET n.x = 1 RETURN n")[1] == [], "Writes are left alone"
+    
+    counts = {"brick_Entity": 50_000, "brick_Building": 10, "brick_Sensor": 20_000}
+    
+    class FakeClient:
+        graph_version = 0
+        stored_graph_version = 1
+        
+        def __init__(self):
+            self.queries = []
+            self.explains = 0
+        
+        def query(self, cypher, params=None, use_cache=True, timeout_ms=None):
+            self.queries.append(cypher)
+            if cypher == LABELS_QUERY:
+                return [{"label": label} for label in counts]
+            if cypher == EDGE_COUNT_QUERY:
+                return [{"count": 200_000}]
+            label = cypher.split(":")[1].split(")")[0]
+            return [{"count": counts[label]}]
+        
+        def explain(self, cypher, params=None):
+            self.explains += 1
+            if self.explains == 4:
+                raise ConnectionError("server went away")
+            if "brick_Building" in cypher:
+                return ["Results", "Project", "Node By Label Scan | (b:brick_Building)"]
+            return ["Results", "Project", "Conditional Traverse | (s)->(x)", "All Node Scan | (s)"]
+    
+    client = FakeClient()
+    guarded = guard.check(client, "MATCH (b:brick_Building) RETURN b.name")
+    assert guarded.cost.estimate == 10 and guarded.timeout_ms == guard.timeout_ms
+    assert guarded.truncated(100) and not guarded.truncated(10)
+    guard.check(client, "MATCH (b:brick_Building) RETURN b.name")
+    assert client.explains == 1, "Template cost should be cached"
+    
+    try:
+        guard.check(client, "MATCH (s)-->(x) RETURN x")
+        raise AssertionError("Expected QueryRejected")
+    except QueryRejected as e:
+        print(f"  {e}")
+        assert e.cost.estimate == 50_000 * 4
+    
+    client.stored_graph_version = 2
+    guard.check(client, "MATCH (b:brick_Building) RETURN b.name")
+    assert client.explains == 3, "Graph version change must drop cached costs"
+    
+    guarded = guard.check(client, "MATCH (b:brick_Building) RETURN b.id")
+    assert guarded.cost.estimate is None and "explain failed" in guarded.cost.reasons[0]
+    guarded = guard.check(client, "MATCH (b:brick_Building) RETURN b.id")
+    assert client.explains == 5, "A failed EXPLAIN must not be cached as the template's cost"
+    assert guarded.cost.estimate is not None
+    print(f"✓ Query guard: {guard.info()}")
+
+
+def test_profiling():
+    """Test stage timings, GRAPH.PROFILE parsing and the profile report (offline)."""
+    print("\n=== Testing Profiling ===")
+    
+    from pipeline import KGPipeline
+    from profiler import STAGES, parse_profile
+    from query_guard import GuardedQuery, QueryCost
+    
+    plan = [
+        "Results | Records produced: 3, Execution time: 0.002 ms",
+        "    Sort | Records produced: 3, Execution time: 0.010 ms",
+        "        Project | Records produced: 3, Execution time: 0.004 ms",
+        "            Node By Label Scan | (f:brick_Floor) | Records produced: 3, Execution time: 0.050 ms",
+    ]
+    operators = parse_profile(plan)
+    scan = operators[0]["children"][0]["children"][0]["children"][0]
+    assert scan["operation"] == "Node By Label Scan" and scan["args"] == "(f:brick_Floor)"
+    assert scan["records"] == 3 and scan["time_ms"] == 0.05
+    
+    class FakeClient:
+        def __init__(self):
+            self.options = []
+            self.profiles = []
+        
+        def query(self, cypher, params=None, **options):
+            self.options.append(options)
+            return [{"f": {"id": "floor_opera_1", "name": "1. etasje", "level": 1}}]
+        
+        def profile(self, cypher, params=None, timeout_ms=None):
+            self.profiles.append(timeout_ms)
+            return plan
+    
+    pipeline = KGPipeline(query_guard=False)
+    client = FakeClient()
+    pipeline._client = client
+    
+    result = pipeline.process("Vis alle etasjer", profile=True)
+    assert result.success
+    assert set(result.debug_info["timings_ms"]) == set(STAGES), result.debug_info["timings_ms"]
+    assert result.debug_info["profile"]["slowest_operator"]["operation"] == "Node By Label Scan"
+    assert client.options == [{"use_cache": False}], "Profiled queries must bypass the result cache"
+    
+    pipeline.process("Vis alle etasjer", profile=True)
+    report = pipeline.profile_report.slowest()
+    assert len(report) == 1 and report[0]["samples"] == 2
+    
+    # Ranked by db_execution; a slow LLM call doesn't make a template slow
+    from profiler import ProfileReport
+    profile_report = ProfileReport()
+    profile_report.add("MATCH (a) RETURN a", {"intent_extraction": 900.0, "db_execution": 2.0})
+    profile_report.add("MATCH (b) RETURN b", {"intent_extraction": 1.0, "db_execution": 40.0})
+    ranked = profile_report.slowest()
+    assert [entry["cypher"] for entry in ranked] == ["MATCH (b) RETURN b", "MATCH (a) RETURN a"]
+    assert ranked[1]["mean_ms"] == 2.0 and ranked[1]["total_mean_ms"] == 902.0
+    assert ranked[1]["stages_mean_ms"]["intent_extraction"] == 900.0
+    print(f"✓ Timings: {result.debug_info['timings_ms']}")
+    print(f"✓ Slowest template: {report[0]['mean_ms']} ms mean")
+    
+    class FakeGuard:
+        def __init__(self, row_limit):
+            self.row_limit = row_limit
+        
+        def check(self, client, cypher, params=None):
+            return GuardedQuery(cypher, 2500, QueryCost(10.0), row_limit=self.row_limit)
+    
+    client.profiles.clear()
+    pipeline.query_guard = FakeGuard(row_limit=100)
+    pipeline.process("Vis alle etasjer", profile=True)
+    assert client.profiles == [2500], "The profile run must use the guarded timeout"
+    
+    pipeline.query_guard = FakeGuard(row_limit=1)
+    result = pipeline.process("Vis alle etasjer", profile=True)
+    assert result.debug_info["truncated"] and "profile" not in result.debug_info
+    assert client.profiles == [2500], "Truncated results must not be profiled again"
+    print("✓ Profile run uses the guard timeout and skips truncated results")
+
+
+def test_telemetry():
+    """Test stage spans and Prometheus metrics (offline)."""
+    print("\n=== Testing Telemetry ===")
+    
+    import json
+    from types import SimpleNamespace
+    from pipeline import KGPipeline
+    from telemetry import InMemorySpanExporter, PipelineTelemetry
+    
+    class FakeLLM:
+        """Fails for the first question, answers the second with low confidence."""
+        def __init__(self):
+            self.chat = SimpleNamespace(completions=self)
+        
+        def create(self, messages, **kwargs):
+            if "etasjer" in messages[-1]["content"]:
+                raise RuntimeError("rate limited")
+            content = json.dumps({"intent_type": "unknown", "confidence": 0.1})
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    
+    class FakeClient:
+        def query(self, cypher, params=None, **options):
+            return [{"count": 3}]
+    
+    exporter = InMemorySpanExporter()
+    pipeline = KGPipeline(query_guard=False, plan_cache=False, telemetry=PipelineTelemetry([exporter]))
+    pipeline.intent_extractor._client = FakeLLM()
+    pipeline._client = FakeClient()
+    
+    assert pipeline.process("Vis alle etasjer").success
+    root = exporter.spans[-1]
+    assert root.name == "kg.process" and root.attributes["outcome"] == "success"
+    stages = [span for span in exporter.spans if span.parent_id == root.span_id]
+    assert [span.name for span in stages] == [
+        "kg.intent_extraction", "kg.graphql_generation", "kg.cypher_resolution",
+        "kg.db_execution", "kg.response_formatting"
+    ]
+    assert all(span.trace_id == root.trace_id for span in stages)
+    assert stages[0].attributes["intent.source"] == "fallback"
+    
+    pipeline.process("Hva er meningen med livet?")
+    metrics = pipeline.telemetry.render()
+    for line in (
+        'kg_queries_total{outcome="success"} 1',
+        'kg_queries_total{outcome="low_confidence"} 1',
+        'kg_intent_extractions_total{source="fallback"} 1',
+        'kg_intent_extractions_total{source="llm"} 1',
+        'kg_llm_latency_seconds_count{outcome="error"} 1',
+        'kg_low_confidence_rejections_total 1',
+        'kg_db_latency_seconds_count{source="falkordb"} 1',
+        'kg_result_rows_bucket{intent="query_list",le="0"} 0',
+        'kg_result_rows_bucket{intent="query_list",le="1"} 1',
+    ):
+        assert line in metrics, line
+    print(f"✓ {len(exporter.spans)} spans, {len(metrics.splitlines())} metric lines")
+
+
 def test_full_pipeline_with_db():
     """Test full pipeline with database connection."""
     print("\n=== Testing Full Pipeline (with DB) ===")
@@ -199,6 +842,18 @@ def main():
     test_graphql_generator()
     test_graphql_to_cypher()
     test_full_pipeline_no_db()
+    test_count_questions()
+    test_query_parameters()
+    test_result_cache()
+    test_graph_sync()
+    test_snapshot_traversal()
+    test_plan_cache()
+    test_semantic_cache()
+    test_batch_extraction()
+    test_batch_processing()
+    test_query_guard()
+    test_profiling()
+    test_telemetry()
     
     print("\n" + "-" * 70)
     print("Testing with database connection...")
@@ -5,13 +5,18 @@ Pipeline Step 1: NL → Semantic Object
 """
 import json
 import os
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from typing import Dict, List, Optional, Any
 from openai import OpenAI
 
 from .ontology import DomainOntology, IntentType, EntityType
 
 
+# Parallel LLM requests in extract_batch
+DEFAULT_BATCH_CONCURRENCY = 8
+
+
 @dataclass
 class ExtractedIntent:
     """Structured representation of extracted intent from natural language."""
@@ -40,9 +45,10 @@ class IntentExtractor:
     Uses LLM to parse natural language and map to domain ontology.
     """
     
-    def __init__(self, ontology: DomainOntology, api_key: Optional[str] = None):
+    def __init__(self, ontology: DomainOntology, api_key: Optional[str] = None, max_retries: int = 5):
         self.ontology = ontology
-        self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        # Rate-limited (429) requests are retried with backoff, honouring Retry-After
+        self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"), max_retries=max_retries)
         self._system_prompt = self._build_system_prompt()
     
     def _build_system_prompt(self) -> str:
@@ -179,6 +185,26 @@ Query: "Vis meg alle innlegg med tittel og forfatter"
             original_query=query
         )
     
-    def extract_batch(self, queries: List[str]) -> List[ExtractedIntent]:
-        """Extract intents from multiple queries."""
-        return [self.extract(q) for q in queries]
+    def extract_batch(
+        self,
+        queries: List[str],
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> List[ExtractedIntent]:
+        """
+        Extract intents from multiple queries.
+        
+        Identical questions are extracted once, and up to max_concurrency
+        LLM requests run in parallel.
+        
+        Returns:
+            One intent per query, in input order
+        """
+        unique = list(dict.fromkeys(query.strip() for query in queries))
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(unique)))) as pool:
+            intents = dict(zip(unique, pool.map(self.extract, unique)))
+        
+        return [
+            replace(intents[query.strip()], parameters=dict(intents[query.strip()].parameters), original_query=query)
+            for query in queries
+        ]
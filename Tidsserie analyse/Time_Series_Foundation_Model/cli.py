@@ -6,32 +6,79 @@ Genererer bilder og tekstforklaringer.
 """
 
 import argparse
+import hashlib
+import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use("Agg")  # Ikke-interaktiv backend - vi lagrer kun til fil
 import matplotlib.dates as mdates
+import matplotlib.style
+from matplotlib.figure import Figure
 import numpy as np
 import pandas as pd
 
 from data_generator import (
     generate_yearly_energy_data,
-    get_monthly_statistics,
-    generate_scenario_data
+    get_monthly_statistics
 )
+from scenario_engine import ScenarioEngine, builtin_scenarios, get_scenario
 from timesfm_predictor import create_predictor
 from llm_explainer import create_explainer
 
 
+# Faste oppsett for hver graf (størrelse, tittel og aksetekster)
+FIGURE_TEMPLATES = {
+    "forecast": {
+        "figsize": (14, 6),
+        "title": "Energiforbruk - Historikk og Prognose",
+        "xlabel": "Dato",
+        "ylabel": "Forbruk (kWh)",
+    },
+    "monthly": {
+        "figsize": (12, 5),
+        "title": "Månedlig Energiforbruk 2025",
+        "xlabel": "Måned",
+        "ylabel": "Totalt forbruk (kWh)",
+    },
+    "daily_pattern": {
+        "figsize": (10, 5),
+        "title": "Daglig Forbruksmønster",
+        "xlabel": "Time på døgnet",
+        "ylabel": "Gjennomsnitt forbruk (kWh)",
+    },
+}
+
+RENDER_CACHE_FILE = ".render_cache.json"
+
+
 def setup_plot_style():
     """Sett opp enkel plotstil."""
-    plt.style.use('seaborn-v0_8-whitegrid')
-    plt.rcParams['figure.figsize'] = (12, 6)
-    plt.rcParams['font.size'] = 10
-    plt.rcParams['axes.titlesize'] = 12
-    plt.rcParams['axes.labelsize'] = 10
+    matplotlib.style.use('seaborn-v0_8-whitegrid')
+    matplotlib.rcParams['figure.figsize'] = (12, 6)
+    matplotlib.rcParams['font.size'] = 10
+    matplotlib.rcParams['axes.titlesize'] = 12
+    matplotlib.rcParams['axes.labelsize'] = 10
+
+
+def new_figure(name: str):
+    """
+    Lag figur og akse fra malen i FIGURE_TEMPLATES.
+    
+    Bruker Figure direkte i stedet for pyplot, så figurene ikke registreres
+    i pyplot sin globale tilstand og ikke trenger plt.close().
+    """
+    template = FIGURE_TEMPLATES[name]
+    fig = Figure(figsize=template["figsize"])
+    ax = fig.add_subplot()
+    ax.set_title(template["title"])
+    ax.set_xlabel(template["xlabel"])
+    ax.set_ylabel(template["ylabel"])
+    return fig, ax
 
 
 def plot_forecast(
@@ -40,7 +87,7 @@ def plot_forecast(
     output_path: str
 ) -> str:
     """Lag og lagre prognosegraf."""
-    fig, ax = plt.subplots(figsize=(14, 6))
+    fig, ax = new_figure("forecast")
     
     # Historiske data
     ax.plot(
@@ -67,31 +114,37 @@ def plot_forecast(
         linestyle="--",
         label="Prognose"
     )
-    ax.fill_between(
-        predictions["timestamp"],
-        predictions["predicted_kwh"],
-        alpha=0.2,
-        color="#f97316"
-    )
+    if "p10" in predictions and "p90" in predictions:
+        ax.fill_between(
+            predictions["timestamp"],
+            predictions["p10"],
+            predictions["p90"],
+            alpha=0.2,
+            color="#f97316",
+            label="Usikkerhet (p10-p90)"
+        )
+    else:
+        ax.fill_between(
+            predictions["timestamp"],
+            predictions["predicted_kwh"],
+            alpha=0.2,
+            color="#f97316"
+        )
     
-    ax.set_xlabel("Dato")
-    ax.set_ylabel("Forbruk (kWh)")
-    ax.set_title("Energiforbruk - Historikk og Prognose")
     ax.legend(loc="upper right")
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%d.%m'))
     ax.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, len(historical)//168)))
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
     
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_path, dpi=150, bbox_inches='tight')
     
     return output_path
 
 
 def plot_monthly(monthly_stats: pd.DataFrame, output_path: str) -> str:
     """Lag og lagre månedlig oversikt."""
-    fig, ax = plt.subplots(figsize=(12, 5))
+    fig, ax = new_figure("monthly")
     
     colors = ["#3b82f6" if i not in [5, 6, 7] else "#10b981" for i in range(12)]
     
@@ -114,14 +167,10 @@ def plot_monthly(monthly_stats: pd.DataFrame, output_path: str) -> str:
             fontsize=8
         )
     
-    ax.set_xlabel("Måned")
-    ax.set_ylabel("Totalt forbruk (kWh)")
-    ax.set_title("Månedlig Energiforbruk 2025")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
     
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_path, dpi=150, bbox_inches='tight')
     
     return output_path
 
@@ -130,7 +179,7 @@ def plot_daily_pattern(hourly_data: pd.DataFrame, output_path: str) -> str:
     """Lag og lagre daglig mønster."""
     hourly_avg = hourly_data.groupby("hour")["consumption_kwh"].agg(['mean', 'std']).reset_index()
     
-    fig, ax = plt.subplots(figsize=(10, 5))
+    fig, ax = new_figure("daily_pattern")
     
     ax.plot(
         hourly_avg["hour"],
@@ -148,19 +197,208 @@ def plot_daily_pattern(hourly_data: pd.DataFrame, output_path: str) -> str:
         color="#3b82f6"
     )
     
-    ax.set_xlabel("Time på døgnet")
-    ax.set_ylabel("Gjennomsnitt forbruk (kWh)")
-    ax.set_title("Daglig Forbruksmønster")
     ax.set_xticks(range(0, 24, 2))
     ax.set_xlim(0, 23)
-    plt.tight_layout()
+    fig.tight_layout()
     
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_path, dpi=150, bbox_inches='tight')
     
     return output_path
 
 
+def _to_highcharts_points(timestamps: pd.Series, *columns: pd.Series) -> list:
+    """Konverter til Highcharts-punkter [[timestamp_ms, verdi, ...], ...]."""
+    ms = pd.to_datetime(timestamps).astype("datetime64[ms]").astype("int64")
+    return [
+        [int(t), *(round(float(v), 3) for v in values)]
+        for t, *values in zip(ms, *columns)
+    ]
+
+
+def forecast_highcharts(historical: pd.DataFrame, predictions: pd.DataFrame) -> dict:
+    """Highcharts-konfigurasjon for historikk og prognose."""
+    template = FIGURE_TEMPLATES["forecast"]
+    series = [
+        {
+            "name": "Historisk forbruk",
+            "type": "area",
+            "color": "#3b82f6",
+            "data": _to_highcharts_points(historical["timestamp"], historical["consumption_kwh"]),
+        },
+        {
+            "name": "Prognose",
+            "type": "line",
+            "color": "#f97316",
+            "dashStyle": "Dash",
+            "data": _to_highcharts_points(predictions["timestamp"], predictions["predicted_kwh"]),
+        },
+    ]
+    if "p10" in predictions and "p90" in predictions:
+        series.append({
+            "name": "Usikkerhet (p10-p90)",
+            "type": "arearange",
+            "color": "#f97316",
+            "fillOpacity": 0.2,
+            "data": _to_highcharts_points(predictions["timestamp"], predictions["p10"], predictions["p90"]),
+        })
+    
+    return {
+        "title": {"text": template["title"]},
+        "xAxis": {"type": "datetime", "title": {"text": template["xlabel"]}},
+        "yAxis": {"title": {"text": template["ylabel"]}},
+        "series": series,
+    }
+
+
+def monthly_highcharts(monthly_stats: pd.DataFrame) -> dict:
+    """Highcharts-konfigurasjon for månedlig oversikt."""
+    template = FIGURE_TEMPLATES["monthly"]
+    return {
+        "chart": {"type": "column"},
+        "title": {"text": template["title"]},
+        "xAxis": {"categories": monthly_stats["month_name"].tolist(), "title": {"text": template["xlabel"]}},
+        "yAxis": {"title": {"text": template["ylabel"]}},
+        "series": [{
+            "name": "Totalt forbruk",
+            "data": [round(float(v), 1) for v in monthly_stats["total_kwh"]],
+        }],
+    }
+
+
+def daily_pattern_highcharts(hourly_data: pd.DataFrame) -> dict:
+    """Highcharts-konfigurasjon for daglig mønster (snitt ± std)."""
+    template = FIGURE_TEMPLATES["daily_pattern"]
+    hourly_avg = hourly_data.groupby("hour")["consumption_kwh"].agg(['mean', 'std']).reset_index()
+    return {
+        "title": {"text": template["title"]},
+        "xAxis": {"categories": hourly_avg["hour"].tolist(), "title": {"text": template["xlabel"]}},
+        "yAxis": {"title": {"text": template["ylabel"]}},
+        "series": [
+            {
+                "name": "Gjennomsnitt",
+                "type": "line",
+                "data": [round(float(v), 3) for v in hourly_avg["mean"]],
+            },
+            {
+                "name": "± std",
+                "type": "arearange",
+                "fillOpacity": 0.2,
+                "data": [
+                    [round(float(m - sd), 3), round(float(m + sd), 3)]
+                    for m, sd in zip(hourly_avg["mean"], hourly_avg["std"])
+                ],
+            },
+        ],
+    }
+
+
+# Graf -> (PNG-funksjon, Highcharts-funksjon)
+FIGURE_RENDERERS = {
+    "forecast": (plot_forecast, forecast_highcharts),
+    "monthly": (plot_monthly, monthly_highcharts),
+    "daily_pattern": (plot_daily_pattern, daily_pattern_highcharts),
+}
+
+
+def data_fingerprint(*frames: pd.DataFrame) -> str:
+    """Hash av innholdet i DataFrames, brukt som nøkkel i render-cachen."""
+    digest = hashlib.md5()
+    for frame in frames:
+        digest.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+        digest.update(",".join(map(str, frame.columns)).encode())
+    return digest.hexdigest()
+
+
+def _render_figure(name: str, fmt: str, args: tuple, output_dir: str) -> list:
+    """Render én graf til PNG og/eller Highcharts JSON. Kjøres i worker-prosess."""
+    plot_png, build_highcharts = FIGURE_RENDERERS[name]
+    paths = []
+    
+    if fmt in ("png", "both"):
+        paths.append(plot_png(*args, str(Path(output_dir) / f"{name}.png")))
+    
+    if fmt in ("highcharts", "both"):
+        json_path = Path(output_dir) / f"{name}.json"
+        json_path.write_text(
+            json.dumps(build_highcharts(*args), ensure_ascii=False),
+            encoding="utf-8"
+        )
+        paths.append(str(json_path))
+    
+    return paths
+
+
+def render_figures(
+    figures: dict,
+    output_dir: Path,
+    fmt: str = "png",
+    jobs: int = 3,
+    use_cache: bool = True
+) -> dict:
+    """
+    Render graf-sett med cache og parallellisering.
+    
+    Grafer der input-data (og format) er uendret siden forrige kjøring,
+    og filene finnes, hoppes over. Resten rendres i en prosesspool.
+    
+    Args:
+        figures: Graf-navn -> tuple med DataFrame-argumenter til renderer
+        output_dir: Mappe for output-filer
+        fmt: 'png', 'highcharts' eller 'both'
+        jobs: Antall worker-prosesser (1 = sekvensielt i denne prosessen)
+        use_cache: Hopp over grafer med uendret data
+    
+    Returns:
+        Dict med graf-navn -> (liste med filstier, True hvis fra cache)
+    """
+    cache_path = output_dir / RENDER_CACHE_FILE
+    cache = {}
+    if use_cache and cache_path.exists():
+        try:
+            cache = json.loads(cache_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            cache = {}
+    
+    results = {}
+    pending = {}
+    for name, args in figures.items():
+        fingerprint = f"{fmt}:{data_fingerprint(*args)}"
+        cached = cache.get(name, {})
+        if (
+            use_cache
+            and cached.get("fingerprint") == fingerprint
+            and all(Path(p).exists() for p in cached.get("paths", []))
+        ):
+            results[name] = (cached["paths"], True)
+        else:
+            pending[name] = (args, fingerprint)
+    
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(pending)),
+            initializer=setup_plot_style
+        ) as pool:
+            futures = {
+                name: pool.submit(_render_figure, name, fmt, args, str(output_dir))
+                for name, (args, _) in pending.items()
+            }
+            rendered = {name: future.result() for name, future in futures.items()}
+    else:
+        rendered = {
+            name: _render_figure(name, fmt, args, str(output_dir))
+            for name, (args, _) in pending.items()
+        }
+    
+    for name, paths in rendered.items():
+        results[name] = (paths, False)
+        cache[name] = {"fingerprint": pending[name][1], "paths": paths}
+    
+    if rendered:
+        cache_path.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+    
+    return {name: results[name] for name in figures}
+
+
 def print_stats(data: pd.DataFrame, predictions: pd.DataFrame, analysis: dict):
     """Skriv ut statistikk til konsollen."""
     print("\n" + "="*50)
@@ -210,6 +448,7 @@ Eksempler:
   python cli.py --days 14 --forecast 72   # 14 dager historikk, 72 timer prognose
   python cli.py --question "Hvorfor er forbruket høyt?"
   python cli.py --scenario smart_home     # Simuler smart hjem-scenario
+  python cli.py --compare-scenarios       # Sammenlign alle scenarioer
         """
     )
     
@@ -255,12 +494,38 @@ Eksempler:
         help="Scenario for analyse (default: normal)"
     )
     
+    parser.add_argument(
+        "--compare-scenarios",
+        action="store_true",
+        help="Sammenlign alle innebygde scenarioer i én tabell"
+    )
+    
     parser.add_argument(
         "--no-images",
         action="store_true",
         help="Hopp over bildegenerering"
     )
     
+    parser.add_argument(
+        "--format",
+        choices=["png", "highcharts", "both"],
+        default="png",
+        help="Bildeformat: PNG, Highcharts JSON eller begge (default: png)"
+    )
+    
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=min(3, os.cpu_count() or 1),
+        help="Antall prosesser for parallell rendering (default: opptil 3)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Render grafer på nytt selv om data er uendret"
+    )
+    
     parser.add_argument(
         "--quiet", "-Q",
         action="store_true",
@@ -290,12 +555,19 @@ Eksempler:
     data = full_data[full_data["timestamp"] >= start_date].copy()
     
     # Scenario
+    if args.scenario != "normal" or args.compare_scenarios:
+        engine = ScenarioEngine(data)
+    
     if args.scenario != "normal":
         if not args.quiet:
             print(f"Bruker scenario: {args.scenario}")
-        scenario_data = generate_scenario_data(data, args.scenario, 15)
-        savings = data['consumption_kwh'].sum() - scenario_data['consumption_kwh'].sum()
-        print(f"\n[Scenario] '{args.scenario}': Sparer {savings:.0f} kWh ({(savings/data['consumption_kwh'].sum())*100:.1f}%)")
+        row = engine.compare([get_scenario(args.scenario, 15)]).iloc[0]
+        print(f"\n[Scenario] '{args.scenario}': Sparer {row['savings_kwh']:.0f} kWh ({row['savings_percent']:.1f}%)")
+    
+    if args.compare_scenarios:
+        comparison = engine.compare(builtin_scenarios(15).values())
+        print("\n[Scenarioer]")
+        print(comparison.drop(columns="description").to_string(index=False))
     
     # Prediksjon
     if not args.quiet:
@@ -316,24 +588,26 @@ Eksempler:
         if not args.quiet:
             print("Genererer grafer...")
         
-        forecast_path = plot_forecast(
-            data, predictions,
-            str(output_dir / "forecast.png")
-        )
-        print(f"[OK] Prognose: {forecast_path}")
-        
-        monthly_stats = get_monthly_statistics(full_data)
-        monthly_path = plot_monthly(
-            monthly_stats,
-            str(output_dir / "monthly.png")
-        )
-        print(f"[OK] Manedlig: {monthly_path}")
-        
-        daily_path = plot_daily_pattern(
-            data,
-            str(output_dir / "daily_pattern.png")
+        figures = {
+            "forecast": (data, predictions),
+            "monthly": (get_monthly_statistics(full_data),),
+            "daily_pattern": (data,),
+        }
+        labels = {
+            "forecast": "Prognose",
+            "monthly": "Manedlig",
+            "daily_pattern": "Daglig monster",
+        }
+        rendered = render_figures(
+            figures,
+            output_dir,
+            fmt=args.format,
+            jobs=args.jobs,
+            use_cache=not args.no_cache
         )
-        print(f"[OK] Daglig monster: {daily_path}")
+        for name, (paths, from_cache) in rendered.items():
+            status = "CACHE" if from_cache else "OK"
+            print(f"[{status}] {labels[name]}: {', '.join(paths)}")
     
     # AI-spørsmål
     if args.question:
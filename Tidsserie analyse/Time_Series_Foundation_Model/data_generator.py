@@ -13,6 +13,8 @@ import pandas as pd
 from datetime import datetime, timedelta
 from typing import Optional
 
+from scenario_engine import ScenarioEngine, get_scenario
+
 
 def generate_yearly_energy_data(
     year: int = 2025,
@@ -163,35 +165,19 @@ def generate_scenario_data(
     
     Args:
         base_data: Originale energidata
-        scenario: Type scenario ('normal', 'reduced_heating', 'smart_home', 'solar')
+        scenario: Type scenario ('normal', 'reduced_heating', 'smart_home', 'solar'),
+            eller en kombinasjon som 'smart_home+solar'. Se scenario_engine.py
+            for å sammenligne mange scenarioer i ett kall.
         reduction_percent: Prosentvis reduksjon for enkle scenarioer
     
     Returns:
         DataFrame med modifiserte data
     """
-    scenario_data = base_data.copy()
+    engine = ScenarioEngine(base_data)
+    consumption = engine.evaluate([get_scenario(scenario, reduction_percent)])[0]
     
-    if scenario == "reduced_heating":
-        # Reduser vinterforbruk med gitt prosent
-        winter_months = [1, 2, 3, 11, 12]
-        mask = scenario_data["month"].isin(winter_months)
-        scenario_data.loc[mask, "consumption_kwh"] *= (1 - reduction_percent / 100)
-        
-    elif scenario == "smart_home":
-        # Reduser nattforbruk og optimaliser timing
-        night_mask = scenario_data["hour"].between(0, 5)
-        scenario_data.loc[night_mask, "consumption_kwh"] *= 0.7
-        
-        # Flytt noe forbruk til lavlast-timer
-        peak_mask = scenario_data["hour"].between(17, 21)
-        scenario_data.loc[peak_mask, "consumption_kwh"] *= 0.85
-        
-    elif scenario == "solar":
-        # Simuler solceller - reduserer forbruk midt på dagen om sommeren
-        summer_months = [4, 5, 6, 7, 8, 9]
-        day_hours = scenario_data["hour"].between(10, 16)
-        summer_day_mask = scenario_data["month"].isin(summer_months) & day_hours
-        scenario_data.loc[summer_day_mask, "consumption_kwh"] *= 0.3
+    scenario_data = base_data.copy()
+    scenario_data["consumption_kwh"] = consumption
     
     return scenario_data
 
@@ -0,0 +1,91 @@
+"""
+Frekvenshåndtering for tidsserieprognoser
+
+Felles for TimesFMPredictor og highchart-spikens ChartPredictionService:
+normalisering av frekvensangivelser, sjekk av fast tidsgitter og
+tidsstempler for prognoseperioden.
+"""
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+# Frekvens som brukes når angivelsen mangler eller er ukjent
+DEFAULT_FREQUENCY = "D"
+
+# Kanonisk frekvens -> pandas offset-alias
+PANDAS_FREQ = {
+    "H": "h",
+    "D": "D",
+    "W": "W",
+    "M": "MS",
+}
+
+# Kanonisk frekvens -> TimesFM frekvenskategori (0 = opptil daglig, 1 = uke/måned)
+TIMESFM_FREQ = {
+    "H": 0,
+    "D": 0,
+    "W": 1,
+    "M": 1,
+}
+
+# pd.infer_freq-svar som regnes som månedlig gitter (månedsstart eller -slutt)
+MONTHLY_FREQS = {"MS", "ME", "M"}
+
+# Fast steglengde for frekvensene som ikke følger kalenderen
+FIXED_STEPS = {
+    "H": pd.Timedelta(hours=1),
+    "D": pd.Timedelta(days=1),
+    "W": pd.Timedelta(weeks=1),
+}
+
+FREQUENCY_ALIASES = {
+    "h": "H", "1h": "H", "hour": "H", "hourly": "H", "time": "H",
+    "d": "D", "1d": "D", "b": "D", "day": "D", "daily": "D", "dag": "D",
+    "w": "W", "1w": "W", "week": "W", "weekly": "W", "uke": "W",
+    "m": "M", "ms": "M", "me": "M", "month": "M", "monthly": "M", "måned": "M",
+}
+
+
+def normalize_frequency(frequency: str) -> str:
+    """
+    Normaliser frekvensangivelse til 'H', 'D', 'W' eller 'M'.
+
+    Godtar både store og små bokstaver ('h'/'H') og pandas-alias som 'MS'.
+    Manglende eller ukjente verdier gir DEFAULT_FREQUENCY.
+    """
+    key = str(frequency or DEFAULT_FREQUENCY).strip().lower()
+    return FREQUENCY_ALIASES.get(key, DEFAULT_FREQUENCY)
+
+
+def is_regular(timestamps: pd.Series, frequency: str) -> bool:
+    """Sjekk om tidsstemplene allerede ligger på et fast gitter for frekvensen."""
+    # pd.infer_freq trenger minst 3 punkter; korte serier regnes som uregelmessige
+    if len(timestamps) < 3:
+        return False
+    if frequency == "M":
+        return pd.infer_freq(pd.DatetimeIndex(timestamps)) in MONTHLY_FREQS
+    steps = np.diff(pd.to_datetime(timestamps).values)
+    return bool(np.all(steps == FIXED_STEPS[frequency].to_timedelta64()))
+
+
+def future_timestamps(timestamps: pd.Series, n_steps: int, frequency: str) -> List:
+    """
+    Tidsstempler for de n_steps neste periodene etter serien.
+
+    Steget tas fra seriens eget gitter (pd.infer_freq), så en ukeserie som
+    slutter på en onsdag fortsetter på onsdager, og en serie med
+    månedsslutt fortsetter på månedsslutt. Kan gitteret ikke utledes,
+    brukes siste tidsstempel + k * steg.
+    """
+    timestamps = pd.DatetimeIndex(pd.to_datetime(timestamps))
+    last = timestamps[-1]
+    inferred = pd.infer_freq(timestamps) if len(timestamps) >= 3 else None
+    if inferred is not None:
+        return list(pd.date_range(start=last, periods=n_steps + 1, freq=inferred)[1:])
+    if frequency == "M":
+        return [last + pd.DateOffset(months=k) for k in range(1, n_steps + 1)]
+    step = FIXED_STEPS[frequency]
+    return [last + k * step for k in range(1, n_steps + 1)]
@@ -7,6 +7,8 @@ på naturlig norsk språk.
 
 import os
 import json
+import hashlib
+from collections import OrderedDict
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 import pandas as pd
@@ -24,6 +26,180 @@ except ImportError:
     print("OpenAI ikke installert.")
 
 
+def _json_default(obj):
+    """Gjør numpy-verdier JSON-serialiserbare."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if hasattr(obj, "item"):  # numpy scalar
+        return obj.item()
+    return str(obj)
+
+
+class ContextBuilder:
+    """
+    Bygger LLM-kontekst fra energidata innenfor et token-budsjett.
+    
+    Sammendraget for et (historikk, prognose, analyse)-sett beregnes én gang
+    og caches, slik at flere spørsmål om samme datasett gjenbruker det.
+    Seksjoner prioriteres: får ikke alt plass, utelates de minst viktige.
+    """
+    
+    # Grovt anslag for norsk/engelsk tekst med GPT-tokenizer
+    CHARS_PER_TOKEN = 4
+    
+    # Seksjon -> (prioritet, visningsrekkefølge). Lavere prioritet tas med først.
+    SECTIONS = {
+        "historical": (1, 1),
+        "forecast": (2, 3),
+        "insights": (3, 4),
+        "monthly": (4, 2),
+        "analysis": (5, 5),
+    }
+    
+    def __init__(self, token_budget: int = 1200, max_entries: int = 8):
+        """
+        Args:
+            token_budget: Maks antall tokens for konteksten
+            max_entries: Antall datasett som holdes i cache
+        """
+        self.token_budget = token_budget
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def estimate_tokens(cls, text: str) -> int:
+        """Anslå antall tokens i en tekst."""
+        return len(text) // cls.CHARS_PER_TOKEN + 1
+    
+    def _fingerprint(
+        self,
+        historical_data: pd.DataFrame,
+        predictions: Optional[pd.DataFrame],
+        analysis: Optional[dict]
+    ) -> str:
+        """Hash av datasettet, brukt som cache-nøkkel."""
+        digest = hashlib.md5()
+        columns = [c for c in ("timestamp", "consumption_kwh", "month") if c in historical_data.columns]
+        digest.update(pd.util.hash_pandas_object(historical_data[columns], index=False).values.tobytes())
+        if predictions is not None and len(predictions) > 0:
+            digest.update(pd.util.hash_pandas_object(
+                predictions[["timestamp", "predicted_kwh"]], index=False
+            ).values.tobytes())
+        if analysis:
+            digest.update(json.dumps(analysis, default=_json_default, sort_keys=True).encode())
+        return digest.hexdigest()
+    
+    def summarize(
+        self,
+        historical_data: pd.DataFrame,
+        predictions: Optional[pd.DataFrame] = None,
+        analysis: Optional[dict] = None
+    ) -> dict:
+        """
+        Nøkkeltall og ferdig formaterte seksjoner for datasettet (cachet).
+        
+        Returns:
+            Dict med 'stats' (tall) og 'sections' (navn -> tekst)
+        """
+        key = self._fingerprint(historical_data, predictions, analysis)
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        self.misses += 1
+        
+        values = historical_data["consumption_kwh"].to_numpy(dtype=np.float64)
+        timestamps = historical_data["timestamp"]
+        stats = {
+            "periode": f"{timestamps.min()} til {timestamps.max()}",
+            "antall_observasjoner": int(len(values)),
+            "totalt_forbruk_kwh": round(float(values.sum()), 2),
+            "gjennomsnitt_kwh": round(float(values.mean()), 2),
+            "maks_kwh": round(float(values.max()), 2),
+            "min_kwh": round(float(values.min()), 2)
+        }
+        sections = {
+            "historical": f"**Historisk data:**\n{json.dumps(stats, indent=2, ensure_ascii=False)}"
+        }
+        
+        # Månedlig fordeling hvis tilgjengelig
+        if "month" in historical_data.columns:
+            months = historical_data["month"].to_numpy(dtype=np.int64)
+            totals = np.bincount(months, weights=values, minlength=13)
+            monthly = {int(m): round(float(totals[m]), 2) for m in np.unique(months)}
+            sections["monthly"] = f"**Maanedlig forbruk (kWh):**\n{json.dumps(monthly, indent=2)}"
+        
+        # Prediksjoner
+        if predictions is not None and len(predictions) > 0:
+            pred_values = predictions["predicted_kwh"].to_numpy(dtype=np.float64)
+            stats["prognose"] = {
+                "prognose_periode": f"{predictions['timestamp'].min()} til {predictions['timestamp'].max()}",
+                "forventet_totalt": round(float(pred_values.sum()), 2),
+                "forventet_snitt": round(float(pred_values.mean()), 2),
+                "antall_perioder": int(len(pred_values))
+            }
+            sections["forecast"] = f"**Prognose:**\n{json.dumps(stats['prognose'], indent=2, ensure_ascii=False)}"
+        
+        # Analyse - innsikt og detaljer som egne seksjoner
+        if analysis:
+            insights = analysis.get("insights") or []
+            if insights:
+                sections["insights"] = "**Innsikt:**\n" + "\n".join(f"- {i}" for i in insights)
+            details = {k: v for k, v in analysis.items() if k != "insights"}
+            if details:
+                sections["analysis"] = (
+                    f"**Analyse:**\n{json.dumps(details, indent=2, ensure_ascii=False, default=_json_default)}"
+                )
+        
+        entry = {"stats": stats, "sections": sections}
+        self._cache[key] = entry
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        
+        return entry
+    
+    def build(
+        self,
+        historical_data: pd.DataFrame,
+        predictions: Optional[pd.DataFrame] = None,
+        analysis: Optional[dict] = None,
+        token_budget: Optional[int] = None
+    ) -> str:
+        """
+        Bygg konteksttekst innenfor token-budsjettet.
+        
+        Args:
+            historical_data: Historiske forbruksdata
+            predictions: Prediksjoner (valgfritt)
+            analysis: Analyseresultater (valgfritt)
+            token_budget: Overstyr budsjettet for dette kallet
+        
+        Returns:
+            Kontekst klar for prompten
+        """
+        budget = token_budget or self.token_budget
+        sections = self.summarize(historical_data, predictions, analysis)["sections"]
+        
+        selected = []
+        omitted = []
+        used = 0
+        for name in sorted(sections, key=lambda n: self.SECTIONS[n][0]):
+            cost = self.estimate_tokens(sections[name])
+            if used + cost <= budget:
+                selected.append(name)
+                used += cost
+            else:
+                omitted.append(name)
+        
+        parts = [sections[name] for name in sorted(selected, key=lambda n: self.SECTIONS[n][1])]
+        if omitted:
+            parts.append(f"(Utelatt pga. kontekstgrense: {', '.join(omitted)})")
+        
+        return "\n\n".join(parts)
+
+
 class EnergyExplainer:
     """
     Klasse for å forklare energidata ved hjelp av GPT-4.
@@ -42,16 +218,18 @@ Hvis du er usikker, si det tydelig.
 
 Format svarene dine pent med overskrifter og punktlister når det passer."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, context_token_budget: int = 1200):
         """
         Initialiser explainer med OpenAI API.
         
         Args:
             api_key: OpenAI API nøkkel (ellers fra miljøvariabel)
+            context_token_budget: Maks tokens for datakonteksten i prompten
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.client = None
         self.model = "gpt-4o"  # Bruk gpt-4o for best ytelse
+        self.context_builder = ContextBuilder(token_budget=context_token_budget)
         
         if OPENAI_AVAILABLE and self.api_key:
             self.client = OpenAI(api_key=self.api_key)
@@ -136,7 +314,7 @@ Gi en kort oppsummering av energiforbruket og eventuelle anbefalinger."""
             Svar på spørsmålet
         """
         if not self.is_available():
-            return self._fallback_answer(question, historical_data, predictions)
+            return self._fallback_answer(question, historical_data, predictions, analysis)
         
         context = self._prepare_context(historical_data, predictions, analysis)
         
@@ -172,7 +350,10 @@ Spørsmål: {question}"""
         base_consumption: float,
         scenario_consumption: float,
         scenario_name: str,
-        time_period: str = "år"
+        time_period: str = "år",
+        historical_data: Optional[pd.DataFrame] = None,
+        predictions: Optional[pd.DataFrame] = None,
+        analysis: Optional[dict] = None
     ) -> str:
         """
         Forklar konsekvenser av et energisparings-scenario.
@@ -182,6 +363,9 @@ Spørsmål: {question}"""
             scenario_consumption: Forbruk etter tiltak i kWh
             scenario_name: Navn på scenarioet
             time_period: Tidsperiode for beregningen
+            historical_data: Datasettet scenarioet gjelder (valgfritt, gir mer kontekst)
+            predictions: Prediksjoner for samme datasett (valgfritt)
+            analysis: Analyseresultater for samme datasett (valgfritt)
         
         Returns:
             Forklaring av scenarioet
@@ -215,6 +399,14 @@ Estimert spart (ved {price_per_kwh} kr/kWh): {money_saved:.0f} kr
 
 Forklar hva dette betyr i praksis, og gi eventuelle tilleggsråd."""
         
+        if historical_data is not None:
+            # Samme cachede kontekst som explain_data/answer_question, men mindre budsjett
+            context = self.context_builder.build(
+                historical_data, predictions, analysis,
+                token_budget=self.context_builder.token_budget // 2
+            )
+            prompt += f"\n\nEnergidata for kontekst:\n{context}"
+        
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -235,48 +427,8 @@ Forklar hva dette betyr i praksis, og gi eventuelle tilleggsråd."""
         predictions: Optional[pd.DataFrame] = None,
         analysis: Optional[dict] = None
     ) -> str:
-        """Forbered datakontext for LLM."""
-        context_parts = []
-        
-        # Historisk data sammendrag
-        hist_summary = {
-            "periode": f"{historical_data['timestamp'].min()} til {historical_data['timestamp'].max()}",
-            "antall_observasjoner": int(len(historical_data)),
-            "totalt_forbruk_kwh": float(round(historical_data['consumption_kwh'].sum(), 2)),
-            "gjennomsnitt_kwh": float(round(historical_data['consumption_kwh'].mean(), 2)),
-            "maks_kwh": float(round(historical_data['consumption_kwh'].max(), 2)),
-            "min_kwh": float(round(historical_data['consumption_kwh'].min(), 2))
-        }
-        context_parts.append(f"**Historisk data:**\n{json.dumps(hist_summary, indent=2, ensure_ascii=False)}")
-        
-        # Månedlig fordeling hvis tilgjengelig
-        if 'month' in historical_data.columns:
-            monthly = {int(k): float(v) for k, v in historical_data.groupby('month')['consumption_kwh'].sum().to_dict().items()}
-            context_parts.append(f"**Maanedlig forbruk (kWh):**\n{json.dumps(monthly, indent=2)}")
-        
-        # Prediksjoner
-        if predictions is not None and len(predictions) > 0:
-            pred_summary = {
-                "prognose_periode": f"{predictions['timestamp'].min()} til {predictions['timestamp'].max()}",
-                "forventet_totalt": float(round(predictions['predicted_kwh'].sum(), 2)),
-                "forventet_snitt": float(round(predictions['predicted_kwh'].mean(), 2))
-            }
-            context_parts.append(f"**Prognose:**\n{json.dumps(pred_summary, indent=2, ensure_ascii=False)}")
-        
-        # Analyse - konverter numpy typer til Python typer
-        if analysis:
-            def convert_numpy(obj):
-                if isinstance(obj, dict):
-                    return {k: convert_numpy(v) for k, v in obj.items()}
-                elif isinstance(obj, list):
-                    return [convert_numpy(i) for i in obj]
-                elif hasattr(obj, 'item'):  # numpy scalar
-                    return obj.item()
-                return obj
-            analysis_clean = convert_numpy(analysis)
-            context_parts.append(f"**Analyse:**\n{json.dumps(analysis_clean, indent=2, ensure_ascii=False)}")
-        
-        return "\n\n".join(context_parts)
+        """Forbered datakontext for LLM (cachet og budsjettert via ContextBuilder)."""
+        return self.context_builder.build(historical_data, predictions, analysis)
     
     def _fallback_explanation(
         self,
@@ -286,8 +438,9 @@ Forklar hva dette betyr i praksis, og gi eventuelle tilleggsråd."""
         user_question: Optional[str]
     ) -> str:
         """Fallback forklaring når OpenAI ikke er tilgjengelig."""
-        total = historical_data['consumption_kwh'].sum()
-        avg = historical_data['consumption_kwh'].mean()
+        stats = self.context_builder.summarize(historical_data, predictions, analysis)["stats"]
+        total = stats["totalt_forbruk_kwh"]
+        avg = stats["gjennomsnitt_kwh"]
         
         explanation = f"""## Energiforbruk Oppsummering
 
@@ -297,8 +450,8 @@ Forklar hva dette betyr i praksis, og gi eventuelle tilleggsråd."""
 
 """
         
-        if predictions is not None and len(predictions) > 0:
-            pred_total = predictions['predicted_kwh'].sum()
+        if "prognose" in stats:
+            pred_total = stats["prognose"]["forventet_totalt"]
             explanation += f"""**Prognose:**
 - Forventet forbruk: {pred_total:.0f} kWh
 - Antall timer i prognosen: {len(predictions)}
@@ -318,11 +471,14 @@ Forklar hva dette betyr i praksis, og gi eventuelle tilleggsråd."""
         self,
         question: str,
         historical_data: pd.DataFrame,
-        predictions: Optional[pd.DataFrame]
+        predictions: Optional[pd.DataFrame],
+        analysis: Optional[dict] = None
     ) -> str:
         """Enkelt svar når OpenAI ikke er tilgjengelig."""
-        total = historical_data['consumption_kwh'].sum()
-        avg = historical_data['consumption_kwh'].mean()
+        # Samme argumenter som explain_data, så sammendraget deler cache-oppføring
+        stats = self.context_builder.summarize(historical_data, predictions, analysis)["stats"]
+        total = stats["totalt_forbruk_kwh"]
+        avg = stats["gjennomsnitt_kwh"]
         
         # Enkel keyword-matching
         question_lower = question.lower()
@@ -334,8 +490,8 @@ Forklar hva dette betyr i praksis, og gi eventuelle tilleggsråd."""
             return f"Gjennomsnittlig forbruk per time er {avg:.2f} kWh."
         
         if "prediksjon" in question_lower or "prognose" in question_lower or "fremtid" in question_lower:
-            if predictions is not None:
-                pred_total = predictions['predicted_kwh'].sum()
+            if "prognose" in stats:
+                pred_total = stats["prognose"]["forventet_totalt"]
                 return f"Prognosen viser et forventet forbruk på {pred_total:.0f} kWh for de neste {len(predictions)} timene."
             return "Ingen prognosedata tilgjengelig."
         
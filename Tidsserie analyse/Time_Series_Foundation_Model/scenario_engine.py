@@ -0,0 +1,248 @@
+"""
+Scenario Engine
+
+Evaluerer mange energiscenarioer samtidig. Hvert scenario blir en rad med
+multiplikatorer over tidsaksen, slik at alle scenarioer regnes ut som én
+(scenarioer × tid) matrise over den samme basisserien - uten å kopiere
+DataFrames per scenario.
+
+Scenarioer er bygget av regler (måneder, timer, helg -> faktor, trend,
+volatilitet) og kan kombineres fritt, f.eks. smart_home + solar.
+Energiscenarioene ligger i builtin_scenarios(), prognosescenarioene for
+Highcharts-spiken (bullish, bearish, volatile) i chart_scenarios().
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class ScenarioRule:
+    """
+    Multipliser forbruket med `factor` der alle angitte betingelser gjelder.
+
+    Betingelser som er None matcher alle tidspunkter. `trend` er relativ
+    endring ved siste treffende tidspunkt (lineær rampe fra 1.0), og
+    `volatility` standardavviket for multiplikativ støy.
+    """
+    factor: float = 1.0
+    months: Optional[Tuple[int, ...]] = None
+    hours: Optional[Tuple[int, ...]] = None
+    weekend: Optional[bool] = None
+    trend: float = 0.0
+    volatility: float = 0.0
+
+
+@dataclass
+class Scenario:
+    """Navngitt scenario bestående av én eller flere regler."""
+    name: str
+    rules: List[ScenarioRule] = field(default_factory=list)
+    description: str = ""
+
+    def __add__(self, other: "Scenario") -> "Scenario":
+        return combine_scenarios(self, other)
+
+
+def combine_scenarios(*scenarios: Scenario, name: Optional[str] = None) -> Scenario:
+    """
+    Kombiner scenarioer. Regler er multiplikative, så kombinasjonen er
+    produktet av scenarioenes multiplikatorer.
+    """
+    return Scenario(
+        name=name or "+".join(s.name for s in scenarios),
+        rules=[rule for s in scenarios for rule in s.rules],
+        description=" + ".join(s.description or s.name for s in scenarios),
+    )
+
+
+def builtin_scenarios(reduction_percent: float = 10.0) -> Dict[str, Scenario]:
+    """
+    Innebygde scenarioer (samme tiltak som tidligere i generate_scenario_data).
+
+    Args:
+        reduction_percent: Prosentvis reduksjon for redusert oppvarming
+    """
+    return {
+        "normal": Scenario("normal", [], "Ingen tiltak"),
+        "reduced_heating": Scenario(
+            "reduced_heating",
+            [ScenarioRule(1 - reduction_percent / 100, months=(1, 2, 3, 11, 12))],
+            f"Redusert vinteroppvarming ({reduction_percent:.0f}%)",
+        ),
+        "smart_home": Scenario(
+            "smart_home",
+            [
+                ScenarioRule(0.7, hours=tuple(range(0, 6))),
+                ScenarioRule(0.85, hours=tuple(range(17, 22))),
+            ],
+            "Smart styring: lavere nattforbruk og kapping av kveldstopp",
+        ),
+        "solar": Scenario(
+            "solar",
+            [ScenarioRule(0.3, months=(4, 5, 6, 7, 8, 9), hours=tuple(range(10, 17)))],
+            "Solceller dekker forbruk midt på dagen om sommeren",
+        ),
+    }
+
+
+def chart_scenarios() -> Dict[str, Scenario]:
+    """Prognosescenarioer for Highcharts-spiken. Kombiner med '+', f.eks. 'bullish+volatile'."""
+    return {
+        "bullish": Scenario("bullish", [ScenarioRule(trend=0.2)], "20% oppgang over perioden"),
+        "bearish": Scenario("bearish", [ScenarioRule(trend=-0.2)], "20% nedgang over perioden"),
+        "volatile": Scenario("volatile", [ScenarioRule(volatility=0.15)], "15% multiplikativ støy"),
+    }
+
+
+def scenario_from_dict(spec: dict) -> Scenario:
+    """
+    Egendefinert scenario fra dict med 'name' og valgfrie 'trend',
+    'volatility' og 'level' (konstant nivåskift, 0.1 = +10%).
+    """
+    rule = ScenarioRule(
+        factor=1.0 + float(spec.get("level") or 0.0),
+        trend=float(spec.get("trend") or 0.0),
+        volatility=float(spec.get("volatility") or 0.0),
+    )
+    return Scenario(spec.get("name", "custom"), [rule], spec.get("description", ""))
+
+
+class ScenarioEngine:
+    """
+    Regner ut scenarioer over én basisserie.
+
+    Kalenderfeltene (måned, time, helg) trekkes ut én gang, og masker
+    gjenbrukes mellom regler og scenarioer.
+    """
+
+    def __init__(self, base_data: pd.DataFrame):
+        """
+        Args:
+            base_data: DataFrame med 'timestamp' og 'consumption_kwh' kolonner
+        """
+        timestamps = pd.DatetimeIndex(base_data["timestamp"])
+        self.timestamps = timestamps
+        self.values = base_data["consumption_kwh"].to_numpy(dtype=np.float64)
+        self._month = timestamps.month.to_numpy()
+        self._hour = timestamps.hour.to_numpy()
+        self._weekend = timestamps.dayofweek.to_numpy() >= 5
+        self._mask_cache: Dict[tuple, np.ndarray] = {}
+
+    def _mask(self, rule: ScenarioRule) -> np.ndarray:
+        """Boolsk maske for tidspunktene en regel gjelder for."""
+        key = (rule.months, rule.hours, rule.weekend)
+        if key not in self._mask_cache:
+            mask = np.ones(len(self.values), dtype=bool)
+            if rule.months is not None:
+                mask &= np.isin(self._month, rule.months)
+            if rule.hours is not None:
+                mask &= np.isin(self._hour, rule.hours)
+            if rule.weekend is not None:
+                mask &= self._weekend == rule.weekend
+            self._mask_cache[key] = mask
+        return self._mask_cache[key]
+
+    def multipliers(self, scenarios: Iterable[Scenario]) -> np.ndarray:
+        """
+        Bygg multiplikatormatrisen.
+
+        Returns:
+            Array med form (antall scenarioer, antall tidspunkter)
+        """
+        scenarios = list(scenarios)
+        matrix = np.ones((len(scenarios), len(self.values)))
+        for row, scenario in enumerate(scenarios):
+            for rule in scenario.rules:
+                mask = self._mask(rule)
+                matrix[row, mask] *= rule.factor
+                if rule.trend:
+                    matrix[row, mask] *= np.linspace(1.0, 1.0 + rule.trend, mask.sum())
+                if rule.volatility:
+                    matrix[row, mask] *= np.random.normal(1.0, rule.volatility, mask.sum())
+        return matrix
+
+    def evaluate(self, scenarios: Iterable[Scenario]) -> np.ndarray:
+        """
+        Forbruk per scenario og tidspunkt.
+
+        Returns:
+            Array med form (antall scenarioer, antall tidspunkter)
+        """
+        return self.multipliers(scenarios) * self.values
+
+    def compare(
+        self,
+        scenarios: Iterable[Scenario],
+        price_per_kwh: float = 1.50
+    ) -> pd.DataFrame:
+        """
+        Sammenlign scenarioer mot basisserien i ett kall.
+
+        Args:
+            scenarios: Scenarioer som skal sammenlignes
+            price_per_kwh: Strømpris brukt for kostnadsestimat
+
+        Returns:
+            DataFrame med én rad per scenario: totalforbruk, besparelse
+            (kWh, %, kr) og toppforbruk
+        """
+        scenarios = list(scenarios)
+        consumption = self.evaluate(scenarios)
+
+        base_total = self.values.sum()
+        totals = consumption.sum(axis=1)
+        savings = base_total - totals
+
+        return pd.DataFrame({
+            "scenario": [s.name for s in scenarios],
+            "description": [s.description for s in scenarios],
+            "total_kwh": totals.round(1),
+            "savings_kwh": savings.round(1),
+            "savings_percent": (savings / base_total * 100 if base_total else np.zeros(len(scenarios))).round(1),
+            "savings_nok": (savings * price_per_kwh).round(0),
+            "peak_kwh": consumption.max(axis=1, initial=0.0).round(2),
+        })
+
+
+def get_scenario(
+    name: str,
+    reduction_percent: float = 10.0,
+    available: Optional[Dict[str, Scenario]] = None
+) -> Scenario:
+    """
+    Slå opp et innebygd scenario. Kombinasjoner kan angis med '+',
+    f.eks. 'smart_home+solar'.
+
+    Args:
+        available: Scenarioene det slås opp i (standard: builtin_scenarios)
+    """
+    if available is None:
+        available = builtin_scenarios(reduction_percent)
+    parts = [part.strip() for part in name.split("+")]
+    unknown = [part for part in parts if part not in available]
+    if unknown:
+        raise ValueError(f"Ukjent scenario: {', '.join(unknown)}. Gyldige: {', '.join(available)}")
+    if len(parts) == 1:
+        return available[parts[0]]
+    return combine_scenarios(*(available[part] for part in parts), name=name)
+
+
+if __name__ == "__main__":
+    from data_generator import generate_yearly_energy_data
+
+    data = generate_yearly_energy_data(2025, frequency="h")
+    engine = ScenarioEngine(data)
+
+    scenarios = list(builtin_scenarios(15).values())
+    scenarios.append(get_scenario("smart_home+solar"))
+    scenarios.append(Scenario(
+        "weekend_shift",
+        [ScenarioRule(0.9, weekend=True, hours=tuple(range(8, 20)))],
+        "Egendefinert: 10% lavere dagforbruk i helgene",
+    ))
+
+    print(engine.compare(scenarios).drop(columns="description").to_string(index=False))
@@ -0,0 +1,91 @@
+"""
+Tester for render-cachen i CLI-et
+
+Kjør:
+    python -m pytest -q test_cli.py
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from cli import RENDER_CACHE_FILE, render_figures
+from timesfm_predictor import TimesFMPredictor
+
+
+def _hourly(days: int = 3) -> pd.DataFrame:
+    timestamps = pd.date_range("2025-01-06", periods=24 * days, freq="h")
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "hour": timestamps.hour,
+        "consumption_kwh": 1.0 + np.arange(len(timestamps)) % 24 / 10,
+    })
+
+
+def _monthly() -> pd.DataFrame:
+    return pd.DataFrame({"month_name": ["Jan", "Feb"], "total_kwh": [310.0, 280.0]})
+
+
+def test_render_cache_skips_unchanged_figures(tmp_path):
+    """Test at uendrede grafer hentes fra cache og endrede rendres på nytt."""
+    hourly = _hourly()
+    figures = {"monthly": (_monthly(),), "daily_pattern": (hourly,)}
+
+    first = render_figures(figures, tmp_path, fmt="highcharts", jobs=1)
+    assert not any(from_cache for _, from_cache in first.values())
+    assert (tmp_path / RENDER_CACHE_FILE).exists()
+    config = json.loads((tmp_path / "monthly.json").read_text(encoding="utf-8"))
+    assert config["series"][0]["data"] == [310.0, 280.0]
+
+    second = render_figures(figures, tmp_path, fmt="highcharts", jobs=1)
+    assert all(from_cache for _, from_cache in second.values())
+    assert second["monthly"][0] == first["monthly"][0]
+
+    changed = hourly.copy()
+    changed.loc[0, "consumption_kwh"] += 1
+    third = render_figures(
+        {"monthly": (_monthly(),), "daily_pattern": (changed,)}, tmp_path, fmt="highcharts", jobs=1
+    )
+    assert third["monthly"][1], "Uendret graf skal fortsatt komme fra cache"
+    assert not third["daily_pattern"][1], "Endrede data skal rendres på nytt"
+
+
+def test_render_cache_bypass_and_missing_files(tmp_path):
+    """Test use_cache=False og at slettede filer rendres på nytt."""
+    figures = {"monthly": (_monthly(),)}
+    render_figures(figures, tmp_path, fmt="highcharts", jobs=1)
+
+    assert not render_figures(figures, tmp_path, fmt="highcharts", jobs=1, use_cache=False)["monthly"][1]
+
+    (tmp_path / "monthly.json").unlink()
+    paths, from_cache = render_figures(figures, tmp_path, fmt="highcharts", jobs=1)["monthly"]
+    assert not from_cache
+    assert (tmp_path / "monthly.json").exists() and paths == [str(tmp_path / "monthly.json")]
+
+
+def test_render_cache_hits_for_repeated_forecast(tmp_path):
+    """Test at samme historikk gir samme fallback-prognose, så prognosegrafen hentes fra cache."""
+    history = _hourly(days=7)[["timestamp", "consumption_kwh"]]
+
+    predictions, _ = TimesFMPredictor().predict(history, forecast_horizon=24)
+    first = render_figures({"forecast": (history, predictions)}, tmp_path, fmt="highcharts", jobs=1)
+    assert not first["forecast"][1]
+
+    predictions, _ = TimesFMPredictor().predict(history, forecast_horizon=24)
+    second = render_figures({"forecast": (history, predictions)}, tmp_path, fmt="highcharts", jobs=1)
+    assert second["forecast"][1], "Uendret historikk skal gi samme prognose og cache-treff"
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    for test in (
+        test_render_cache_skips_unchanged_figures,
+        test_render_cache_bypass_and_missing_files,
+        test_render_cache_hits_for_repeated_forecast,
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("✓ Alle tester bestått")
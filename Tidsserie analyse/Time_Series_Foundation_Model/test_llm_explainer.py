@@ -0,0 +1,81 @@
+"""
+Tester for ContextBuilder (uten OpenAI)
+
+Kjør:
+    python -m pytest -q test_llm_explainer.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from llm_explainer import ContextBuilder, EnergyExplainer
+
+
+def _data():
+    timestamps = pd.date_range("2025-01-01", periods=24 * 60, freq="h")
+    historical = pd.DataFrame({
+        "timestamp": timestamps,
+        "consumption_kwh": 1.0 + np.arange(len(timestamps)) % 24 / 10,
+        "month": timestamps.month,
+    })
+    predictions = pd.DataFrame({
+        "timestamp": pd.date_range(timestamps[-1], periods=25, freq="h")[1:],
+        "predicted_kwh": np.full(24, 1.5),
+    })
+    analysis = {"insights": ["Høyt forbruk om kvelden"], "peak_hour": 18, "trend": "stabil"}
+    return historical, predictions, analysis
+
+
+def test_summary_is_cached():
+    """Test at sammendraget beregnes én gang per datasett."""
+    builder = ContextBuilder(max_entries=1)
+    historical, predictions, analysis = _data()
+
+    first = builder.summarize(historical, predictions, analysis)
+    assert builder.summarize(historical, predictions, analysis) is first
+    assert (builder.hits, builder.misses) == (1, 1)
+    assert set(first["sections"]) == set(ContextBuilder.SECTIONS)
+
+    builder.summarize(historical.iloc[:-1], predictions, analysis)
+    builder.summarize(historical, predictions, analysis)
+    assert builder.misses == 3, "max_entries=1 skal kaste ut eldste datasett"
+
+
+def test_budget_drops_lowest_priority_sections():
+    """Test at konteksten holder seg innenfor budsjettet og utelater de minst viktige seksjonene."""
+    builder = ContextBuilder()
+    historical, predictions, analysis = _data()
+    sections = builder.summarize(historical, predictions, analysis)["sections"]
+
+    full = builder.build(historical, predictions, analysis, token_budget=10_000)
+    assert "Utelatt" not in full
+    # Visningsrekkefølgen følger SECTIONS, ikke prioriteten
+    assert full.index("Historisk data") < full.index("Maanedlig") < full.index("Prognose")
+
+    budget = sum(builder.estimate_tokens(sections[name]) for name in ("historical", "forecast"))
+    context = builder.build(historical, predictions, analysis, token_budget=budget)
+    assert "Historisk data" in context and "Prognose" in context
+    assert "Maanedlig" not in context and "**Analyse:**" not in context
+    assert context.endswith("(Utelatt pga. kontekstgrense: insights, monthly, analysis)")
+    assert builder.estimate_tokens(context.rsplit("\n\n", 1)[0]) <= budget + 1
+
+
+
+def test_fallback_answer_shares_summary_with_explanation():
+    """Test at forklaring og svar uten OpenAI bruker samme cachede sammendrag."""
+    explainer = EnergyExplainer()
+    explainer.client = None
+    historical, predictions, analysis = _data()
+
+    explainer.explain_data(historical, predictions, analysis)
+    answer = explainer.answer_question("Hvor mye har vi brukt totalt?", historical, predictions, analysis)
+    assert answer.startswith("Totalt energiforbruk")
+    builder = explainer.context_builder
+    assert (builder.hits, builder.misses) == (1, 1)
+
+
+if __name__ == "__main__":
+    test_summary_is_cached()
+    test_budget_drops_lowest_priority_sections()
+    test_fallback_answer_shares_summary_with_explanation()
+    print("✓ Alle tester bestått")
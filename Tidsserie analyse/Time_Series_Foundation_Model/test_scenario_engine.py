@@ -0,0 +1,96 @@
+"""
+Tester for ScenarioEngine
+
+Kjør:
+    python -m pytest -q test_scenario_engine.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scenario_engine import (
+    Scenario,
+    ScenarioEngine,
+    ScenarioRule,
+    builtin_scenarios,
+    chart_scenarios,
+    get_scenario,
+    scenario_from_dict,
+)
+
+
+def _hourly(days: int = 14, start: str = "2025-01-06") -> pd.DataFrame:
+    timestamps = pd.date_range(start, periods=24 * days, freq="h")
+    return pd.DataFrame({"timestamp": timestamps, "consumption_kwh": np.full(len(timestamps), 2.0)})
+
+
+def test_rules_hit_only_matching_timestamps():
+    """Test at en regel bare endrer tidspunktene den gjelder for."""
+    engine = ScenarioEngine(_hourly())
+    night = Scenario("night", [ScenarioRule(0.5, hours=(0, 1))])
+    weekend = Scenario("weekend", [ScenarioRule(0.0, weekend=True)])
+
+    matrix = engine.multipliers([night, weekend])
+    assert matrix.shape == (2, 24 * 14)
+    assert (matrix[0][engine._hour < 2] == 0.5).all()
+    assert (matrix[0][engine._hour >= 2] == 1.0).all()
+    assert (matrix[1] == 0.0).sum() == 4 * 24, "To helger à to døgn"
+
+
+def test_combined_scenario_is_product():
+    """Test at smart_home+solar gir produktet av multiplikatorene."""
+    engine = ScenarioEngine(_hourly(start="2025-06-02"))
+    smart_home, solar = builtin_scenarios()["smart_home"], builtin_scenarios()["solar"]
+
+    combined = engine.multipliers([get_scenario("smart_home+solar")])[0]
+    separate = engine.multipliers([smart_home, solar])
+    assert np.allclose(combined, separate[0] * separate[1])
+    assert (smart_home + solar).name == "smart_home+solar"
+
+
+def test_compare():
+    """Test sammenligningstabellen mot basisserien."""
+    data = _hourly(start="2025-01-06")
+    engine = ScenarioEngine(data)
+    table = engine.compare([get_scenario("normal"), get_scenario("reduced_heating", 20)], price_per_kwh=2.0)
+
+    base_total = data["consumption_kwh"].sum()
+    assert list(table["scenario"]) == ["normal", "reduced_heating"]
+    assert table["savings_kwh"].iloc[0] == 0
+    assert table["total_kwh"].iloc[1] == pytest.approx(base_total * 0.8)
+    assert table["savings_percent"].iloc[1] == pytest.approx(20.0)
+    assert table["savings_nok"].iloc[1] == pytest.approx(base_total * 0.2 * 2.0, abs=0.5), "Avrundet til hele kroner"
+
+
+def test_chart_scenarios():
+    """Test trend-, volatilitet- og nivåregler for prognosescenarioene."""
+    np.random.seed(0)
+    engine = ScenarioEngine(_hourly(days=1))
+    bullish = get_scenario("bullish", available=chart_scenarios())
+    volatile = get_scenario("bullish+volatile", available=chart_scenarios())
+    level = scenario_from_dict({"name": "flat", "level": 0.1})
+
+    matrix = engine.multipliers([bullish, volatile, level])
+    assert matrix[0, 0] == 1.0 and matrix[0, -1] == pytest.approx(1.2)
+    assert np.all(np.diff(matrix[0]) > 0), "Trend skal være en lineær rampe"
+    assert not np.allclose(matrix[1], matrix[0]), "Volatilitet skal legge på støy"
+    assert np.allclose(matrix[2], 1.1)
+
+    with pytest.raises(ValueError, match="Ukjent scenario"):
+        get_scenario("smart_home", available=chart_scenarios())
+
+
+def test_unknown_scenario():
+    """Test at ukjente scenarionavn gir ValueError."""
+    with pytest.raises(ValueError, match="Ukjent scenario"):
+        get_scenario("smart_home+wind")
+
+
+if __name__ == "__main__":
+    test_rules_hit_only_matching_timestamps()
+    test_combined_scenario_is_product()
+    test_compare()
+    test_chart_scenarios()
+    test_unknown_scenario()
+    print("✓ Alle tester bestått")
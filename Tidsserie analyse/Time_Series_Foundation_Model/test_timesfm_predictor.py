@@ -0,0 +1,136 @@
+"""
+Tester for TimesFMPredictor (uten TimesFM-modellen)
+
+Kjør:
+    python -m pytest -q test_timesfm_predictor.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from timesfm_predictor import INPUT_PATCH_LENGTH, QUANTILE_LEVELS, TimesFMPredictor
+
+
+def _series(periods: int, freq: str, start: str = "2024-01-01") -> pd.DataFrame:
+    timestamps = pd.date_range(start, periods=periods, freq=freq)
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "consumption_kwh": np.arange(periods, dtype=float),
+    })
+
+
+def test_context_regular_series_is_kept():
+    """Test at en serie som allerede har riktig frekvens ikke resamples."""
+    predictor = TimesFMPredictor()
+    context, info = predictor.prepare_context(_series(100, "h"), "H")
+    assert not info["resampled"]
+    assert len(context) == 100, "Hele historikken skal beholdes"
+
+    model_context, trimmed = predictor.trim_context(context)
+    assert len(model_context) == 96, "TimesFM-konteksten skal kuttes til hele patcher"
+    assert trimmed
+    assert model_context["consumption_kwh"].iloc[-1] == 99
+
+
+def test_context_monthly_resamples_finer_data():
+    """Test at time- og døgndata resamples når det bes om månedsfrekvens."""
+    predictor = TimesFMPredictor()
+    for freq, periods in (("h", 24 * 90), ("D", 120)):
+        context, info = predictor.prepare_context(_series(periods, freq), "M")
+        assert info["resampled"], freq
+        assert (context["timestamp"].dt.day == 1).all(), "Forventet månedsstart-gitter"
+        assert len(context) in (3, 4, 5), len(context)
+
+    for freq in ("MS", "ME"):
+        _, info = predictor.prepare_context(_series(12, freq), "M")
+        assert not info["resampled"], freq
+
+
+def test_context_short_and_irregular_series():
+    """Test korte serier og serier med hull."""
+    predictor = TimesFMPredictor()
+    _, info = predictor.prepare_context(_series(2, "D"), "M")
+    assert info["resampled"], "Serier med under 3 punkter regnes som uregelmessige"
+
+    gappy = _series(10, "D").drop(index=[3, 4])
+    context, info = predictor.prepare_context(gappy, "D")
+    assert info["resampled"] and len(context) == 10
+    assert context["consumption_kwh"].iloc[3] == 3.0, "Hull skal interpoleres"
+
+    context, info = predictor.prepare_context(_series(2 * INPUT_PATCH_LENGTH + 5, "D"), "D")
+    assert len(predictor.trim_context(context)[0]) == 2 * INPUT_PATCH_LENGTH
+
+
+def test_future_timestamps_follow_series():
+    """Test at prognosen fortsetter seriens eget gitter i stedet for offset-ankeret."""
+    predictor = TimesFMPredictor()
+
+    weekly = _series(60, "W-WED", start="2024-01-03")
+    assert weekly["timestamp"].iloc[-1] == pd.Timestamp("2025-02-19")
+    predictions, metadata = predictor.predict(weekly, forecast_horizon=3, frequency="W")
+    assert predictions["timestamp"].iloc[0] == pd.Timestamp("2025-02-26")
+    assert metadata["context_length"] == 60, "Fallback skal bruke hele historikken"
+
+    month_end = _series(12, "ME", start="2022-05-31")
+    assert month_end["timestamp"].iloc[-1] == pd.Timestamp("2023-04-30")
+    predictions, _ = predictor.predict(month_end, forecast_horizon=2, frequency="M")
+    assert list(predictions["timestamp"]) == [pd.Timestamp("2023-05-31"), pd.Timestamp("2023-06-30")]
+
+
+def test_fallback_quantile_columns():
+    """Test at fallback-prognosen har ordnede p10/p50/p90-kolonner."""
+    np.random.seed(0)
+    predictor = TimesFMPredictor()
+    history = _series(24 * 21, "h")
+    history["consumption_kwh"] = 100 + 20 * np.sin(np.arange(len(history)) * 2 * np.pi / 24)
+
+    predictions, metadata = predictor._fallback_predict(history, 24, "H")
+    assert list(predictions.columns[-3:]) == list(QUANTILE_LEVELS)
+    assert metadata["uncertainty_method"] == "conformal_backtest"
+    assert (predictions["p10"] <= predictions["p50"]).all()
+    assert (predictions["p50"] <= predictions["p90"]).all()
+    assert (predictions["p10"] >= 0).all()
+
+
+def test_backtest_residuals():
+    """Test at backtesten gir residualer fra alle vinduer med riktig horisont."""
+    np.random.seed(0)
+    predictor = TimesFMPredictor()
+    values = np.full(24 * 12, 50.0)
+
+    residuals = predictor._backtest_residuals(values, 24, "H", n_windows=5)
+    assert len(residuals) == 5 * 24
+    assert np.abs(residuals).max() < 50 * 0.3, "Flat serie skal gi små residualer"
+
+    assert len(predictor._backtest_residuals(values[:3], 24, "H")) == 0, "For kort serie gir ingen residualer"
+
+
+def test_conformal_band():
+    """Test konformt bånd fra residualer og normalfallback med få residualer."""
+    predictor = TimesFMPredictor()
+    predictions = pd.DataFrame({"predicted_kwh": np.full(4, 100.0)})
+    residuals = np.linspace(-10, 10, 101)
+
+    method = predictor._add_conformal_quantiles(predictions, residuals, np.full(50, 100.0))
+    assert method == "conformal_backtest"
+    assert np.allclose(predictions["p50"], 100.0)
+    # Endelig-utvalgskorreksjonen gjør båndet litt bredere enn residualkvantilene
+    assert (predictions["p10"] < 100 + np.quantile(residuals, 0.1)).all()
+    assert (predictions["p90"] > 100 + np.quantile(residuals, 0.9)).all()
+
+    predictions = pd.DataFrame({"predicted_kwh": np.full(4, 100.0)})
+    history = np.array([90.0, 110.0] * 10)
+    method = predictor._add_conformal_quantiles(predictions, residuals[:5], history)
+    assert method == "historical_std"
+    assert np.allclose(predictions["p90"] - predictions["p50"], 1.2816 * np.std(history))
+
+
+if __name__ == "__main__":
+    test_context_regular_series_is_kept()
+    test_context_monthly_resamples_finer_data()
+    test_context_short_and_irregular_series()
+    test_future_timestamps_follow_series()
+    test_fallback_quantile_columns()
+    test_backtest_residuals()
+    test_conformal_band()
+    print("✓ Alle tester bestått")
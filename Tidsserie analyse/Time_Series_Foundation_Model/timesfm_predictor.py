@@ -6,11 +6,20 @@ Brukes for å predikere fremtidig energiforbruk basert på historiske data.
 """
 
 import os
+import hashlib
 import numpy as np
 import pandas as pd
 from typing import Optional, Tuple, List
 from datetime import datetime, timedelta
 
+from frequency import (
+    PANDAS_FREQ,
+    TIMESFM_FREQ,
+    future_timestamps,
+    is_regular,
+    normalize_frequency,
+)
+
 # Fix Windows symlink issue for HuggingFace
 os.environ["HF_HUB_DISABLE_SYMLINKS_WARNING"] = "1"
 
@@ -23,21 +32,35 @@ except ImportError:
     print("TimesFM ikke installert. Bruker fallback-prediksjon.")
 
 
+# Maks kontekstlengde for timesfm-1.0-200m, og patch-lengden modellen leser input i
+MAX_CONTEXT_LENGTH = 512
+INPUT_PATCH_LENGTH = 32
+
+# Kvantiler i prognosen. TimesFM returnerer [mean, q0.1, ..., q0.9] per steg.
+QUANTILE_LEVELS = {"p10": 0.1, "p50": 0.5, "p90": 0.9}
+
 class TimesFMPredictor:
     """
     Wrapper klasse for Google TimesFM modellen.
     """
     
-    def __init__(self, model_path: str = "google/timesfm-1.0-200m-pytorch"):
+    def __init__(
+        self,
+        model_path: str = "google/timesfm-1.0-200m-pytorch",
+        max_context_length: int = MAX_CONTEXT_LENGTH
+    ):
         """
         Initialiser TimesFM prediktor.
         
         Args:
             model_path: HuggingFace model path for TimesFM
+            max_context_length: Maks antall historiske punkter som sendes til modellen
         """
         self.model_path = model_path
+        self.max_context_length = max_context_length
         self.model = None
         self.is_initialized = False
+        self._context_cache = {}  # Cache for forberedt kontekst
         
         if TIMESFM_AVAILABLE:
             self._initialize_model()
@@ -55,6 +78,7 @@ class TimesFMPredictor:
                     backend="cpu",
                     per_core_batch_size=32,
                     horizon_len=128,
+                    context_len=self.max_context_length,
                 ),
                 checkpoint=timesfm.TimesFmCheckpoint(
                     huggingface_repo_id=self.model_path
@@ -86,58 +110,144 @@ class TimesFMPredictor:
         Args:
             historical_data: DataFrame med 'timestamp' og 'consumption_kwh' kolonner
             forecast_horizon: Antall tidspunkter å predikere fremover
-            frequency: Tidsfrekvens ('H' for time, 'D' for dag)
+            frequency: Tidsfrekvens ('H' for time, 'D' for dag, 'W' for uke, 'M' for måned)
         
         Returns:
             Tuple med (predictions DataFrame, metadata dict)
         """
+        frequency = normalize_frequency(frequency)
+        context, context_info = self.prepare_context(historical_data, frequency)
+        
         if not TIMESFM_AVAILABLE or not self.is_initialized:
-            return self._fallback_predict(historical_data, forecast_horizon, frequency)
+            return self._fallback_predict(context, forecast_horizon, frequency, context_info)
         
         try:
-            # Forbered data for TimesFM
-            values = historical_data["consumption_kwh"].values.astype(np.float32)
+            # Forbered data for TimesFM - bare de siste hele patchene brukes
+            model_context, trimmed = self.trim_context(context)
+            values = model_context["consumption_kwh"].values.astype(np.float32)
             
-            # Kjør prediksjon
-            forecast, _ = self.model.forecast(
+            # Kjør prediksjon - kvantilene kommer fra samme forward pass
+            forecast, quantile_forecast = self.model.forecast(
                 [values],
                 freq=[self._get_timesfm_freq(frequency)],
             )
             
             # Lag predictions DataFrame
-            last_timestamp = historical_data["timestamp"].iloc[-1]
-            freq_delta = timedelta(hours=1) if frequency == "h" else timedelta(days=1)
-            
-            future_timestamps = [
-                last_timestamp + freq_delta * (i + 1) 
-                for i in range(min(forecast_horizon, len(forecast[0])))
-            ]
+            n_steps = min(forecast_horizon, len(forecast[0]))
             
             predictions = pd.DataFrame({
-                "timestamp": future_timestamps,
-                "predicted_kwh": forecast[0][:forecast_horizon],
+                "timestamp": future_timestamps(context["timestamp"], n_steps, frequency),
+                "predicted_kwh": forecast[0][:n_steps],
                 "type": "forecast"
             })
+            for name, level in QUANTILE_LEVELS.items():
+                predictions[name] = quantile_forecast[0][:n_steps, int(round(level * 10))]
             
             metadata = {
                 "model": self.model_path,
                 "method": "timesfm",
+                "uncertainty_method": "timesfm_quantiles",
                 "horizon": forecast_horizon,
                 "frequency": frequency,
-                "context_length": len(values)
+                "context_length": len(values),
+                "trimmed": trimmed,
+                **context_info
             }
             
             return predictions, metadata
             
         except Exception as e:
             print(f"TimesFM prediksjon feilet: {e}")
-            return self._fallback_predict(historical_data, forecast_horizon, frequency)
+            return self._fallback_predict(context, forecast_horizon, frequency, context_info)
+    
+    def prepare_context(
+        self,
+        historical_data: pd.DataFrame,
+        frequency: str = "H"
+    ) -> Tuple[pd.DataFrame, dict]:
+        """
+        Forbered historikk for modellen.
+        
+        Legger uregelmessige serier på et fast tidsgitter. Hele historikken
+        beholdes; kutting til modellens kontekstlengde gjøres av
+        trim_context, bare for TimesFM. Resultatet caches per datasett og
+        frekvens.
+        
+        Args:
+            historical_data: DataFrame med 'timestamp' og 'consumption_kwh' kolonner
+            frequency: Tidsfrekvens ('H', 'D', 'W', 'M' - store eller små bokstaver)
+        
+        Returns:
+            Tuple med (kontekst DataFrame, info dict)
+        """
+        frequency = normalize_frequency(frequency)
+        cache_key = self._get_context_cache_key(historical_data, frequency)
+        if cache_key in self._context_cache:
+            context, info = self._context_cache[cache_key]
+            return context, dict(info, context_cached=True)
+        
+        series = (
+            historical_data[["timestamp", "consumption_kwh"]]
+            .dropna()
+            .sort_values("timestamp")
+        )
+        original_length = len(series)
+        
+        # Resample til fast gitter hvis serien er uregelmessig
+        resampled = False
+        if len(series) > 1 and not is_regular(series["timestamp"], frequency):
+            series = (
+                series.set_index("timestamp")["consumption_kwh"]
+                .resample(PANDAS_FREQ[frequency])
+                .mean()
+                .interpolate(limit_direction="both")
+                .reset_index()
+            )
+            resampled = True
+        context = series.reset_index(drop=True)
+        
+        info = {
+            "original_length": original_length,
+            "resampled": resampled,
+        }
+        
+        self._context_cache[cache_key] = (context, info)
+        # Begrens cache-størrelse til 20 oppføringer
+        if len(self._context_cache) > 20:
+            del self._context_cache[next(iter(self._context_cache))]
+        
+        return context, dict(info, context_cached=False)
+    
+    def trim_context(self, context: pd.DataFrame) -> Tuple[pd.DataFrame, bool]:
+        """
+        Kutt konteksten til punktene TimesFM faktisk leser.
+
+        Modellen leser input i hele patcher av 32, maks max_context_length.
+        Fallback-prediksjonen bruker hele historikken og kaller ikke denne.
+        
+        Returns:
+            Tuple med (kuttet kontekst, om noe ble kuttet)
+        """
+        context_length = min(len(context), self.max_context_length)
+        if context_length >= INPUT_PATCH_LENGTH:
+            context_length -= context_length % INPUT_PATCH_LENGTH
+        trimmed = context_length < len(context)
+        return context.iloc[-context_length:].reset_index(drop=True), trimmed
+    
+    def _get_context_cache_key(self, historical_data: pd.DataFrame, frequency: str) -> str:
+        """Lag cache-nøkkel fra tidsstempler, verdier og frekvens."""
+        digest = hashlib.md5()
+        digest.update(pd.to_datetime(historical_data["timestamp"]).values.astype("int64").tobytes())
+        digest.update(historical_data["consumption_kwh"].values.astype(np.float64).tobytes())
+        digest.update(frequency.encode())
+        return digest.hexdigest()
     
     def _fallback_predict(
         self,
         historical_data: pd.DataFrame,
         forecast_horizon: int,
-        frequency: str
+        frequency: str,
+        context_info: Optional[dict] = None
     ) -> Tuple[pd.DataFrame, dict]:
         """
         Fallback-prediksjon når TimesFM ikke er tilgjengelig.
@@ -145,8 +255,40 @@ class TimesFMPredictor:
         """
         values = historical_data["consumption_kwh"].values
         
+        predictions = pd.DataFrame({
+            "timestamp": future_timestamps(
+                historical_data["timestamp"], forecast_horizon, frequency
+            ),
+            "predicted_kwh": self._seasonal_forecast(values, forecast_horizon, frequency),
+            "type": "forecast"
+        })
+        
+        # Kalibrer kvantiler fra backtest-residualer
+        residuals = self._backtest_residuals(values, forecast_horizon, frequency)
+        uncertainty_method = self._add_conformal_quantiles(predictions, residuals, values)
+        
+        metadata = {
+            "model": "fallback_seasonal",
+            "method": "seasonal_decomposition",
+            "horizon": forecast_horizon,
+            "frequency": frequency,
+            "context_length": len(values),
+            "uncertainty_method": uncertainty_method,
+            **(context_info or {}),
+            "note": "TimesFM ikke tilgjengelig, bruker sesongbasert fallback"
+        }
+        
+        return predictions, metadata
+    
+    def _seasonal_forecast(
+        self,
+        values: np.ndarray,
+        forecast_horizon: int,
+        frequency: str
+    ) -> np.ndarray:
+        """Sesongbasert gjennomsnitt med lineær trend."""
         # Beregn sesongmønster (24 timer eller 7 dager)
-        season_length = 24 if frequency == "h" else 7
+        season_length = 24 if frequency == "H" else 7
         n_complete_seasons = len(values) // season_length
         
         if n_complete_seasons > 0:
@@ -167,46 +309,79 @@ class TimesFMPredictor:
         else:
             trend = 0
         
-        # Generer prediksjoner
-        last_timestamp = historical_data["timestamp"].iloc[-1]
-        freq_delta = timedelta(hours=1) if frequency == "h" else timedelta(days=1)
-        
-        predictions_list = []
-        for i in range(forecast_horizon):
-            idx = i % season_length
-            pred_value = seasonal_pattern[idx] + trend * (i + 1)
-            # Legg til litt usikkerhet
-            pred_value *= (1 + np.random.normal(0, 0.05))
-            pred_value = max(0.1, pred_value)  # Alltid positiv
-            
-            predictions_list.append({
-                "timestamp": last_timestamp + freq_delta * (i + 1),
-                "predicted_kwh": pred_value,
-                "type": "forecast"
-            })
+        steps = np.arange(forecast_horizon)
+        pred_values = seasonal_pattern[steps % season_length] + trend * (steps + 1)
+        # Legg til litt usikkerhet, seedet fra historikken så samme data gir
+        # samme prognose (og render-cachen i CLI-et treffer)
+        seed = int(hashlib.md5(np.asarray(values, dtype=np.float64).tobytes()).hexdigest()[:8], 16)
+        pred_values *= (1 + np.random.default_rng(seed).normal(0, 0.05, forecast_horizon))
+        return np.maximum(0.1, pred_values)  # Alltid positiv
+    
+    def _backtest_residuals(
+        self,
+        values: np.ndarray,
+        forecast_horizon: int,
+        frequency: str,
+        n_windows: int = 5
+    ) -> np.ndarray:
+        """
+        Rullerende backtest av fallback-modellen over de siste vinduene.
         
-        predictions = pd.DataFrame(predictions_list)
+        Returns:
+            Residualer (faktisk - prognose) fra alle vinduer
+        """
+        backtest_horizon = min(forecast_horizon, len(values) // (n_windows + 1))
+        residuals = []
         
-        metadata = {
-            "model": "fallback_seasonal",
-            "method": "seasonal_decomposition",
-            "horizon": forecast_horizon,
-            "frequency": frequency,
-            "context_length": len(values),
-            "note": "TimesFM ikke tilgjengelig, bruker sesongbasert fallback"
-        }
+        for window in range(1, n_windows + 1):
+            cutoff = len(values) - backtest_horizon * window
+            if backtest_horizon < 1 or cutoff < 1:
+                break
+            forecast = self._seasonal_forecast(values[:cutoff], backtest_horizon, frequency)
+            residuals.append(values[cutoff:cutoff + backtest_horizon] - forecast)
         
-        return predictions, metadata
+        return np.concatenate(residuals) if residuals else np.array([])
+    
+    def _add_conformal_quantiles(
+        self,
+        predictions: pd.DataFrame,
+        residuals: np.ndarray,
+        values: np.ndarray
+    ) -> str:
+        """
+        Legg p10/p50/p90-kolonner på prediksjonene.
+        
+        Empiriske kvantiler av backtest-residualene legges på punktprognosen
+        (split-konform kalibrering). Med for få residualer brukes historisk
+        standardavvik under normalantagelse.
+        
+        Returns:
+            Navn på metoden som ble brukt
+        """
+        pred_values = predictions["predicted_kwh"].values
+        
+        if len(residuals) >= 10:
+            n = len(residuals)
+            for name, level in QUANTILE_LEVELS.items():
+                # Endelig-utvalgskorreksjon gir litt bredere bånd ved få residualer
+                adjusted = np.clip(level + (level - 0.5) / n, 0.0, 1.0)
+                predictions[name] = np.maximum(0.0, pred_values + np.quantile(residuals, adjusted))
+            return "conformal_backtest"
+        
+        hist_std = np.std(values)
+        predictions["p10"] = np.maximum(0.0, pred_values - 1.2816 * hist_std)
+        predictions["p50"] = pred_values
+        predictions["p90"] = pred_values + 1.2816 * hist_std
+        return "historical_std"
     
     def _get_timesfm_freq(self, frequency: str) -> int:
-        """Konverter pandas frequency til TimesFM frequency."""
-        freq_map = {
-            "H": 0,   # Hourly
-            "D": 1,   # Daily
-            "W": 2,   # Weekly
-            "M": 3,   # Monthly
-        }
-        return freq_map.get(frequency, 0)
+        """
+        Konverter frekvens til TimesFM frequency-kategori.
+        
+        TimesFM har tre kategorier: 0 = høy frekvens (opptil daglig),
+        1 = middels (uke/måned), 2 = lav (kvartal/år).
+        """
+        return TIMESFM_FREQ[normalize_frequency(frequency)]
     
     def analyze_prediction(
         self,
@@ -6,6 +6,7 @@ Konverterer mellom Highcharts format og pandas DataFrame.
 """
 
 import os
+import sys
 import numpy as np
 import pandas as pd
 from typing import Optional, Tuple, List
@@ -13,6 +14,17 @@ from datetime import datetime, timedelta
 from functools import lru_cache
 import hashlib
 
+# Frekvenshåndtering og scenarioer deles med Tidsserie-prosjektet
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'Tidsserie analyse', 'Time_Series_Foundation_Model'))
+from frequency import (
+    PANDAS_FREQ,
+    TIMESFM_FREQ,
+    future_timestamps,
+    is_regular,
+    normalize_frequency,
+)
+from scenario_engine import Scenario, ScenarioEngine, chart_scenarios, get_scenario, scenario_from_dict
+
 # Fix Windows symlink issue for HuggingFace
 os.environ["HF_HUB_DISABLE_SYMLINKS_WARNING"] = "1"
 
@@ -25,6 +37,15 @@ except ImportError:
     print("[INFO] TimesFM ikke installert. Bruker fallback-prediksjon.")
 
 
+# TimesFM 1.0 leser maks 512 punkter, i patcher på 32
+MAX_CONTEXT_LENGTH = 512
+INPUT_PATCH_LENGTH = 32
+
+# Kvantiler som eksponeres. TimesFM sin kvantil-output har gjennomsnitt på
+# indeks 0 og kvantilene 0.1 ... 0.9 på indeks 1 ... 9.
+QUANTILE_LEVELS = {"p10": 0.1, "p50": 0.5, "p90": 0.9}
+
+
 class ChartPredictionService:
     """
     Prediksjonstjeneste for Highcharts tidsseriedata.
@@ -42,6 +63,7 @@ class ChartPredictionService:
         self.model = None
         self.is_initialized = False
         self._prediction_cache = {}  # Cache for prediksjonsresultater
+        self._context_cache = {}  # Cache for forberedt modellkontekst
 
         if TIMESFM_AVAILABLE:
             self._initialize_model()
@@ -95,6 +117,7 @@ class ChartPredictionService:
                     backend="cpu",
                     per_core_batch_size=32,
                     horizon_len=128,
+                    context_len=MAX_CONTEXT_LENGTH,
                 ),
                 checkpoint=timesfm.TimesFmCheckpoint(
                     huggingface_repo_id=self.model_path
@@ -125,12 +148,20 @@ class ChartPredictionService:
         Args:
             series_data: Liste med [timestamp, value] par fra Highcharts
             forecast_horizon: Antall perioder å predikere fremover
-            frequency: 'D' for daglig, 'H' for time
-            scenario: Valgfritt scenario - 'bullish', 'bearish', 'volatile'
+            frequency: 'H', 'D', 'W' eller 'M' (store eller små bokstaver)
+            scenario: Valgfritt scenario - 'bullish', 'bearish', 'volatile',
+                en kombinasjon som 'bullish+volatile', eller en dict med
+                'name', 'trend', 'volatility', 'level'
 
         Returns:
             Dict med predictions, confidence bounds og metadata
+
+        Raises:
+            ValueError: Ukjent scenarionavn
         """
+        frequency = normalize_frequency(frequency)
+        resolved_scenario = self._resolve_scenario(scenario) if scenario else None
+
         # Sjekk cache først
         cache_key = self._get_cache_key(series_data, forecast_horizon, frequency, scenario)
         cached_result = self._get_cached_prediction(cache_key)
@@ -145,18 +176,23 @@ class ChartPredictionService:
             self._cache_prediction(cache_key, result)
             return result
 
+        # Legg på fast gitter; TimesFM-stien kutter selv til modellens kontekstlengde
+        df, context_info = self._prepare_context(df, frequency)
+
         # Kjør prediksjon
         if TIMESFM_AVAILABLE and self.is_initialized:
             predictions, metadata = self._timesfm_predict(df, forecast_horizon, frequency)
         else:
             predictions, metadata = self._fallback_predict(df, forecast_horizon, frequency)
+        metadata.update(context_info)
 
         # Appliser scenario-modifikasjoner
-        if scenario:
-            predictions = self._apply_scenario(predictions, scenario)
+        if resolved_scenario is not None:
+            predictions = self._apply_scenario(predictions, resolved_scenario)
 
-        # Beregn konfidensintervall
-        confidence = self._calculate_confidence_bounds(predictions, df)
+        # Beregn konfidensintervall (modellens kvantiler, ellers kalibrert fallback)
+        confidence = self._calculate_confidence_bounds(predictions, df, frequency)
+        metadata["uncertainty_method"] = confidence["method"]
 
         # Konverter til Highcharts-format
         result = self._format_for_highcharts(predictions, confidence, metadata)
@@ -201,6 +237,59 @@ class ChartPredictionService:
             print(f"[ERROR] Kunne ikke konvertere data: {e}")
             return None
     
+    def _prepare_context(
+        self,
+        df: pd.DataFrame,
+        frequency: str
+    ) -> Tuple[pd.DataFrame, dict]:
+        """
+        Forbered historikken før prediksjon.
+
+        Uregelmessige serier (hull, duplikater, helger i børsdata) resamples
+        til fast gitter med interpolasjon. Hele historikken beholdes, slik at
+        fallback og konfidensbåndet ser alle punktene; _trim_context kutter
+        for TimesFM. Resultatet caches per datasett og frekvens.
+        """
+        digest = hashlib.md5(df["timestamp"].values.astype("int64").tobytes())
+        digest.update(df["value"].values.astype(np.float64).tobytes())
+        digest.update(frequency.encode())
+        context_key = digest.hexdigest()
+
+        if context_key in self._context_cache:
+            context, info = self._context_cache[context_key]
+            return context, dict(info, context_cached=True)
+
+        original_length = len(df)
+        context = df
+        regular = is_regular(df["timestamp"], frequency)
+
+        if not regular:
+            context = (
+                df.set_index("timestamp")["value"]
+                .resample(PANDAS_FREQ[frequency])
+                .mean()
+                .interpolate(limit_direction="both")
+                .reset_index()
+            )
+
+        info = {
+            "original_length": original_length,
+            "resampled": not regular,
+        }
+        self._context_cache[context_key] = (context, info)
+        if len(self._context_cache) > 20:
+            del self._context_cache[next(iter(self._context_cache))]
+
+        return context, dict(info, context_cached=False)
+
+    def _trim_context(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, bool]:
+        """Kutt til de siste hele patchene innenfor MAX_CONTEXT_LENGTH, som TimesFM leser."""
+        context_length = min(len(df), MAX_CONTEXT_LENGTH)
+        if context_length >= INPUT_PATCH_LENGTH:
+            context_length -= context_length % INPUT_PATCH_LENGTH
+        trimmed = context_length < len(df)
+        return df.iloc[-context_length:].reset_index(drop=True), trimmed
+
     def _timesfm_predict(
         self,
         df: pd.DataFrame,
@@ -209,35 +298,32 @@ class ChartPredictionService:
     ) -> Tuple[pd.DataFrame, dict]:
         """Kjør TimesFM prediksjon."""
         try:
-            values = df["value"].values.astype(np.float32)
+            context, trimmed = self._trim_context(df)
+            values = context["value"].values.astype(np.float32)
             
-            # Kjør prediksjon
-            freq_map = {"H": 0, "D": 1, "W": 2, "M": 3}
-            forecast, _ = self.model.forecast(
+            # Kjør prediksjon - punktprognose og kvantiler fra samme kall
+            forecast, quantile_forecast = self.model.forecast(
                 [values],
-                freq=[freq_map.get(frequency, 1)],
+                freq=[TIMESFM_FREQ[frequency]],
             )
             
             # Lag predictions DataFrame
-            last_timestamp = df["timestamp"].iloc[-1]
-            freq_delta = timedelta(hours=1) if frequency == "H" else timedelta(days=1)
-            
-            future_timestamps = [
-                last_timestamp + freq_delta * (i + 1)
-                for i in range(min(forecast_horizon, len(forecast[0])))
-            ]
+            n_steps = min(forecast_horizon, len(forecast[0]))
             
             predictions = pd.DataFrame({
-                "timestamp": future_timestamps,
-                "predicted_value": forecast[0][:forecast_horizon]
+                "timestamp": future_timestamps(df["timestamp"], n_steps, frequency),
+                "predicted_value": forecast[0][:n_steps]
             })
+            for name, level in QUANTILE_LEVELS.items():
+                predictions[name] = quantile_forecast[0][:n_steps, int(round(level * 10))]
             
             metadata = {
                 "model": self.model_path,
                 "method": "timesfm",
                 "horizon": forecast_horizon,
                 "frequency": frequency,
-                "context_length": len(values)
+                "context_length": len(values),
+                "trimmed": trimmed
             }
             
             return predictions, metadata
@@ -257,15 +343,46 @@ class ChartPredictionService:
         Brukes når TimesFM ikke er tilgjengelig.
         """
         values = df["value"].values
+        pred_values, trend_slope = self._trend_seasonal_forecast(
+            values, forecast_horizon, frequency
+        )
+        
+        predictions = pd.DataFrame({
+            "timestamp": future_timestamps(df["timestamp"], forecast_horizon, frequency),
+            "predicted_value": pred_values
+        })
+        
+        metadata = {
+            "model": "fallback_trend_seasonal",
+            "method": "linear_trend_with_seasonality",
+            "horizon": forecast_horizon,
+            "frequency": frequency,
+            "context_length": len(values),
+            "trend_slope": float(trend_slope),
+            "note": "TimesFM ikke tilgjengelig, bruker fallback"
+        }
         
+        return predictions, metadata
+    
+    def _trend_seasonal_forecast(
+        self,
+        values: np.ndarray,
+        forecast_horizon: int,
+        frequency: str
+    ) -> Tuple[np.ndarray, float]:
+        """
+        Lineær trend + sesongmønster. Brukes av fallback og av backtesten
+        som kalibrerer fallback-intervallene.
+
+        Returns:
+            Tuple med (prediksjoner, trend_slope)
+        """
         # Beregn lineær trend
         x = np.arange(len(values))
-        coeffs = np.polyfit(x, values, 1)
-        trend_slope = coeffs[0]
-        trend_intercept = coeffs[1]
+        trend_slope, trend_intercept = np.polyfit(x, values, 1)
         
-        # Beregn sesongmønster (siste 7 eller 24 perioder)
-        season_length = 7 if frequency == "D" else 24
+        # Beregn sesongmønster (siste to sesonger)
+        season_length = {"H": 24, "D": 7, "W": 52, "M": 12}[frequency]
         if len(values) >= season_length * 2:
             seasonal_values = values[-(season_length * 2):]
             seasonal_pattern = np.array([
@@ -276,95 +393,191 @@ class ChartPredictionService:
         else:
             seasonal_pattern = np.zeros(season_length)
         
-        # Generer prediksjoner
-        last_timestamp = df["timestamp"].iloc[-1]
-        freq_delta = timedelta(hours=1) if frequency == "H" else timedelta(days=1)
+        steps = np.arange(forecast_horizon)
+        trend_values = trend_slope * (len(values) + steps) + trend_intercept
+        seasonal_values = seasonal_pattern[steps % season_length]
         
-        predictions_list = []
-        base_idx = len(values)
+        # Kombiner med litt støy
+        noise = np.random.normal(0, np.std(values) * 0.05, forecast_horizon)
+        pred_values = trend_values + seasonal_values + noise
         
-        for i in range(forecast_horizon):
-            # Trend-komponent
-            trend_value = trend_slope * (base_idx + i) + trend_intercept
-            
-            # Sesong-komponent
-            seasonal_value = seasonal_pattern[i % season_length]
-            
-            # Kombiner med litt støy
-            noise = np.random.normal(0, np.std(values) * 0.05)
-            pred_value = trend_value + seasonal_value + noise
-            
-            # Sørg for positiv verdi hvis originale data er positive
-            if np.min(values) > 0:
-                pred_value = max(pred_value, np.min(values) * 0.5)
-            
-            predictions_list.append({
-                "timestamp": last_timestamp + freq_delta * (i + 1),
-                "predicted_value": pred_value
-            })
+        # Sørg for positiv verdi hvis originale data er positive
+        if np.min(values) > 0:
+            pred_values = np.maximum(pred_values, np.min(values) * 0.5)
         
-        predictions = pd.DataFrame(predictions_list)
+        return pred_values, float(trend_slope)
+    
+    def _backtest_residuals(
+        self,
+        values: np.ndarray,
+        forecast_horizon: int,
+        frequency: str,
+        n_windows: int = 5
+    ) -> np.ndarray:
+        """
+        Residualer (faktisk - prognose) fra rullerende backtest av fallback-modellen
+        på de siste vinduene av historikken.
+        """
+        backtest_horizon = min(forecast_horizon, len(values) // (n_windows + 1))
+        residuals = []
         
-        metadata = {
-            "model": "fallback_trend_seasonal",
-            "method": "linear_trend_with_seasonality",
-            "horizon": forecast_horizon,
-            "frequency": frequency,
-            "context_length": len(values),
-            "trend_slope": float(trend_slope),
-            "note": "TimesFM ikke tilgjengelig, bruker fallback"
-        }
+        for window in range(1, n_windows + 1):
+            cutoff = len(values) - backtest_horizon * window
+            if backtest_horizon < 1 or cutoff < 2:
+                break
+            forecast, _ = self._trend_seasonal_forecast(
+                values[:cutoff], backtest_horizon, frequency
+            )
+            residuals.append(values[cutoff:cutoff + backtest_horizon] - forecast)
         
-        return predictions, metadata
+        return np.concatenate(residuals) if residuals else np.array([])
+    
+    def _resolve_scenario(self, scenario) -> Scenario:
+        """
+        Slå opp et scenario i ScenarioEngine sine chart_scenarios().
+
+        Godtar navn, kombinasjoner med '+', eller en egendefinert dict med
+        'name' og valgfrie 'trend', 'volatility', 'level'.
+
+        Raises:
+            ValueError: Ukjent scenarionavn
+        """
+        if isinstance(scenario, dict):
+            return scenario_from_dict(scenario)
+        return get_scenario(str(scenario), available=chart_scenarios())
+    
+    def _scenario_values(
+        self,
+        timestamps: pd.Series,
+        values: np.ndarray,
+        scenarios: List[Scenario]
+    ) -> np.ndarray:
+        """
+        Scenarioverdier over prognosen som (scenarioer × tid) matrise.
+
+        Returns:
+            Array med form (antall scenarioer, antall tidspunkter)
+        """
+        engine = ScenarioEngine(pd.DataFrame({"timestamp": timestamps, "consumption_kwh": values}))
+        return engine.evaluate(scenarios)
     
     def _apply_scenario(
         self,
         predictions: pd.DataFrame,
-        scenario: str
+        scenario: Scenario
     ) -> pd.DataFrame:
         """Appliser scenario-modifikasjoner på prediksjonene."""
         df = predictions.copy()
-        values = df["predicted_value"].values
+        multiplier = self._scenario_values(df["timestamp"], np.ones(len(df)), [scenario])[0]
         
-        if scenario == "bullish":
-            # Øk trenden med 20%
-            growth = np.linspace(1.0, 1.2, len(values))
-            df["predicted_value"] = values * growth
-            
-        elif scenario == "bearish":
-            # Reduser trenden med 20%
-            decline = np.linspace(1.0, 0.8, len(values))
-            df["predicted_value"] = values * decline
-            
-        elif scenario == "volatile":
-            # Legg til høyere volatilitet
-            volatility = np.random.normal(1.0, 0.15, len(values))
-            df["predicted_value"] = values * volatility
+        # Samme multiplikator på punktprognose og kvantiler
+        for column in ["predicted_value", *QUANTILE_LEVELS]:
+            if column in df:
+                df[column] = df[column].values * multiplier
         
         return df
     
+    def compare_scenarios(
+        self,
+        series_data: List[List],
+        scenarios: List,
+        forecast_horizon: int = 30,
+        frequency: str = "D"
+    ) -> dict:
+        """
+        Evaluer mange scenarioer over én basisprognose.
+
+        Basisprognosen kjøres én gang; scenarioene regnes ut samtidig som
+        (scenarioer × tid) multiplikatormatrise over prognoseverdiene.
+
+        Returns:
+            Dict med basisprognose, scenarioserier og sammenligningstabell
+
+        Raises:
+            ValueError: Ukjent scenarionavn
+        """
+        resolved = [self._resolve_scenario(scenario) for scenario in scenarios]
+        base = self.predict_from_chart_data(series_data, forecast_horizon, frequency)
+        if not base.get("success"):
+            return base
+        
+        timestamps = [point[0] for point in base["predictions"]]
+        base_values = np.array([point[1] for point in base["predictions"]])
+        scenario_values = self._scenario_values(
+            pd.to_datetime(timestamps, unit="ms"), base_values, resolved
+        )
+        
+        base_total = base_values.sum()
+        series = {}
+        comparison = []
+        for scenario, values in zip(resolved, scenario_values):
+            name = scenario.name
+            series[name] = [[ts, round(v, 2)] for ts, v in zip(timestamps, values.tolist())]
+            comparison.append({
+                "scenario": name,
+                "total": round(float(values.sum()), 2),
+                "mean": round(float(values.mean()), 2),
+                "last": round(float(values[-1]), 2),
+                "difference": round(float(values.sum() - base_total), 2),
+                "difference_percent": round(float((values.sum() - base_total) / base_total * 100), 2) if base_total else 0.0,
+            })
+        
+        return {
+            "base": base,
+            "scenarios": series,
+            "comparison": comparison,
+            "success": True
+        }
+    
     def _calculate_confidence_bounds(
         self,
         predictions: pd.DataFrame,
-        historical_df: pd.DataFrame
+        historical_df: pd.DataFrame,
+        frequency: str = "D"
     ) -> dict:
-        """Beregn konfidensintervall basert på historisk volatilitet."""
-        hist_std = historical_df["value"].std()
+        """
+        Beregn p10/p50/p90-bånd for prognosen.
+
+        Bruker TimesFM sine kvantiler når de finnes. For fallback kalibreres
+        båndet konformt: empiriske kvantiler av backtest-residualene legges
+        på punktprognosen.
+        """
         pred_values = predictions["predicted_value"].values
         
-        # Øk usikkerhet over tid
-        uncertainty_growth = np.linspace(1.0, 2.0, len(pred_values))
-        
-        upper = pred_values + (hist_std * 1.96 * uncertainty_growth)
-        lower = pred_values - (hist_std * 1.96 * uncertainty_growth)
+        if all(name in predictions for name in QUANTILE_LEVELS):
+            bands = {name: predictions[name].values for name in QUANTILE_LEVELS}
+            method = "timesfm_quantiles"
+        else:
+            hist_values = historical_df["value"].values
+            residuals = self._backtest_residuals(hist_values, len(pred_values), frequency)
+            
+            if len(residuals) >= 10:
+                # Endelig-utvalgskorreksjon for konforme kvantiler
+                n = len(residuals)
+                bands = {}
+                for name, level in QUANTILE_LEVELS.items():
+                    adjusted = np.clip(level + (level - 0.5) / n, 0.0, 1.0)
+                    bands[name] = pred_values + np.quantile(residuals, adjusted)
+                method = "conformal_backtest"
+            else:
+                # For kort historikk til backtest - normalantagelse
+                hist_std = np.std(hist_values)
+                bands = {
+                    "p10": pred_values - 1.2816 * hist_std,
+                    "p50": pred_values.copy(),
+                    "p90": pred_values + 1.2816 * hist_std,
+                }
+                method = "historical_std"
         
         # Sørg for at lower ikke går under 0 hvis originale verdier er positive
         if historical_df["value"].min() > 0:
-            lower = np.maximum(lower, 0)
+            bands = {name: np.maximum(band, 0) for name, band in bands.items()}
         
         return {
-            "upper": upper.tolist(),
-            "lower": lower.tolist()
+            **{name: band.tolist() for name, band in bands.items()},
+            "upper": bands["p90"].tolist(),
+            "lower": bands["p10"].tolist(),
+            "method": method
         }
     
     def _format_for_highcharts(
@@ -390,9 +603,20 @@ class ChartPredictionService:
             for i in range(len(predictions))
         ]
         
+        # Kvantilserier som {"p10": [[timestamp_ms, value], ...], ...}
+        timestamps_ms = [int(ts.timestamp() * 1000) for ts in predictions["timestamp"]]
+        quantiles = {
+            name: [
+                [ts, round(value, 2)]
+                for ts, value in zip(timestamps_ms, confidence[name])
+            ]
+            for name in QUANTILE_LEVELS
+        }
+        
         return {
             "predictions": prediction_series,
             "confidenceRange": confidence_range,
+            "quantiles": quantiles,
             "metadata": metadata,
             "success": True
         }
@@ -402,6 +626,7 @@ class ChartPredictionService:
         return {
             "predictions": [],
             "confidenceRange": [],
+            "quantiles": {},
             "metadata": {"error": reason},
             "success": False
         }
@@ -16,7 +16,7 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 from dotenv import load_dotenv
 
 # Nye semantiske moduler
@@ -115,8 +115,7 @@ class ChartStateInput(BaseModel):
         description="Slutt-dato for custom periode (YYYY-MM-DD)"
     )
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 # ==========================================
@@ -500,8 +499,7 @@ class ChatMessage(BaseModel):
         description="Slutt-dato for custom periode"
     )
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 # Nøkkelord for å oppdage prediksjons-spørsmål
@@ -645,6 +643,7 @@ async def chat_with_assistant(chat_input: ChatMessage) -> dict:
                 prediction_data = {
                     "predictions": prediction_result.get("predictions", []),
                     "confidenceRange": prediction_result.get("confidenceRange", []),
+                    "quantiles": prediction_result.get("quantiles", {}),
                     "metadata": prediction_result.get("metadata", {}),
                     "analysis": analysis,
                     "horizon": horizon or 30,
@@ -757,8 +756,7 @@ class PredictionRequest(BaseModel):
         description="Slutt-dato for custom periode"
     )
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 # Lazy-load prediction service
@@ -793,12 +791,15 @@ async def predict_future(request: PredictionRequest) -> dict:
     service = get_prediction_service()
 
     # Kjør prediksjon på filtrert data
-    result = service.predict_from_chart_data(
-        series_data=filtered_data if filtered_data else request.series_data,
-        forecast_horizon=request.horizon,
-        frequency=request.frequency,
-        scenario=request.scenario
-    )
+    try:
+        result = service.predict_from_chart_data(
+            series_data=filtered_data if filtered_data else request.series_data,
+            forecast_horizon=request.horizon,
+            frequency=request.frequency,
+            scenario=request.scenario
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
     # Legg til informasjon om filtrering
     result["dataPointsUsed"] = len(filtered_data) if filtered_data else len(request.series_data)
@@ -837,6 +838,50 @@ async def predict_future(request: PredictionRequest) -> dict:
     return result
 
 
+class ScenarioComparisonRequest(BaseModel):
+    """Input for scenariosammenligning."""
+    series_data: list[list] = Field(
+        ...,
+        alias="seriesData",
+        description="Tidsseriedata som [[timestamp, value], ...]"
+    )
+    scenarios: list[Any] = Field(
+        default_factory=lambda: ["bullish", "bearish", "volatile"],
+        description="Scenarionavn ('bullish+volatile' for kombinasjon) eller dict med name/trend/volatility/level"
+    )
+    horizon: int = Field(default=30, ge=1, le=365)
+    frequency: str = Field(default="D")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+@app.post("/predict/scenarios")
+async def compare_prediction_scenarios(request: ScenarioComparisonRequest) -> dict:
+    """
+    Sammenlign flere scenarioer over én basisprognose i ett kall.
+
+    Ukjente scenarionavn gir 422.
+    """
+    service = get_prediction_service()
+    try:
+        result = service.compare_scenarios(
+            request.series_data,
+            request.scenarios,
+            forecast_horizon=request.horizon,
+            frequency=request.frequency
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    if not result.get("success"):
+        raise HTTPException(
+            status_code=400,
+            detail=result.get("metadata", {}).get("error", "Prediksjon feilet")
+        )
+    
+    return result
+
+
 async def generate_prediction_explanation(
     prediction_result: dict,
     scenario: Optional[str]
@@ -0,0 +1,135 @@
+"""
+Tester for ChartPredictionService (uten TimesFM-modellen)
+
+Kjør:
+    python -m pytest -q test_prediction_service.py
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from prediction_service import INPUT_PATCH_LENGTH, QUANTILE_LEVELS, ChartPredictionService
+
+
+def _frame(periods: int, freq: str, start: str = "2024-01-01") -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=periods, freq=freq),
+        "value": np.arange(periods, dtype=float),
+    })
+
+
+def _chart_series(periods: int) -> list:
+    """Highcharts-serie [[timestamp_ms, verdi], ...] med døgnverdier."""
+    frame = _frame(periods, "D")
+    values = 100 + 10 * np.sin(np.arange(periods) * 2 * np.pi / 7)
+    return [[int(ts.timestamp() * 1000), float(v)] for ts, v in zip(frame["timestamp"], values)]
+
+
+def test_prepare_context_frequency():
+    """Test at data resamples når gitteret ikke matcher frekvensen."""
+    service = ChartPredictionService()
+
+    context, info = service._prepare_context(_frame(120, "D"), "M")
+    assert info["resampled"], "Døgndata som månedsserie skal resamples"
+    assert (context["timestamp"].dt.day == 1).all()
+    assert len(context) == 4
+
+    _, info = service._prepare_context(_frame(24, "ME"), "M")
+    assert not info["resampled"]
+
+    _, info = service._prepare_context(_frame(2, "D"), "M")
+    assert info["resampled"], "Serier med under 3 punkter regnes som uregelmessige"
+
+    context, info = service._prepare_context(_frame(3 * INPUT_PATCH_LENGTH + 7, "h"), "H")
+    assert not info["resampled"] and len(context) == 3 * INPUT_PATCH_LENGTH + 7
+    context, trimmed = service._trim_context(context)
+    assert trimmed and len(context) == 3 * INPUT_PATCH_LENGTH
+
+
+def test_weekly_forecast_keeps_weekday():
+    """Test at en ukeserie som slutter på en onsdag får prognose på onsdager, fra hele historikken."""
+    np.random.seed(0)
+    service = ChartPredictionService()
+    frame = _frame(60, "W-WED", start="2024-01-03")
+    series = [[int(ts.timestamp() * 1000), float(v) + 1] for ts, v in zip(frame["timestamp"], frame["value"])]
+
+    result = service.predict_from_chart_data(series, forecast_horizon=2, frequency="w")
+    first = datetime.fromtimestamp(result["predictions"][0][0] / 1000)
+    assert first == datetime(2025, 2, 26)
+    assert result["metadata"]["context_length"] == 60
+
+
+def test_confidence_bounds():
+    """Test p10/p50/p90-bånd fra modellkvantiler, konform backtest og normalfallback."""
+    service = ChartPredictionService()
+    history = _frame(60, "D")
+    history["value"] += 10
+
+    with_quantiles = pd.DataFrame({
+        "predicted_value": [5.0, 6.0], "p10": [4.0, 5.0], "p50": [5.0, 6.0], "p90": [6.0, 7.0]
+    })
+    bounds = service._calculate_confidence_bounds(with_quantiles, history, "D")
+    assert bounds["method"] == "timesfm_quantiles"
+    assert bounds["lower"] == [4.0, 5.0] and bounds["upper"] == [6.0, 7.0]
+
+    predictions = pd.DataFrame({"predicted_value": np.full(7, 70.0)})
+    bounds = service._calculate_confidence_bounds(predictions, history, "D")
+    assert bounds["method"] == "conformal_backtest"
+    assert set(QUANTILE_LEVELS) <= set(bounds)
+    assert all(lo <= mid <= hi for lo, mid, hi in zip(bounds["p10"], bounds["p50"], bounds["p90"]))
+
+    short = _frame(8, "D")
+    short["value"] = [1.0, 9.0] * 4
+    bounds = service._calculate_confidence_bounds(pd.DataFrame({"predicted_value": [2.0, 2.0]}), short, "D")
+    assert bounds["method"] == "historical_std"
+    assert min(bounds["lower"]) == 0.0, "Positive serier skal ikke få negative nedre grenser"
+
+
+def test_compare_scenarios():
+    """Test at scenarioene regnes over én basisprognose."""
+    np.random.seed(0)
+    service = ChartPredictionService()
+    result = service.compare_scenarios(
+        _chart_series(60), ["bullish", "bearish", {"name": "flat", "level": 0.0}], forecast_horizon=14
+    )
+    assert result["success"]
+    assert list(result["scenarios"]) == ["bullish", "bearish", "flat"]
+    comparison = {row["scenario"]: row for row in result["comparison"]}
+    assert comparison["bullish"]["difference"] > 0 > comparison["bearish"]["difference"]
+    assert comparison["flat"]["difference"] == 0.0
+    assert all(len(series) == 14 for series in result["scenarios"].values())
+
+    assert not service.compare_scenarios(_chart_series(5), ["bullish"])["success"]
+    with pytest.raises(ValueError, match="Ukjent scenario"):
+        service.compare_scenarios(_chart_series(60), ["bullish+sideways"])
+
+
+def test_scenarios_endpoint():
+    """Test /predict/scenarios med FastAPI TestClient."""
+    from fastapi.testclient import TestClient
+    from server import app
+
+    client = TestClient(app)
+    response = client.post("/predict/scenarios", json={
+        "seriesData": _chart_series(60), "scenarios": ["bullish+volatile"], "horizon": 7
+    })
+    assert response.status_code == 200, response.text
+    assert response.json()["comparison"][0]["scenario"] == "bullish+volatile"
+
+    response = client.post("/predict/scenarios", json={"seriesData": _chart_series(3)})
+    assert response.status_code == 400
+
+    response = client.post("/predict/scenarios", json={"seriesData": _chart_series(60), "scenarios": ["sideways"]})
+    assert response.status_code == 422 and "sideways" in response.json()["detail"]
+
+
+if __name__ == "__main__":
+    test_prepare_context_frequency()
+    test_weekly_forecast_keeps_weekday()
+    test_confidence_bounds()
+    test_compare_scenarios()
+    test_scenarios_endpoint()
+    print("✓ Alle tester bestått")